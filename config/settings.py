@@ -134,6 +134,44 @@ REDIS_BOT_DB = int(os.environ.get('REDIS_BOT_DB', 0))
 
 SCHEDULER_DAILY_INTERVAL_SECONDS = int(os.environ.get('SCHEDULER_DAILY_INTERVAL_SECONDS', str(60 * 60 * 24)))
 SCHEDULER_HOURLY_INTERVAL_SECONDS = int(os.environ.get('SCHEDULER_HOURLY_INTERVAL_SECONDS', str(60 * 60)))
+# How often the horoscope delivery queue is drained; each run reads only what became due
+SCHEDULER_DELIVERY_INTERVAL_SECONDS = int(os.environ.get('SCHEDULER_DELIVERY_INTERVAL_SECONDS', '60'))
+# Number of user UIDs fetched per query when background tasks iterate over users
+SCHEDULER_UID_CHUNK_SIZE = int(os.environ.get('SCHEDULER_UID_CHUNK_SIZE', '500'))
+# Random delay added after each bucket boundary so jobs sharing a boundary do not start at once
+SCHEDULER_JITTER_SECONDS = float(os.environ.get('SCHEDULER_JITTER_SECONDS', '10'))
+# Missed hourly generation buckets replayed after downtime, oldest dropped first
+SCHEDULER_MAX_CATCH_UP_RUNS = int(os.environ.get('SCHEDULER_MAX_CATCH_UP_RUNS', '24'))
+# Per-job lease so only one bot replica runs each job; renewed every third of the TTL while it runs
+SCHEDULER_LEASE_TTL_SECONDS = int(os.environ.get('SCHEDULER_LEASE_TTL_SECONDS', '120'))
+# Identifies this replica as a lease holder; defaults to hostname:pid
+SCHEDULER_INSTANCE_ID = os.environ.get('SCHEDULER_INSTANCE_ID') or None
+
+
+# Message history retention (scheduled chunked purge). Only scheduled when the
+# cold archive is disabled; otherwise the archive moves the rows out first.
+
+MESSAGE_HISTORY_RETENTION_DAYS = int(os.environ.get('MESSAGE_HISTORY_RETENTION_DAYS', '30'))
+MESSAGE_HISTORY_RETENTION_CHUNK_SIZE = int(os.environ.get('MESSAGE_HISTORY_RETENTION_CHUNK_SIZE', '5000'))
+MESSAGE_HISTORY_RETENTION_CHUNK_PAUSE_SECONDS = float(
+    os.environ.get('MESSAGE_HISTORY_RETENTION_CHUNK_PAUSE_SECONDS', '0.5')
+)
+
+
+# Cold archive: old rows are moved to compressed JSON-lines files grouped by month.
+# When enabled it replaces the message history purge above: history leaves the hot
+# table after ARCHIVE_MESSAGE_HISTORY_AFTER_DAYS instead of being deleted after
+# MESSAGE_HISTORY_RETENTION_DAYS. Archived rows are deleted from the database, so
+# ARCHIVE_DIR has no default: it must be persistent storage shared by all replicas
+# (a mounted volume, never the container filesystem), and archiving refuses to run
+# without it.
+
+ARCHIVE_ENABLED = os.environ.get('ARCHIVE_ENABLED', 'False').lower() in ('true', '1', 'yes')
+ARCHIVE_DIR = Path(os.environ['ARCHIVE_DIR']) if os.environ.get('ARCHIVE_DIR') else None
+ARCHIVE_HOROSCOPE_AFTER_DAYS = int(os.environ.get('ARCHIVE_HOROSCOPE_AFTER_DAYS', '90'))
+ARCHIVE_MESSAGE_HISTORY_AFTER_DAYS = int(os.environ.get('ARCHIVE_MESSAGE_HISTORY_AFTER_DAYS', '14'))
+ARCHIVE_CHUNK_SIZE = int(os.environ.get('ARCHIVE_CHUNK_SIZE', '2000'))
+ARCHIVE_CHUNK_PAUSE_SECONDS = float(os.environ.get('ARCHIVE_CHUNK_PAUSE_SECONDS', '0.5'))
 
 
 # Bot configuration
@@ -157,6 +195,76 @@ BOTS_CONFIG = {slug.value: _get_bot_config(slug.value) for slug in BotSlug}
 CURRENT_BOT_SLUG: BotSlug = BotSlug(MAIN_BOT_SLUG)
 CURRENT_BOT_TOKEN = BOTS_CONFIG.get(MAIN_BOT_SLUG, {}).get('token', '')
 
+# Update ingestion: 'polling' (long polling) or 'webhook'
+BOT_UPDATES_MODE = os.environ.get('BOT_UPDATES_MODE', 'polling')
+# Public HTTPS origin Telegram posts updates to; the bot slug is appended to WEBHOOK_PATH
+WEBHOOK_BASE_URL = os.environ.get('WEBHOOK_BASE_URL', '')
+WEBHOOK_PATH = os.environ.get('WEBHOOK_PATH', '/telegram/webhook')
+# Sent back by Telegram in X-Telegram-Bot-Api-Secret-Token; requests without it are rejected
+WEBHOOK_SECRET_TOKEN = os.environ.get('WEBHOOK_SECRET_TOKEN', '')
+WEBHOOK_HOST = os.environ.get('WEBHOOK_HOST', '0.0.0.0')
+WEBHOOK_PORT = int(os.environ.get('WEBHOOK_PORT', '8080'))
+# 0 handles updates in the webhook process; N > 0 hands them over Redis streams
+# to N `start_bot --mode worker --worker-index i` processes
+WEBHOOK_WORKERS = int(os.environ.get('WEBHOOK_WORKERS', '0'))
+# Streams updates are partitioned into by chat; must be at least WEBHOOK_WORKERS
+WEBHOOK_STREAM_PARTITIONS = int(os.environ.get('WEBHOOK_STREAM_PARTITIONS', '16'))
+WEBHOOK_STREAM_MAXLEN = int(os.environ.get('WEBHOOK_STREAM_MAXLEN', '100000'))
+
+# Update dispatch: updates of one chat run one at a time, across chats at most
+# DISPATCH_MAX_CONCURRENT_UPDATES at once
+DISPATCH_MAX_CONCURRENT_UPDATES = int(os.environ.get('DISPATCH_MAX_CONCURRENT_UPDATES', '32'))
+# Non-critical updates are dropped when their chat already has this many waiting
+DISPATCH_MAX_CHAT_QUEUE = int(os.environ.get('DISPATCH_MAX_CHAT_QUEUE', '5'))
+# ... or when this many updates wait in total
+DISPATCH_SHED_PENDING_THRESHOLD = int(os.environ.get('DISPATCH_SHED_PENDING_THRESHOLD', '500'))
+# Polling stops fetching new updates while this many are in progress
+DISPATCH_MAX_PENDING_UPDATES = int(os.environ.get('DISPATCH_MAX_PENDING_UPDATES', '1000'))
+
+# Per-user token buckets: route -> (burst capacity, tokens refilled per minute).
+# Routes are command names ('horoscope'), 'text' for free text (followup
+# questions), 'callback' for buttons; 'default' covers everything else.
+# Successful payments are never throttled.
+THROTTLE_ENABLED = os.environ.get('THROTTLE_ENABLED', 'True').lower() in ('true', '1', 'yes')
+THROTTLE_LIMITS = {
+    'horoscope': (3, 6),
+    'text': (5, 10),
+    'callback': (20, 60),
+    'default': (10, 30),
+}
+
+# Prometheus metrics endpoint (http://METRICS_HOST:METRICS_PORT/metrics);
+# update workers listen on METRICS_PORT + 1 + worker index. 0 disables it.
+METRICS_HOST = os.environ.get('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.environ.get('METRICS_PORT', '9090'))
+
+# Tracing: every update and scheduled job run is recorded as a span tree
+# (middlewares, handler, repository calls with SQL counts, LLM and Bot API
+# calls). A trace is exported when sampled or when it took at least
+# TRACING_SLOW_SECONDS; exporter 'console' logs it, 'file' appends JSON lines
+# to TRACING_FILE.
+TRACING_ENABLED = os.environ.get('TRACING_ENABLED', 'False').lower() in ('true', '1', 'yes')
+TRACING_SAMPLE_RATE = float(os.environ.get('TRACING_SAMPLE_RATE', '0.0'))
+TRACING_SLOW_SECONDS = float(os.environ.get('TRACING_SLOW_SECONDS', '2.0'))
+TRACING_EXPORTER = os.environ.get('TRACING_EXPORTER', 'console')
+TRACING_FILE = os.environ.get('TRACING_FILE', 'traces.jsonl')
+
+# Slow work detection: updates and scheduled job runs slower than these many
+# seconds (0 disables) are logged with their DB / LLM / Bot API / Python time
+# breakdown and SQL statements; single statements slower than
+# SLOW_QUERY_SECONDS are logged as they finish. With SLOW_PROFILE_ENABLED
+# the await stack of a slow unit is sampled every SLOW_PROFILE_INTERVAL_SECONDS.
+SLOW_UPDATE_SECONDS = float(os.environ.get('SLOW_UPDATE_SECONDS', '3.0'))
+SLOW_TASK_SECONDS = float(os.environ.get('SLOW_TASK_SECONDS', '600'))
+SLOW_QUERY_SECONDS = float(os.environ.get('SLOW_QUERY_SECONDS', '0.5'))
+SLOW_PROFILE_ENABLED = os.environ.get('SLOW_PROFILE_ENABLED', 'False').lower() in ('true', '1', 'yes')
+SLOW_PROFILE_INTERVAL_SECONDS = float(os.environ.get('SLOW_PROFILE_INTERVAL_SECONDS', '0.1'))
+
+# Event loop watchdog (start_bot --loop-watchdog): loop lag is exported as a
+# metric and blocks longer than LOOP_STALL_SECONDS are logged with the stack
+# of the blocking call
+LOOP_STALL_SECONDS = float(os.environ.get('LOOP_STALL_SECONDS', '0.1'))
+
 # Admin configuration
 ADMIN_USERS_IDS = [
     int(uid.strip()) for uid in os.environ.get('ADMIN_USERS_IDS', '').split(',')
@@ -230,6 +338,40 @@ LLM_API_KEY = os.environ.get('LLM_API_KEY', '')
 LLM_MODEL = os.environ.get('LLM_MODEL', 'gpt-4o-mini')
 LLM_BASE_URL = os.environ.get('LLM_BASE_URL', '')
 LLM_TIMEOUT = int(os.environ.get('LLM_TIMEOUT', '30'))
+# All LLM calls of a process share one governor (horoscope.services.llm_governor).
+# Retryable errors (timeouts, 429, 5xx) are retried LLM_MAX_RETRIES times with
+# jittered exponential backoff from LLM_RETRY_BACKOFF_SECONDS.
+LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', '2'))
+LLM_RETRY_BACKOFF_SECONDS = float(os.environ.get('LLM_RETRY_BACKOFF_SECONDS', '0.5'))
+LLM_RETRY_BACKOFF_MAX_SECONDS = float(os.environ.get('LLM_RETRY_BACKOFF_MAX_SECONDS', '8'))
+# Concurrent calls start at LLM_CONCURRENCY_INITIAL and adapt between min and
+# max: up while answers come within LLM_LATENCY_TARGET_SECONDS, halved on 429s,
+# provider errors or slower answers.
+LLM_CONCURRENCY_INITIAL = int(os.environ.get('LLM_CONCURRENCY_INITIAL', '4'))
+LLM_CONCURRENCY_MIN = int(os.environ.get('LLM_CONCURRENCY_MIN', '1'))
+LLM_CONCURRENCY_MAX = int(os.environ.get('LLM_CONCURRENCY_MAX', '16'))
+LLM_LATENCY_TARGET_SECONDS = float(os.environ.get('LLM_LATENCY_TARGET_SECONDS', '15'))
+# After this many consecutive provider failures calls fail fast for
+# LLM_CIRCUIT_OPEN_SECONDS, then a single probe call decides whether to resume.
+LLM_CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('LLM_CIRCUIT_FAILURE_THRESHOLD', '5'))
+LLM_CIRCUIT_OPEN_SECONDS = float(os.environ.get('LLM_CIRCUIT_OPEN_SECONDS', '30'))
+# A horoscope the LLM fails to write within HOROSCOPE_LLM_LATENCY_BUDGET_SECONDS
+# of getting an LLM slot is composed offline from a phrase corpus instead and
+# flagged as a fallback (0 waits for LLM_TIMEOUT). Waiting for the slot itself
+# is bounded by LLM_TIMEOUT.
+HOROSCOPE_FALLBACK_ENABLED = os.environ.get('HOROSCOPE_FALLBACK_ENABLED', 'True').lower() in ('true', '1', 'yes')
+HOROSCOPE_LLM_LATENCY_BUDGET_SECONDS = float(os.environ.get('HOROSCOPE_LLM_LATENCY_BUDGET_SECONDS', '20'))
+# Fallback horoscopes not delivered yet are regenerated with the LLM every
+# interval, up to batch size per run, once it answers again.
+HOROSCOPE_FALLBACK_UPGRADE_ENABLED = (
+    os.environ.get('HOROSCOPE_FALLBACK_UPGRADE_ENABLED', 'True').lower() in ('true', '1', 'yes')
+)
+HOROSCOPE_FALLBACK_UPGRADE_INTERVAL_SECONDS = int(os.environ.get('HOROSCOPE_FALLBACK_UPGRADE_INTERVAL_SECONDS', '300'))
+HOROSCOPE_FALLBACK_UPGRADE_BATCH_SIZE = int(os.environ.get('HOROSCOPE_FALLBACK_UPGRADE_BATCH_SIZE', '50'))
+# Daily horoscopes are generated this long before their notification hour starts
+# and wait in the delivery queue, so fallbacks have time to be upgraded. Keep it
+# under the hourly interval minus the 5 minutes the bucket rebuild runs earlier.
+HOROSCOPE_GENERATION_LEAD_SECONDS = int(os.environ.get('HOROSCOPE_GENERATION_LEAD_SECONDS', str(30 * 60)))
 
 
 # Grafana Loki logging configuration (optional)
@@ -238,6 +380,14 @@ LOKI_URL = os.environ.get('LOKI_URL', '')
 LOKI_BEARER_TOKEN = os.environ.get('LOKI_BEARER_TOKEN', '')
 LOKI_APPLICATION_NAME = os.environ.get('LOKI_APPLICATION_NAME', '')
 LOKI_ENABLED = all([LOKI_URL, LOKI_BEARER_TOKEN, LOKI_APPLICATION_NAME])
+# Log lines are queued and pushed by a background thread in batches of up to
+# LOKI_BATCH_SIZE lines, at least every LOKI_FLUSH_INTERVAL seconds. Lines
+# logged while LOKI_QUEUE_SIZE lines are already waiting are dropped.
+LOKI_BATCH_SIZE = int(os.environ.get('LOKI_BATCH_SIZE', '500'))
+LOKI_FLUSH_INTERVAL = float(os.environ.get('LOKI_FLUSH_INTERVAL', '1.0'))
+LOKI_QUEUE_SIZE = int(os.environ.get('LOKI_QUEUE_SIZE', '10000'))
+# How long shutdown waits for queued lines to be pushed
+LOKI_FLUSH_TIMEOUT = float(os.environ.get('LOKI_FLUSH_TIMEOUT', '10'))
 
 
 # Logging configuration
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from core.models import Setting, User
+from core.models import SchedulerLease, Setting, User
 
 
 @admin.register(Setting)
@@ -17,3 +17,10 @@ class UserAdmin(admin.ModelAdmin):
     list_filter = ('is_premium', 'language_code')
     search_fields = ('telegram_uid', 'username', 'first_name', 'last_name')
     readonly_fields = ('telegram_uid',)
+
+
+@admin.register(SchedulerLease)
+class SchedulerLeaseAdmin(admin.ModelAdmin):
+    list_display = ('name', 'holder', 'expires_at', 'updated_at')
+    search_fields = ('name', 'holder')
+    readonly_fields = ('updated_at',)
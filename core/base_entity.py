@@ -1,10 +1,28 @@
-from typing import List, NoReturn, TypeVar
+from typing import Any, Iterable, List, NoReturn, TypeVar
 
 from pydantic import BaseModel, ConfigDict
 
 
 T = TypeVar("T", bound="BaseEntity")
 
+# Slot setters of pydantic's BaseModel, used by the trusted hydration path (see BaseEntity.from_row).
+# These are pydantic internals, hence the minor-version pin in pyproject.toml; TestBaseEntity checks the
+# slots still match what model_construct sets up. model_construct itself is slower than model_validate here.
+_set_dict = object.__setattr__
+_set_fields_set = BaseModel.__dict__['__pydantic_fields_set__'].__set__
+_set_extra = BaseModel.__dict__['__pydantic_extra__'].__set__
+_set_private = BaseModel.__dict__['__pydantic_private__'].__set__
+
+
+def _construct(cls, row: dict[str, Any]):
+    # Same state BaseModel.model_construct sets up, minus its per-field default handling
+    entity = object.__new__(cls)
+    _set_dict(entity, '__dict__', row)
+    _set_fields_set(entity, set(row))
+    _set_extra(entity, None)
+    _set_private(entity, None)
+    return entity
+
 
 class BaseEntity(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -17,5 +35,26 @@ class BaseEntity(BaseModel):
     def from_models(cls: type[T], models: List) -> List[T]:
         return [cls.from_model(model) for model in models]
 
+    @classmethod
+    def from_row(cls: type[T], row: dict[str, Any]) -> T:
+        """
+        Build an entity from a trusted row without running validation.
+
+        Only for values read back from our own tables: `row` must hold every entity
+        field already in its final type (choice fields stay plain strings, which
+        compare equal to their TextChoices members). Input from users or external
+        APIs goes through `from_model`/`model_validate`.
+        """
+        return _construct(cls, row)
+
+    @classmethod
+    def from_rows(cls: type[T], rows: Iterable[dict[str, Any]]) -> List[T]:
+        return [_construct(cls, row) for row in rows]
+
+    @classmethod
+    def from_queryset(cls: type[T], queryset) -> List[T]:
+        """Bulk-hydrate a queryset via `.values()` of the entity fields, skipping ORM instances and validation."""
+        return cls.from_rows(queryset.values(*cls.model_fields))
+
     def to_model(self) -> NoReturn:
         raise NotImplementedError("to_model() must be implemented in subclass")
@@ -3,7 +3,8 @@ from typing import TYPE_CHECKING
 from dependency_injector import containers, providers
 
 if TYPE_CHECKING:
-    from core.repositories import UserRepository
+    from core.repositories import SchedulerLeaseRepository, SettingRepository, UserRepository
+    from core.services.archive import ArchiveStorage
     from horoscope.repositories import (
         HoroscopeFollowupRepository,
         HoroscopeRepository,
@@ -11,7 +12,10 @@ if TYPE_CHECKING:
         SubscriptionRepository,
         UserProfileRepository,
     )
+    from horoscope.services.archive import ColdArchiveService
     from horoscope.services.horoscope import HoroscopeService
+    from horoscope.services.llm_governor import LLMGovernor
+    from horoscope.services.notification_schedule import NotificationScheduleService
     from horoscope.services.subscription import SubscriptionService
     from telegram_bot.repositories import MessageHistoryRepository
 
@@ -21,6 +25,26 @@ def _create_user_repository() -> "UserRepository":
     return UserRepository()
 
 
+def _create_setting_repository() -> "SettingRepository":
+    from core.repositories import SettingRepository
+    return SettingRepository()
+
+
+def _create_scheduler_lease_repository() -> "SchedulerLeaseRepository":
+    from core.repositories import SchedulerLeaseRepository
+    return SchedulerLeaseRepository()
+
+
+def _create_archive_storage() -> "ArchiveStorage":
+    from django.conf import settings
+    from django.core.exceptions import ImproperlyConfigured
+
+    from core.services.archive import ArchiveStorage
+    if not settings.ARCHIVE_DIR:
+        raise ImproperlyConfigured("ARCHIVE_DIR must point to persistent storage shared by all replicas")
+    return ArchiveStorage(base_dir=settings.ARCHIVE_DIR)
+
+
 def _create_user_profile_repository() -> "UserProfileRepository":
     from horoscope.repositories import UserProfileRepository
     return UserProfileRepository()
@@ -53,11 +77,15 @@ def _create_message_history_repository() -> "MessageHistoryRepository":
 
 class CoreContainer(containers.DeclarativeContainer):
     user_repository = providers.Singleton(_create_user_repository)
+    setting_repository = providers.Singleton(_create_setting_repository)
+    scheduler_lease_repository = providers.Singleton(_create_scheduler_lease_repository)
     message_history_repository = providers.Singleton(_create_message_history_repository)
+    archive_storage = providers.Singleton(_create_archive_storage)
 
 
 class HoroscopeContainer(containers.DeclarativeContainer):
     user_repository = providers.Dependency()
+    setting_repository = providers.Dependency()
 
     user_profile_repository = providers.Singleton(_create_user_profile_repository)
     horoscope_repository = providers.Singleton(_create_horoscope_repository)
@@ -65,12 +93,27 @@ class HoroscopeContainer(containers.DeclarativeContainer):
     subscription_repository = providers.Singleton(_create_subscription_repository)
     followup_repository = providers.Singleton(_create_followup_repository)
 
+    llm_governor = providers.Singleton(
+        lambda: _create_llm_governor(),
+    )
+
     horoscope_service = providers.Singleton(
         lambda: _create_horoscope_service(),
     )
     subscription_service = providers.Singleton(
         lambda: _create_subscription_service(),
     )
+    notification_schedule_service = providers.Singleton(
+        lambda: _create_notification_schedule_service(),
+    )
+    archive_service = providers.Singleton(
+        lambda: _create_archive_service(),
+    )
+
+
+def _create_llm_governor() -> "LLMGovernor":
+    from horoscope.services.llm_governor import LLMGovernor
+    return LLMGovernor.from_settings()
 
 
 def _create_horoscope_service() -> "HoroscopeService":
@@ -89,6 +132,23 @@ def _create_subscription_service() -> "SubscriptionService":
     )
 
 
+def _create_notification_schedule_service() -> "NotificationScheduleService":
+    from horoscope.services.notification_schedule import NotificationScheduleService
+    return NotificationScheduleService(
+        user_profile_repo=container.horoscope.user_profile_repository(),
+        setting_repo=container.core.setting_repository(),
+    )
+
+
+def _create_archive_service() -> "ColdArchiveService":
+    from horoscope.services.archive import ColdArchiveService
+    return ColdArchiveService(
+        horoscope_repo=container.horoscope.horoscope_repository(),
+        message_history_repo=container.core.message_history_repository(),
+        storage=container.core.archive_storage(),
+    )
+
+
 class ApplicationContainer(containers.DeclarativeContainer):
     config = providers.Configuration()
 
@@ -96,6 +156,7 @@ class ApplicationContainer(containers.DeclarativeContainer):
     horoscope: HoroscopeContainer = providers.Container(
         HoroscopeContainer,
         user_repository=core.user_repository,
+        setting_repository=core.setting_repository,
     )
 
 
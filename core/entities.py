@@ -36,3 +36,17 @@ class UserEntity(BaseEntity):
     def full_name(self) -> str:
         parts = [self.first_name, self.last_name]
         return ' '.join(p for p in parts if p) or self.username or str(self.telegram_uid)
+
+
+class ArchiveResultEntity(BaseEntity):
+    dataset: str
+    archived_count: int = 0
+    segments: int = 0
+    bytes_written: int = 0
+
+
+class SchedulerLeaseEntity(BaseEntity):
+    name: str
+    holder: str
+    expires_at: datetime
+    updated_at: datetime
@@ -4,3 +4,7 @@ class UserNotFoundException(Exception):
 
 class SettingNotFoundException(Exception):
     pass
+
+
+class SchedulerLeaseNotFoundException(Exception):
+    pass
@@ -1,41 +1,163 @@
 """
 Grafana Loki logging handler for centralized log aggregation.
 """
+import gzip
 import json
 import logging
+import queue
+import threading
 import time
 import traceback
+from logging.handlers import QueueHandler
 from typing import Optional
-from urllib.error import URLError
+from urllib.error import HTTPError, URLError
 from urllib.request import Request, urlopen
 
 from django.conf import settings
 
+# (stream labels, timestamp in ns, log line)
+LokiEntry = tuple[tuple[tuple[str, str], ...], str, str]
 
-class LokiHandlerWrapper(logging.Handler):
+_STOP = object()
+
+
+class LokiShipper(threading.Thread):
+    """
+    Background thread pushing queued log entries to Loki.
+
+    Entries are collected for up to `flush_interval` seconds or `batch_size`
+    entries, grouped into one stream per label set and sent as a single
+    gzip-compressed push request. Failed pushes are retried with exponential
+    backoff; 4xx responses other than 429 are not retried.
+    """
+
+    def __init__(
+        self,
+        entries: queue.Queue,
+        url: str,
+        headers: dict[str, str],
+        batch_size: int,
+        flush_interval: float,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        timeout: float = 5,
+    ) -> None:
+        super().__init__(name='loki-shipper', daemon=True)
+        self._entries = entries
+        self._url = url
+        self._headers = headers
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_retries = max_retries
+        self._retry_backoff = retry_backoff
+        self._timeout = timeout
+        self.sent = 0
+        self.failed = 0
+
+    def run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            if batch:
+                self._ship(batch)
+
+    def _next_batch(self) -> tuple[list[LokiEntry], bool]:
+        entry = self._entries.get()
+        if entry is _STOP:
+            return [], True
+        batch = [entry]
+        deadline = time.monotonic() + self._flush_interval
+        while len(batch) < self._batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entry = self._entries.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+
+    def _ship(self, batch: list[LokiEntry]) -> None:
+        body = gzip.compress(json.dumps(build_push_payload(batch)).encode('utf-8'))
+        for attempt in range(self._max_retries + 1):
+            try:
+                request = Request(url=self._url, data=body, headers=self._headers, method='POST')
+                with urlopen(request, timeout=self._timeout):
+                    pass
+                self.sent += len(batch)
+                return
+            except HTTPError as e:
+                if e.code != 429 and e.code < 500:
+                    print(f"Loki rejected {len(batch)} log lines: HTTP {e.code}", flush=True)
+                    break
+                error = e
+            except (URLError, OSError) as e:
+                error = e
+            if attempt < self._max_retries:
+                time.sleep(self._retry_backoff * 2 ** attempt)
+        else:
+            print(f"Failed to send {len(batch)} log lines to Loki: {error}", flush=True)
+        self.failed += len(batch)
+
+
+def build_push_payload(batch: list[LokiEntry]) -> dict:
+    """Loki push request with one stream per distinct label set."""
+    streams: dict[tuple[tuple[str, str], ...], list[list[str]]] = {}
+    for labels, timestamp_ns, line in batch:
+        streams.setdefault(labels, []).append([timestamp_ns, line])
+    return {
+        "streams": [
+            {"stream": dict(labels), "values": values}
+            for labels, values in streams.items()
+        ]
+    }
+
+
+class LokiHandlerWrapper(QueueHandler):
     """
-    A logging handler that sends logs directly to Grafana Loki using HTTP requests.
+    A logging handler that ships logs to Grafana Loki without blocking the caller.
 
     This handler sends logs to Grafana Loki only if LOKI_ENABLED is True
     in settings. It includes metadata like environment and application name
     as stream labels.
 
+    emit() only formats the record and puts it on a bounded queue; a
+    LokiShipper thread does the HTTP work. When the queue is full, records
+    are dropped and counted instead of blocking the event loop. Queued
+    records are flushed when logging shuts down.
+
     Uses stdlib urllib instead of requests library to avoid extra dependencies.
     """
 
     def __init__(self, level: int = logging.INFO) -> None:
-        super().__init__(level)
+        super().__init__(queue.Queue(maxsize=settings.LOKI_QUEUE_SIZE))
+        self.setLevel(level)
         self._enabled: bool = settings.LOKI_ENABLED
         self._headers: Optional[dict[str, str]] = None
+        self._shipper: Optional[LokiShipper] = None
+        self.dropped = 0
 
         if self._enabled:
             self._setup_headers()
+        if self._enabled and self._headers is not None:
+            self._shipper = LokiShipper(
+                entries=self.queue,
+                url=settings.LOKI_URL,
+                headers=self._headers,
+                batch_size=settings.LOKI_BATCH_SIZE,
+                flush_interval=settings.LOKI_FLUSH_INTERVAL,
+            )
+            self._shipper.start()
 
     def _setup_headers(self) -> None:
         """Set up HTTP headers for Loki requests."""
         try:
             self._headers = {
                 "Content-Type": "application/json",
+                "Content-Encoding": "gzip",
                 "Authorization": f"Bearer {settings.LOKI_BEARER_TOKEN}",
             }
         except Exception as e:
@@ -65,49 +187,42 @@ class LokiHandlerWrapper(logging.Handler):
         return labels
 
     def emit(self, record: logging.LogRecord) -> None:
-        """Emit a log record to Loki."""
-        if not self._enabled or self._headers is None:
+        """Queue a log record for Loki."""
+        if self._shipper is None:
             return
+        super().emit(record)
 
-        try:
-            log_message = record.message if record.message else self.format(record)
-
-            if record.exc_info:
-                if not record.exc_text:
-                    record.exc_text = ''.join(traceback.format_exception(*record.exc_info))
+    def prepare(self, record: logging.LogRecord) -> LokiEntry:
+        """Render the record in the calling thread, while its arguments are still current."""
+        log_message = self.format(record)
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = ''.join(traceback.format_exception(*record.exc_info))
+            if record.exc_text not in log_message:
                 log_message = f"{log_message}\n\n{record.exc_text}"
 
-            stream_labels = self._get_stream_labels(record)
-            timestamp_ns = str(int(time.time() * 1000000000))
-
-            payload = {
-                "streams": [
-                    {
-                        "stream": stream_labels,
-                        "values": [[timestamp_ns, log_message]],
-                    }
-                ]
-            }
+        labels = tuple(self._get_stream_labels(record).items())
+        timestamp_ns = str(int(record.created * 1_000_000_000))
+        return labels, timestamp_ns, log_message
 
-            data = json.dumps(payload).encode('utf-8')
-            req = Request(
-                url=settings.LOKI_URL,
-                data=data,
-                headers=self._headers,
-                method='POST',
-            )
-
-            with urlopen(req, timeout=5) as response:
-                if response.status >= 400:
-                    print(f"Loki returned error {response.status}", flush=True)
-
-        except URLError as e:
-            # Network errors — don't crash the app
-            print(f"Failed to send log to Loki (network error): {e}", flush=True)
-        except Exception as e:
-            # Other errors — don't crash the app
-            print(f"Failed to send log to Loki: {e}", flush=True)
-            self.handleError(record)
+    def enqueue(self, entry: LokiEntry) -> None:
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                print(f"Loki log queue is full, dropped {self.dropped} log lines so far", flush=True)
+
+    def close(self) -> None:
+        """Flush queued records to Loki and stop the shipper thread."""
+        shipper, self._shipper = self._shipper, None
+        if shipper is not None and shipper.is_alive():
+            try:
+                self.queue.put(_STOP, timeout=1)
+            except queue.Full:
+                pass
+            shipper.join(timeout=settings.LOKI_FLUSH_TIMEOUT)
+        super().close()
 
 
 def is_loki_enabled() -> bool:
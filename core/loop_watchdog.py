@@ -0,0 +1,104 @@
+"""
+Event loop lag measurement and blocking call detection.
+
+A heartbeat coroutine sleeps for a short interval and records how late it
+woke up; that lag is how long any other coroutine had to wait for the loop.
+A helper thread watches the heartbeat: when it has not beaten for longer than
+the stall threshold, the loop thread is stuck in synchronous code, and its
+current stack (taken with sys._current_frames) shows which call is blocking.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from core.metrics import EVENT_LOOP_LAG_SECONDS, EVENT_LOOP_STALLS_TOTAL
+
+logger = logging.getLogger(__name__)
+
+STACK_LIMIT = 30
+
+
+def format_thread_stack(thread_id: int, limit: int = STACK_LIMIT) -> str:
+    """Current stack of another thread, innermost call last."""
+    frame = sys._current_frames().get(thread_id)
+    if frame is None:
+        return '<thread not running>'
+    return ''.join(traceback.format_stack(frame, limit=limit))
+
+
+class LoopWatchdog:
+    """
+    Measures event loop lag and dumps the loop thread's stack on stalls.
+
+    A stall is reported twice: once by the helper thread while the loop is
+    still blocked (with the stack of the blocking call), and once by the
+    heartbeat when the loop is free again (with the total blocked time).
+    """
+
+    def __init__(self, stall_seconds: float, interval_seconds: float = 0.05):
+        self.stall_seconds = stall_seconds
+        self.interval_seconds = interval_seconds
+        self.stalls = 0
+        self.dumps = 0
+        self._beat = time.monotonic()
+        self._dumped_beat: Optional[float] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    async def start(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopped.clear()
+        self._heartbeat = asyncio.create_task(self._run_heartbeat())
+        self._thread = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._thread.start()
+        logger.info(f"Event loop watchdog started (stall threshold {self.stall_seconds * 1000:.0f}ms)")
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except asyncio.CancelledError:
+                pass
+        if self._thread is not None:
+            self._thread.join()
+
+    async def _run_heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            now = time.monotonic()
+            self._beat = now
+            self.record_lag(max(now - expected, 0.0))
+
+    def record_lag(self, lag: float) -> None:
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+        if lag >= self.stall_seconds:
+            self.stalls += 1
+            EVENT_LOOP_STALLS_TOTAL.inc()
+            logger.warning(f"Event loop was blocked for {lag * 1000:.0f}ms")
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.interval_seconds):
+            self.check(time.monotonic())
+
+    def check(self, now: float) -> None:
+        """Dump the loop thread's stack once per stall (helper thread)."""
+        beat = self._beat
+        blocked = now - beat - self.interval_seconds
+        if blocked < self.stall_seconds or self._dumped_beat == beat:
+            return
+        self._dumped_beat = beat
+        self.dumps += 1
+        logger.warning(
+            f"Event loop blocked for {blocked * 1000:.0f}ms so far, loop thread is at:\n"
+            f"{format_thread_stack(self._loop_thread_id)}"
+        )
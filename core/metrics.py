@@ -0,0 +1,353 @@
+"""
+Process-local metrics in the Prometheus text exposition format.
+
+A small stdlib implementation of counters, gauges and histograms with labels,
+kept dependency-free like the Loki handler. Metrics are updated from the event
+loop and from sync_to_async worker threads, so every update takes a lock.
+The registry is rendered by the bot's `/metrics` endpoint (telegram_bot.metrics).
+
+All metrics of the project are declared at the bottom of this module.
+"""
+import bisect
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, Optional
+
+from django.db.backends.signals import connection_created
+
+from core.profiling import record_io
+from core.query_budget import record_query_count
+from core.tracing import record_query
+
+LabelValues = tuple[str, ...]
+# (metric name, type, help, [(labels, value)])
+CollectedMetric = tuple[str, str, str, list[tuple[dict[str, str], float]]]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + '}'
+
+
+class _Metric:
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues) -> dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type_name = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self._labels(key))} {_format_value(value)}" for key, value in values]
+
+
+class Gauge(Counter):
+    type_name = 'gauge'
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type_name = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        counts, _ = self._values.get(self._key(labels), ([0], [0.0]))
+        return sum(counts)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            values = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        lines = []
+        for key, counts, total in values:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float('inf')), counts):
+                cumulative += count
+                bucket_labels = _format_labels({**labels, 'le': _format_value(bound)})
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Metrics rendered together. Collectors are called on every render for
+    values that are cheaper to read on scrape than to track on every change.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: dict[str, Callable[[], Iterable[CollectedMetric]]] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, name: str, collector: Callable[[], Iterable[CollectedMetric]]) -> None:
+        """Add or replace a scrape-time collector."""
+        self._collectors[name] = collector
+
+    def unregister_collector(self, name: str) -> None:
+        self._collectors.pop(name, None)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for collector in list(self._collectors.values()):
+            for name, type_name, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {type_name}")
+                lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+
+# Bot updates
+
+HANDLER_SECONDS = REGISTRY.histogram(
+    'bot_handler_seconds', 'Time spent in update handlers.', ['router', 'handler', 'outcome'],
+)
+UPDATE_QUERIES = REGISTRY.histogram(
+    'bot_update_queries', 'SQL statements per update, middlewares included, by handler.', ['route'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+UPDATE_QUERY_SECONDS = REGISTRY.histogram(
+    'bot_update_query_seconds', 'Time spent in SQL statements per update, by handler.', ['route'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+
+# Scheduler
+
+SCHEDULER_JOB_SECONDS = REGISTRY.histogram(
+    'scheduler_job_seconds', 'Duration of scheduled job runs.', ['job', 'outcome'],
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 1800, 3600),
+)
+SCHEDULER_JOB_QUERIES = REGISTRY.histogram(
+    'scheduler_job_queries', 'SQL statements per scheduled job run.', ['job'],
+    buckets=(10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000),
+)
+SCHEDULER_JOB_QUERY_SECONDS = REGISTRY.histogram(
+    'scheduler_job_query_seconds', 'Time spent in SQL statements per scheduled job run.', ['job'],
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 1800, 3600),
+)
+SCHEDULER_JOB_LAG_SECONDS = REGISTRY.histogram(
+    'scheduler_job_lag_seconds', 'Delay between the start of a job bucket and its run.', ['job'],
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600),
+)
+
+# LLM
+
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    'llm_request_seconds', 'LLM completion latency.', ['model', 'kind'],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+LLM_TOKENS_TOTAL = REGISTRY.counter(
+    'llm_tokens_total', 'LLM tokens used.', ['model', 'kind', 'direction'],
+)
+LLM_ERRORS_TOTAL = REGISTRY.counter(
+    'llm_errors_total', 'Failed LLM completions.', ['model', 'kind', 'error'],
+)
+LLM_RETRIES_TOTAL = REGISTRY.counter(
+    'llm_retries_total', 'LLM completions retried after a retryable error.', ['kind', 'error'],
+)
+LLM_CONCURRENCY_LIMIT = REGISTRY.gauge(
+    'llm_concurrency_limit', 'Adaptive limit of concurrent LLM completions.',
+)
+LLM_IN_FLIGHT = REGISTRY.gauge(
+    'llm_in_flight', 'LLM completions in progress.',
+)
+LLM_QUEUE_SECONDS = REGISTRY.histogram(
+    'llm_queue_seconds', 'Time LLM completions waited for a concurrency slot.', ['priority'],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2, 5, 10, 30),
+)
+LLM_CIRCUIT_STATE = REGISTRY.gauge(
+    'llm_circuit_state', 'LLM circuit breaker state (0 closed, 1 half-open, 2 open).',
+)
+HOROSCOPE_FALLBACKS_TOTAL = REGISTRY.counter(
+    'horoscope_fallbacks_total', 'Horoscopes composed offline instead of by the LLM.', ['reason'],
+)
+HOROSCOPE_FALLBACK_UPGRADES_TOTAL = REGISTRY.counter(
+    'horoscope_fallback_upgrades_total', 'Fallback horoscopes regenerated with the LLM.', ['outcome'],
+)
+
+# Telegram Bot API
+
+TELEGRAM_REQUEST_SECONDS = REGISTRY.histogram(
+    'telegram_request_seconds', 'Telegram Bot API request latency.', ['method', 'outcome'],
+)
+TELEGRAM_ERRORS_TOTAL = REGISTRY.counter(
+    'telegram_errors_total', 'Failed Telegram Bot API requests.', ['method', 'error'],
+)
+
+# Database
+
+DB_QUERIES_TOTAL = REGISTRY.counter(
+    'db_queries_total', 'SQL statements executed.', ['operation'],
+)
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    'db_query_seconds', 'SQL statement latency.', ['operation'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+SYNC_TO_ASYNC_WAIT_SECONDS = REGISTRY.histogram(
+    'sync_to_async_wait_seconds',
+    'Round trip of an empty sync_to_async call, i.e. how long ORM calls queue for the sync thread.',
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+
+# Event loop
+
+EVENT_LOOP_LAG_SECONDS = REGISTRY.histogram(
+    'event_loop_lag_seconds', 'How late the loop watchdog heartbeat woke up.',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+EVENT_LOOP_STALLS_TOTAL = REGISTRY.counter(
+    'event_loop_stalls_total', 'Times the event loop was blocked longer than LOOP_STALL_SECONDS.',
+)
+
+
+_SQL_OPERATION_RE = re.compile(r'^\s*(\w+)')
+
+
+def sql_operation(sql: str) -> str:
+    match = _SQL_OPERATION_RE.match(sql)
+    return match.group(1).upper() if match else 'OTHER'
+
+
+def _record_query(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        operation = sql_operation(sql)
+        DB_QUERIES_TOTAL.inc(operation=operation)
+        DB_QUERY_SECONDS.observe(duration, operation=operation)
+        record_query(duration)
+        record_query_count(duration, sql)
+        record_io('db', duration, statement=sql)
+
+
+def _install_query_wrapper(sender=None, connection=None, **kwargs) -> None:
+    if connection is not None and _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def install_db_query_metrics(connections: Optional[Iterable] = None) -> None:
+    """
+    Count and time every SQL statement, on open and future connections.
+
+    Statements are also attributed to the current trace span, slow-work
+    profile and query counters.
+    """
+    from django.db import connections as default_connections
+
+    for connection in connections if connections is not None else default_connections.all():
+        _install_query_wrapper(connection=connection)
+    connection_created.connect(_install_query_wrapper, dispatch_uid='core.metrics.db_queries')
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_user_last_activity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchedulerLease',
+            fields=[
+                ('name', models.CharField(max_length=256, primary_key=True, serialize=False)),
+                ('holder', models.CharField(max_length=256)),
+                ('expires_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'scheduler_leases',
+                'managed': True,
+            },
+        ),
+    ]
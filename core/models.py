@@ -68,3 +68,19 @@ class User(models.Model):
 
     def __str__(self):
         return f"User {self.telegram_uid} ({self.username})"
+
+
+class SchedulerLease(models.Model):
+    """Time-limited ownership of a scheduled job, so only one bot replica runs it at a time."""
+
+    name = models.CharField(max_length=256, primary_key=True)
+    holder = models.CharField(max_length=256)
+    expires_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        managed = True
+        db_table = 'scheduler_leases'
+
+    def __str__(self):
+        return f"Lease {self.name} held by {self.holder} until {self.expires_at}"
@@ -0,0 +1,198 @@
+"""
+Slow update / slow job detection with a per-unit time breakdown.
+
+While a unit of work (an update or a scheduled job run) is watched, DB, LLM
+and Bot API calls made on its behalf add their wall time to a WorkProfile
+held in a ContextVar (copied into sync_to_async threads like the tracing
+span). When the unit ends above its threshold, one structured log record is
+written with the breakdown, the SQL statements that ran and, if enabled,
+stack samples of the unit's task taken from the moment it crossed the
+threshold. Individual statements above `slow_query_seconds` are logged as
+they happen.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_STATEMENTS = 50
+MAX_STATEMENT_LENGTH = 500
+IO_KINDS = ('db', 'llm', 'telegram')
+
+
+@dataclass
+class WorkProfile:
+    kind: str
+    name: str
+    attributes: dict[str, Any] = field(default_factory=dict)
+    started: float = field(default_factory=time.perf_counter)
+    seconds: dict[str, float] = field(default_factory=lambda: dict.fromkeys(IO_KINDS, 0.0))
+    calls: dict[str, int] = field(default_factory=lambda: dict.fromkeys(IO_KINDS, 0))
+    statements: list[tuple[str, float]] = field(default_factory=list)
+    stack_samples: Counter = field(default_factory=Counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, kind: str, seconds: float, statement: Optional[str] = None) -> None:
+        with self._lock:
+            self.seconds[kind] += seconds
+            self.calls[kind] += 1
+            if statement is not None and len(self.statements) < MAX_STATEMENTS:
+                self.statements.append((statement[:MAX_STATEMENT_LENGTH], seconds))
+
+    def breakdown(self, elapsed: float) -> dict[str, Any]:
+        io_seconds = sum(self.seconds.values())
+        data: dict[str, Any] = {
+            'kind': self.kind,
+            'name': self.name,
+            **self.attributes,
+            'seconds': round(elapsed, 3),
+        }
+        for kind in IO_KINDS:
+            data[f'{kind}_seconds'] = round(self.seconds[kind], 3)
+            data[f'{kind}_calls'] = self.calls[kind]
+        # Time not spent waiting on DB, LLM or Bot API: Python code and event loop scheduling
+        data['python_seconds'] = round(max(elapsed - io_seconds, 0.0), 3)
+        data['statements'] = [{'sql': sql, 'ms': round(seconds * 1000, 2)} for sql, seconds in self.statements]
+        if self.calls['db'] > len(self.statements):
+            data['statements_not_listed'] = self.calls['db'] - len(self.statements)
+        if self.stack_samples:
+            data['stacks'] = [
+                {'samples': samples, 'stack': stack}
+                for stack, samples in self.stack_samples.most_common(5)
+            ]
+        return data
+
+
+_current_profile: ContextVar[Optional[WorkProfile]] = ContextVar('current_work_profile', default=None)
+_slow_query_seconds: Optional[float] = None
+
+
+def record_io(kind: str, seconds: float, statement: Optional[str] = None) -> None:
+    """Add a DB/LLM/Bot API call to the watched unit, if any; log slow statements."""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.record(kind, seconds, statement)
+    if statement is not None and _slow_query_seconds is not None and seconds >= _slow_query_seconds:
+        owner = f" in {profile.kind} {profile.name}" if profile is not None else ''
+        logger.warning(f"Slow query ({seconds * 1000:.0f}ms){owner}: {statement[:MAX_STATEMENT_LENGTH]}")
+
+
+def format_coroutine_stack(coroutine: Any, limit: int = 15) -> str:
+    """Where a suspended coroutine is, innermost await last (Task.get_stack stops at the outer frame)."""
+    frames = []
+    while coroutine is not None:
+        frame = getattr(coroutine, 'cr_frame', None) or getattr(coroutine, 'gi_frame', None)
+        if frame is not None:
+            frames.append(f"{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}")
+        coroutine = getattr(coroutine, 'cr_await', None) or getattr(coroutine, 'gi_yieldfrom', None)
+    return '\n'.join(frames[-limit:])
+
+
+class TaskStackSampler:
+    """Samples the await stack of a task every interval, starting after a delay."""
+
+    def __init__(self, task: asyncio.Task, profile: WorkProfile, interval_seconds: float):
+        self.task = task
+        self.profile = profile
+        self.interval_seconds = interval_seconds
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def start(self, delay_seconds: float) -> None:
+        self._handle = asyncio.get_running_loop().call_later(delay_seconds, self.sample)
+
+    def sample(self) -> None:
+        if self.task.done():
+            return
+        stack = format_coroutine_stack(self.task.get_coro())
+        if stack:
+            self.profile.stack_samples[stack] += 1
+        self._handle = asyncio.get_running_loop().call_later(self.interval_seconds, self.sample)
+
+    def cancel(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+
+
+class SlowWorkDetector:
+    """
+    Watches units of work and logs the ones slower than their threshold.
+
+    With `profile_interval_seconds`, the stack of a watched task is sampled
+    every interval once it has run longer than the threshold, so the record
+    shows where a slow unit was spending (or awaiting) its time.
+    """
+
+    def __init__(
+        self,
+        thresholds: dict[str, float],
+        slow_query_seconds: Optional[float] = None,
+        profile_interval_seconds: Optional[float] = None,
+    ):
+        self.thresholds = thresholds
+        self.slow_query_seconds = slow_query_seconds
+        self.profile_interval_seconds = profile_interval_seconds
+        self.reported = 0
+
+    @classmethod
+    def from_settings(cls) -> 'SlowWorkDetector':
+        from django.conf import settings
+
+        return cls(
+            thresholds={'update': settings.SLOW_UPDATE_SECONDS, 'task': settings.SLOW_TASK_SECONDS},
+            slow_query_seconds=settings.SLOW_QUERY_SECONDS or None,
+            profile_interval_seconds=settings.SLOW_PROFILE_INTERVAL_SECONDS if settings.SLOW_PROFILE_ENABLED else None,
+        )
+
+    def install(self) -> None:
+        """Enable slow statement logging for the process."""
+        global _slow_query_seconds
+        _slow_query_seconds = self.slow_query_seconds
+
+    @contextmanager
+    def watch(self, kind: str, name: str, **attributes: Any) -> Iterator[Optional[WorkProfile]]:
+        threshold = self.thresholds.get(kind)
+        if not threshold or _current_profile.get() is not None:
+            yield None
+            return
+
+        profile = WorkProfile(kind=kind, name=name, attributes=attributes)
+        token = _current_profile.set(profile)
+        sampler = self._start_sampler(profile, threshold)
+        try:
+            yield profile
+        finally:
+            _current_profile.reset(token)
+            if sampler is not None:
+                sampler.cancel()
+            elapsed = time.perf_counter() - profile.started
+            if elapsed >= threshold:
+                self.report(profile, elapsed, threshold)
+
+    def report(self, profile: WorkProfile, elapsed: float, threshold: float) -> None:
+        self.reported += 1
+        breakdown = profile.breakdown(elapsed)
+        logger.warning(
+            f"Slow {profile.kind} {profile.name}: {elapsed:.2f}s (threshold {threshold:.2f}s) "
+            f"{json.dumps(breakdown, default=str)}"
+        )
+
+    def _start_sampler(self, profile: WorkProfile, threshold: float) -> Optional[TaskStackSampler]:
+        if not self.profile_interval_seconds:
+            return None
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            return None
+        if task is None:
+            return None
+        sampler = TaskStackSampler(task, profile, self.profile_interval_seconds)
+        sampler.start(threshold)
+        return sampler
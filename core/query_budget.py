@@ -0,0 +1,81 @@
+"""
+SQL statement counting per handler or task invocation, and query budgets.
+
+`count_queries()` collects the number and time of statements executed inside
+it, including those run in sync_to_async threads (the active counters live in
+a ContextVar, which asgiref copies into the worker thread). Counters nest: a
+statement is added to every active one. The execute wrapper installed by
+core.metrics.install_db_query_metrics feeds them.
+
+`query_budget()` is the test-side counterpart: it fails with the executed
+statements when a block runs more queries than declared, so query creep on
+hot paths shows up as a failing test instead of a slower bot. Unlike
+Django's assertNumQueries it sees every connection, not only the calling
+thread's.
+"""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+MAX_RECORDED_STATEMENTS = 100
+
+
+@dataclass
+class QueryCount:
+    queries: int = 0
+    seconds: float = 0.0
+    statements: list[str] = field(default_factory=list)
+    # Set by the handler middleware so the update is reported under its handler
+    route: Optional[str] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, seconds: float, sql: str) -> None:
+        with self._lock:
+            self.queries += 1
+            self.seconds += seconds
+            if len(self.statements) < MAX_RECORDED_STATEMENTS:
+                self.statements.append(sql)
+
+
+_active_counts: ContextVar[tuple[QueryCount, ...]] = ContextVar('active_query_counts', default=())
+
+
+def record_query_count(seconds: float, sql: str) -> None:
+    for count in _active_counts.get():
+        count.add(seconds, sql)
+
+
+def current_query_count() -> Optional[QueryCount]:
+    """Innermost active counter, if any."""
+    active = _active_counts.get()
+    return active[-1] if active else None
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCount]:
+    count = QueryCount()
+    token = _active_counts.set(_active_counts.get() + (count,))
+    try:
+        yield count
+    finally:
+        _active_counts.reset(token)
+
+
+class QueryBudgetExceeded(AssertionError):
+    def __init__(self, name: str, budget: int, count: QueryCount):
+        self.name = name
+        self.budget = budget
+        self.count = count
+        statements = '\n'.join(f'  {index}. {sql}' for index, sql in enumerate(count.statements, 1))
+        super().__init__(f"{name} ran {count.queries} queries, budget is {budget}:\n{statements}")
+
+
+@contextmanager
+def query_budget(max_queries: int, name: str = 'block') -> Iterator[QueryCount]:
+    """Fail with QueryBudgetExceeded if the block runs more than `max_queries` statements."""
+    with count_queries() as count:
+        yield count
+    if count.queries > max_queries:
+        raise QueryBudgetExceeded(name, max_queries, count)
@@ -1,3 +1,5 @@
 from core.repositories.user import UserRepository
+from core.repositories.setting import SettingRepository
+from core.repositories.scheduler_lease import SchedulerLeaseRepository
 
-__all__ = ['UserRepository']
+__all__ = ['UserRepository', 'SettingRepository', 'SchedulerLeaseRepository']
@@ -1,17 +1,68 @@
-from typing import Any, Generic, Type, TypeVar
+import asyncio
+from typing import Any, AsyncIterator, Generic, Iterator, Optional, Type, TypeVar
 
 from asgiref.sync import sync_to_async
 from django.core.exceptions import FieldDoesNotExist
-from django.db.models import Model
+from django.db.models import Model, QuerySet
 from django.utils import timezone
 
 from core.base_entity import BaseEntity
+from core.tracing import trace_coroutine_methods
 
 M = TypeVar("M", bound=Model)
 E = TypeVar("E", bound=BaseEntity)
+T = TypeVar("T")
+
+
+def iter_value_chunks(queryset: QuerySet, field: str, chunk_size: int) -> Iterator[list]:
+    """
+    Yield values of `field` from `queryset` in chunks using keyset pagination.
+
+    Each chunk is a separate `WHERE field > last ORDER BY field LIMIT n` query,
+    so memory stays bounded by `chunk_size` and rows updated while iterating
+    (e.g. marked as sent) do not shift the remaining pages.
+    """
+    last_value: Optional[Any] = None
+    while True:
+        page = queryset
+        if last_value is not None:
+            page = page.filter(**{f'{field}__gt': last_value})
+        chunk = list(page.order_by(field).values_list(field, flat=True)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        last_value = chunk[-1]
+
+
+async def aiter_chunks(chunks: Iterator[list[T]]) -> AsyncIterator[list[T]]:
+    """
+    Consume a sync chunk iterator from async code.
+
+    The next chunk is fetched in the background while the caller processes
+    the current one, so DB reads overlap with Telegram I/O.
+    """
+    fetch_next = sync_to_async(next)
+    pending = asyncio.ensure_future(fetch_next(chunks, None))
+    try:
+        while True:
+            chunk = await pending
+            if chunk is None:
+                return
+            pending = asyncio.ensure_future(fetch_next(chunks, None))
+            yield chunk
+    finally:
+        if not pending.done():
+            pending.cancel()
 
 
 class BaseRepository(Generic[M, E]):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Async repository calls show up as 'db' spans in traces
+        trace_coroutine_methods(cls, kind='db')
+
     def __init__(self, model: Type[M], entity: Type[E], not_found_exception: Type[Exception]):
         self.model = model
         self.entity = entity
@@ -85,7 +136,10 @@ class BaseRepository(Generic[M, E]):
                 models = self.model.objects.filter(deleted_at=None)
             except FieldDoesNotExist:
                 models = self.model.objects.all()
-        return [self.entity.from_model(model) for model in models]
+        return self.entity.from_queryset(models)
 
     async def aall(self, even_deleted: bool = True) -> list[E]:
         return await sync_to_async(self.all)(even_deleted=even_deleted)
+
+
+trace_coroutine_methods(BaseRepository, kind='db')
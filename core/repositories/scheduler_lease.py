@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.entities import SchedulerLeaseEntity
+from core.exceptions import SchedulerLeaseNotFoundException
+from core.models import SchedulerLease
+from core.repositories.base import BaseRepository
+
+
+class SchedulerLeaseRepository(BaseRepository[SchedulerLease, SchedulerLeaseEntity]):
+    def __init__(self):
+        super().__init__(
+            model=SchedulerLease,
+            entity=SchedulerLeaseEntity,
+            not_found_exception=SchedulerLeaseNotFoundException,
+        )
+
+    def try_acquire(self, name: str, holder: str, ttl_seconds: float) -> bool:
+        """
+        Take or extend the lease if it is free, expired or already ours.
+
+        The conditional UPDATE is atomic, so of several replicas racing for an
+        expired lease exactly one sees an updated row.
+        """
+        now = timezone.now()
+        expires_at = now + timedelta(seconds=ttl_seconds)
+        updated = SchedulerLease.objects.filter(
+            Q(holder=holder) | Q(expires_at__lte=now),
+            name=name,
+        ).update(holder=holder, expires_at=expires_at, updated_at=now)
+        if updated:
+            return True
+        try:
+            with transaction.atomic():
+                SchedulerLease.objects.create(name=name, holder=holder, expires_at=expires_at)
+        except IntegrityError:
+            # Someone else holds a live lease, or created it first
+            return False
+        return True
+
+    async def atry_acquire(self, name: str, holder: str, ttl_seconds: float) -> bool:
+        return await sync_to_async(self.try_acquire)(name, holder, ttl_seconds)
+
+    def release(self, name: str, holder: str) -> None:
+        SchedulerLease.objects.filter(name=name, holder=holder).update(expires_at=timezone.now())
+
+    async def arelease(self, name: str, holder: str) -> None:
+        return await sync_to_async(self.release)(name, holder)
@@ -0,0 +1,53 @@
+from typing import Any, Optional
+
+from asgiref.sync import sync_to_async
+
+from core.entities import SettingEntity
+from core.enums import SettingType
+from core.exceptions import SettingNotFoundException
+from core.models import Setting
+from core.repositories.base import BaseRepository
+
+
+class SettingRepository(BaseRepository[Setting, SettingEntity]):
+    def __init__(self):
+        super().__init__(
+            model=Setting,
+            entity=SettingEntity,
+            not_found_exception=SettingNotFoundException,
+        )
+
+    def get_value(self, name: str, default: Optional[Any] = None) -> Any:
+        try:
+            setting = Setting.objects.get(name=name)
+            return setting.get_value()
+        except Setting.DoesNotExist:
+            return default
+
+    async def aget_value(self, name: str, default: Optional[Any] = None) -> Any:
+        return await sync_to_async(self.get_value)(name, default)
+
+    def set_value(
+        self,
+        name: str,
+        value: Any,
+        setting_type: SettingType = SettingType.JSON,
+    ) -> SettingEntity:
+        setting = Setting(name=name, type=setting_type)
+        setting.set_value(value)
+        setting, _created = Setting.objects.update_or_create(
+            name=name,
+            defaults={
+                'type': setting.type,
+                'value': setting.value,
+            },
+        )
+        return SettingEntity.from_model(setting)
+
+    async def aset_value(
+        self,
+        name: str,
+        value: Any,
+        setting_type: SettingType = SettingType.JSON,
+    ) -> SettingEntity:
+        return await sync_to_async(self.set_value)(name, value, setting_type)
@@ -0,0 +1,139 @@
+import gzip
+import io
+import json
+import os
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from core.entities import ArchiveResultEntity
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the installed extras
+    zstandard = None
+
+ZSTD_SUFFIX = '.jsonl.zst'
+GZIP_SUFFIX = '.jsonl.gz'
+
+
+class ArchiveStorage:
+    """
+    Cold storage for rows moved out of hot tables.
+
+    Rows are written as compressed JSON lines under `<base_dir>/<dataset>/<YYYY-MM>/`,
+    one segment file per archived chunk. zstd is used when `zstandard` is installed,
+    gzip otherwise; both are readable regardless of which codec wrote them.
+    """
+
+    def __init__(self, base_dir: Path | str):
+        self.base_dir = Path(base_dir)
+
+    @property
+    def suffix(self) -> str:
+        return ZSTD_SUFFIX if zstandard is not None else GZIP_SUFFIX
+
+    def write_segment(self, dataset: str, month: str, rows: list[dict]) -> Path:
+        """
+        Write rows to a segment named after their id range.
+
+        The file is written under a temporary name and renamed into place, so readers
+        never see a partial segment and a re-run over the same rows replaces it.
+        """
+        month_dir = self.base_dir / dataset / month
+        month_dir.mkdir(parents=True, exist_ok=True)
+        path = month_dir / f"part-{rows[0]['id']:012d}-{rows[-1]['id']:012d}{self.suffix}"
+        tmp_path = path.with_name(path.name + '.tmp')
+
+        payload = ''.join(
+            json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+            for row in rows
+        ).encode('utf-8')
+        if zstandard is not None:
+            data = zstandard.ZstdCompressor(level=10).compress(payload)
+        else:
+            data = gzip.compress(payload)
+
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return path
+
+    def archive_chunks(
+        self,
+        dataset: str,
+        chunks: Iterable[list[dict]],
+        month_of: Callable[[dict], str],
+        delete_ids: Callable[[list[int]], int],
+    ) -> ArchiveResultEntity:
+        """
+        Move row chunks into the archive.
+
+        Each chunk is written to disk before its rows are deleted, so a crash can at
+        worst leave rows both archived and still in the database.
+        """
+        result = ArchiveResultEntity(dataset=dataset)
+        for rows in chunks:
+            self.archive_rows(result, rows, month_of=month_of, delete_ids=delete_ids)
+        return result
+
+    def archive_rows(
+        self,
+        result: ArchiveResultEntity,
+        rows: list[dict],
+        month_of: Callable[[dict], str],
+        delete_ids: Callable[[list[int]], int],
+    ) -> None:
+        """Move one chunk into the archive, adding its counts to `result`."""
+        by_month: dict[str, list[dict]] = {}
+        for row in rows:
+            by_month.setdefault(month_of(row), []).append(row)
+        for month, month_rows in sorted(by_month.items()):
+            path = self.write_segment(dataset=result.dataset, month=month, rows=month_rows)
+            result.segments += 1
+            result.bytes_written += path.stat().st_size
+        result.archived_count += delete_ids([row['id'] for row in rows])
+
+    def list_months(self, dataset: str) -> list[str]:
+        dataset_dir = self.base_dir / dataset
+        if not dataset_dir.is_dir():
+            return []
+        return sorted(p.name for p in dataset_dir.iterdir() if p.is_dir())
+
+    def iter_rows(
+        self,
+        dataset: str,
+        month_from: Optional[str] = None,
+        month_to: Optional[str] = None,
+        predicate: Optional[Callable[[dict], bool]] = None,
+    ) -> Iterator[dict]:
+        """Stream archived rows, optionally limited to an inclusive YYYY-MM range."""
+        for month in self.list_months(dataset):
+            if month_from and month < month_from:
+                continue
+            if month_to and month > month_to:
+                continue
+            for path in sorted((self.base_dir / dataset / month).iterdir()):
+                for row in self._read_segment(path):
+                    if predicate is None or predicate(row):
+                        yield row
+
+    def _read_segment(self, path: Path) -> Iterator[dict]:
+        if path.name.endswith(ZSTD_SUFFIX):
+            if zstandard is None:
+                raise RuntimeError(f"Cannot read {path}: the 'zstandard' package is not installed")
+            with open(path, 'rb') as f:
+                stream = zstandard.ZstdDecompressor().stream_reader(f)
+                yield from self._parse_lines(io.TextIOWrapper(stream, encoding='utf-8'))
+        elif path.name.endswith(GZIP_SUFFIX):
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                yield from self._parse_lines(f)
+
+    @staticmethod
+    def _parse_lines(lines: Iterable[str]) -> Iterator[dict]:
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
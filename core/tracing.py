@@ -0,0 +1,259 @@
+"""
+Lightweight in-process tracing.
+
+A trace is a tree of timed spans for one unit of work: an update (started by
+telegram_bot.middlewares.tracing.TracingMiddleware) or a scheduled job run.
+Spans are opened with `span()` anywhere below; the current span lives in a
+ContextVar, which asgiref copies into sync_to_async threads, so repository and
+LLM calls made from worker threads nest under the span that awaited them.
+
+Every trace is recorded while tracing is enabled; when the root span ends it is
+exported if it was sampled (`sample_rate`) or took at least `slow_seconds`.
+Exporters write to the log (console) or to a JSON-lines file. Without an active
+trace `span()` only does a ContextVar lookup.
+
+Span kinds: 'update', 'task', 'middleware', 'handler', 'db', 'llm', 'telegram', 'internal'.
+"""
+import functools
+import inspect
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Iterator, Optional, Protocol
+
+logger = logging.getLogger(__name__)
+
+# Bulk jobs make thousands of calls; beyond this many children per span they
+# are only counted, their time and SQL stay attributed to the parent
+MAX_CHILDREN_PER_SPAN = 200
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str = 'internal'
+    attributes: dict[str, Any] = field(default_factory=dict)
+    started: float = field(default_factory=time.perf_counter)
+    ended: Optional[float] = None
+    error: Optional[str] = None
+    sql_count: int = 0
+    sql_seconds: float = 0.0
+    children: list['Span'] = field(default_factory=list)
+    dropped_children: int = 0
+
+    @property
+    def duration(self) -> float:
+        return (self.ended if self.ended is not None else time.perf_counter()) - self.started
+
+    def walk(self) -> Iterator['Span']:
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def to_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            'name': self.name,
+            'kind': self.kind,
+            'duration_ms': round(self.duration * 1000, 3),
+        }
+        if self.attributes:
+            data['attributes'] = self.attributes
+        if self.error:
+            data['error'] = self.error
+        if self.sql_count:
+            data['sql_count'] = self.sql_count
+            data['sql_ms'] = round(self.sql_seconds * 1000, 3)
+        if self.children:
+            data['children'] = [child.to_dict() for child in self.children]
+        if self.dropped_children:
+            data['dropped_children'] = self.dropped_children
+        return data
+
+
+@dataclass
+class Trace:
+    root: Span
+    trace_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    started_at: datetime = field(default_factory=lambda: datetime.now(dt_timezone.utc))
+    sampled: bool = False
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'trace_id': self.trace_id,
+            'started_at': self.started_at.isoformat(),
+            **self.root.to_dict(),
+        }
+
+
+class SpanExporter(Protocol):
+    def export(self, trace: Trace) -> None: ...
+
+
+class ConsoleSpanExporter:
+    """Logs the span tree, one line per span, indented by depth."""
+
+    def export(self, trace: Trace) -> None:
+        lines = [f"Trace {trace.trace_id}"]
+        self._render(trace.root, 0, lines)
+        logger.info('\n'.join(lines))
+
+    def _render(self, span: Span, depth: int, lines: list[str]) -> None:
+        details = f" sql={span.sql_count} ({span.sql_seconds * 1000:.1f}ms)" if span.sql_count else ''
+        if span.error:
+            details += f" error={span.error}"
+        if span.dropped_children:
+            details += f" (+{span.dropped_children} spans not recorded)"
+        lines.append(f"{'  ' * depth}{span.name} [{span.kind}] {span.duration * 1000:.1f}ms{details}")
+        for child in span.children:
+            self._render(child, depth + 1, lines)
+
+
+class FileSpanExporter:
+    """Appends every exported trace to a JSON-lines file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, trace: Trace) -> None:
+        line = json.dumps(trace.to_dict(), default=str)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as file:
+            file.write(line + '\n')
+
+
+class Tracer:
+    def __init__(self, exporter: SpanExporter, sample_rate: float = 0.0, slow_seconds: Optional[float] = None):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_seconds
+        self.exported = 0
+
+    @classmethod
+    def from_settings(cls) -> 'Tracer':
+        from django.conf import settings
+
+        if settings.TRACING_EXPORTER == 'file':
+            exporter: SpanExporter = FileSpanExporter(settings.TRACING_FILE)
+        else:
+            exporter = ConsoleSpanExporter()
+        return cls(
+            exporter=exporter,
+            sample_rate=settings.TRACING_SAMPLE_RATE,
+            slow_seconds=settings.TRACING_SLOW_SECONDS or None,
+        )
+
+    def should_export(self, trace: Trace) -> bool:
+        if trace.sampled:
+            return True
+        return self.slow_seconds is not None and trace.root.duration >= self.slow_seconds
+
+    def finish(self, trace: Trace) -> None:
+        if not self.should_export(trace):
+            return
+        try:
+            self.exporter.export(trace)
+            self.exported += 1
+        except Exception as e:
+            logger.warning(f"Failed to export trace {trace.trace_id}: {e}")
+
+
+_tracer: Optional[Tracer] = None
+_current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+
+def configure_tracing(tracer: Optional[Tracer]) -> None:
+    """Install the process tracer; None disables tracing."""
+    global _tracer
+    _tracer = tracer
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def start_trace(name: str, kind: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Open the root span of a trace; nested inside another trace it becomes a plain span."""
+    tracer = _tracer
+    if tracer is None:
+        yield None
+        return
+    if _current_span.get() is not None:
+        with span(name, kind, **attributes) as child:
+            yield child
+        return
+
+    root = Span(name=name, kind=kind, attributes=attributes)
+    trace = Trace(root=root, sampled=random.random() < tracer.sample_rate)
+    token = _current_span.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.error = type(e).__name__
+        raise
+    finally:
+        root.ended = time.perf_counter()
+        _current_span.reset(token)
+        tracer.finish(trace)
+
+
+@contextmanager
+def span(name: str, kind: str = 'internal', **attributes: Any) -> Iterator[Optional[Span]]:
+    """Time a block as a child of the current span; a no-op outside a trace."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    if len(parent.children) >= MAX_CHILDREN_PER_SPAN:
+        parent.dropped_children += 1
+        yield None
+        return
+    child = Span(name=name, kind=kind, attributes=attributes)
+    parent.children.append(child)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.error = type(e).__name__
+        raise
+    finally:
+        child.ended = time.perf_counter()
+        _current_span.reset(token)
+
+
+def record_query(duration: float) -> None:
+    """Attribute an SQL statement to the current span."""
+    current = _current_span.get()
+    if current is not None:
+        current.sql_count += 1
+        current.sql_seconds += duration
+
+
+def trace_coroutine_methods(cls: type, kind: str) -> type:
+    """Wrap the public coroutine methods defined on `cls` in spans named `<Class>.<method>`."""
+    for attribute, value in list(vars(cls).items()):
+        if attribute.startswith('_') or not inspect.iscoroutinefunction(value):
+            continue
+        if getattr(value, '__traced__', False):
+            continue
+        setattr(cls, attribute, _traced_method(value, kind))
+    return cls
+
+
+def _traced_method(method, kind: str):
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        if _current_span.get() is None:
+            return await method(self, *args, **kwargs)
+        with span(f"{type(self).__name__}.{method.__name__}", kind):
+            return await method(self, *args, **kwargs)
+
+    wrapper.__traced__ = True
+    return wrapper
@@ -14,10 +14,10 @@ class UserProfileAdmin(admin.ModelAdmin):
 
 @admin.register(Horoscope)
 class HoroscopeAdmin(admin.ModelAdmin):
-    list_display = ('id', 'user_telegram_uid', 'horoscope_type', 'date', 'created_at')
-    list_filter = ('horoscope_type', 'date')
+    list_display = ('id', 'user_telegram_uid', 'horoscope_type', 'date', 'generated_by_fallback', 'created_at')
+    list_filter = ('horoscope_type', 'date', 'generated_by_fallback')
     search_fields = ('user_telegram_uid',)
-    readonly_fields = ('id', 'user_telegram_uid', 'horoscope_type', 'date', 'full_text', 'teaser_text', 'created_at')
+    readonly_fields = ('id', 'user_telegram_uid', 'horoscope_type', 'date', 'full_text', 'created_at')
 
     def full_text_preview(self, obj):
         if obj.full_text and len(obj.full_text) > 200:
@@ -0,0 +1,78 @@
+"""
+Local OpenAI-compatible chat completions endpoint for benchmarks and load tests.
+
+LLMService talks to it through LLM_BASE_URL like to any OpenAI-compatible
+provider. Every completion is answered after a configurable latency with a
+fixed number of output tokens, so generation and follow-up costs can be
+reproduced without a real provider.
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+from aiohttp import web
+
+FAKE_LLM_MODEL = 'openai/fake-llm'
+FAKE_LLM_API_KEY = 'fake-llm-key'
+
+
+class FakeLLMServer:
+    def __init__(self, latency_seconds: float = 0.0, output_tokens: int = 200):
+        self.latency_seconds = latency_seconds
+        self.output_tokens = output_tokens
+        self.requests = 0
+        self.in_flight = 0
+        self.input_tokens_total = 0
+        self.output_tokens_total = 0
+        self._runner: Optional[web.AppRunner] = None
+        self.url = ''
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_post('/chat/completions', self._handle)
+        app.router.add_post('/v1/chat/completions', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host=host, port=port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        self.url = f"http://{host}:{bound_port}"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        self.requests += 1
+        self.in_flight += 1
+        try:
+            if self.latency_seconds:
+                await asyncio.sleep(self.latency_seconds)
+        finally:
+            self.in_flight -= 1
+
+        # Roughly four characters per token, like English text
+        prompt_tokens = sum(len(str(message.get('content', ''))) for message in payload.get('messages', [])) // 4
+        completion_tokens = min(self.output_tokens, int(payload.get('max_tokens') or self.output_tokens))
+        self.input_tokens_total += prompt_tokens
+        self.output_tokens_total += completion_tokens
+        return web.json_response({
+            'id': f'chatcmpl-fake-{self.requests}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': payload.get('model', FAKE_LLM_MODEL),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': ' '.join(['✨ star'] * completion_tokens)},
+                'finish_reason': 'stop',
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        })
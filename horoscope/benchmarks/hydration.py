@@ -0,0 +1,80 @@
+"""
+Microbenchmark for turning database rows into entities.
+
+Compares the validating ORM path (`from_model` on model instances) with
+`.values()` + `model_validate` and the trusted `from_queryset` path, over the
+same set of subscription rows: once including the query, once for entity
+construction alone.
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable
+
+from django.utils import timezone
+
+from horoscope.benchmarks.seed import SEED_UID_OFFSET
+from horoscope.entities import SubscriptionEntity
+from horoscope.enums import SubscriptionStatus
+from horoscope.models import Subscription
+
+
+@dataclass
+class HydrationTiming:
+    name: str
+    rows: int
+    seconds: float
+
+    @property
+    def per_row_us(self) -> float:
+        return self.seconds / self.rows * 1_000_000 if self.rows else 0.0
+
+
+def seed_subscriptions(row_count: int, uid_offset: int = SEED_UID_OFFSET, batch_size: int = 5000) -> None:
+    now = timezone.now()
+    Subscription.objects.bulk_create(
+        [
+            Subscription(
+                user_telegram_uid=uid_offset + i,
+                status=SubscriptionStatus.ACTIVE,
+                expires_at=now + timedelta(days=i % 30),
+                telegram_payment_charge_id=f'charge-{i}',
+            )
+            for i in range(row_count)
+        ],
+        batch_size=batch_size,
+    )
+
+
+def _hydration_paths(uid_offset: int) -> dict[str, Callable[[], list]]:
+    queryset = Subscription.objects.filter(user_telegram_uid__gte=uid_offset)
+    fields = list(SubscriptionEntity.model_fields)
+    # Pre-fetched inputs isolate the entity construction cost from the query itself
+    instances = list(queryset.all())
+    rows = list(queryset.values(*fields))
+    return {
+        'query + from_model': lambda: SubscriptionEntity.from_models(queryset.all()),
+        'query + model_validate': lambda: [
+            SubscriptionEntity.model_validate(row) for row in queryset.values(*fields)
+        ],
+        'query + from_queryset': lambda: SubscriptionEntity.from_queryset(queryset.all()),
+        'from_model only': lambda: SubscriptionEntity.from_models(instances),
+        'model_validate only': lambda: [SubscriptionEntity.model_validate(row) for row in rows],
+        'from_row only': lambda: SubscriptionEntity.from_rows(rows),
+    }
+
+
+def benchmark_hydration(uid_offset: int = SEED_UID_OFFSET, repeat: int = 3) -> list[HydrationTiming]:
+    """Time each hydration path over the seeded rows and keep the best of `repeat` runs."""
+    timings = []
+    for name, run in _hydration_paths(uid_offset).items():
+        best = None
+        rows = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = len(run())
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        timings.append(HydrationTiming(name=name, rows=rows, seconds=best or 0.0))
+    return timings
@@ -0,0 +1,176 @@
+"""
+EXPLAIN-based checks for hot repository queries.
+
+Each hot query is executed through its repository method while SQL is captured,
+then every captured statement is re-run under EXPLAIN (ANALYZE, BUFFERS) and the
+plan is searched for sequential scans on the large tables.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.containers import container
+from horoscope.models import Horoscope, Subscription, UserProfile
+from telegram_bot.models import MessageHistory
+
+# Tables that grow with the user base — a sequential scan on any of them is a regression
+LARGE_TABLES = frozenset({
+    UserProfile._meta.db_table,
+    Horoscope._meta.db_table,
+    Subscription._meta.db_table,
+    MessageHistory._meta.db_table,
+    'users',
+})
+
+
+@dataclass
+class HotQuery:
+    name: str
+    run: Callable[[], Any]
+
+
+@dataclass
+class QueryPlanResult:
+    name: str
+    sql: str
+    execution_time_ms: float
+    shared_hit_blocks: int
+    shared_read_blocks: int
+    node_types: list[str] = field(default_factory=list)
+    seq_scans: list[str] = field(default_factory=list)
+
+    @property
+    def is_regression(self) -> bool:
+        return bool(self.seq_scans)
+
+
+def find_plan_nodes(plan: dict) -> list[dict]:
+    """Flatten an EXPLAIN (FORMAT JSON) plan tree into a list of nodes."""
+    nodes = [plan]
+    for child in plan.get('Plans', []):
+        nodes.extend(find_plan_nodes(child))
+    return nodes
+
+
+def find_seq_scans(plan: dict, tables: frozenset[str] = LARGE_TABLES) -> list[str]:
+    """Return relation names that are read with a sequential scan in the given plan."""
+    return [
+        node['Relation Name']
+        for node in find_plan_nodes(plan)
+        if node.get('Node Type') == 'Seq Scan' and node.get('Relation Name') in tables
+    ]
+
+
+def build_hot_queries(sample_uid: int, target_date: date) -> list[HotQuery]:
+    """Hot read paths of handlers and scheduled tasks, as called in production."""
+    from django.utils import timezone
+
+    user_profile_repo = container.horoscope.user_profile_repository()
+    horoscope_repo = container.horoscope.horoscope_repository()
+    subscription_repo = container.horoscope.subscription_repository()
+    followup_repo = container.horoscope.followup_repository()
+    user_repo = container.core.user_repository()
+    message_history_repo = container.core.message_history_repository()
+
+    return [
+        HotQuery(
+            name='user_profile.iter_telegram_uids_by_notification_hour',
+            run=lambda: next(user_profile_repo.iter_telegram_uids_by_notification_hour(
+                hour_utc=timezone.now().hour,
+            ), None),
+        ),
+        HotQuery(
+            name='user_profile.get_by_telegram_uid',
+            run=lambda: user_profile_repo.get_by_telegram_uid(sample_uid),
+        ),
+        HotQuery(
+            name='user.get',
+            run=lambda: user_repo.get(sample_uid),
+        ),
+        HotQuery(
+            name='horoscope.iter_unsent_telegram_uids_for_date',
+            run=lambda: next(horoscope_repo.iter_unsent_telegram_uids_for_date(target_date=target_date), None),
+        ),
+        HotQuery(
+            name='horoscope.iter_due_deliveries',
+            run=lambda: next(horoscope_repo.iter_due_deliveries(due_at=timezone.now()), None),
+        ),
+        HotQuery(
+            name='horoscope.get_by_user_and_date',
+            run=lambda: horoscope_repo.get_by_user_and_date(telegram_uid=sample_uid, target_date=target_date),
+        ),
+        HotQuery(
+            name='horoscope.get_delivery_state_by_user_and_date',
+            run=lambda: horoscope_repo.get_delivery_state_by_user_and_date(
+                telegram_uid=sample_uid,
+                target_date=target_date,
+            ),
+        ),
+        HotQuery(
+            name='horoscope.get_delivery_by_user_and_date',
+            run=lambda: horoscope_repo.get_delivery_by_user_and_date(telegram_uid=sample_uid, target_date=target_date),
+        ),
+        HotQuery(
+            name='horoscope.get_queued_fallbacks',
+            run=lambda: horoscope_repo.get_queued_fallbacks(after=timezone.now(), limit=50),
+        ),
+        HotQuery(
+            name='horoscope.get_last_sent_at',
+            run=lambda: horoscope_repo.get_last_sent_at(telegram_uid=sample_uid),
+        ),
+        HotQuery(
+            name='subscription.has_active_subscription',
+            run=lambda: subscription_repo.has_active_subscription(telegram_uid=sample_uid),
+        ),
+        HotQuery(
+            name='subscription.get_latest_by_user',
+            run=lambda: subscription_repo.get_latest_by_user(telegram_uid=sample_uid),
+        ),
+        HotQuery(
+            name='subscription.get_expiring_soon',
+            run=lambda: subscription_repo.get_expiring_soon(days=3),
+        ),
+        HotQuery(
+            name='subscription.get_recently_expired_unnotified',
+            run=lambda: subscription_repo.get_recently_expired_unnotified(),
+        ),
+        HotQuery(
+            name='followup.get_by_horoscope',
+            run=lambda: followup_repo.get_by_horoscope(horoscope_id=0),
+        ),
+        HotQuery(
+            name='message_history.count_by_user',
+            run=lambda: message_history_repo.count_by_user(telegram_uid=sample_uid),
+        ),
+    ]
+
+
+def explain_hot_query(hot_query: HotQuery) -> list[QueryPlanResult]:
+    """Run the hot query, then EXPLAIN (ANALYZE, BUFFERS) each SQL statement it executed."""
+    with CaptureQueriesContext(connection) as captured:
+        hot_query.run()
+
+    results = []
+    with connection.cursor() as cursor:
+        for query in captured.captured_queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}')
+            explain = cursor.fetchone()[0][0]
+            plan = explain['Plan']
+            nodes = find_plan_nodes(plan)
+            results.append(QueryPlanResult(
+                name=hot_query.name,
+                sql=sql,
+                execution_time_ms=explain.get('Execution Time', 0.0),
+                shared_hit_blocks=plan.get('Shared Hit Blocks', 0),
+                shared_read_blocks=plan.get('Shared Read Blocks', 0),
+                node_types=[node['Node Type'] for node in nodes],
+                seq_scans=find_seq_scans(plan),
+            ))
+    return results
@@ -0,0 +1,180 @@
+"""
+Synthetic population seeding for benchmarks and query-plan checks.
+Writes users, profiles, subscriptions, horoscope history and message history with bulk inserts.
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.db.models.functions import Mod
+from django.utils import timezone
+
+from core.models import User
+from horoscope.enums import HoroscopeType, SubscriptionStatus
+from horoscope.models import Horoscope, Subscription, UserProfile
+from horoscope.utils import get_effective_notification_minute
+from telegram_bot.models import MessageHistory
+
+SEED_UID_OFFSET = 9_000_000_000
+
+SEED_FULL_TEXT = "\n".join(
+    ["♈ Daily horoscope", "Dear friend,"]
+    + [f"✨ Line {line} of the synthetic horoscope content." for line in range(10)]
+)
+
+
+@dataclass
+class SeedResult:
+    users: int
+    subscriptions: int
+    horoscopes: int
+    messages: int
+    first_uid: int
+    last_uid: int
+
+
+def _subscription_for(uid: int, index: int, now: datetime) -> Subscription | None:
+    # ~10% active subscribers spread over the subscription period, ~5% expired
+    bucket = index % 20
+    if bucket in (0, 1):
+        return Subscription(
+            user_telegram_uid=uid,
+            status=SubscriptionStatus.ACTIVE,
+            expires_at=now + timedelta(days=random.randint(1, settings.HOROSCOPE_SUBSCRIPTION_DURATION_DAYS)),
+        )
+    if bucket == 2:
+        return Subscription(
+            user_telegram_uid=uid,
+            status=SubscriptionStatus.EXPIRED,
+            expires_at=now - timedelta(days=random.randint(1, 180)),
+            reminder_sent_at=now - timedelta(days=random.randint(0, 180)) if index % 40 else None,
+        )
+    return None
+
+
+def seed_population(
+    user_count: int,
+    history_days: int = 30,
+    messages_per_user: int = 20,
+    target_date: date | None = None,
+    uid_offset: int = SEED_UID_OFFSET,
+    batch_size: int = 5000,
+) -> SeedResult:
+    """
+    Seed `user_count` synthetic users with `history_days` days of horoscopes
+    (all sent except `target_date`, which is left unsent) and message history.
+    """
+    target_date = target_date or date.today()
+    now = timezone.now()
+    languages = list(settings.HOROSCOPE_SUPPORTED_LANGUAGE_CODES) or ['en']
+    random.seed(user_count)
+
+    subscriptions = 0
+    horoscopes = 0
+    messages = 0
+
+    for batch_start in range(0, user_count, batch_size):
+        batch_indexes = range(batch_start, min(batch_start + batch_size, user_count))
+        users = []
+        profiles = []
+        batch_subscriptions = []
+        batch_horoscopes = []
+        batch_messages = []
+
+        for index in batch_indexes:
+            uid = uid_offset + index
+            language = languages[index % len(languages)]
+            notification_hour_local = index % 24 if index % 7 == 0 else None
+
+            users.append(User(
+                telegram_uid=uid,
+                first_name=f"Seed {index}",
+                language_code=language,
+                last_activity=now - timedelta(days=random.randint(0, 30)),
+            ))
+            effective_notification_minute = get_effective_notification_minute(
+                notification_hour_local=notification_hour_local,
+                preferred_language=language,
+            )
+            profiles.append(UserProfile(
+                user_telegram_uid=uid,
+                name=f"Seed {index}",
+                date_of_birth=date(1970, 1, 1) + timedelta(days=index % 15000),
+                place_of_birth="Seed City",
+                place_of_living="Seed City",
+                preferred_language=language,
+                notification_hour_local=notification_hour_local,
+                effective_notification_hour=effective_notification_minute // 60,
+                effective_notification_minute=effective_notification_minute,
+                utc_offset_minutes=0,
+            ))
+
+            subscription = _subscription_for(uid=uid, index=index, now=now)
+            if subscription is not None:
+                batch_subscriptions.append(subscription)
+
+            for day in range(history_days):
+                horoscope_date = target_date - timedelta(days=day)
+                sent_at = None
+                deliver_at = None
+                if horoscope_date != target_date:
+                    sent_at = datetime.combine(horoscope_date, datetime.min.time(), tzinfo=now.tzinfo)
+                else:
+                    deliver_at = datetime.combine(
+                        horoscope_date, time(effective_notification_minute // 60, effective_notification_minute % 60), tzinfo=now.tzinfo,
+                    )
+                batch_horoscopes.append(Horoscope(
+                    user_telegram_uid=uid,
+                    horoscope_type=HoroscopeType.DAILY,
+                    date=horoscope_date,
+                    full_text=SEED_FULL_TEXT,
+                    sent_at=sent_at,
+                    deliver_at=deliver_at,
+                ))
+
+            for message_index in range(messages_per_user):
+                batch_messages.append(MessageHistory(
+                    from_user_telegram_uid=uid,
+                    to_user_telegram_uid=None,
+                    chat_telegram_uid=uid,
+                    text=f"/horoscope {message_index}",
+                    raw={'message_id': message_index, 'text': '/horoscope'},
+                ))
+
+        User.objects.bulk_create(users, batch_size=batch_size)
+        UserProfile.objects.bulk_create(profiles, batch_size=batch_size)
+        Subscription.objects.bulk_create(batch_subscriptions, batch_size=batch_size)
+        Horoscope.objects.bulk_create(batch_horoscopes, batch_size=batch_size)
+        MessageHistory.objects.bulk_create(batch_messages, batch_size=batch_size)
+
+        subscriptions += len(batch_subscriptions)
+        horoscopes += len(batch_horoscopes)
+        messages += len(batch_messages)
+
+    # created_at is auto_now_add — spread message history over the seeded period afterwards
+    seeded_messages = MessageHistory.objects.filter(
+        from_user_telegram_uid__range=(uid_offset, uid_offset + user_count - 1),
+    ).annotate(day_bucket=Mod('id', max(history_days, 1)))
+    for day in range(max(history_days, 1)):
+        seeded_messages.filter(day_bucket=day).update(created_at=now - timedelta(days=day))
+
+    return SeedResult(
+        users=user_count,
+        subscriptions=subscriptions,
+        horoscopes=horoscopes,
+        messages=messages,
+        first_uid=uid_offset,
+        last_uid=uid_offset + user_count - 1,
+    )
+
+
+def delete_population(first_uid: int, last_uid: int) -> None:
+    """Remove everything seeded (or created by benchmark traffic) for users in the uid range."""
+    uid_range = (first_uid, last_uid)
+    MessageHistory.objects.filter(chat_telegram_uid__range=uid_range).delete()
+    Horoscope.objects.filter(user_telegram_uid__range=uid_range).delete()
+    Subscription.objects.filter(user_telegram_uid__range=uid_range).delete()
+    UserProfile.objects.filter(user_telegram_uid__range=uid_range).delete()
+    User.objects.filter(telegram_uid__range=uid_range).delete()
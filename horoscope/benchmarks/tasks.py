@@ -0,0 +1,305 @@
+"""
+Scheduled task benchmark at population scale.
+
+For every population size a synthetic population is seeded (today's
+horoscopes left unsent and queued, see seed_population) and the tasks
+start_bot schedules run one after the other against a fake Telegram and a
+fake LLM: the notification bucket rebuild, daily generation for the busiest
+notification hour (whose horoscopes for today are removed first, so they
+are really generated), a delivery run with the whole day's queue due, and
+the subscription reminders. The legacy full-scan daily and teaser sends,
+kept for manual sweeps, only run when asked for with `tasks`. Per task the
+wall time, SQL statements and their time (from the statement hook feeding
+slow work profiles), peak RSS and messages sent per second are recorded.
+
+Results are written as JSON and can be compared with a previous run.
+"""
+
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, time as time_of_day, timedelta, timezone as dt_timezone
+from typing import Any, Awaitable, Callable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from core.metrics import install_db_query_metrics
+from core.profiling import SlowWorkDetector
+from horoscope.benchmarks.fake_llm import FAKE_LLM_API_KEY, FAKE_LLM_MODEL, FakeLLMServer
+from horoscope.benchmarks.seed import SEED_UID_OFFSET, delete_population, seed_population
+from horoscope.models import Horoscope, UserProfile
+
+BENCHMARKED_TASKS = (
+    'rebuild_notification_buckets',
+    'generate_daily_for_all_users',
+    'deliver_due_horoscopes',
+    'send_expiry_reminders',
+    'send_expired_notifications',
+)
+# Manual sweeps only, not scheduled
+OPTIONAL_TASKS = (
+    'send_daily_horoscope_notifications',
+    'send_periodic_teaser_notifications',
+)
+
+
+@dataclass
+class TaskRun:
+    task: str
+    users: int
+    seconds: float
+    queries: int
+    db_seconds: float
+    peak_rss_mb: float
+    messages: int
+    result: Any = None
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.messages / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), 'messages_per_second': round(self.messages_per_second, 1)}
+
+
+@dataclass
+class TaskBenchResults:
+    database: str
+    started_at: str
+    seed_seconds: dict[int, float] = field(default_factory=dict)
+    runs: list[TaskRun] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'database': self.database,
+            'started_at': self.started_at,
+            'seed_seconds': {str(users): round(seconds, 2) for users, seconds in self.seed_seconds.items()},
+            'runs': [run.to_dict() for run in self.runs],
+        }
+
+    def write(self, path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+
+
+def _current_rss_bytes() -> Optional[int]:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _max_rss_bytes() -> int:
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+class PeakRssSampler:
+    """Peak resident memory while running; samples /proc where available, process peak otherwise."""
+
+    def __init__(self, interval_seconds: float = 0.05):
+        self.interval_seconds = interval_seconds
+        self.peak_bytes = 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+
+    def __enter__(self) -> 'PeakRssSampler':
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stopped.set()
+        self._thread.join()
+        self._sample()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval_seconds):
+            self._sample()
+
+    def _sample(self) -> None:
+        rss = _current_rss_bytes()
+        self.peak_bytes = max(self.peak_bytes, rss if rss is not None else _max_rss_bytes())
+
+
+def busiest_notification_hour(first_uid: int, last_uid: int) -> int:
+    row = (
+        UserProfile.objects.filter(user_telegram_uid__range=(first_uid, last_uid))
+        .values('effective_notification_hour')
+        .annotate(users=Count('user_telegram_uid'))
+        .order_by('-users')
+        .first()
+    )
+    return row['effective_notification_hour'] if row else 0
+
+
+def forget_generated_for_hour(first_uid: int, last_uid: int, hour: int, target_date: date) -> int:
+    """Remove today's horoscopes of users notified at `hour`, so daily generation has real work."""
+    uids = UserProfile.objects.filter(
+        user_telegram_uid__range=(first_uid, last_uid),
+        effective_notification_hour=hour,
+    ).values('user_telegram_uid')
+    deleted, _ = Horoscope.objects.filter(user_telegram_uid__in=uids, date=target_date).delete()
+    return deleted
+
+
+def make_queue_due(first_uid: int, last_uid: int, target_date: date) -> int:
+    """Make every queued horoscope of `target_date` due now, so a delivery run drains the whole day at once."""
+    return Horoscope.objects.filter(
+        user_telegram_uid__range=(first_uid, last_uid),
+        date=target_date,
+        deliver_at__isnull=False,
+    ).update(deliver_at=timezone.now())
+
+
+def _task_functions(generation_scheduled_at: datetime) -> dict[str, Callable[[Any], Awaitable[Any]]]:
+    from horoscope.tasks.deliver_due import deliver_due_horoscopes
+    from horoscope.tasks.notification_buckets import rebuild_notification_buckets
+    from horoscope.tasks.send_daily_horoscope import generate_daily_for_all_users, send_daily_horoscope_notifications
+    from horoscope.tasks.send_periodic_teaser import send_periodic_teaser_notifications
+    from horoscope.tasks.subscription_reminders import send_expired_notifications, send_expiry_reminders
+
+    async def generate_for_busiest_hour(bot):
+        return await generate_daily_for_all_users(bot, scheduled_at=generation_scheduled_at)
+
+    return {
+        'rebuild_notification_buckets': rebuild_notification_buckets,
+        'generate_daily_for_all_users': generate_for_busiest_hour,
+        'deliver_due_horoscopes': deliver_due_horoscopes,
+        'send_daily_horoscope_notifications': send_daily_horoscope_notifications,
+        'send_periodic_teaser_notifications': send_periodic_teaser_notifications,
+        'send_expiry_reminders': send_expiry_reminders,
+        'send_expired_notifications': send_expired_notifications,
+    }
+
+
+async def run_task_measured(name: str, users: int, func, bot, fake_telegram) -> TaskRun:
+    # Never reported: the profile only collects the DB statements of the task
+    detector = SlowWorkDetector(thresholds={'task': float('inf')})
+    sent_before = fake_telegram.sent_count
+    with PeakRssSampler() as rss, detector.watch('task', name) as profile:
+        started = time.perf_counter()
+        result = await func(bot)
+        seconds = time.perf_counter() - started
+    return TaskRun(
+        task=name,
+        users=users,
+        seconds=round(seconds, 3),
+        queries=profile.calls['db'],
+        db_seconds=round(profile.seconds['db'], 3),
+        peak_rss_mb=round(rss.peak_bytes / 2**20, 1),
+        messages=fake_telegram.sent_count - sent_before,
+        result=result,
+    )
+
+
+async def run_task_benchmark(
+    populations: list[int],
+    tasks: tuple[str, ...] = BENCHMARKED_TASKS,
+    history_days: int = 2,
+    api_latency_seconds: float = 0.0,
+    llm_latency_seconds: float = 0.0,
+    uid_offset: int = SEED_UID_OFFSET,
+    on_run: Optional[Callable[[TaskRun], None]] = None,
+) -> TaskBenchResults:
+    from telegram_bot.benchmarks.bot_load import ServerThread
+    from telegram_bot.benchmarks.fake_telegram import FakeTelegramServer, create_fake_bot
+
+    install_db_query_metrics()
+    results = TaskBenchResults(database=connection.vendor, started_at=datetime.now(dt_timezone.utc).isoformat())
+    today = date.today()
+
+    fake_telegram = FakeTelegramServer(latency_seconds=api_latency_seconds)
+    fake_llm = FakeLLMServer(latency_seconds=llm_latency_seconds)
+    servers = ServerThread()
+    servers.start()
+    api_url = await servers.run(fake_telegram.start())
+    llm_url = await servers.run(fake_llm.start())
+    bot = create_fake_bot(api_url)
+    try:
+        with override_settings(LLM_BASE_URL=llm_url, LLM_API_KEY=FAKE_LLM_API_KEY, LLM_MODEL=FAKE_LLM_MODEL):
+            for users in populations:
+                last_uid = uid_offset + users - 1
+                started = time.perf_counter()
+                await sync_to_async(seed_population)(
+                    user_count=users,
+                    history_days=history_days,
+                    messages_per_user=0,
+                    target_date=today,
+                    uid_offset=uid_offset,
+                )
+                hour = await sync_to_async(busiest_notification_hour)(uid_offset, last_uid)
+                await sync_to_async(forget_generated_for_hour)(uid_offset, last_uid, hour, today)
+                results.seed_seconds[users] = time.perf_counter() - started
+
+                # Generation serves the hour starting after its lead
+                task_functions = _task_functions(
+                    generation_scheduled_at=datetime.combine(today, time_of_day(hour), tzinfo=dt_timezone.utc)
+                    - timedelta(seconds=settings.HOROSCOPE_GENERATION_LEAD_SECONDS),
+                )
+                try:
+                    for name in tasks:
+                        if name == 'deliver_due_horoscopes':
+                            # Outside the measurement: only the drain itself is timed
+                            await sync_to_async(make_queue_due)(uid_offset, last_uid, today)
+                        run = await run_task_measured(name, users, task_functions[name], bot, fake_telegram)
+                        results.runs.append(run)
+                        if on_run is not None:
+                            on_run(run)
+                finally:
+                    await sync_to_async(delete_population)(uid_offset, last_uid)
+    finally:
+        await bot.session.close()
+        await servers.run(fake_llm.stop())
+        await servers.run(fake_telegram.stop())
+        servers.stop()
+    return results
+
+
+@dataclass
+class Comparison:
+    task: str
+    users: int
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        """Relative change, positive when the current run is worse (higher)."""
+        if not self.baseline:
+            return 0.0 if not self.current else float('inf')
+        return (self.current - self.baseline) / self.baseline
+
+
+COMPARED_METRICS = ('seconds', 'queries', 'peak_rss_mb')
+
+
+def compare_with_baseline(current: dict[str, Any], baseline: dict[str, Any]) -> list[Comparison]:
+    """Pair up runs of the same task and population in two results files."""
+    baseline_runs = {(run['task'], run['users']): run for run in baseline.get('runs', [])}
+    comparisons = []
+    for run in current.get('runs', []):
+        previous = baseline_runs.get((run['task'], run['users']))
+        if previous is None:
+            continue
+        for metric in COMPARED_METRICS:
+            comparisons.append(Comparison(
+                task=run['task'],
+                users=run['users'],
+                metric=metric,
+                baseline=previous[metric],
+                current=run[metric],
+            ))
+    return comparisons
@@ -1,8 +1,11 @@
 from datetime import date, datetime, time
 from typing import Optional
 
+from django.conf import settings
+
 from core.base_entity import BaseEntity
 from horoscope.enums import HoroscopeType
+from horoscope.utils import build_teaser
 
 
 class UserProfileEntity(BaseEntity):
@@ -14,21 +17,46 @@ class UserProfileEntity(BaseEntity):
     birth_time: Optional[time] = None
     preferred_language: str = 'en'
     timezone: str = ''
-    notification_hour_utc: Optional[int] = None
+    notification_hour_local: Optional[int] = None
+    effective_notification_hour: Optional[int] = None
+    effective_notification_minute: Optional[int] = None
+    utc_offset_minutes: Optional[int] = None
     created_at: datetime
     updated_at: datetime
 
 
-class HoroscopeEntity(BaseEntity):
+class HoroscopeDeliveryStateEntity(BaseEntity):
+    """Projection used to decide whether a horoscope still needs delivering."""
+    id: int
+    sent_at: Optional[datetime] = None
+
+
+class HoroscopeDueDeliveryEntity(BaseEntity):
+    """Entry of the delivery queue: which user's horoscope for which date is due."""
     id: int
     user_telegram_uid: int
-    horoscope_type: HoroscopeType
     date: date
+
+
+class HoroscopeDeliveryEntity(HoroscopeDeliveryStateEntity):
+    """Projection used to render a horoscope: delivery state plus its text."""
     full_text: str
-    teaser_text: str
-    extended_teaser_text: str = ''
-    sent_at: Optional[datetime] = None
+
+    @property
+    def teaser_text(self) -> str:
+        return build_teaser(self.full_text, settings.HOROSCOPE_TEASER_LINE_COUNT)
+
+    @property
+    def extended_teaser_text(self) -> str:
+        return build_teaser(self.full_text, settings.HOROSCOPE_EXTENDED_TEASER_LINE_COUNT)
+
+
+class HoroscopeEntity(HoroscopeDeliveryEntity):
+    user_telegram_uid: int
+    horoscope_type: HoroscopeType
+    date: date
     failed_to_send_at: Optional[datetime] = None
+    generated_by_fallback: bool = False
     created_at: datetime
 
 
@@ -5,6 +5,7 @@ from datetime import date
 from aiogram import F, Router
 from aiogram.enums import ChatAction
 from aiogram.types import Message
+from asgiref.sync import sync_to_async
 
 from django.utils.translation import gettext_lazy as _
 
@@ -51,7 +52,7 @@ async def handle_followup_question(
 
     horoscope_repo = container.horoscope.horoscope_repository()
     today = date.today()
-    horoscope = await horoscope_repo.aget_by_user_and_date(
+    horoscope = await horoscope_repo.aget_delivery_by_user_and_date(
         telegram_uid=user.telegram_uid,
         target_date=today,
     )
@@ -79,7 +80,9 @@ async def handle_followup_question(
 
     llm_service = LLMService()
     try:
-        result = llm_service.generate_followup_answer(
+        # Off the event loop and the shared sync thread: the call may wait for
+        # a governor slot and take as long as LLM_TIMEOUT per attempt
+        result = await sync_to_async(llm_service.generate_followup_answer, thread_sensitive=False)(
             horoscope_text=horoscope.full_text,
             question=question_text,
             language=lang,
@@ -36,7 +36,7 @@ async def view_horoscope_handler(message: Message, user: UserEntity, app_context
     lang = profile.preferred_language
 
     today = date.today()
-    horoscope = await horoscope_repo.aget_by_user_and_date(
+    horoscope = await horoscope_repo.aget_delivery_by_user_and_date(
         telegram_uid=user.telegram_uid,
         target_date=today,
     )
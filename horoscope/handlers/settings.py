@@ -1,7 +1,7 @@
 import logging
 
 from aiogram import Router
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, InlineKeyboardMarkup, Message
 
@@ -15,7 +15,12 @@ from horoscope.callbacks import (
     TimezoneCallback,
 )
 from horoscope.keyboards import notification_hour_keyboard, timezone_keyboard
-from horoscope.utils import map_telegram_language, translate
+from horoscope.utils import (
+    get_utc_offset_minutes,
+    map_telegram_language,
+    resolve_timezone,
+    translate,
+)
 from telegram_bot.app_context import AppContext
 
 logger = logging.getLogger(__name__)
@@ -39,8 +44,20 @@ TIMEZONE_NOT_SET = _(
     "Choose your UTC offset:"
 )
 
+TIMEZONE_NAME_HINT = _(
+    "\n"
+    "To follow daylight saving time, send your city's zone instead, "
+    "e.g. <code>/timezone Europe/Berlin</code>"
+)
+
 TIMEZONE_CHANGED = _("✅ Timezone changed to <b>{timezone}</b>")
 
+TIMEZONE_INVALID = _(
+    "⚠️ Unknown timezone <b>{timezone}</b>.\n"
+    "Use a zone name like <code>Europe/Berlin</code> or <code>Asia/Kolkata</code>, "
+    "or an offset like <code>UTC+3</code>."
+)
+
 NOTIFICATION_TIME_CURRENT = _(
     "🔔 Your notification time: <b>{time}</b> (local time)\n"
     "\n"
@@ -70,37 +87,13 @@ def _format_utc_offset(offset: int) -> str:
     return f"UTC{offset}"
 
 
-def _parse_timezone_offset(timezone_str: str) -> int:
-    """Parse UTC offset from timezone string like 'UTC+3' or 'UTC-5'. Returns 0 if invalid."""
-    if not timezone_str or not timezone_str.startswith("UTC"):
-        return 0
-    try:
-        offset_str = timezone_str[3:]
-        if offset_str.startswith('+'):
-            return int(offset_str[1:])
-        elif offset_str.startswith('-'):
-            return -int(offset_str[1:])
-        return 0
-    except (ValueError, IndexError):
-        return 0
-
-
-def _local_hour_to_utc(local_hour: int, utc_offset: int) -> int:
-    """Convert a local hour (0-23) to UTC hour using the UTC offset."""
-    return (local_hour - utc_offset) % 24
-
-
-def _utc_hour_to_local(utc_hour: int, utc_offset: int) -> int:
-    """Convert a UTC hour (0-23) to local hour using the UTC offset."""
-    return (utc_hour + utc_offset) % 24
-
-
 @router.message(Command("timezone"))
 async def timezone_command_handler(
     message: Message,
     state: FSMContext,
     user: UserEntity,
     app_context: AppContext,
+    command: CommandObject | None = None,
     **kwargs,
 ):
     user_profile_repo = container.horoscope.user_profile_repository()
@@ -114,18 +107,47 @@ async def timezone_command_handler(
     lang = profile.preferred_language
 
     await state.clear()
+    timezone_name = command.args.strip() if command and command.args else ''
+    if timezone_name:
+        await _set_timezone(user, lang, timezone_name, app_context)
+        return
+
+    hint = translate(TIMEZONE_NAME_HINT, lang)
     if profile.timezone:
         await app_context.send_message(
-            text=translate(TIMEZONE_CURRENT, lang, timezone=profile.timezone),
+            text=translate(TIMEZONE_CURRENT, lang, timezone=profile.timezone) + hint,
             reply_markup=timezone_keyboard(),
         )
     else:
         await app_context.send_message(
-            text=translate(TIMEZONE_NOT_SET, lang),
+            text=translate(TIMEZONE_NOT_SET, lang) + hint,
             reply_markup=timezone_keyboard(),
         )
 
 
+async def _set_timezone(user: UserEntity, lang: str, timezone_name: str, app_context: AppContext) -> None:
+    """Save a timezone typed as `/timezone <name>` after validating it."""
+    if resolve_timezone(timezone_name) is None:
+        await app_context.send_message(
+            text=translate(TIMEZONE_INVALID, lang, timezone=timezone_name),
+        )
+        return
+
+    user_profile_repo = container.horoscope.user_profile_repository()
+    profile = await user_profile_repo.aupdate_timezone(
+        telegram_uid=user.telegram_uid,
+        timezone=timezone_name,
+    )
+    if not profile:
+        await app_context.send_message(text=translate(SETTINGS_NO_PROFILE, lang))
+        return
+
+    await app_context.send_message(
+        text=translate(TIMEZONE_CHANGED, profile.preferred_language, timezone=timezone_name),
+    )
+    logger.info(f"User {user.telegram_uid} changed timezone to {timezone_name}")
+
+
 @router.callback_query(TimezoneCallback.filter())
 async def change_timezone_callback(
     callback: CallbackQuery,
@@ -185,19 +207,15 @@ async def notification_time_command_handler(
         )
         return
 
-    utc_offset = _parse_timezone_offset(profile.timezone)
+    utc_offset = get_utc_offset_minutes(profile.timezone) // 60
 
     await state.clear()
-    if profile.notification_hour_utc is not None:
-        local_hour = _utc_hour_to_local(
-            utc_hour=profile.notification_hour_utc,
-            utc_offset=utc_offset,
-        )
+    if profile.notification_hour_local is not None:
         await app_context.send_message(
             text=translate(
                 NOTIFICATION_TIME_CURRENT,
                 lang,
-                time=f"{local_hour:02d}:00",
+                time=f"{profile.notification_hour_local:02d}:00",
             ),
             reply_markup=notification_hour_keyboard(
                 language=lang,
@@ -225,23 +243,10 @@ async def change_notification_hour_callback(
     await callback.answer()
 
     user_profile_repo = container.horoscope.user_profile_repository()
-    profile = await user_profile_repo.aget_by_telegram_uid(user.telegram_uid)
-
-    if not profile:
-        lang = map_telegram_language(user.language_code)
-        await app_context.send_message(text=translate(SETTINGS_NO_PROFILE, lang))
-        return
-
-    utc_offset = _parse_timezone_offset(profile.timezone)
     local_hour = callback_data.hour
-    utc_hour = _local_hour_to_utc(
-        local_hour=local_hour,
-        utc_offset=utc_offset,
-    )
-
     profile = await user_profile_repo.aupdate_notification_hour(
         telegram_uid=user.telegram_uid,
-        notification_hour_utc=utc_hour,
+        notification_hour_local=local_hour,
     )
 
     if not profile:
@@ -264,7 +269,7 @@ async def change_notification_hour_callback(
     )
     logger.info(
         f"User {user.telegram_uid} changed notification time to "
-        f"{local_hour:02d}:00 local (UTC hour={utc_hour})"
+        f"{local_hour:02d}:00 local (UTC hour={profile.effective_notification_hour})"
     )
 
 
@@ -280,7 +285,7 @@ async def reset_notification_hour_callback(
     user_profile_repo = container.horoscope.user_profile_repository()
     profile = await user_profile_repo.aupdate_notification_hour(
         telegram_uid=user.telegram_uid,
-        notification_hour_utc=None,
+        notification_hour_local=None,
     )
 
     if not profile:
@@ -0,0 +1,36 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core.containers import container
+from horoscope.services.archive import HOROSCOPES_DATASET, MESSAGE_HISTORY_DATASET
+
+
+class Command(BaseCommand):
+    help = 'Print archived horoscopes or message history of a user as JSON lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('telegram_uid', type=int)
+        parser.add_argument(
+            '--dataset',
+            choices=[HOROSCOPES_DATASET, MESSAGE_HISTORY_DATASET],
+            default=HOROSCOPES_DATASET,
+        )
+        parser.add_argument('--from', dest='month_from', help='First month to scan, YYYY-MM')
+        parser.add_argument('--to', dest='month_to', help='Last month to scan, YYYY-MM')
+
+    def handle(self, *args, **options):
+        archive_service = container.horoscope.archive_service()
+        find = (
+            archive_service.find_horoscopes
+            if options['dataset'] == HOROSCOPES_DATASET
+            else archive_service.find_messages
+        )
+        rows = find(
+            telegram_uid=options['telegram_uid'],
+            month_from=options['month_from'],
+            month_to=options['month_to'],
+        )
+        for row in rows:
+            self.stdout.write(json.dumps(row, ensure_ascii=False))
+        self.stderr.write(f'{len(rows)} archived {options["dataset"]} rows found.')
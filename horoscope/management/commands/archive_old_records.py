@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from core.containers import container
+
+
+class Command(BaseCommand):
+    help = 'Move old horoscopes and message history to compressed monthly archive files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horoscope-days',
+            type=int,
+            default=None,
+            help='Archive horoscopes older than this many days (default: ARCHIVE_HOROSCOPE_AFTER_DAYS)',
+        )
+        parser.add_argument(
+            '--message-history-days',
+            type=int,
+            default=None,
+            help='Archive message history older than this many days (default: ARCHIVE_MESSAGE_HISTORY_AFTER_DAYS)',
+        )
+
+    def handle(self, *args, **options):
+        archive_service = container.horoscope.archive_service()
+        results = archive_service.archive_old_records(
+            horoscope_days=options['horoscope_days'],
+            message_history_days=options['message_history_days'],
+        )
+        for result in results:
+            self.stdout.write(self.style.SUCCESS(
+                f'{result.dataset}: archived {result.archived_count} rows '
+                f'into {result.segments} segments ({result.bytes_written:,} bytes)'
+            ))
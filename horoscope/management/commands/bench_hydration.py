@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from horoscope.benchmarks.hydration import benchmark_hydration, seed_subscriptions
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Measure per-row cost of hydrating entities from database rows (validating vs trusted path)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=10_000,
+            help='Number of subscription rows to seed and hydrate (default: 10000)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Runs per path; the fastest one is reported (default: 3)',
+        )
+
+    def handle(self, *args, **options):
+        timings = []
+        try:
+            with transaction.atomic():
+                seed_subscriptions(row_count=options['rows'])
+                timings = benchmark_hydration(repeat=options['repeat'])
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        self.stdout.write(f'{"path":<26} {"rows":>8} {"total ms":>10} {"us/row":>8}')
+        for timing in timings:
+            self.stdout.write(
+                f'{timing.name:<26} {timing.rows:>8,} {timing.seconds * 1000:>10.1f} {timing.per_row_us:>8.2f}'
+            )
@@ -0,0 +1,125 @@
+import asyncio
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from horoscope.benchmarks.tasks import (
+    BENCHMARKED_TASKS,
+    OPTIONAL_TASKS,
+    compare_with_baseline,
+    run_task_benchmark,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed synthetic populations and run the scheduled horoscope tasks against a fake Telegram and a fake LLM, '
+        'recording wall time, SQL statements, peak RSS and messages/s per task'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=str,
+            default='10000',
+            help='Comma-separated population sizes, e.g. 10000,100000,1000000 (default: 10000)',
+        )
+        parser.add_argument(
+            '--tasks',
+            type=str,
+            default=','.join(BENCHMARKED_TASKS),
+            help=f'Comma-separated tasks to run (default: all of {", ".join(BENCHMARKED_TASKS)}; '
+                 f'also available: {", ".join(OPTIONAL_TASKS)})',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=2,
+            help='Days of horoscope history per user (default: 2)',
+        )
+        parser.add_argument(
+            '--api-latency-ms',
+            type=float,
+            default=0,
+            help='Latency of every fake Bot API call (default: 0)',
+        )
+        parser.add_argument(
+            '--llm-latency-ms',
+            type=float,
+            default=0,
+            help='Latency of every fake LLM completion (default: 0)',
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            default='bench_tasks.json',
+            help='Results file to write (default: bench_tasks.json)',
+        )
+        parser.add_argument(
+            '--baseline',
+            type=str,
+            default=None,
+            help='Results file of a previous run to compare with',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=20,
+            help='Percent a metric may grow over the baseline before the run fails (default: 20)',
+        )
+
+    def handle(self, *args, **options):
+        populations = [int(users) for users in options['users'].split(',') if users.strip()]
+        tasks = tuple(task.strip() for task in options['tasks'].split(',') if task.strip())
+        unknown = set(tasks) - set(BENCHMARKED_TASKS) - set(OPTIONAL_TASKS)
+        if unknown:
+            raise CommandError(f'Unknown tasks: {", ".join(sorted(unknown))}')
+
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+
+        self.stdout.write(
+            f'{"task":<36} {"users":>9} {"seconds":>9} {"queries":>9} {"db s":>8} {"peak MB":>8} {"msgs/s":>9}'
+        )
+
+        def print_run(run):
+            self.stdout.write(
+                f'{run.task:<36} {run.users:>9,} {run.seconds:>9.2f} {run.queries:>9,} '
+                f'{run.db_seconds:>8.2f} {run.peak_rss_mb:>8.1f} {run.messages_per_second:>9.1f}'
+            )
+
+        results = asyncio.run(run_task_benchmark(
+            populations=populations,
+            tasks=tasks,
+            history_days=options['days'],
+            api_latency_seconds=options['api_latency_ms'] / 1000,
+            llm_latency_seconds=options['llm_latency_ms'] / 1000,
+            on_run=print_run,
+        ))
+        results.write(options['output'])
+        self.stdout.write(f'\nResults written to {options["output"]} ({results.database})')
+
+        if baseline is None:
+            return
+        if baseline.get('database') != results.database:
+            self.stderr.write(
+                f'Baseline was recorded on {baseline.get("database")}, this run on {results.database}'
+            )
+
+        tolerance = options['tolerance'] / 100
+        regressions = []
+        self.stdout.write(f'\nCompared with {options["baseline"]}')
+        for comparison in compare_with_baseline(results.to_dict(), baseline):
+            line = (
+                f'{comparison.task:<36} {comparison.users:>9,} {comparison.metric:<12} '
+                f'{comparison.baseline:>10} -> {comparison.current:<10} {comparison.change:>+8.1%}'
+            )
+            if comparison.change > tolerance:
+                regressions.append(comparison)
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+
+        if regressions:
+            raise CommandError(f'{len(regressions)} metrics regressed by more than {options["tolerance"]:.0f}%')
@@ -6,9 +6,19 @@ from core.containers import container
 class Command(BaseCommand):
     help = 'Calculate LLM token usage and cost for all horoscopes'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--include-archive',
+            action='store_true',
+            help='Also count usage of horoscopes moved to the cold archive',
+        )
+
     def handle(self, *args, **options):
         llm_usage_repo = container.horoscope.llm_usage_repository()
         summary = llm_usage_repo.get_usage_summary()
+        if options['include_archive']:
+            archived_summary = container.horoscope.archive_service().get_usage_summary()
+            summary = self._merge_summaries(summary, archived_summary)
 
         if not summary:
             self.stdout.write('No LLM usage data found.')
@@ -44,3 +54,19 @@ class Command(BaseCommand):
         self.stdout.write(f'  Output tokens: {grand_output:>12,}')
         self.stdout.write(f'  Total tokens:  {grand_input + grand_output:>12,}')
         self.stdout.write('')
+
+    @staticmethod
+    def _merge_summaries(*summaries: list[dict]) -> list[dict]:
+        merged: dict[str, dict] = {}
+        for summary in summaries:
+            for row in summary:
+                totals = merged.setdefault(row['model'], {
+                    'model': row['model'],
+                    'total_input_tokens': 0,
+                    'total_output_tokens': 0,
+                    'count': 0,
+                })
+                totals['total_input_tokens'] += row['total_input_tokens'] or 0
+                totals['total_output_tokens'] += row['total_output_tokens'] or 0
+                totals['count'] += row['count'] or 0
+        return [merged[model] for model in sorted(merged)]
@@ -0,0 +1,83 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from horoscope.benchmarks.query_plans import LARGE_TABLES, build_hot_queries, explain_hot_query
+from horoscope.benchmarks.seed import seed_population
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a synthetic population into PostgreSQL, run EXPLAIN (ANALYZE, BUFFERS) '
+        'for hot repository queries and fail if any plan uses a sequential scan'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=10_000,
+            help='Number of synthetic users to seed (default: 10000)',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='Days of horoscope/message history per user (default: 30)',
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Keep seeded rows instead of rolling them back',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError(f'Query plan checks require PostgreSQL (current backend: {connection.vendor})')
+
+        results = []
+        try:
+            with transaction.atomic():
+                seed = seed_population(
+                    user_count=options['users'],
+                    history_days=options['days'],
+                )
+                self.stdout.write(
+                    f'Seeded {seed.users:,} users, {seed.subscriptions:,} subscriptions, '
+                    f'{seed.horoscopes:,} horoscopes, {seed.messages:,} messages'
+                )
+                with connection.cursor() as cursor:
+                    for table in sorted(LARGE_TABLES):
+                        cursor.execute(f'ANALYZE {connection.ops.quote_name(table)}')
+
+                sample_uid = seed.first_uid + seed.users // 2
+                for hot_query in build_hot_queries(sample_uid=sample_uid, target_date=date.today()):
+                    results.extend(explain_hot_query(hot_query))
+
+                if not options['keep']:
+                    raise _Rollback()
+        except _Rollback:
+            pass
+
+        self.stdout.write('\nQuery plans')
+        self.stdout.write('=' * 70)
+        for result in results:
+            status = self.style.ERROR('SEQ SCAN') if result.is_regression else self.style.SUCCESS('ok')
+            self.stdout.write(f'\n{result.name}: {status}')
+            self.stdout.write(f'  Execution time: {result.execution_time_ms:>10.3f} ms')
+            self.stdout.write(f'  Buffers:        hit={result.shared_hit_blocks} read={result.shared_read_blocks}')
+            self.stdout.write(f'  Plan nodes:     {" > ".join(result.node_types)}')
+
+        regressions = [result for result in results if result.is_regression]
+        self.stdout.write('')
+        if regressions:
+            for result in regressions:
+                self.stderr.write(f'{result.name}: sequential scan on {", ".join(result.seq_scans)}\n  {result.sql}')
+            raise CommandError(f'{len(regressions)} hot queries regressed to a sequential scan')
+
+        self.stdout.write(self.style.SUCCESS(f'All {len(results)} hot query plans use indexes.'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.containers import container
+
+
+class Command(BaseCommand):
+    help = 'Backfill/recompute effective notification hours from HOROSCOPE_GENERATION_HOURS_UTC'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Recompute even if the hour mapping has not changed since the last run',
+        )
+
+    def handle(self, *args, **options):
+        service = container.horoscope.notification_schedule_service()
+        updated = service.refresh_effective_hours(force=options['force'])
+        self.stdout.write(self.style.SUCCESS(f'Updated effective notification hour for {updated} profiles.'))
@@ -9,10 +9,15 @@ from config import settings
 
 TASKS = {
     'generate-daily-horoscopes': 'horoscope.tasks.send_daily_horoscope.generate_daily_for_all_users',
+    'rebuild-notification-buckets': 'horoscope.tasks.notification_buckets.rebuild_notification_buckets',
+    'deliver-due-horoscopes': 'horoscope.tasks.deliver_due.deliver_due_horoscopes',
     'send-daily-horoscope-notifications': 'horoscope.tasks.send_daily_horoscope.send_daily_horoscope_notifications',
     'send-expiry-reminders': 'horoscope.tasks.subscription_reminders.send_expiry_reminders',
     'send-expired-notifications': 'horoscope.tasks.subscription_reminders.send_expired_notifications',
     'send-periodic-teaser-notifications': 'horoscope.tasks.send_periodic_teaser.send_periodic_teaser_notifications',
+    'upgrade-fallback-horoscopes': 'horoscope.tasks.upgrade_fallback.upgrade_fallback_horoscopes',
+    'archive-old-records': 'horoscope.tasks.archive.archive_old_records',
+    'purge-old-message-history': 'telegram_bot.tasks.message_history_retention.purge_old_message_history',
 }
 
 
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:31
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_effective_notification_hour(apps, schema_editor):
+    UserProfile = apps.get_model('horoscope', 'UserProfile')
+    UserProfile.objects.filter(
+        notification_hour_utc__isnull=False,
+    ).update(effective_notification_hour=F('notification_hour_utc'))
+    for language, hour in settings.HOROSCOPE_GENERATION_HOURS_UTC.items():
+        UserProfile.objects.filter(
+            notification_hour_utc__isnull=True,
+            preferred_language=language,
+        ).update(effective_notification_hour=hour)
+    UserProfile.objects.filter(
+        effective_notification_hour__isnull=True,
+    ).update(effective_notification_hour=settings.HOROSCOPE_DEFAULT_GENERATION_HOUR_UTC)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('horoscope', '0010_add_timezone_and_notification_hour'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='effective_notification_hour',
+            field=models.IntegerField(blank=True, editable=False, help_text='Resolved UTC hour (explicit hour or per-language default). Maintained on save.', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['effective_notification_hour', 'user_telegram_uid'], name='horoscope_u_effecti_ca9030_idx'),
+        ),
+        migrations.RunPython(backfill_effective_notification_hour, migrations.RunPython.noop),
+    ]
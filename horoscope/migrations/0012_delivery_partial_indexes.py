@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('horoscope', '0011_userprofile_effective_notification_hour'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='horoscope',
+            index=models.Index(condition=models.Q(('failed_to_send_at__isnull', True), ('sent_at__isnull', True)), fields=['date', 'user_telegram_uid'], name='horoscope_unsent_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='horoscope',
+            index=models.Index(condition=models.Q(('sent_at__isnull', False)), fields=['user_telegram_uid', '-sent_at'], name='horoscope_user_sent_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(condition=models.Q(('reminder_sent_at__isnull', True), ('status', 'active')), fields=['expires_at'], name='subscription_remind_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(condition=models.Q(('reminder_sent_at__isnull', True), ('status', 'expired')), fields=['id'], name='subscription_expired_new_idx'),
+        ),
+    ]
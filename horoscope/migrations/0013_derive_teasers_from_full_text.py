@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:41
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('horoscope', '0012_delivery_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='horoscope',
+            name='extended_teaser_text',
+        ),
+        migrations.RemoveField(
+            model_name='horoscope',
+            name='teaser_text',
+        ),
+    ]
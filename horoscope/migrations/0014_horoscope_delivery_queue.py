@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:57
+
+from datetime import date
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def queue_pending_horoscopes(apps, schema_editor):
+    # Today's horoscopes that the scan tasks had not delivered yet stay deliverable
+    Horoscope = apps.get_model('horoscope', 'Horoscope')
+    Horoscope.objects.filter(
+        date__gte=date.today(),
+        sent_at__isnull=True,
+        failed_to_send_at__isnull=True,
+    ).update(deliver_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('horoscope', '0013_derive_teasers_from_full_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='horoscope',
+            name='deliver_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='horoscope',
+            index=models.Index(condition=models.Q(('deliver_at__isnull', False)), fields=['deliver_at', 'id'], name='horoscope_deliver_at_idx'),
+        ),
+        migrations.RunPython(queue_pending_horoscopes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,146 @@
+import re
+from datetime import datetime, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Frozen copies of the horoscope.utils timezone helpers as of this migration,
+# so replaying it gives the same result whatever those helpers become
+
+_UTC_OFFSET_RE = re.compile(r'^UTC([+-])(\d{1,2})(?::([0-5]\d))?$')
+
+
+def _resolve_timezone(name):
+    if not name:
+        return None
+    match = _UTC_OFFSET_RE.match(name)
+    if match:
+        sign = 1 if match.group(1) == '+' else -1
+        minutes = int(match.group(2)) * 60 + int(match.group(3) or 0)
+        if minutes > 14 * 60:
+            return None
+        return dt_timezone(sign * timedelta(minutes=minutes))
+    if name in ('UTC', 'UTC+0', 'UTC-0'):
+        return dt_timezone.utc
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def _utc_offset_minutes(timezone_name, at):
+    tz = _resolve_timezone(timezone_name)
+    if tz is None:
+        return 0
+    return int(at.astimezone(tz).utcoffset().total_seconds() // 60)
+
+
+def _effective_notification_minute(notification_hour_local, preferred_language, timezone_name, at):
+    if notification_hour_local is not None:
+        offset = _utc_offset_minutes(timezone_name, at)
+        return (notification_hour_local * 60 - offset) % (24 * 60)
+    hour = settings.HOROSCOPE_GENERATION_HOURS_UTC.get(
+        preferred_language,
+        settings.HOROSCOPE_DEFAULT_GENERATION_HOUR_UTC,
+    )
+    return hour * 60
+
+
+def convert_to_local_hours(apps, schema_editor):
+    # notification_hour_local held the UTC hour until now; shift it into the
+    # user's fixed offset and fill in the precomputed delivery minute
+    UserProfile = apps.get_model('horoscope', 'UserProfile')
+    profiles = UserProfile.objects.only(
+        'user_telegram_uid', 'timezone', 'preferred_language', 'notification_hour_local',
+    )
+    now = datetime.now(dt_timezone.utc)
+    batch = []
+    for profile in profiles.iterator(chunk_size=2000):
+        offset = _utc_offset_minutes(profile.timezone, now)
+        if profile.notification_hour_local is not None:
+            profile.notification_hour_local = (profile.notification_hour_local + offset // 60) % 24
+        profile.utc_offset_minutes = offset
+        profile.effective_notification_minute = _effective_notification_minute(
+            notification_hour_local=profile.notification_hour_local,
+            preferred_language=profile.preferred_language,
+            timezone_name=profile.timezone,
+            at=now,
+        )
+        profile.effective_notification_hour = profile.effective_notification_minute // 60
+        batch.append(profile)
+        if len(batch) >= 2000:
+            UserProfile.objects.bulk_update(batch, [
+                'notification_hour_local', 'utc_offset_minutes',
+                'effective_notification_minute', 'effective_notification_hour',
+            ])
+            batch = []
+    if batch:
+        UserProfile.objects.bulk_update(batch, [
+            'notification_hour_local', 'utc_offset_minutes',
+            'effective_notification_minute', 'effective_notification_hour',
+        ])
+
+
+def convert_to_utc_hours(apps, schema_editor):
+    # Inverse of convert_to_local_hours with the offset each profile was last
+    # computed with, so notification_hour_utc holds a UTC hour again
+    UserProfile = apps.get_model('horoscope', 'UserProfile')
+    profiles = UserProfile.objects.filter(notification_hour_local__isnull=False).only(
+        'user_telegram_uid', 'notification_hour_local', 'utc_offset_minutes',
+    )
+    batch = []
+    for profile in profiles.iterator(chunk_size=2000):
+        offset = profile.utc_offset_minutes or 0
+        profile.notification_hour_local = (profile.notification_hour_local - offset // 60) % 24
+        batch.append(profile)
+        if len(batch) >= 2000:
+            UserProfile.objects.bulk_update(batch, ['notification_hour_local'])
+            batch = []
+    if batch:
+        UserProfile.objects.bulk_update(batch, ['notification_hour_local'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('horoscope', '0014_horoscope_delivery_queue'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userprofile',
+            name='timezone',
+            field=models.CharField(blank=True, default='', help_text='IANA zone, e.g. "Europe/Kyiv", or a fixed UTC offset, e.g. "UTC+3", "UTC+5:30"', max_length=64),
+        ),
+        migrations.RenameField(
+            model_name='userprofile',
+            old_name='notification_hour_utc',
+            new_name='notification_hour_local',
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='notification_hour_local',
+            field=models.IntegerField(blank=True, help_text="Hour (0-23) in the user's timezone when they want to receive notifications. Overrides per-language default.", null=True),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='effective_notification_hour',
+            field=models.IntegerField(blank=True, editable=False, help_text="Resolved UTC hour (explicit hour or per-language default). Maintained on save and when the timezone's UTC offset changes.", null=True),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='effective_notification_minute',
+            field=models.IntegerField(blank=True, editable=False, help_text='Resolved UTC minute of the day (0-1439) for delivery within the hour.', null=True),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='utc_offset_minutes',
+            field=models.IntegerField(blank=True, editable=False, help_text='UTC offset the effective notification time was computed with.', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(condition=models.Q(('notification_hour_local__isnull', False)), fields=['timezone', 'utc_offset_minutes'], name='profile_tz_offset_idx'),
+        ),
+        migrations.RunPython(convert_to_local_hours, convert_to_utc_hours),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('horoscope', '0015_iana_timezones'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='horoscope',
+            name='generated_by_fallback',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='horoscope',
+            index=models.Index(condition=models.Q(('failed_to_send_at__isnull', True), ('generated_by_fallback', True), ('sent_at__isnull', True)), fields=['date', 'id'], name='horoscope_fallback_idx'),
+        ),
+    ]
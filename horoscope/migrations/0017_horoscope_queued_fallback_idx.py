@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('horoscope', '0016_horoscope_generated_by_fallback'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='horoscope',
+            name='horoscope_fallback_idx',
+        ),
+        migrations.AddIndex(
+            model_name='horoscope',
+            index=models.Index(condition=models.Q(('deliver_at__isnull', False), ('generated_by_fallback', True)), fields=['deliver_at', 'id'], name='horoscope_queued_fallback_idx'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
+from django.db.models import Q
 
 from horoscope.enums import HoroscopeType, Language, SubscriptionStatus
+from horoscope.utils import get_effective_notification_minute, get_utc_offset_minutes
 
 
 class UserProfile(models.Model):
@@ -16,25 +18,71 @@ class UserProfile(models.Model):
         default=Language.EN,
     )
     timezone = models.CharField(
-        max_length=10,
+        max_length=64,
         default='',
         blank=True,
-        help_text='UTC offset string, e.g. "UTC+3", "UTC-5", "UTC+0"',
+        help_text='IANA zone, e.g. "Europe/Kyiv", or a fixed UTC offset, e.g. "UTC+3", "UTC+5:30"',
     )
-    notification_hour_utc = models.IntegerField(
+    notification_hour_local = models.IntegerField(
         null=True,
         blank=True,
-        help_text='Hour (0-23) in UTC when user wants to receive notifications. Overrides per-language default.',
+        help_text='Hour (0-23) in the user\'s timezone when they want to receive notifications. '
+                  'Overrides per-language default.',
+    )
+    effective_notification_hour = models.IntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text='Resolved UTC hour (explicit hour or per-language default). Maintained on save '
+                  'and when the timezone\'s UTC offset changes.',
+    )
+    effective_notification_minute = models.IntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text='Resolved UTC minute of the day (0-1439) for delivery within the hour.',
+    )
+    utc_offset_minutes = models.IntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text='UTC offset the effective notification time was computed with.',
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        pass
+        indexes = [
+            models.Index(fields=['effective_notification_hour', 'user_telegram_uid']),
+            # DST rebuild: profiles per zone whose stored offset is out of date
+            models.Index(
+                fields=['timezone', 'utc_offset_minutes'],
+                condition=Q(notification_hour_local__isnull=False),
+                name='profile_tz_offset_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"UserProfile {self.user_telegram_uid} ({self.name})"
 
+    def save(self, *args, **kwargs):
+        self.utc_offset_minutes = get_utc_offset_minutes(self.timezone)
+        self.effective_notification_minute = get_effective_notification_minute(
+            notification_hour_local=self.notification_hour_local,
+            preferred_language=self.preferred_language,
+            timezone_name=self.timezone,
+        )
+        self.effective_notification_hour = self.effective_notification_minute // 60
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'notification_hour_local', 'preferred_language', 'timezone'} & set(update_fields):
+            kwargs['update_fields'] = {
+                *update_fields,
+                'effective_notification_hour',
+                'effective_notification_minute',
+                'utc_offset_minutes',
+            }
+        super().save(*args, **kwargs)
+
 
 class Horoscope(models.Model):
     id = models.AutoField(primary_key=True)
@@ -46,16 +94,42 @@ class Horoscope(models.Model):
     )
     date = models.DateField()
     full_text = models.TextField()
-    teaser_text = models.TextField()
-    extended_teaser_text = models.TextField(default='')
     sent_at = models.DateTimeField(null=True, blank=True)
     failed_to_send_at = models.DateTimeField(null=True, blank=True)
+    # When the horoscope becomes due for delivery; cleared once it is sent, failed or skipped
+    deliver_at = models.DateTimeField(null=True, blank=True)
+    # Composed offline because the LLM failed or missed its latency budget
+    generated_by_fallback = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         indexes = [
             models.Index(fields=['user_telegram_uid', 'date']),
             models.Index(fields=['user_telegram_uid', 'horoscope_type', 'date']),
+            # Delivery tasks: unsent horoscopes for a date, iterated by user
+            models.Index(
+                fields=['date', 'user_telegram_uid'],
+                condition=Q(sent_at__isnull=True, failed_to_send_at__isnull=True),
+                name='horoscope_unsent_date_idx',
+            ),
+            # get_last_sent_at: latest sent_at per user, served from the index only
+            models.Index(
+                fields=['user_telegram_uid', '-sent_at'],
+                condition=Q(sent_at__isnull=False),
+                name='horoscope_user_sent_at_idx',
+            ),
+            # Delivery queue: only pending rows are indexed, so draining is O(due)
+            models.Index(
+                fields=['deliver_at', 'id'],
+                condition=Q(deliver_at__isnull=False),
+                name='horoscope_deliver_at_idx',
+            ),
+            # Fallback upgrades: only undelivered fallback horoscopes are indexed
+            models.Index(
+                fields=['deliver_at', 'id'],
+                condition=Q(generated_by_fallback=True, deliver_at__isnull=False),
+                name='horoscope_queued_fallback_idx',
+            ),
         ]
 
     def __str__(self):
@@ -104,6 +178,18 @@ class Subscription(models.Model):
         indexes = [
             models.Index(fields=['user_telegram_uid', 'status']),
             models.Index(fields=['status', 'expires_at']),
+            # Expiry reminders: active subscriptions not yet reminded, by expiry date
+            models.Index(
+                fields=['expires_at'],
+                condition=Q(status=SubscriptionStatus.ACTIVE, reminder_sent_at__isnull=True),
+                name='subscription_remind_due_idx',
+            ),
+            # Expired notifications: expired subscriptions not yet notified
+            models.Index(
+                fields=['id'],
+                condition=Q(status=SubscriptionStatus.EXPIRED, reminder_sent_at__isnull=True),
+                name='subscription_expired_new_idx',
+            ),
         ]
 
     def __str__(self):
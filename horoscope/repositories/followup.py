@@ -57,7 +57,7 @@ class HoroscopeFollowupRepository(BaseRepository[HoroscopeFollowup, HoroscopeFol
         followups = HoroscopeFollowup.objects.filter(
             horoscope_id=horoscope_id,
         ).order_by('created_at')
-        return HoroscopeFollowupEntity.from_models(followups)
+        return HoroscopeFollowupEntity.from_queryset(followups)
 
     async def aget_by_horoscope(self, horoscope_id: int) -> List[HoroscopeFollowupEntity]:
         return await sync_to_async(self.get_by_horoscope)(horoscope_id)
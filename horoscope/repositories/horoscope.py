@@ -1,14 +1,20 @@
 from datetime import date, datetime
-from typing import Optional
+from typing import AsyncIterator, Iterator, Optional
 
 from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.utils import timezone
 
-from core.repositories.base import BaseRepository
-from horoscope.entities import HoroscopeEntity
+from core.repositories.base import BaseRepository, aiter_chunks, iter_value_chunks
+from horoscope.entities import (
+    HoroscopeDeliveryEntity,
+    HoroscopeDeliveryStateEntity,
+    HoroscopeDueDeliveryEntity,
+    HoroscopeEntity,
+)
 from horoscope.enums import HoroscopeType
 from horoscope.exceptions import HoroscopeNotFoundException
-from horoscope.models import Horoscope
+from horoscope.models import Horoscope, HoroscopeFollowup, LLMUsage
 
 
 class HoroscopeRepository(BaseRepository[Horoscope, HoroscopeEntity]):
@@ -40,22 +46,76 @@ class HoroscopeRepository(BaseRepository[Horoscope, HoroscopeEntity]):
     ) -> Optional[HoroscopeEntity]:
         return await sync_to_async(self.get_by_user_and_date)(telegram_uid, target_date)
 
+    def get_delivery_state_by_user_and_date(
+        self,
+        telegram_uid: int,
+        target_date: date,
+    ) -> Optional[HoroscopeDeliveryStateEntity]:
+        """Load only id and sent_at, for paths that may skip the horoscope without rendering it."""
+        try:
+            row = Horoscope.objects.values('id', 'sent_at').get(
+                user_telegram_uid=telegram_uid,
+                date=target_date,
+            )
+        except Horoscope.DoesNotExist:
+            return None
+        return HoroscopeDeliveryStateEntity.from_row(row)
+
+    async def aget_delivery_state_by_user_and_date(
+        self,
+        telegram_uid: int,
+        target_date: date,
+    ) -> Optional[HoroscopeDeliveryStateEntity]:
+        return await sync_to_async(self.get_delivery_state_by_user_and_date)(telegram_uid, target_date)
+
+    def get_delivery_by_user_and_date(
+        self,
+        telegram_uid: int,
+        target_date: date,
+    ) -> Optional[HoroscopeDeliveryEntity]:
+        """Load only the columns needed to render and mark a horoscope as delivered."""
+        try:
+            row = Horoscope.objects.values('id', 'sent_at', 'full_text').get(
+                user_telegram_uid=telegram_uid,
+                date=target_date,
+            )
+        except Horoscope.DoesNotExist:
+            return None
+        return HoroscopeDeliveryEntity.from_row(row)
+
+    async def aget_delivery_by_user_and_date(
+        self,
+        telegram_uid: int,
+        target_date: date,
+    ) -> Optional[HoroscopeDeliveryEntity]:
+        return await sync_to_async(self.get_delivery_by_user_and_date)(telegram_uid, target_date)
+
+    def get_delivery(self, horoscope_id: int) -> Optional[HoroscopeDeliveryEntity]:
+        try:
+            row = Horoscope.objects.values('id', 'sent_at', 'full_text').get(id=horoscope_id)
+        except Horoscope.DoesNotExist:
+            return None
+        return HoroscopeDeliveryEntity.from_row(row)
+
+    async def aget_delivery(self, horoscope_id: int) -> Optional[HoroscopeDeliveryEntity]:
+        return await sync_to_async(self.get_delivery)(horoscope_id)
+
     def create_horoscope(
         self,
         telegram_uid: int,
         horoscope_type: HoroscopeType,
         target_date: date,
         full_text: str,
-        teaser_text: str,
-        extended_teaser_text: str = '',
+        deliver_at: Optional[datetime] = None,
+        generated_by_fallback: bool = False,
     ) -> HoroscopeEntity:
         horoscope = Horoscope.objects.create(
             user_telegram_uid=telegram_uid,
             horoscope_type=horoscope_type,
             date=target_date,
             full_text=full_text,
-            teaser_text=teaser_text,
-            extended_teaser_text=extended_teaser_text,
+            deliver_at=deliver_at,
+            generated_by_fallback=generated_by_fallback,
         )
         return HoroscopeEntity.from_model(horoscope)
 
@@ -65,30 +125,93 @@ class HoroscopeRepository(BaseRepository[Horoscope, HoroscopeEntity]):
         horoscope_type: HoroscopeType,
         target_date: date,
         full_text: str,
-        teaser_text: str,
-        extended_teaser_text: str = '',
+        deliver_at: Optional[datetime] = None,
+        generated_by_fallback: bool = False,
     ) -> HoroscopeEntity:
         return await sync_to_async(self.create_horoscope)(
             telegram_uid,
             horoscope_type,
             target_date,
             full_text,
-            teaser_text,
-            extended_teaser_text,
+            deliver_at,
+            generated_by_fallback,
         )
 
+    def get_queued_fallbacks(self, after: datetime, limit: int) -> list[HoroscopeEntity]:
+        """Fallback horoscopes still in the delivery queue with deliver_at after `after`, soonest first."""
+        return HoroscopeEntity.from_queryset(
+            Horoscope.objects.filter(
+                generated_by_fallback=True,
+                deliver_at__gt=after,
+            ).order_by('deliver_at', 'id')[:limit]
+        )
+
+    async def aget_queued_fallbacks(self, after: datetime, limit: int) -> list[HoroscopeEntity]:
+        return await sync_to_async(self.get_queued_fallbacks)(after, limit)
+
+    def replace_fallback_text(self, horoscope_id: int, full_text: str) -> bool:
+        """Swap a fallback horoscope's text for an LLM one, unless it was delivered meanwhile."""
+        return bool(
+            Horoscope.objects.filter(
+                id=horoscope_id,
+                generated_by_fallback=True,
+                sent_at__isnull=True,
+                failed_to_send_at__isnull=True,
+            ).update(full_text=full_text, generated_by_fallback=False)
+        )
+
+    async def areplace_fallback_text(self, horoscope_id: int, full_text: str) -> bool:
+        return await sync_to_async(self.replace_fallback_text)(horoscope_id, full_text)
+
     def mark_sent(self, horoscope_id: int) -> None:
-        Horoscope.objects.filter(id=horoscope_id).update(sent_at=timezone.now())
+        Horoscope.objects.filter(id=horoscope_id).update(sent_at=timezone.now(), deliver_at=None)
 
     async def amark_sent(self, horoscope_id: int) -> None:
         return await sync_to_async(self.mark_sent)(horoscope_id)
 
     def mark_failed_to_send(self, horoscope_id: int) -> None:
-        Horoscope.objects.filter(id=horoscope_id).update(failed_to_send_at=timezone.now())
+        Horoscope.objects.filter(id=horoscope_id).update(failed_to_send_at=timezone.now(), deliver_at=None)
 
     async def amark_failed_to_send(self, horoscope_id: int) -> None:
         return await sync_to_async(self.mark_failed_to_send)(horoscope_id)
 
+    def iter_due_deliveries(
+        self,
+        due_at: datetime,
+        chunk_size: Optional[int] = None,
+    ) -> Iterator[list[HoroscopeDueDeliveryEntity]]:
+        """
+        Yield queued horoscopes whose deliver_at has passed, in id-ordered chunks.
+
+        Only rows still in the delivery queue are read, so the cost is proportional
+        to what is due rather than to the day's whole unsent backlog.
+        """
+        queryset = Horoscope.objects.filter(deliver_at__lte=due_at).order_by('id')
+        chunk_size = chunk_size or settings.SCHEDULER_UID_CHUNK_SIZE
+        last_id = 0
+        while True:
+            chunk = HoroscopeDueDeliveryEntity.from_queryset(queryset.filter(id__gt=last_id)[:chunk_size])
+            if not chunk:
+                return
+            yield chunk
+            if len(chunk) < chunk_size:
+                return
+            last_id = chunk[-1].id
+
+    def aiter_due_deliveries(
+        self,
+        due_at: datetime,
+        chunk_size: Optional[int] = None,
+    ) -> AsyncIterator[list[HoroscopeDueDeliveryEntity]]:
+        return aiter_chunks(self.iter_due_deliveries(due_at, chunk_size))
+
+    def dequeue_deliveries(self, horoscope_ids: list[int]) -> int:
+        """Remove horoscopes from the delivery queue without marking them sent."""
+        return Horoscope.objects.filter(id__in=horoscope_ids, deliver_at__isnull=False).update(deliver_at=None)
+
+    async def adequeue_deliveries(self, horoscope_ids: list[int]) -> int:
+        return await sync_to_async(self.dequeue_deliveries)(horoscope_ids)
+
     def get_last_sent_at(self, telegram_uid: int) -> Optional[datetime]:
         horoscope = (
             Horoscope.objects
@@ -115,8 +238,69 @@ class HoroscopeRepository(BaseRepository[Horoscope, HoroscopeEntity]):
     async def aget_unsent_telegram_uids_for_date(self, target_date: date) -> list[int]:
         return await sync_to_async(self.get_unsent_telegram_uids_for_date)(target_date)
 
+    def iter_unsent_telegram_uids_for_date(
+        self,
+        target_date: date,
+        chunk_size: Optional[int] = None,
+    ) -> Iterator[list[int]]:
+        """Same as get_unsent_telegram_uids_for_date, but yields UIDs in bounded chunks."""
+        return iter_value_chunks(
+            queryset=Horoscope.objects.filter(
+                date=target_date,
+                sent_at__isnull=True,
+                failed_to_send_at__isnull=True,
+            ),
+            field='user_telegram_uid',
+            chunk_size=chunk_size or settings.SCHEDULER_UID_CHUNK_SIZE,
+        )
+
+    def aiter_unsent_telegram_uids_for_date(
+        self,
+        target_date: date,
+        chunk_size: Optional[int] = None,
+    ) -> AsyncIterator[list[int]]:
+        return aiter_chunks(self.iter_unsent_telegram_uids_for_date(target_date, chunk_size))
+
     def count_created_since(self, since: date) -> int:
         return Horoscope.objects.filter(created_at__date__gte=since).count()
 
     async def acount_created_since(self, since: date) -> int:
         return await sync_to_async(self.count_created_since)(since)
+
+    def iter_archive_rows(self, before_date: date, chunk_size: int) -> Iterator[list[dict]]:
+        """
+        Yield horoscopes dated before `before_date` as plain dicts, in id-ordered chunks.
+
+        LLM usage and follow-ups are embedded in each row because they cascade when
+        the horoscope is deleted, and cost reports still need them afterwards.
+        """
+        queryset = Horoscope.objects.filter(date__lt=before_date).order_by('id')
+        last_id = 0
+        while True:
+            rows = list(queryset.filter(id__gt=last_id).values()[:chunk_size])
+            if not rows:
+                return
+            ids = [row['id'] for row in rows]
+
+            usage_by_id = {
+                usage.pop('horoscope_id'): usage
+                for usage in LLMUsage.objects.filter(horoscope_id__in=ids).values(
+                    'horoscope_id', 'model', 'input_tokens', 'output_tokens', 'created_at',
+                )
+            }
+            followups_by_id: dict[int, list[dict]] = {}
+            followups = HoroscopeFollowup.objects.filter(horoscope_id__in=ids).order_by('id').values(
+                'horoscope_id', 'question_text', 'answer_text', 'model', 'input_tokens', 'output_tokens', 'created_at',
+            )
+            for followup in followups:
+                followups_by_id.setdefault(followup.pop('horoscope_id'), []).append(followup)
+
+            for row in rows:
+                row['llm_usage'] = usage_by_id.get(row['id'])
+                row['followups'] = followups_by_id.get(row['id'], [])
+            yield rows
+            last_id = ids[-1]
+
+    def delete_by_ids(self, ids: list[int]) -> int:
+        _, deleted_per_model = Horoscope.objects.filter(id__in=ids).delete()
+        return deleted_per_model.get(Horoscope._meta.label, 0)
@@ -71,7 +71,7 @@ class SubscriptionRepository(BaseRepository[Subscription, SubscriptionEntity]):
             status=SubscriptionStatus.ACTIVE,
             expires_at__lte=timezone.now(),
         )
-        return [SubscriptionEntity.from_model(s) for s in subs]
+        return SubscriptionEntity.from_queryset(subs)
 
     async def aget_expired_subscriptions(self) -> list[SubscriptionEntity]:
         return await sync_to_async(self.get_expired_subscriptions)()
@@ -139,7 +139,7 @@ class SubscriptionRepository(BaseRepository[Subscription, SubscriptionEntity]):
             expires_at__lte=deadline,
             reminder_sent_at__isnull=True,
         )
-        return [SubscriptionEntity.from_model(s) for s in subs]
+        return SubscriptionEntity.from_queryset(subs)
 
     async def aget_expiring_soon(self, days: int) -> list[SubscriptionEntity]:
         return await sync_to_async(self.get_expiring_soon)(days)
@@ -149,7 +149,7 @@ class SubscriptionRepository(BaseRepository[Subscription, SubscriptionEntity]):
             status=SubscriptionStatus.EXPIRED,
             reminder_sent_at__isnull=True,
         )
-        return [SubscriptionEntity.from_model(s) for s in subs]
+        return SubscriptionEntity.from_queryset(subs)
 
     async def aget_recently_expired_unnotified(self) -> list[SubscriptionEntity]:
         return await sync_to_async(self.get_recently_expired_unnotified)()
@@ -1,12 +1,16 @@
-from datetime import date, time
-from typing import Optional
-from config import settings
+from datetime import date, datetime, time
+from typing import AsyncIterator, Iterator, Optional
+
 from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import QuerySet
+from django.utils import timezone
 
-from core.repositories.base import BaseRepository
+from core.repositories.base import BaseRepository, aiter_chunks, iter_value_chunks
 from horoscope.entities import UserProfileEntity
 from horoscope.exceptions import UserProfileNotFoundException
 from horoscope.models import UserProfile
+from horoscope.utils import get_utc_offset_minutes
 
 
 class UserProfileRepository(BaseRepository[UserProfile, UserProfileEntity]):
@@ -95,12 +99,12 @@ class UserProfileRepository(BaseRepository[UserProfile, UserProfileEntity]):
     def update_notification_hour(
         self,
         telegram_uid: int,
-        notification_hour_utc: Optional[int],
+        notification_hour_local: Optional[int],
     ) -> Optional[UserProfileEntity]:
         try:
             profile = UserProfile.objects.get(user_telegram_uid=telegram_uid)
-            profile.notification_hour_utc = notification_hour_utc
-            profile.save(update_fields=['notification_hour_utc', 'updated_at'])
+            profile.notification_hour_local = notification_hour_local
+            profile.save(update_fields=['notification_hour_local', 'updated_at'])
             return UserProfileEntity.from_model(profile)
         except UserProfile.DoesNotExist:
             return None
@@ -108,59 +112,45 @@ class UserProfileRepository(BaseRepository[UserProfile, UserProfileEntity]):
     async def aupdate_notification_hour(
         self,
         telegram_uid: int,
-        notification_hour_utc: Optional[int],
+        notification_hour_local: Optional[int],
     ) -> Optional[UserProfileEntity]:
         return await sync_to_async(self.update_notification_hour)(
             telegram_uid,
-            notification_hour_utc,
+            notification_hour_local,
         )
 
+    def _notification_hour_queryset(self, hour_utc: int) -> QuerySet:
+        """Profiles whose effective notification hour matches the given UTC hour (index range scan)."""
+        return UserProfile.objects.filter(effective_notification_hour=hour_utc)
+
     def get_telegram_uids_by_notification_hour(self, hour_utc: int) -> list[int]:
         """Get telegram UIDs of users whose effective notification hour matches the given UTC hour."""
-        result: list[int] = []
-        # Users with explicit notification_hour_utc set
-        explicit = list(
-            UserProfile.objects.filter(
-                notification_hour_utc=hour_utc,
-            ).values_list('user_telegram_uid', flat=True)
+        return list(
+            self._notification_hour_queryset(hour_utc).values_list('user_telegram_uid', flat=True)
         )
-        result.extend(explicit)
-
-        # Users without explicit hour — use per-language defaults (pure DB queries)
-        # Find languages whose configured hour matches
-        matching_langs = [
-            lang for lang, hour in settings.HOROSCOPE_GENERATION_HOURS_UTC.items()
-            if hour == hour_utc
-        ]
-        all_configured_langs = list(settings.HOROSCOPE_GENERATION_HOURS_UTC.keys())
-        default_hour_matches = settings.HOROSCOPE_DEFAULT_GENERATION_HOUR_UTC == hour_utc
-
-        # Users with a language that maps to this hour
-        if matching_langs:
-            lang_matches = list(
-                UserProfile.objects.filter(
-                    notification_hour_utc__isnull=True,
-                    preferred_language__in=matching_langs,
-                ).values_list('user_telegram_uid', flat=True)
-            )
-            result.extend(lang_matches)
-
-        # Users whose language is NOT in the configured mapping — they use the default hour
-        if default_hour_matches:
-            default_matches = list(
-                UserProfile.objects.filter(
-                    notification_hour_utc__isnull=True,
-                ).exclude(
-                    preferred_language__in=all_configured_langs,
-                ).values_list('user_telegram_uid', flat=True)
-            )
-            result.extend(default_matches)
-
-        return result
 
     async def aget_telegram_uids_by_notification_hour(self, hour_utc: int) -> list[int]:
         return await sync_to_async(self.get_telegram_uids_by_notification_hour)(hour_utc)
 
+    def iter_telegram_uids_by_notification_hour(
+        self,
+        hour_utc: int,
+        chunk_size: Optional[int] = None,
+    ) -> Iterator[list[int]]:
+        """Same as get_telegram_uids_by_notification_hour, but yields UIDs in bounded chunks."""
+        return iter_value_chunks(
+            queryset=self._notification_hour_queryset(hour_utc),
+            field='user_telegram_uid',
+            chunk_size=chunk_size or settings.SCHEDULER_UID_CHUNK_SIZE,
+        )
+
+    def aiter_telegram_uids_by_notification_hour(
+        self,
+        hour_utc: int,
+        chunk_size: Optional[int] = None,
+    ) -> AsyncIterator[list[int]]:
+        return aiter_chunks(self.iter_telegram_uids_by_notification_hour(hour_utc, chunk_size))
+
     def get_all_telegram_uids(self) -> list[int]:
         return list(
             UserProfile.objects.values_list('user_telegram_uid', flat=True)
@@ -169,6 +159,82 @@ class UserProfileRepository(BaseRepository[UserProfile, UserProfileEntity]):
     async def aget_all_telegram_uids(self) -> list[int]:
         return await sync_to_async(self.get_all_telegram_uids)()
 
+    def iter_all_telegram_uids(self, chunk_size: Optional[int] = None) -> Iterator[list[int]]:
+        return iter_value_chunks(
+            queryset=UserProfile.objects.all(),
+            field='user_telegram_uid',
+            chunk_size=chunk_size or settings.SCHEDULER_UID_CHUNK_SIZE,
+        )
+
+    def aiter_all_telegram_uids(self, chunk_size: Optional[int] = None) -> AsyncIterator[list[int]]:
+        return aiter_chunks(self.iter_all_telegram_uids(chunk_size))
+
+    def recompute_effective_notification_hours(self) -> int:
+        """
+        Bring the effective notification time of profiles without an explicit hour
+        in line with the current per-language hour mapping.
+
+        Profiles with an explicit local hour are kept up to date by
+        rebuild_notification_buckets. Only rows whose stored value differs are
+        updated. Returns the number of updated rows.
+        """
+        updated = 0
+        for language, hour in settings.HOROSCOPE_GENERATION_HOURS_UTC.items():
+            updated += UserProfile.objects.filter(
+                notification_hour_local__isnull=True,
+                preferred_language=language,
+            ).exclude(
+                effective_notification_hour=hour,
+                effective_notification_minute=hour * 60,
+            ).update(effective_notification_hour=hour, effective_notification_minute=hour * 60)
+
+        default_hour = settings.HOROSCOPE_DEFAULT_GENERATION_HOUR_UTC
+        updated += UserProfile.objects.filter(
+            notification_hour_local__isnull=True,
+        ).exclude(
+            preferred_language__in=list(settings.HOROSCOPE_GENERATION_HOURS_UTC.keys()),
+        ).exclude(
+            effective_notification_hour=default_hour,
+            effective_notification_minute=default_hour * 60,
+        ).update(effective_notification_hour=default_hour, effective_notification_minute=default_hour * 60)
+
+        return updated
+
+    async def arecompute_effective_notification_hours(self) -> int:
+        return await sync_to_async(self.recompute_effective_notification_hours)()
+
+    def rebuild_notification_buckets(self, at: Optional[datetime] = None) -> int:
+        """
+        Re-resolve the UTC notification time of profiles with an explicit local hour
+        whose timezone's UTC offset at `at` (default: now) differs from the stored one.
+
+        Offsets are resolved once per distinct timezone and stale rows are fixed with
+        one UPDATE per (timezone, local hour), so the hourly index lookups stay
+        correct across DST transitions without per-user conversion. Outside a
+        transition no row is written. Returns the number of updated rows.
+        """
+        at = at or timezone.now()
+        with_local_hour = UserProfile.objects.filter(notification_hour_local__isnull=False)
+        timezone_names = with_local_hour.order_by().values_list('timezone', flat=True).distinct()
+
+        updated = 0
+        for timezone_name in list(timezone_names):
+            offset = get_utc_offset_minutes(timezone_name, at)
+            stale = with_local_hour.filter(timezone=timezone_name).exclude(utc_offset_minutes=offset)
+            if not stale.exists():
+                continue
+            for local_hour in range(24):
+                minute = (local_hour * 60 - offset) % (24 * 60)
+                updated += stale.filter(notification_hour_local=local_hour).update(
+                    utc_offset_minutes=offset,
+                    effective_notification_minute=minute,
+                    effective_notification_hour=minute // 60,
+                )
+        return updated
+
+    async def arebuild_notification_buckets(self, at: Optional[datetime] = None) -> int:
+        return await sync_to_async(self.rebuild_notification_buckets)(at)
+
     def count_created_since(self, since: date) -> int:
         return UserProfile.objects.filter(created_at__date__gte=since).count()
 
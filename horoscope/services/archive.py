@@ -0,0 +1,159 @@
+import asyncio
+import logging
+from datetime import timedelta
+from typing import TYPE_CHECKING, Callable, Iterator, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from core.entities import ArchiveResultEntity
+
+if TYPE_CHECKING:
+    from core.services.archive import ArchiveStorage
+    from horoscope.repositories import HoroscopeRepository
+    from telegram_bot.repositories import MessageHistoryRepository
+
+logger = logging.getLogger(__name__)
+
+HOROSCOPES_DATASET = 'horoscopes'
+MESSAGE_HISTORY_DATASET = 'message_history'
+
+
+def _next_chunk(chunks: Iterator[list[dict]]) -> Optional[list[dict]]:
+    close_old_connections()
+    return next(chunks, None)
+
+
+class ColdArchiveService:
+    """Moves old horoscopes and message history to the archive storage and reads them back."""
+
+    def __init__(
+        self,
+        horoscope_repo: "HoroscopeRepository",
+        message_history_repo: "MessageHistoryRepository",
+        storage: "ArchiveStorage",
+    ):
+        self.horoscope_repo = horoscope_repo
+        self.message_history_repo = message_history_repo
+        self.storage = storage
+
+    def archive_old_records(
+        self,
+        horoscope_days: Optional[int] = None,
+        message_history_days: Optional[int] = None,
+    ) -> list[ArchiveResultEntity]:
+        results = [
+            self.storage.archive_chunks(dataset=dataset, chunks=chunks, month_of=month_of, delete_ids=delete_ids)
+            for dataset, chunks, month_of, delete_ids in self._archive_jobs(horoscope_days, message_history_days)
+        ]
+        self._log_results(results)
+        return results
+
+    async def aarchive_old_records(
+        self,
+        horoscope_days: Optional[int] = None,
+        message_history_days: Optional[int] = None,
+    ) -> list[ArchiveResultEntity]:
+        """
+        Async archive_old_records, awaited chunk by chunk with a pause between
+        chunks, so handlers' queries and scheduler lease renewals on the shared
+        sync_to_async thread keep running during a long archive run.
+        """
+        results = []
+        for dataset, chunks, month_of, delete_ids in self._archive_jobs(horoscope_days, message_history_days):
+            result = ArchiveResultEntity(dataset=dataset)
+            while (rows := await sync_to_async(_next_chunk)(chunks)) is not None:
+                await sync_to_async(self.storage.archive_rows)(
+                    result, rows, month_of=month_of, delete_ids=delete_ids,
+                )
+                await asyncio.sleep(settings.ARCHIVE_CHUNK_PAUSE_SECONDS)
+            results.append(result)
+        self._log_results(results)
+        return results
+
+    def _archive_jobs(
+        self,
+        horoscope_days: Optional[int],
+        message_history_days: Optional[int],
+    ) -> list[tuple[str, Iterator[list[dict]], Callable[[dict], str], Callable[[list[int]], int]]]:
+        if horoscope_days is None:
+            horoscope_days = settings.ARCHIVE_HOROSCOPE_AFTER_DAYS
+        if message_history_days is None:
+            message_history_days = settings.ARCHIVE_MESSAGE_HISTORY_AFTER_DAYS
+        chunk_size = settings.ARCHIVE_CHUNK_SIZE
+        now = timezone.now()
+
+        return [
+            (
+                HOROSCOPES_DATASET,
+                self.horoscope_repo.iter_archive_rows(
+                    before_date=(now - timedelta(days=horoscope_days)).date(),
+                    chunk_size=chunk_size,
+                ),
+                lambda row: row['date'].strftime('%Y-%m'),
+                self.horoscope_repo.delete_by_ids,
+            ),
+            (
+                MESSAGE_HISTORY_DATASET,
+                self.message_history_repo.iter_archive_rows(
+                    older_than=now - timedelta(days=message_history_days),
+                    chunk_size=chunk_size,
+                ),
+                lambda row: row['created_at'].strftime('%Y-%m'),
+                self.message_history_repo.delete_by_ids,
+            ),
+        ]
+
+    @staticmethod
+    def _log_results(results: list[ArchiveResultEntity]) -> None:
+        for result in results:
+            logger.info(
+                f"Archived {result.archived_count} {result.dataset} rows "
+                f"into {result.segments} segments ({result.bytes_written} bytes)"
+            )
+
+    def find_horoscopes(
+        self,
+        telegram_uid: int,
+        month_from: Optional[str] = None,
+        month_to: Optional[str] = None,
+    ) -> list[dict]:
+        return list(self.storage.iter_rows(
+            dataset=HOROSCOPES_DATASET,
+            month_from=month_from,
+            month_to=month_to,
+            predicate=lambda row: row['user_telegram_uid'] == telegram_uid,
+        ))
+
+    def find_messages(
+        self,
+        telegram_uid: int,
+        month_from: Optional[str] = None,
+        month_to: Optional[str] = None,
+    ) -> list[dict]:
+        return list(self.storage.iter_rows(
+            dataset=MESSAGE_HISTORY_DATASET,
+            month_from=month_from,
+            month_to=month_to,
+            predicate=lambda row: telegram_uid in (row['from_user_telegram_uid'], row['to_user_telegram_uid']),
+        ))
+
+    def get_usage_summary(self) -> list[dict]:
+        """Same shape as LLMUsageRepository.get_usage_summary, computed over archived horoscopes."""
+        totals: dict[str, dict] = {}
+        for row in self.storage.iter_rows(dataset=HOROSCOPES_DATASET):
+            usage = row.get('llm_usage')
+            if not usage:
+                continue
+            summary = totals.setdefault(usage['model'], {
+                'model': usage['model'],
+                'total_input_tokens': 0,
+                'total_output_tokens': 0,
+                'count': 0,
+            })
+            summary['total_input_tokens'] += usage['input_tokens']
+            summary['total_output_tokens'] += usage['output_tokens']
+            summary['count'] += 1
+        return [totals[model] for model in sorted(totals)]
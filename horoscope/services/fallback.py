@@ -0,0 +1,131 @@
+"""
+Offline fallback horoscopes, used when the LLM fails or misses its latency budget.
+
+A fallback horoscope is composed from the curated corpus in fallback_phrases:
+one phrase per section, chosen by a generator seeded with (sign, date,
+language). The same sign gets the same horoscope for a day in a language,
+which is what a printed horoscope column does too, and needs no network.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import random
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import date
+from typing import Callable, Optional, TypeVar
+
+from django.conf import settings
+
+from horoscope.services.fallback_phrases import FALLBACK_PHRASES, SECTIONS
+from horoscope.services.llm import LLMResult
+from horoscope.services.llm_governor import LLMDeadline, LLMPriority, current_llm_priority, llm_deadline
+
+FALLBACK_MODEL = 'offline-fallback'
+
+SIGN_SYMBOLS = {
+    'Aries': '♈', 'Taurus': '♉', 'Gemini': '♊', 'Cancer': '♋', 'Leo': '♌', 'Virgo': '♍',
+    'Libra': '♎', 'Scorpio': '♏', 'Sagittarius': '♐', 'Capricorn': '♑', 'Aquarius': '♒', 'Pisces': '♓',
+}
+
+SIGN_ELEMENTS = {
+    'Aries': 'fire', 'Leo': 'fire', 'Sagittarius': 'fire',
+    'Taurus': 'earth', 'Virgo': 'earth', 'Capricorn': 'earth',
+    'Gemini': 'air', 'Libra': 'air', 'Aquarius': 'air',
+    'Cancer': 'water', 'Scorpio': 'water', 'Pisces': 'water',
+}
+
+# One pool per LLM priority, so interactive calls never queue behind batch
+# work before reaching the governor. Each fits the governor's highest
+# concurrency plus as many calls abandoned mid-request at their deadline
+DEADLINE_WORKERS = 2 * settings.LLM_CONCURRENCY_MAX
+
+T = TypeVar('T')
+
+_deadline_executors = {
+    priority: ThreadPoolExecutor(
+        max_workers=DEADLINE_WORKERS,
+        thread_name_prefix=f'llm-deadline-{priority.name.lower()}',
+    )
+    for priority in LLMPriority
+}
+
+
+def fallback_seed(zodiac_sign: str, target_date: date, language: str) -> int:
+    # Not hash(): string hashing is salted per process
+    digest = hashlib.sha256(f'{zodiac_sign}|{target_date.isoformat()}|{language}'.encode()).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+def generate_fallback_horoscope(zodiac_sign: str, name: str, target_date: date, language: str = 'en') -> LLMResult:
+    """Compose a horoscope from the phrase corpus, deterministic per (sign, date, language)."""
+    phrases = FALLBACK_PHRASES.get(language) or FALLBACK_PHRASES['en']
+    rng = random.Random(fallback_seed(zodiac_sign, target_date, language))
+
+    lines = [
+        phrases['header'].format(
+            symbol=SIGN_SYMBOLS.get(zodiac_sign, '✨'),
+            sign=phrases['signs'].get(zodiac_sign, zodiac_sign),
+            date=target_date.strftime('%d.%m.%Y'),
+        ),
+        rng.choice(phrases['greeting']).format(name=name),
+        phrases['element'][SIGN_ELEMENTS.get(zodiac_sign, 'fire')],
+    ]
+    lines.extend(rng.choice(phrases[section]) for section in SECTIONS)
+    return LLMResult(full_text='\n'.join(lines), model=FALLBACK_MODEL, input_tokens=0, output_tokens=0)
+
+
+def call_with_deadline(func: Callable[[], T], timeout_seconds: float) -> T:
+    """
+    Run `func` in a worker thread and wait at most `timeout_seconds` for it.
+
+    Raises TimeoutError when the deadline passes; the call is cancelled at
+    its next governor wait or retry, and a request already sent is left to
+    finish in the background with its result discarded. Time the call spends
+    queued for its first LLM slot doesn't count. Unlike the request timeout
+    this bounds the whole call, retries and slow streams included. A timeout
+    of 0 runs `func` inline without a deadline.
+    """
+    if timeout_seconds <= 0:
+        return func()
+    deadline = LLMDeadline(timeout_seconds)
+    future = _submit(func, deadline)
+    while not wait([future], timeout=max(deadline.remaining(), 0)).done:
+        if deadline.remaining() <= 0:
+            deadline.cancel()
+            raise TimeoutError(f"No answer within {timeout_seconds}s")
+    return future.result()
+
+
+async def acall_with_deadline(func: Callable[[], T], timeout_seconds: float) -> T:
+    """
+    Async call_with_deadline: the event loop and the shared sync_to_async
+    thread stay free while `func` waits for the LLM. A timeout of 0 waits
+    for `func` without a deadline.
+    """
+    deadline = LLMDeadline(timeout_seconds) if timeout_seconds > 0 else None
+    future = asyncio.wrap_future(_submit(func, deadline))
+    if deadline is None:
+        return await future
+    while True:
+        done, _ = await asyncio.wait({future}, timeout=max(deadline.remaining(), 0))
+        if done:
+            return future.result()
+        if deadline.remaining() <= 0:
+            deadline.cancel()
+            future.cancel()
+            raise TimeoutError(f"No answer within {timeout_seconds}s")
+
+
+def _submit(func: Callable[[], T], deadline: Optional[LLMDeadline]) -> Future:
+    # Copied so spans, slow-work profiles and query counters see the call
+    context = contextvars.copy_context()
+    executor = _deadline_executors[current_llm_priority()]
+    return executor.submit(context.run, _run_within, func, deadline)
+
+
+def _run_within(func: Callable[[], T], deadline: Optional[LLMDeadline]) -> T:
+    if deadline is None:
+        return func()
+    with llm_deadline(deadline):
+        return func()
@@ -0,0 +1,453 @@
+"""
+Curated phrase corpus of the offline fallback horoscope generator.
+
+Per language: zodiac sign names, a header, greetings, one line per element
+and interchangeable lines for each section of the horoscope. Every phrase
+of a section must read well after any phrase of the previous one. Languages
+missing here fall back to English.
+"""
+
+SECTIONS = ('day', 'love', 'career', 'health', 'growth', 'closing')
+
+FALLBACK_PHRASES: dict[str, dict] = {
+    'en': {
+        'signs': {
+            'Aries': 'Aries', 'Taurus': 'Taurus', 'Gemini': 'Gemini', 'Cancer': 'Cancer',
+            'Leo': 'Leo', 'Virgo': 'Virgo', 'Libra': 'Libra', 'Scorpio': 'Scorpio',
+            'Sagittarius': 'Sagittarius', 'Capricorn': 'Capricorn', 'Aquarius': 'Aquarius', 'Pisces': 'Pisces',
+        },
+        'header': '{symbol} Horoscope for {sign} · {date}',
+        'greeting': [
+            'Dear {name}, the stars have a message for you today ✨',
+            '{name}, here is what the sky whispers to you today 🌙',
+            'Good day, {name}! The planets line up to guide you 🌟',
+        ],
+        'element': {
+            'fire': '🔥 Your fiery spirit burns bright — let your courage lead the way.',
+            'earth': '🌿 Your grounded nature is your anchor — steady steps bring lasting results.',
+            'air': '🌬️ Your curious mind is restless — new ideas are carried on the wind.',
+            'water': '🌊 Your intuition runs deep — trust the quiet voice within.',
+        },
+        'day': [
+            '☀️ The day opens with calm energy, perfect for setting clear intentions.',
+            '🌅 A fresh rhythm arrives today — small changes bring big relief.',
+            '🌤️ Gentle cosmic winds favour patience over haste today.',
+            '⭐ An unexpected spark of inspiration may arrive before noon.',
+        ],
+        'love': [
+            '💖 In love, an honest word opens a door that seemed closed.',
+            '💞 Someone close is waiting for a sign of your warmth — share it.',
+            '❤️ Romance grows in small gestures; a kind message goes a long way.',
+            '💫 Old misunderstandings soften, making room for tenderness.',
+        ],
+        'career': [
+            '💼 At work, focus on one task at a time and you will finish ahead of time.',
+            '📈 A practical idea of yours deserves to be heard — speak up.',
+            '🧭 Careful planning now pays off more than quick decisions.',
+            '🤝 Cooperation brings success; a colleague may offer valuable help.',
+        ],
+        'health': [
+            '🍃 Your body asks for rest and water — listen to it.',
+            '🧘 A short walk or a few deep breaths will restore your balance.',
+            '🌙 An early night will recharge you better than any coffee.',
+            '💪 Your energy is high; channel it into movement you enjoy.',
+        ],
+        'growth': [
+            '🌱 Take a moment to notice how far you have already come.',
+            '📖 Learning something new, however small, lifts your spirit.',
+            '🔮 Let go of one worry that no longer serves you.',
+            '🌈 Gratitude turns an ordinary moment into a special one.',
+        ],
+        'closing': [
+            '✨ Trust the path — the universe is on your side today.',
+            '🌟 Shine your light, and the day will answer in kind.',
+            '💫 Every step you take today plants a seed for tomorrow.',
+            '🌙 Walk gently, dream boldly, and the stars will follow.',
+        ],
+    },
+    'ru': {
+        'signs': {
+            'Aries': 'Овен', 'Taurus': 'Телец', 'Gemini': 'Близнецы', 'Cancer': 'Рак',
+            'Leo': 'Лев', 'Virgo': 'Дева', 'Libra': 'Весы', 'Scorpio': 'Скорпион',
+            'Sagittarius': 'Стрелец', 'Capricorn': 'Козерог', 'Aquarius': 'Водолей', 'Pisces': 'Рыбы',
+        },
+        'header': '{symbol} Гороскоп: {sign} · {date}',
+        'greeting': [
+            'Дорогой {name}, у звёзд есть для вас послание ✨',
+            '{name}, вот что сегодня шепчет вам небо 🌙',
+            'Добрый день, {name}! Планеты выстроились, чтобы помочь вам 🌟',
+        ],
+        'element': {
+            'fire': '🔥 Ваш огненный дух горит ярко — позвольте смелости вести вас.',
+            'earth': '🌿 Ваша надёжность — ваша опора: уверенные шаги принесут прочный результат.',
+            'air': '🌬️ Ваш пытливый ум не знает покоя — ветер приносит новые идеи.',
+            'water': '🌊 Ваша интуиция глубока — доверьтесь тихому внутреннему голосу.',
+        },
+        'day': [
+            '☀️ День начинается спокойно — самое время наметить ясные цели.',
+            '🌅 Сегодня приходит новый ритм: небольшие перемены принесут облегчение.',
+            '🌤️ Мягкие космические ветры сегодня благоволят терпению, а не спешке.',
+            '⭐ Неожиданная искра вдохновения может появиться ещё до полудня.',
+        ],
+        'love': [
+            '💖 В любви честное слово откроет дверь, которая казалась закрытой.',
+            '💞 Близкий человек ждёт знака вашей теплоты — не скрывайте её.',
+            '❤️ Романтика растёт из мелочей: доброе сообщение значит многое.',
+            '💫 Старые недоразумения смягчаются, оставляя место нежности.',
+        ],
+        'career': [
+            '💼 В работе сосредоточьтесь на одной задаче — и закончите раньше срока.',
+            '📈 Ваша практичная идея заслуживает внимания — не молчите.',
+            '🧭 Сейчас тщательное планирование важнее быстрых решений.',
+            '🤝 Успех приносит сотрудничество: коллега может оказать ценную помощь.',
+        ],
+        'health': [
+            '🍃 Тело просит отдыха и воды — прислушайтесь к нему.',
+            '🧘 Короткая прогулка или несколько глубоких вдохов вернут равновесие.',
+            '🌙 Ранний сон восстановит силы лучше любого кофе.',
+            '💪 Энергии много — направьте её в движение, которое вам нравится.',
+        ],
+        'growth': [
+            '🌱 Заметьте, какой путь вы уже прошли.',
+            '📖 Даже маленькое новое знание поднимет настроение.',
+            '🔮 Отпустите одну тревогу, которая вам больше не нужна.',
+            '🌈 Благодарность превращает обычный момент в особенный.',
+        ],
+        'closing': [
+            '✨ Доверьтесь пути — сегодня вселенная на вашей стороне.',
+            '🌟 Делитесь своим светом, и день ответит тем же.',
+            '💫 Каждый шаг сегодня — семя для завтрашнего дня.',
+            '🌙 Идите мягко, мечтайте смело, и звёзды последуют за вами.',
+        ],
+    },
+    'uk': {
+        'signs': {
+            'Aries': 'Овен', 'Taurus': 'Телець', 'Gemini': 'Близнюки', 'Cancer': 'Рак',
+            'Leo': 'Лев', 'Virgo': 'Діва', 'Libra': 'Терези', 'Scorpio': 'Скорпіон',
+            'Sagittarius': 'Стрілець', 'Capricorn': 'Козеріг', 'Aquarius': 'Водолій', 'Pisces': 'Риби',
+        },
+        'header': '{symbol} Гороскоп: {sign} · {date}',
+        'greeting': [
+            'Дорогий {name}, зірки мають для вас послання ✨',
+            '{name}, ось що сьогодні шепоче вам небо 🌙',
+            'Добрий день, {name}! Планети вишикувалися, щоб допомогти вам 🌟',
+        ],
+        'element': {
+            'fire': '🔥 Ваш вогняний дух палає яскраво — нехай сміливість веде вас.',
+            'earth': '🌿 Ваша надійність — ваша опора: впевнені кроки дадуть міцний результат.',
+            'air': '🌬️ Ваш допитливий розум не знає спокою — вітер приносить нові ідеї.',
+            'water': '🌊 Ваша інтуїція глибока — довіртеся тихому внутрішньому голосу.',
+        },
+        'day': [
+            '☀️ День починається спокійно — саме час окреслити ясні цілі.',
+            '🌅 Сьогодні приходить новий ритм: невеликі зміни принесуть полегшення.',
+            '🌤️ Лагідні космічні вітри сьогодні сприяють терпінню, а не поспіху.',
+            '⭐ Несподівана іскра натхнення може з’явитися ще до полудня.',
+        ],
+        'love': [
+            '💖 У коханні чесне слово відчинить двері, що здавалися зачиненими.',
+            '💞 Близька людина чекає на знак вашої теплоти — не приховуйте її.',
+            '❤️ Романтика росте з дрібниць: добре повідомлення важить багато.',
+            '💫 Старі непорозуміння пом’якшуються, залишаючи місце ніжності.',
+        ],
+        'career': [
+            '💼 У роботі зосередьтеся на одному завданні — і закінчите раніше строку.',
+            '📈 Ваша практична ідея заслуговує на увагу — не мовчіть.',
+            '🧭 Зараз ретельне планування важливіше за швидкі рішення.',
+            '🤝 Успіх приносить співпраця: колега може надати цінну допомогу.',
+        ],
+        'health': [
+            '🍃 Тіло просить відпочинку та води — прислухайтеся до нього.',
+            '🧘 Коротка прогулянка або кілька глибоких вдихів повернуть рівновагу.',
+            '🌙 Ранній сон відновить сили краще за будь-яку каву.',
+            '💪 Енергії багато — спрямуйте її в рух, який вам до вподоби.',
+        ],
+        'growth': [
+            '🌱 Помітьте, який шлях ви вже пройшли.',
+            '📖 Навіть маленьке нове знання підніме настрій.',
+            '🔮 Відпустіть одну тривогу, яка вам більше не потрібна.',
+            '🌈 Вдячність перетворює звичайну мить на особливу.',
+        ],
+        'closing': [
+            '✨ Довіртеся шляху — сьогодні всесвіт на вашому боці.',
+            '🌟 Діліться своїм світлом, і день відповість тим самим.',
+            '💫 Кожен крок сьогодні — зерно для завтрашнього дня.',
+            '🌙 Ідіть м’яко, мрійте сміливо, і зорі підуть за вами.',
+        ],
+    },
+    'de': {
+        'signs': {
+            'Aries': 'Widder', 'Taurus': 'Stier', 'Gemini': 'Zwillinge', 'Cancer': 'Krebs',
+            'Leo': 'Löwe', 'Virgo': 'Jungfrau', 'Libra': 'Waage', 'Scorpio': 'Skorpion',
+            'Sagittarius': 'Schütze', 'Capricorn': 'Steinbock', 'Aquarius': 'Wassermann', 'Pisces': 'Fische',
+        },
+        'header': '{symbol} Horoskop für {sign} · {date}',
+        'greeting': [
+            'Liebe/r {name}, die Sterne haben heute eine Botschaft für dich ✨',
+            '{name}, das flüstert dir der Himmel heute zu 🌙',
+            'Guten Tag, {name}! Die Planeten stehen bereit, dich zu leiten 🌟',
+        ],
+        'element': {
+            'fire': '🔥 Dein feuriger Geist brennt hell — lass dich von deinem Mut führen.',
+            'earth': '🌿 Deine Bodenständigkeit ist dein Anker — sichere Schritte bringen dauerhafte Erfolge.',
+            'air': '🌬️ Dein neugieriger Geist ist rastlos — der Wind trägt neue Ideen heran.',
+            'water': '🌊 Deine Intuition ist tief — vertraue der leisen Stimme in dir.',
+        },
+        'day': [
+            '☀️ Der Tag beginnt ruhig, ideal, um klare Absichten zu setzen.',
+            '🌅 Ein neuer Rhythmus kommt heute — kleine Änderungen bringen große Erleichterung.',
+            '🌤️ Sanfte kosmische Winde begünstigen heute Geduld statt Eile.',
+            '⭐ Noch vor Mittag kann dich ein unerwarteter Funke Inspiration erreichen.',
+        ],
+        'love': [
+            '💖 In der Liebe öffnet ein ehrliches Wort eine Tür, die verschlossen schien.',
+            '💞 Ein nahestehender Mensch wartet auf ein Zeichen deiner Wärme — zeig es.',
+            '❤️ Romantik wächst aus kleinen Gesten; eine liebe Nachricht bewirkt viel.',
+            '💫 Alte Missverständnisse lösen sich und machen Platz für Zärtlichkeit.',
+        ],
+        'career': [
+            '💼 Konzentriere dich bei der Arbeit auf eine Aufgabe nach der anderen, dann bist du früher fertig.',
+            '📈 Eine praktische Idee von dir verdient Gehör — sprich sie aus.',
+            '🧭 Sorgfältige Planung zahlt sich jetzt mehr aus als schnelle Entscheidungen.',
+            '🤝 Zusammenarbeit bringt Erfolg; ein Kollege bietet vielleicht wertvolle Hilfe an.',
+        ],
+        'health': [
+            '🍃 Dein Körper bittet um Ruhe und Wasser — hör auf ihn.',
+            '🧘 Ein kurzer Spaziergang oder ein paar tiefe Atemzüge bringen dich ins Gleichgewicht.',
+            '🌙 Früh schlafen zu gehen lädt dich besser auf als jeder Kaffee.',
+            '💪 Deine Energie ist hoch; steck sie in Bewegung, die dir Freude macht.',
+        ],
+        'growth': [
+            '🌱 Nimm dir einen Moment, um zu sehen, wie weit du schon gekommen bist.',
+            '📖 Etwas Neues zu lernen, und sei es noch so klein, hebt deine Stimmung.',
+            '🔮 Lass eine Sorge los, die dir nicht mehr dient.',
+            '🌈 Dankbarkeit macht aus einem gewöhnlichen Moment einen besonderen.',
+        ],
+        'closing': [
+            '✨ Vertraue deinem Weg — das Universum ist heute auf deiner Seite.',
+            '🌟 Lass dein Licht scheinen, und der Tag antwortet dir ebenso.',
+            '💫 Jeder Schritt heute sät einen Samen für morgen.',
+            '🌙 Geh sanft, träume mutig, und die Sterne folgen dir.',
+        ],
+    },
+    'hi': {
+        'signs': {
+            'Aries': 'मेष', 'Taurus': 'वृषभ', 'Gemini': 'मिथुन', 'Cancer': 'कर्क',
+            'Leo': 'सिंह', 'Virgo': 'कन्या', 'Libra': 'तुला', 'Scorpio': 'वृश्चिक',
+            'Sagittarius': 'धनु', 'Capricorn': 'मकर', 'Aquarius': 'कुंभ', 'Pisces': 'मीन',
+        },
+        'header': '{symbol} {sign} राशिफल · {date}',
+        'greeting': [
+            'प्रिय {name}, आज सितारों के पास आपके लिए एक संदेश है ✨',
+            '{name}, आज आकाश आपसे यह कह रहा है 🌙',
+            'नमस्ते {name}! ग्रह आज आपका मार्गदर्शन करने के लिए तैयार हैं 🌟',
+        ],
+        'element': {
+            'fire': '🔥 आपकी अग्नि जैसी ऊर्जा तेज़ है — साहस को राह दिखाने दें।',
+            'earth': '🌿 आपका स्थिर स्वभाव आपकी ताक़त है — धीमे पर पक्के क़दम स्थायी फल देंगे।',
+            'air': '🌬️ आपका जिज्ञासु मन बेचैन है — हवा नए विचार लेकर आ रही है।',
+            'water': '🌊 आपकी अंतर्ज्ञान शक्ति गहरी है — भीतर की शांत आवाज़ पर भरोसा करें।',
+        },
+        'day': [
+            '☀️ दिन की शुरुआत शांत ऊर्जा से होगी, स्पष्ट लक्ष्य तय करने का अच्छा समय है।',
+            '🌅 आज एक नई लय आ रही है — छोटे बदलाव बड़ी राहत देंगे।',
+            '🌤️ आज ब्रह्मांड की हल्की हवाएँ जल्दबाज़ी के बजाय धैर्य का साथ देती हैं।',
+            '⭐ दोपहर से पहले प्रेरणा की एक अनपेक्षित चिंगारी मिल सकती है।',
+        ],
+        'love': [
+            '💖 प्रेम में एक सच्चा शब्द वह दरवाज़ा खोल देगा जो बंद लग रहा था।',
+            '💞 कोई क़रीबी आपकी गर्मजोशी के इशारे का इंतज़ार कर रहा है — उसे ज़ाहिर करें।',
+            '❤️ रोमांस छोटी-छोटी बातों से बढ़ता है; एक प्यारा संदेश बहुत मायने रखता है।',
+            '💫 पुरानी ग़लतफ़हमियाँ नरम पड़ रही हैं, कोमलता के लिए जगह बन रही है।',
+        ],
+        'career': [
+            '💼 काम में एक समय पर एक ही काम पर ध्यान दें, आप समय से पहले पूरा कर लेंगे।',
+            '📈 आपका एक व्यावहारिक विचार सुने जाने लायक है — उसे ज़रूर कहें।',
+            '🧭 अभी जल्दी फ़ैसलों से ज़्यादा सोच-समझकर बनाई गई योजना फल देगी।',
+            '🤝 सहयोग से सफलता मिलेगी; कोई सहकर्मी क़ीमती मदद दे सकता है।',
+        ],
+        'health': [
+            '🍃 आपका शरीर आराम और पानी माँग रहा है — उसकी सुनें।',
+            '🧘 थोड़ी सैर या कुछ गहरी साँसें आपका संतुलन लौटा देंगी।',
+            '🌙 जल्दी सोना किसी भी कॉफ़ी से बेहतर ऊर्जा देगा।',
+            '💪 आपकी ऊर्जा ऊँची है; उसे अपनी पसंद की किसी गतिविधि में लगाएँ।',
+        ],
+        'growth': [
+            '🌱 एक पल रुककर देखें कि आप कितना आगे आ चुके हैं।',
+            '📖 कुछ नया सीखना, चाहे छोटा ही हो, मन को ऊँचा उठाएगा।',
+            '🔮 एक ऐसी चिंता छोड़ दें जो अब आपके काम की नहीं है।',
+            '🌈 कृतज्ञता एक साधारण पल को ख़ास बना देती है।',
+        ],
+        'closing': [
+            '✨ अपने रास्ते पर भरोसा रखें — आज ब्रह्मांड आपके साथ है।',
+            '🌟 अपनी रोशनी बिखेरें, और दिन भी आपको वैसा ही जवाब देगा।',
+            '💫 आज का हर क़दम कल के लिए एक बीज बोता है।',
+            '🌙 धीरे चलें, बड़े सपने देखें, और सितारे आपके साथ चलेंगे।',
+        ],
+    },
+    'ar': {
+        'signs': {
+            'Aries': 'الحمل', 'Taurus': 'الثور', 'Gemini': 'الجوزاء', 'Cancer': 'السرطان',
+            'Leo': 'الأسد', 'Virgo': 'العذراء', 'Libra': 'الميزان', 'Scorpio': 'العقرب',
+            'Sagittarius': 'القوس', 'Capricorn': 'الجدي', 'Aquarius': 'الدلو', 'Pisces': 'الحوت',
+        },
+        'header': '{symbol} برج {sign} · {date}',
+        'greeting': [
+            'عزيزي {name}، تحمل لك النجوم رسالة اليوم ✨',
+            '{name}، هذا ما تهمس به السماء لك اليوم 🌙',
+            'يوم سعيد يا {name}! الكواكب مصطفّة لترشدك 🌟',
+        ],
+        'element': {
+            'fire': '🔥 روحك النارية متّقدة — دع شجاعتك تقودك.',
+            'earth': '🌿 ثباتك هو مرساتك — الخطوات الواثقة تأتي بنتائج دائمة.',
+            'air': '🌬️ عقلك الفضولي لا يهدأ — الرياح تحمل إليك أفكاراً جديدة.',
+            'water': '🌊 حدسك عميق — ثق بالصوت الهادئ في داخلك.',
+        },
+        'day': [
+            '☀️ يبدأ اليوم بطاقة هادئة، وهو وقت مثالي لتحديد أهداف واضحة.',
+            '🌅 إيقاع جديد يصل اليوم — التغييرات الصغيرة تجلب راحة كبيرة.',
+            '🌤️ الرياح الكونية اللطيفة تفضّل الصبر على العجلة اليوم.',
+            '⭐ قد تصلك شرارة إلهام غير متوقعة قبل الظهر.',
+        ],
+        'love': [
+            '💖 في الحب، كلمة صادقة تفتح باباً بدا مغلقاً.',
+            '💞 شخص قريب ينتظر إشارة من دفئك — شاركه إياها.',
+            '❤️ الرومانسية تنمو بالتفاصيل الصغيرة؛ رسالة لطيفة تصنع الفرق.',
+            '💫 سوء الفهم القديم يلين، ويفسح المجال للحنان.',
+        ],
+        'career': [
+            '💼 في العمل، ركّز على مهمة واحدة في كل مرة وستنتهي قبل الموعد.',
+            '📈 فكرتك العملية تستحق أن تُسمع — تحدّث عنها.',
+            '🧭 التخطيط المتأني الآن أجدى من القرارات السريعة.',
+            '🤝 التعاون يجلب النجاح؛ قد يقدّم لك زميل مساعدة قيّمة.',
+        ],
+        'health': [
+            '🍃 جسدك يطلب الراحة والماء — أصغِ إليه.',
+            '🧘 نزهة قصيرة أو بضعة أنفاس عميقة ستعيد إليك توازنك.',
+            '🌙 النوم المبكر سيجدّد طاقتك أكثر من أي قهوة.',
+            '💪 طاقتك عالية؛ وجّهها إلى حركة تستمتع بها.',
+        ],
+        'growth': [
+            '🌱 خذ لحظة لتلاحظ كم قطعت من الطريق.',
+            '📖 تعلّم شيء جديد، مهما كان صغيراً، يرفع معنوياتك.',
+            '🔮 تخلَّ عن قلق واحد لم يعد يفيدك.',
+            '🌈 الامتنان يحوّل اللحظة العادية إلى لحظة مميزة.',
+        ],
+        'closing': [
+            '✨ ثق بطريقك — الكون إلى جانبك اليوم.',
+            '🌟 دع نورك يسطع، وسيرد اليوم بالمثل.',
+            '💫 كل خطوة تخطوها اليوم تزرع بذرة للغد.',
+            '🌙 امشِ برفق واحلم بجرأة، وستتبعك النجوم.',
+        ],
+    },
+    'it': {
+        'signs': {
+            'Aries': 'Ariete', 'Taurus': 'Toro', 'Gemini': 'Gemelli', 'Cancer': 'Cancro',
+            'Leo': 'Leone', 'Virgo': 'Vergine', 'Libra': 'Bilancia', 'Scorpio': 'Scorpione',
+            'Sagittarius': 'Sagittario', 'Capricorn': 'Capricorno', 'Aquarius': 'Acquario', 'Pisces': 'Pesci',
+        },
+        'header': '{symbol} Oroscopo {sign} · {date}',
+        'greeting': [
+            'Caro/a {name}, oggi le stelle hanno un messaggio per te ✨',
+            '{name}, ecco cosa ti sussurra il cielo oggi 🌙',
+            'Buongiorno, {name}! I pianeti si allineano per guidarti 🌟',
+        ],
+        'element': {
+            'fire': '🔥 Il tuo spirito di fuoco brilla intenso — lascia che il coraggio ti guidi.',
+            'earth': '🌿 La tua concretezza è la tua àncora — passi sicuri portano risultati duraturi.',
+            'air': '🌬️ La tua mente curiosa non si ferma — il vento porta nuove idee.',
+            'water': '🌊 La tua intuizione è profonda — fidati della voce quieta dentro di te.',
+        },
+        'day': [
+            '☀️ La giornata si apre con un’energia calma, perfetta per fissare obiettivi chiari.',
+            '🌅 Oggi arriva un ritmo nuovo — piccoli cambiamenti portano grande sollievo.',
+            '🌤️ Venti cosmici gentili oggi premiano la pazienza più della fretta.',
+            '⭐ Una scintilla d’ispirazione inattesa potrebbe arrivare prima di mezzogiorno.',
+        ],
+        'love': [
+            '💖 In amore, una parola sincera apre una porta che sembrava chiusa.',
+            '💞 Una persona vicina aspetta un segno del tuo calore — mostralo.',
+            '❤️ Il romanticismo cresce nei piccoli gesti; un messaggio gentile conta molto.',
+            '💫 Vecchi malintesi si sciolgono, lasciando spazio alla tenerezza.',
+        ],
+        'career': [
+            '💼 Al lavoro, concentrati su un compito alla volta e finirai in anticipo.',
+            '📈 Una tua idea pratica merita di essere ascoltata — parlane.',
+            '🧭 Ora una pianificazione attenta rende più delle decisioni rapide.',
+            '🤝 La collaborazione porta successo; un collega potrebbe offrirti un aiuto prezioso.',
+        ],
+        'health': [
+            '🍃 Il tuo corpo chiede riposo e acqua — ascoltalo.',
+            '🧘 Una breve passeggiata o qualche respiro profondo ti ridaranno equilibrio.',
+            '🌙 Andare a letto presto ti ricaricherà più di qualsiasi caffè.',
+            '💪 La tua energia è alta; incanalala in un movimento che ami.',
+        ],
+        'growth': [
+            '🌱 Prenditi un momento per notare quanta strada hai già fatto.',
+            '📖 Imparare qualcosa di nuovo, anche di piccolo, ti solleva lo spirito.',
+            '🔮 Lascia andare una preoccupazione che non ti serve più.',
+            '🌈 La gratitudine trasforma un momento qualunque in uno speciale.',
+        ],
+        'closing': [
+            '✨ Fidati del tuo cammino — oggi l’universo è dalla tua parte.',
+            '🌟 Fai brillare la tua luce, e la giornata ti risponderà allo stesso modo.',
+            '💫 Ogni passo di oggi pianta un seme per domani.',
+            '🌙 Cammina con dolcezza, sogna con audacia, e le stelle ti seguiranno.',
+        ],
+    },
+    'fr': {
+        'signs': {
+            'Aries': 'Bélier', 'Taurus': 'Taureau', 'Gemini': 'Gémeaux', 'Cancer': 'Cancer',
+            'Leo': 'Lion', 'Virgo': 'Vierge', 'Libra': 'Balance', 'Scorpio': 'Scorpion',
+            'Sagittarius': 'Sagittaire', 'Capricorn': 'Capricorne', 'Aquarius': 'Verseau', 'Pisces': 'Poissons',
+        },
+        'header': '{symbol} Horoscope {sign} · {date}',
+        'greeting': [
+            'Cher/Chère {name}, les étoiles ont un message pour vous aujourd’hui ✨',
+            '{name}, voici ce que le ciel vous murmure aujourd’hui 🌙',
+            'Bonjour, {name} ! Les planètes s’alignent pour vous guider 🌟',
+        ],
+        'element': {
+            'fire': '🔥 Votre esprit de feu brille fort — laissez votre courage montrer la voie.',
+            'earth': '🌿 Votre nature posée est votre ancre — des pas assurés apportent des résultats durables.',
+            'air': '🌬️ Votre esprit curieux ne tient pas en place — le vent apporte de nouvelles idées.',
+            'water': '🌊 Votre intuition est profonde — faites confiance à la petite voix intérieure.',
+        },
+        'day': [
+            '☀️ La journée s’ouvre sur une énergie calme, idéale pour fixer des intentions claires.',
+            '🌅 Un nouveau rythme s’installe aujourd’hui — de petits changements apportent un grand soulagement.',
+            '🌤️ De doux vents cosmiques favorisent aujourd’hui la patience plutôt que la hâte.',
+            '⭐ Une étincelle d’inspiration inattendue pourrait arriver avant midi.',
+        ],
+        'love': [
+            '💖 En amour, une parole sincère ouvre une porte qui semblait fermée.',
+            '💞 Un proche attend un signe de votre chaleur — partagez-le.',
+            '❤️ La romance grandit dans les petits gestes ; un message tendre compte beaucoup.',
+            '💫 Les vieux malentendus s’adoucissent et laissent place à la tendresse.',
+        ],
+        'career': [
+            '💼 Au travail, concentrez-vous sur une tâche à la fois et vous finirez en avance.',
+            '📈 Une de vos idées pratiques mérite d’être entendue — exprimez-la.',
+            '🧭 Une planification soignée paie davantage que des décisions rapides.',
+            '🤝 La coopération mène au succès ; un collègue pourrait vous offrir une aide précieuse.',
+        ],
+        'health': [
+            '🍃 Votre corps réclame du repos et de l’eau — écoutez-le.',
+            '🧘 Une courte promenade ou quelques respirations profondes rétabliront votre équilibre.',
+            '🌙 Se coucher tôt vous ressourcera mieux que n’importe quel café.',
+            '💪 Votre énergie est haute ; canalisez-la dans une activité que vous aimez.',
+        ],
+        'growth': [
+            '🌱 Prenez un instant pour mesurer le chemin déjà parcouru.',
+            '📖 Apprendre quelque chose de nouveau, même de petit, vous remonte le moral.',
+            '🔮 Laissez partir une inquiétude qui ne vous sert plus.',
+            '🌈 La gratitude transforme un moment ordinaire en moment précieux.',
+        ],
+        'closing': [
+            '✨ Faites confiance à votre chemin — l’univers est avec vous aujourd’hui.',
+            '🌟 Laissez briller votre lumière, et la journée vous le rendra.',
+            '💫 Chaque pas d’aujourd’hui sème une graine pour demain.',
+            '🌙 Avancez doucement, rêvez grand, et les étoiles vous suivront.',
+        ],
+    },
+}
@@ -1,15 +1,25 @@
 import logging
-from datetime import date
-from typing import TYPE_CHECKING
+from datetime import date, datetime, timedelta
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Optional
 
 from asgiref.sync import sync_to_async
+from django.conf import settings
 
+from core.metrics import HOROSCOPE_FALLBACKS_TOTAL
 from horoscope.entities import HoroscopeEntity, UserProfileEntity
 from horoscope.enums import HoroscopeType
+from horoscope.services.fallback import (
+    FALLBACK_MODEL,
+    acall_with_deadline,
+    call_with_deadline,
+    generate_fallback_horoscope,
+)
 from horoscope.utils import get_zodiac_sign
 
 if TYPE_CHECKING:
     from horoscope.repositories import HoroscopeRepository, LLMUsageRepository, UserProfileRepository
+    from horoscope.services.llm import LLMResult
 
 logger = logging.getLogger(__name__)
 
@@ -30,49 +40,142 @@ class HoroscopeService:
         telegram_uid: int,
         target_date: date,
         horoscope_type: HoroscopeType = HoroscopeType.DAILY,
+        deliver_at: Optional[datetime] = None,
     ) -> HoroscopeEntity:
+        existing, profile = self._existing_or_profile(telegram_uid, target_date)
+        if existing:
+            return existing
+
+        llm_result = self._generate_text_or_fallback(profile=profile, target_date=target_date)
+        return self._save_generated(profile, llm_result, target_date, horoscope_type, deliver_at)
+
+    def upgrade_fallback(self, horoscope: HoroscopeEntity) -> bool:
+        """
+        Replace a fallback horoscope's text with one written by the LLM.
+
+        Returns False if the user has no profile any more or the horoscope was
+        delivered in the meantime. LLM errors and timeouts are raised.
+        """
+        profile = self.user_profile_repo.get_by_telegram_uid(horoscope.user_telegram_uid)
+        if not profile:
+            return False
+
+        llm_result = call_with_deadline(
+            self._generate_call(profile, horoscope.date),
+            settings.HOROSCOPE_LLM_LATENCY_BUDGET_SECONDS,
+        )
+        return self._save_upgrade(horoscope, llm_result)
+
+    def _existing_or_profile(
+        self,
+        telegram_uid: int,
+        target_date: date,
+    ) -> tuple[Optional[HoroscopeEntity], Optional[UserProfileEntity]]:
         existing = self.horoscope_repo.get_by_user_and_date(
             telegram_uid=telegram_uid,
             target_date=target_date,
         )
         if existing:
-            return existing
+            return existing, None
 
         profile = self.user_profile_repo.get_by_telegram_uid(telegram_uid)
         if not profile:
             raise ValueError(f"No profile found for user {telegram_uid}")
+        return None, profile
 
-        full_text, teaser_text, extended_teaser_text, llm_result = self._generate_text(
-            profile=profile,
-            target_date=target_date,
-            language=profile.preferred_language,
-        )
+    def _save_generated(
+        self,
+        profile: UserProfileEntity,
+        llm_result: "LLMResult",
+        target_date: date,
+        horoscope_type: HoroscopeType,
+        deliver_at: Optional[datetime],
+    ) -> HoroscopeEntity:
+        telegram_uid = profile.user_telegram_uid
+        generated_by_fallback = llm_result.model == FALLBACK_MODEL
 
         horoscope = self.horoscope_repo.create_horoscope(
             telegram_uid=telegram_uid,
             horoscope_type=horoscope_type,
             target_date=target_date,
-            full_text=full_text,
-            teaser_text=teaser_text,
-            extended_teaser_text=extended_teaser_text,
+            full_text=llm_result.full_text,
+            deliver_at=self._delivery_time(profile, deliver_at),
+            generated_by_fallback=generated_by_fallback,
         )
 
+        if not generated_by_fallback:
+            self.llm_usage_repo.create_usage(
+                horoscope_id=horoscope.id,
+                model=llm_result.model,
+                input_tokens=llm_result.input_tokens,
+                output_tokens=llm_result.output_tokens,
+            )
+
+        logger.info(f"Generated {horoscope_type} horoscope for user {telegram_uid} on {target_date}")
+        return horoscope
+
+    def _save_upgrade(self, horoscope: HoroscopeEntity, llm_result: "LLMResult") -> bool:
+        if not self.horoscope_repo.replace_fallback_text(horoscope.id, llm_result.full_text):
+            return False
+
         self.llm_usage_repo.create_usage(
             horoscope_id=horoscope.id,
             model=llm_result.model,
             input_tokens=llm_result.input_tokens,
             output_tokens=llm_result.output_tokens,
         )
+        logger.info(f"Upgraded fallback horoscope {horoscope.id} of user {horoscope.user_telegram_uid}")
+        return True
 
-        logger.info(f"Generated {horoscope_type} horoscope for user {telegram_uid} on {target_date}")
-        return horoscope
+    def _generate_call(self, profile: UserProfileEntity, target_date: date) -> Callable[[], "LLMResult"]:
+        return partial(
+            self._generate_text,
+            profile=profile,
+            target_date=target_date,
+            language=profile.preferred_language,
+        )
+
+    def _generate_text_or_fallback(self, profile: UserProfileEntity, target_date: date) -> "LLMResult":
+        """LLM text within the latency budget, or an offline one if the LLM fails or is too slow."""
+        generate = self._generate_call(profile, target_date)
+        if not settings.HOROSCOPE_FALLBACK_ENABLED:
+            return generate()
+
+        try:
+            return call_with_deadline(generate, settings.HOROSCOPE_LLM_LATENCY_BUDGET_SECONDS)
+        except Exception as e:
+            return self._fallback(profile, target_date, e)
+
+    async def _agenerate_text_or_fallback(self, profile: UserProfileEntity, target_date: date) -> "LLMResult":
+        generate = self._generate_call(profile, target_date)
+        if not settings.HOROSCOPE_FALLBACK_ENABLED:
+            return await acall_with_deadline(generate, 0)
+
+        try:
+            return await acall_with_deadline(generate, settings.HOROSCOPE_LLM_LATENCY_BUDGET_SECONDS)
+        except Exception as e:
+            return self._fallback(profile, target_date, e)
+
+    @staticmethod
+    def _fallback(profile: UserProfileEntity, target_date: date, error: Exception) -> "LLMResult":
+        reason = type(error).__name__
+        HOROSCOPE_FALLBACKS_TOTAL.inc(reason=reason)
+        logger.warning(
+            f"LLM horoscope for user {profile.user_telegram_uid} failed ({reason}), using the offline fallback"
+        )
+        return generate_fallback_horoscope(
+            zodiac_sign=get_zodiac_sign(profile.date_of_birth),
+            name=profile.name,
+            target_date=target_date,
+            language=profile.preferred_language,
+        )
 
     def _generate_text(
         self,
         profile: UserProfileEntity,
         target_date: date,
         language: str = 'en',
-    ) -> tuple:
+    ) -> "LLMResult":
         from horoscope.services.llm import LLMService
 
         llm_service = LLMService()
@@ -87,16 +190,38 @@ class HoroscopeService:
             language=language,
             birth_time=profile.birth_time,
         )
-        return result.full_text, result.teaser_text, result.extended_teaser_text, result
+        return result
+
+    @staticmethod
+    def _delivery_time(profile: UserProfileEntity, deliver_at: Optional[datetime]) -> Optional[datetime]:
+        """Shift the start of the notification hour to the user's minute (half-hour timezones)."""
+        if deliver_at is None or not profile.effective_notification_minute:
+            return deliver_at
+        return deliver_at + timedelta(minutes=profile.effective_notification_minute % 60)
 
     async def agenerate_for_user(
         self,
         telegram_uid: int,
         target_date: date,
         horoscope_type: HoroscopeType = HoroscopeType.DAILY,
+        deliver_at: Optional[datetime] = None,
     ) -> HoroscopeEntity:
-        return await sync_to_async(self.generate_for_user)(
-            telegram_uid,
-            target_date,
-            horoscope_type,
+        # Only the DB work runs on the shared sync_to_async thread; the LLM
+        # call waits in the deadline pool so other updates' queries go on
+        existing, profile = await sync_to_async(self._existing_or_profile)(telegram_uid, target_date)
+        if existing:
+            return existing
+
+        llm_result = await self._agenerate_text_or_fallback(profile=profile, target_date=target_date)
+        return await sync_to_async(self._save_generated)(profile, llm_result, target_date, horoscope_type, deliver_at)
+
+    async def aupgrade_fallback(self, horoscope: HoroscopeEntity) -> bool:
+        profile = await sync_to_async(self.user_profile_repo.get_by_telegram_uid)(horoscope.user_telegram_uid)
+        if not profile:
+            return False
+
+        llm_result = await acall_with_deadline(
+            self._generate_call(profile, horoscope.date),
+            settings.HOROSCOPE_LLM_LATENCY_BUDGET_SECONDS,
         )
+        return await sync_to_async(self._save_upgrade)(horoscope, llm_result)
@@ -1,18 +1,21 @@
 import logging
 from dataclasses import dataclass
 from datetime import date, time
+from time import perf_counter
 from typing import Optional
 
 from django.conf import settings
 
+from core.metrics import LLM_ERRORS_TOTAL, LLM_REQUEST_SECONDS, LLM_TOKENS_TOTAL
+from core.profiling import record_io
+from core.tracing import span
+
 logger = logging.getLogger(__name__)
 
 
 @dataclass
 class LLMResult:
     full_text: str
-    teaser_text: str
-    extended_teaser_text: str
     model: str
     input_tokens: int
     output_tokens: int
@@ -79,6 +82,51 @@ class LLMService:
     def is_configured(self) -> bool:
         return bool(self.api_key)
 
+    def _complete(self, prompt: str, max_tokens: int, kind: str):
+        """
+        Run a completion through the shared LLM governor, recording latency,
+        token usage and errors per model for every attempt.
+        """
+        from core.containers import container
+
+        response = container.horoscope.llm_governor().call(
+            lambda: self._complete_once(prompt, max_tokens=max_tokens, kind=kind),
+            kind=kind,
+        )
+        usage = response.usage
+        LLM_TOKENS_TOTAL.inc(usage.prompt_tokens, model=self.model, kind=kind, direction='input')
+        LLM_TOKENS_TOTAL.inc(usage.completion_tokens, model=self.model, kind=kind, direction='output')
+        return response
+
+    def _complete_once(self, prompt: str, max_tokens: int, kind: str):
+        import litellm
+
+        started = perf_counter()
+        try:
+            with span(f"llm.{kind}", 'llm', model=self.model) as llm_span:
+                response = litellm.completion(
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    api_key=self.api_key,
+                    api_base=self.base_url,
+                    timeout=self.timeout,
+                    max_tokens=max_tokens,
+                    # Retries are the governor's, with backoff and circuit breaking
+                    num_retries=0,
+                )
+        except Exception as e:
+            LLM_ERRORS_TOTAL.inc(model=self.model, kind=kind, error=type(e).__name__)
+            raise
+        finally:
+            duration = perf_counter() - started
+            LLM_REQUEST_SECONDS.observe(duration, model=self.model, kind=kind)
+            record_io('llm', duration)
+
+        if llm_span is not None:
+            usage = response.usage
+            llm_span.attributes.update(input_tokens=usage.prompt_tokens, output_tokens=usage.completion_tokens)
+        return response
+
     def generate_horoscope_text(
         self,
         zodiac_sign: str,
@@ -90,8 +138,6 @@ class LLMService:
         language: str = 'en',
         birth_time: Optional[time] = None,
     ) -> LLMResult:
-        import litellm
-
         language_name = settings.HOROSCOPE_LANGUAGE_NAMES.get(language, 'English')
 
         birth_time_line = ""
@@ -110,43 +156,14 @@ class LLMService:
             language_name=language_name,
         )
 
-        response = litellm.completion(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}],
-            api_key=self.api_key,
-            api_base=self.base_url,
-            timeout=self.timeout,
-            max_tokens=1000,
-        )
+        response = self._complete(prompt, max_tokens=1000, kind='horoscope')
 
         full_text = response.choices[0].message.content.strip()
 
-        # Build content lines (skip header, greeting, and leading empty lines)
-        lines = full_text.split("\n")
-        content_lines = []
-        skip_count = 0
-        for line in lines:
-            # Skip the first 2 non-empty lines (header and greeting) and leading empty lines
-            if skip_count < 2:
-                if line.strip():
-                    skip_count += 1
-                continue
-            if not content_lines and not line.strip():
-                continue  # skip empty lines between greeting and content
-            content_lines.append(line)
-
-        teaser_lines = content_lines[:settings.HOROSCOPE_TEASER_LINE_COUNT]
-        teaser_text = "\n".join(teaser_lines) + "\n..."
-
-        extended_teaser_lines = content_lines[:settings.HOROSCOPE_EXTENDED_TEASER_LINE_COUNT]
-        extended_teaser_text = "\n".join(extended_teaser_lines) + "\n..."
-
         usage = response.usage
         logger.info(f"Generated LLM horoscope for {name} ({zodiac_sign}) on {target_date} in {language_name}")
         return LLMResult(
             full_text=full_text,
-            teaser_text=teaser_text,
-            extended_teaser_text=extended_teaser_text,
             model=response.model,
             input_tokens=usage.prompt_tokens,
             output_tokens=usage.completion_tokens,
@@ -159,8 +176,6 @@ class LLMService:
         language: str = 'en',
         previous_followups: list | None = None,
     ) -> LLMFollowupResult:
-        import litellm
-
         language_name = settings.HOROSCOPE_LANGUAGE_NAMES.get(language, 'English')
 
         previous_qa = ""
@@ -182,14 +197,7 @@ class LLMService:
             previous_qa=previous_qa,
         )
 
-        response = litellm.completion(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}],
-            api_key=self.api_key,
-            api_base=self.base_url,
-            timeout=self.timeout,
-            max_tokens=500,
-        )
+        response = self._complete(prompt, max_tokens=500, kind='followup')
 
         answer_text = response.choices[0].message.content.strip()
         usage = response.usage
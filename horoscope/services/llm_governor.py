@@ -0,0 +1,402 @@
+"""
+Shared governor of LLM calls: adaptive concurrency, circuit breaker, retries.
+
+Every completion goes through one LLMGovernor, whichever thread makes it:
+
+- Concurrency is limited with AIMD. The limit grows by one per limit's worth
+  of calls answered within LLM_LATENCY_TARGET_SECONDS, and is halved on
+  429s, timeouts, 5xx errors or slower answers. This keeps the request rate
+  near what the provider sustains instead of a fixed guess.
+- Waiting calls are served by priority, then arrival. Interactive calls
+  (followups, first and on-demand horoscopes) go before batch calls
+  (scheduled generation). Priority comes from the llm_priority() context,
+  so it follows the call into sync_to_async and worker threads.
+- After LLM_CIRCUIT_FAILURE_THRESHOLD consecutive provider failures the
+  circuit opens and calls fail fast with LLMCircuitOpen for
+  LLM_CIRCUIT_OPEN_SECONDS. One probe call is then let through, and its
+  outcome closes or reopens the circuit.
+- Retryable errors are retried up to LLM_MAX_RETRIES times, with full
+  jitter exponential backoff.
+- A caller bounding the call with an LLMDeadline (see llm_deadline()) has
+  its budget start once the call gets its first slot, so time spent queued
+  behind other calls doesn't use it up. A call abandoned at its deadline
+  leaves the queue and is not retried.
+"""
+
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Callable, Iterator, Optional, TypeVar
+
+from core.metrics import (
+    LLM_CIRCUIT_STATE,
+    LLM_CONCURRENCY_LIMIT,
+    LLM_IN_FLIGHT,
+    LLM_QUEUE_SECONDS,
+    LLM_RETRIES_TOTAL,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Timeouts, rate limits and server errors; anything else is the request's fault
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class LLMPriority(IntEnum):
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+_current_priority: ContextVar[LLMPriority] = ContextVar('llm_priority', default=LLMPriority.INTERACTIVE)
+
+
+@contextmanager
+def llm_priority(priority: LLMPriority) -> Iterator[None]:
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_llm_priority() -> LLMPriority:
+    return _current_priority.get()
+
+
+class LLMDeadline:
+    """
+    Latency budget of a governed call, not counting the wait for its first slot.
+
+    The caller waits up to remaining() and calls cancel() when it gives up;
+    the governor then drops the call's place in the queue and its retries.
+    """
+
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.seconds = seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._created_at = clock()
+        self._queued_seconds = 0.0
+        self._queued_since: Optional[float] = None
+        self._on_cancel: list[Callable[[], None]] = []
+        self.cancelled = threading.Event()
+
+    @contextmanager
+    def queued(self) -> Iterator[None]:
+        """Stop the clock while the call waits for its first slot."""
+        with self._lock:
+            self._queued_since = self._clock()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._queued_seconds += self._clock() - self._queued_since
+                self._queued_since = None
+
+    def remaining(self) -> float:
+        with self._lock:
+            now = self._clock()
+            queued = self._queued_seconds
+            if self._queued_since is not None:
+                queued += now - self._queued_since
+            return self.seconds - (now - self._created_at - queued)
+
+    def on_cancel(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            self._on_cancel.append(callback)
+
+    def cancel(self) -> None:
+        with self._lock:
+            self.cancelled.set()
+            callbacks = list(self._on_cancel)
+        for callback in callbacks:
+            callback()
+
+
+_current_deadline: ContextVar[Optional[LLMDeadline]] = ContextVar('llm_deadline', default=None)
+
+
+@contextmanager
+def llm_deadline(deadline: LLMDeadline) -> Iterator[None]:
+    token = _current_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _current_deadline.reset(token)
+
+
+class LLMCircuitOpen(Exception):
+    def __init__(self, retry_in_seconds: float):
+        self.retry_in_seconds = retry_in_seconds
+        super().__init__(f"LLM circuit is open, next probe in {retry_in_seconds:.1f}s")
+
+
+class LLMQueueTimeout(TimeoutError):
+    pass
+
+
+class LLMCallCancelled(Exception):
+    """The caller stopped waiting at its deadline; the call makes no further attempt."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Provider-side failures worth retrying: timeouts, connection errors, 408/429/5xx."""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    # litellm errors carry the HTTP status; their timeout and connection errors use 408 and 500
+    return getattr(error, 'status_code', None) in RETRYABLE_STATUS_CODES
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    # Values of the llm_circuit_state gauge
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        open_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def before_call(self) -> None:
+        """Raise LLMCircuitOpen unless a call may go to the provider now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN:
+                retry_in = self._opened_at + self.open_seconds - self._clock()
+                if retry_in > 0:
+                    raise LLMCircuitOpen(retry_in)
+                self._set_state(self.HALF_OPEN)
+            if self._probing:
+                raise LLMCircuitOpen(0)
+            self._probing = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            if self.state != self.CLOSED:
+                logger.info("LLM circuit closed, provider answers again")
+                self._set_state(self.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(
+                        f"LLM circuit opened after {self.failures} failures, failing fast for {self.open_seconds}s"
+                    )
+                self._opened_at = self._clock()
+                self._set_state(self.OPEN)
+
+    def release(self) -> None:
+        """End a call that says nothing about the provider's health (e.g. a rejected request)."""
+        with self._lock:
+            self._probing = False
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        LLM_CIRCUIT_STATE.set(self.STATE_VALUES[state])
+
+
+class AdaptiveConcurrencyLimit:
+    """AIMD concurrency limit with a priority-ordered wait queue."""
+
+    def __init__(
+        self,
+        initial_limit: float,
+        min_limit: float,
+        max_limit: float,
+        latency_target_seconds: float,
+        decrease_factor: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target_seconds = latency_target_seconds
+        self.decrease_factor = decrease_factor
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._waiters: list[tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._last_decrease = float('-inf')
+        self.limit = min(max(initial_limit, min_limit), max_limit)
+        self.in_flight = 0
+        LLM_CONCURRENCY_LIMIT.set(self.limit)
+
+    def acquire(
+        self,
+        priority: LLMPriority,
+        timeout_seconds: Optional[float] = None,
+        cancelled: Optional[threading.Event] = None,
+    ) -> None:
+        """
+        Wait for a slot; callers of higher priority, then earlier ones, are served first.
+
+        Raises LLMCallCancelled once `cancelled` is set; call wake() after setting it.
+        """
+        entry = (int(priority), next(self._sequence))
+        deadline = None if timeout_seconds is None else self._clock() + timeout_seconds
+        with self._condition:
+            heapq.heappush(self._waiters, entry)
+            while self._waiters[0] != entry or self.in_flight >= int(self.limit):
+                remaining = None if deadline is None else deadline - self._clock()
+                if cancelled is not None and cancelled.is_set():
+                    self._leave_queue(entry)
+                    raise LLMCallCancelled()
+                if remaining is not None and remaining <= 0:
+                    self._leave_queue(entry)
+                    raise LLMQueueTimeout(f"No LLM slot within {timeout_seconds}s (limit {int(self.limit)})")
+                self._condition.wait(remaining)
+            heapq.heappop(self._waiters)
+            self.in_flight += 1
+            LLM_IN_FLIGHT.set(self.in_flight)
+            # The next waiter may fit as well
+            self._condition.notify_all()
+
+    def release(self, latency_seconds: float, overloaded: bool = False) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            LLM_IN_FLIGHT.set(self.in_flight)
+            if overloaded or latency_seconds > self.latency_target_seconds:
+                self._decrease()
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            LLM_CONCURRENCY_LIMIT.set(self.limit)
+            self._condition.notify_all()
+
+    def wake(self) -> None:
+        """Let waiting callers recheck whether they were cancelled."""
+        with self._condition:
+            self._condition.notify_all()
+
+    def _leave_queue(self, entry: tuple[int, int]) -> None:
+        self._waiters.remove(entry)
+        heapq.heapify(self._waiters)
+        self._condition.notify_all()
+
+    def _decrease(self) -> None:
+        # Calls already in flight when the provider pushed back report it too;
+        # count them as one signal rather than collapsing the limit
+        now = self._clock()
+        if now - self._last_decrease < self.latency_target_seconds:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+
+
+class LLMGovernor:
+    def __init__(
+        self,
+        limiter: AdaptiveConcurrencyLimit,
+        breaker: CircuitBreaker,
+        max_retries: int = 2,
+        backoff_seconds: float = 0.5,
+        backoff_max_seconds: float = 8.0,
+        queue_timeout_seconds: Optional[float] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.limiter = limiter
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self._sleep = sleep
+
+    @classmethod
+    def from_settings(cls) -> 'LLMGovernor':
+        from django.conf import settings
+
+        return cls(
+            limiter=AdaptiveConcurrencyLimit(
+                initial_limit=settings.LLM_CONCURRENCY_INITIAL,
+                min_limit=settings.LLM_CONCURRENCY_MIN,
+                max_limit=settings.LLM_CONCURRENCY_MAX,
+                latency_target_seconds=settings.LLM_LATENCY_TARGET_SECONDS,
+            ),
+            breaker=CircuitBreaker(
+                failure_threshold=settings.LLM_CIRCUIT_FAILURE_THRESHOLD,
+                open_seconds=settings.LLM_CIRCUIT_OPEN_SECONDS,
+            ),
+            max_retries=settings.LLM_MAX_RETRIES,
+            backoff_seconds=settings.LLM_RETRY_BACKOFF_SECONDS,
+            backoff_max_seconds=settings.LLM_RETRY_BACKOFF_MAX_SECONDS,
+            queue_timeout_seconds=settings.LLM_TIMEOUT,
+        )
+
+    def call(self, func: Callable[[], T], kind: str) -> T:
+        """Run one completion under the limit and circuit, retrying retryable errors."""
+        priority = _current_priority.get()
+        deadline = _current_deadline.get()
+        cancelled = None
+        if deadline is not None:
+            cancelled = deadline.cancelled
+            deadline.on_cancel(self.limiter.wake)
+        for attempt in range(self.max_retries + 1):
+            if cancelled is not None and cancelled.is_set():
+                raise LLMCallCancelled()
+            self.breaker.before_call()
+            # Only the wait for the first slot is kept off the caller's deadline
+            waiting = deadline.queued() if deadline is not None and attempt == 0 else nullcontext()
+            queued = time.perf_counter()
+            try:
+                with waiting:
+                    self.limiter.acquire(priority, self.queue_timeout_seconds, cancelled)
+            except (LLMQueueTimeout, LLMCallCancelled):
+                self.breaker.release()
+                raise
+            started = time.perf_counter()
+            LLM_QUEUE_SECONDS.observe(started - queued, priority=priority.name.lower())
+
+            try:
+                result = func()
+            except Exception as e:
+                retryable = is_retryable(e)
+                self.limiter.release(time.perf_counter() - started, overloaded=retryable)
+                if retryable:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.release()
+                if not retryable or attempt == self.max_retries:
+                    raise
+                LLM_RETRIES_TOTAL.inc(kind=kind, error=type(e).__name__)
+                delay = self.backoff_delay(attempt)
+                logger.warning(f"LLM {kind} call failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                if cancelled is None:
+                    self._sleep(delay)
+                elif cancelled.wait(delay):
+                    raise LLMCallCancelled() from e
+                continue
+
+            self.limiter.release(time.perf_counter() - started)
+            self.breaker.record_success()
+            return result
+        raise AssertionError("unreachable")
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full jitter: uniform up to the capped exponential delay of the attempt."""
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_seconds * 2 ** attempt))
@@ -0,0 +1,57 @@
+import logging
+from typing import TYPE_CHECKING
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from core.enums import SettingType
+
+if TYPE_CHECKING:
+    from core.repositories import SettingRepository
+    from horoscope.repositories import UserProfileRepository
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_HOURS_SETTING_NAME = 'horoscope_notification_hours_config'
+
+
+class NotificationScheduleService:
+    """Keeps UserProfile.effective_notification_hour in sync with the per-language hour settings."""
+
+    def __init__(
+        self,
+        user_profile_repo: "UserProfileRepository",
+        setting_repo: "SettingRepository",
+    ):
+        self.user_profile_repo = user_profile_repo
+        self.setting_repo = setting_repo
+
+    @staticmethod
+    def _current_config() -> dict:
+        return {
+            'hours': dict(sorted(settings.HOROSCOPE_GENERATION_HOURS_UTC.items())),
+            'default_hour': settings.HOROSCOPE_DEFAULT_GENERATION_HOUR_UTC,
+        }
+
+    def refresh_effective_hours(self, force: bool = False) -> int:
+        """
+        Recompute effective notification hours if the hour mapping changed since the last run.
+
+        Returns the number of updated profiles (0 when the mapping is unchanged and force is False).
+        """
+        current_config = self._current_config()
+        stored_config = self.setting_repo.get_value(NOTIFICATION_HOURS_SETTING_NAME)
+        if not force and stored_config == current_config:
+            return 0
+
+        updated = self.user_profile_repo.recompute_effective_notification_hours()
+        self.setting_repo.set_value(
+            name=NOTIFICATION_HOURS_SETTING_NAME,
+            value=current_config,
+            setting_type=SettingType.JSON,
+        )
+        logger.info(f"Recomputed effective notification hour for {updated} profiles")
+        return updated
+
+    async def arefresh_effective_hours(self, force: bool = False) -> int:
+        return await sync_to_async(self.refresh_effective_hours)(force)
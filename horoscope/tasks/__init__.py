@@ -1,4 +1,7 @@
+from horoscope.tasks.archive import archive_old_records
+from horoscope.tasks.deliver_due import deliver_due_horoscopes
 from horoscope.tasks.generate_horoscope import generate_and_send_horoscope, generate_horoscope
+from horoscope.tasks.notification_buckets import rebuild_notification_buckets
 from horoscope.tasks.send_daily_horoscope import (
     generate_daily_for_all_users,
     send_daily_horoscope_notifications,
@@ -8,13 +11,18 @@ from horoscope.tasks.subscription_reminders import (
     send_expiry_reminders,
     send_expired_notifications,
 )
+from horoscope.tasks.upgrade_fallback import upgrade_fallback_horoscopes
 
 __all__ = [
+    'archive_old_records',
+    'deliver_due_horoscopes',
     'generate_horoscope',
     'generate_and_send_horoscope',
     'generate_daily_for_all_users',
+    'rebuild_notification_buckets',
     'send_daily_horoscope_notifications',
     'send_periodic_teaser_notifications',
     'send_expiry_reminders',
     'send_expired_notifications',
+    'upgrade_fallback_horoscopes',
 ]
@@ -0,0 +1,16 @@
+import logging
+
+from aiogram import Bot
+
+logger = logging.getLogger(__name__)
+
+
+async def archive_old_records(bot: Bot) -> int:
+    """
+    Move old horoscopes and message history out of the hot tables into the cold archive.
+    """
+    from core.containers import container
+
+    archive_service = container.horoscope.archive_service()
+    results = await archive_service.aarchive_old_records()
+    return sum(result.archived_count for result in results)
@@ -0,0 +1,71 @@
+import logging
+from datetime import date
+
+from aiogram import Bot
+
+logger = logging.getLogger(__name__)
+
+
+async def deliver_due_horoscopes(bot: Bot) -> int:
+    """
+    Drain the delivery queue: send every horoscope whose deliver_at has passed.
+
+    Subscribers get the full horoscope, non-subscribers a teaser if the teaser
+    rules allow it. Each processed horoscope leaves the queue whether it was
+    sent, failed or skipped, so every run only reads what became due since
+    the previous one. A horoscope whose delivery raised (DB or Bot API error)
+    stays queued and is retried by the next run. Horoscopes queued for an
+    earlier day are dropped unsent.
+    """
+    from django.utils import timezone
+
+    from core.containers import container
+    from horoscope.tasks.send_daily_horoscope import deliver_daily_horoscope
+    from horoscope.tasks.send_periodic_teaser import deliver_teaser
+
+    today = date.today()
+    horoscope_repo = container.horoscope.horoscope_repository()
+    subscription_repo = container.horoscope.subscription_repository()
+
+    due_count = 0
+    sent_count = 0
+    stale_count = 0
+    async for due in horoscope_repo.aiter_due_deliveries(due_at=timezone.now()):
+        due_count += len(due)
+        processed_ids = []
+        for item in due:
+            if item.date != today:
+                stale_count += 1
+                processed_ids.append(item.id)
+                continue
+            try:
+                has_subscription = await subscription_repo.ahas_active_subscription(
+                    telegram_uid=item.user_telegram_uid,
+                )
+                if has_subscription:
+                    sent = await deliver_daily_horoscope(
+                        bot=bot,
+                        telegram_uid=item.user_telegram_uid,
+                        target_date=item.date,
+                    )
+                else:
+                    sent = await deliver_teaser(
+                        bot=bot,
+                        telegram_uid=item.user_telegram_uid,
+                        target_date=item.date,
+                    )
+            except Exception as e:
+                # Individual user failure must not stop delivery for other users
+                logger.error(f"Failed to deliver horoscope {item.id} to user {item.user_telegram_uid}", exc_info=e)
+                continue
+            processed_ids.append(item.id)
+            if sent:
+                sent_count += 1
+        await horoscope_repo.adequeue_deliveries(processed_ids)
+
+    if due_count:
+        logger.info(
+            f"Delivered {sent_count} of {due_count} due horoscopes on {today} "
+            f"({stale_count} from earlier days dropped)"
+        )
+    return sent_count
@@ -1,5 +1,6 @@
 import logging
-from datetime import date
+from datetime import date, datetime
+from typing import Optional
 
 from aiogram import Bot
 from django.utils.translation import gettext_lazy as _
@@ -20,6 +21,7 @@ async def generate_horoscope(
     telegram_uid: int,
     target_date: str,
     horoscope_type: HoroscopeType = HoroscopeType.DAILY,
+    deliver_at: Optional[datetime] = None,
 ) -> None:
     """
     Generate a horoscope for a specific user and date.
@@ -32,6 +34,7 @@ async def generate_horoscope(
         telegram_uid: User's Telegram UID.
         target_date: ISO format date string (YYYY-MM-DD).
         horoscope_type: Type of horoscope ('daily' or 'first').
+        deliver_at: When to queue the horoscope for delivery; None leaves it unqueued.
     """
     from core.containers import container
 
@@ -43,6 +46,7 @@ async def generate_horoscope(
             telegram_uid=telegram_uid,
             target_date=parsed_date,
             horoscope_type=horoscope_type,
+            deliver_at=deliver_at,
         )
         logger.info(
             f"Generated horoscope {horoscope.id} for user {telegram_uid} "
@@ -92,7 +96,7 @@ async def generate_and_send_horoscope(
     subscription_repo = container.horoscope.subscription_repository()
 
     parsed_date = date.fromisoformat(target_date)
-    horoscope = await horoscope_repo.aget_by_user_and_date(
+    horoscope = await horoscope_repo.aget_delivery_by_user_and_date(
         telegram_uid=telegram_uid,
         target_date=parsed_date,
     )
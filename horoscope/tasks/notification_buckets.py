@@ -0,0 +1,25 @@
+import logging
+
+from aiogram import Bot
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_notification_buckets(bot: Bot) -> int:
+    """
+    Move users with an explicit local notification hour into the UTC hour bucket
+    they belong to at the next hour boundary, so DST transitions take effect
+    before the generation run of that hour. Outside a transition nothing changes.
+    """
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    from core.containers import container
+
+    next_hour = timezone.now().replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    user_profile_repo = container.horoscope.user_profile_repository()
+    updated = await user_profile_repo.arebuild_notification_buckets(at=next_hour)
+    if updated:
+        logger.info(f"Moved {updated} profiles to new notification hours for UTC offsets at {next_hour.isoformat()}")
+    return updated
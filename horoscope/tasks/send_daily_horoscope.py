@@ -1,16 +1,24 @@
+import asyncio
 import logging
-from datetime import date
+from datetime import date, datetime
+from typing import Optional
 
 from aiogram import Bot
 
 logger = logging.getLogger(__name__)
 
 
-async def generate_daily_for_all_users(bot: Bot) -> int:
+async def generate_daily_for_all_users(bot: Bot, scheduled_at: Optional[datetime] = None) -> int:
     """
-    Generate daily horoscopes for users whose notification hour matches the current UTC hour.
+    Generate daily horoscopes for users whose notification hour is the UTC hour
+    starting within HOROSCOPE_GENERATION_LEAD_SECONDS.
     - Subscribers: always generate
     - Non-subscribers: only generate if active within HOROSCOPE_ACTIVITY_WINDOW_DAYS
+
+    Generated horoscopes are queued for deliver_due_horoscopes via deliver_at, the
+    start of that hour; until then fallback horoscopes can still be upgraded.
+    When the scheduler catches up a missed run it passes its time as `scheduled_at`;
+    hours from a previous day are skipped since their horoscopes would be stale.
     """
     from datetime import timedelta
 
@@ -19,42 +27,71 @@ async def generate_daily_for_all_users(bot: Bot) -> int:
 
     from core.containers import container
     from horoscope.enums import HoroscopeType
+    from horoscope.services.llm_governor import LLMPriority, llm_priority
     from horoscope.tasks.generate_horoscope import generate_horoscope
 
-    today = date.today()
-    current_utc_hour = timezone.now().hour
+    # Users are picked by notification hour, so their horoscopes are due from the start of it
+    deliver_at = (
+        (scheduled_at or timezone.now()) + timedelta(seconds=settings.HOROSCOPE_GENERATION_LEAD_SECONDS)
+    ).replace(minute=0, second=0, microsecond=0)
+    if deliver_at.date() < timezone.now().date():
+        logger.info(f"Skipping daily horoscope generation for past hour {deliver_at.isoformat()}")
+        return 0
+    today = deliver_at.date()
+    current_utc_hour = deliver_at.hour
     user_profile_repo = container.horoscope.user_profile_repository()
     subscription_repo = container.horoscope.subscription_repository()
     user_repo = container.core.user_repository()
 
-    telegram_uids = await user_profile_repo.aget_telegram_uids_by_notification_hour(
-        hour_utc=current_utc_hour,
-    )
-
     activity_cutoff = timezone.now() - timedelta(days=settings.HOROSCOPE_ACTIVITY_WINDOW_DAYS)
 
-    count = 0
-    for telegram_uid in telegram_uids:
-        has_subscription = await subscription_repo.ahas_active_subscription(telegram_uid=telegram_uid)
-
-        if not has_subscription:
-            user = await user_repo.aget(telegram_uid)
-            if not user:
-                continue
-            if not user.last_activity or user.last_activity < activity_cutoff:
-                continue
+    # Generations run concurrently, as many at once as the shared LLM
+    # governor currently lets through, so none waits for a slot long enough
+    # to miss its latency budget; interactive calls are still served first
+    limiter = container.horoscope.llm_governor().limiter
 
+    async def generate(telegram_uid: int) -> bool:
         try:
             await generate_horoscope(
                 bot=bot,
                 telegram_uid=telegram_uid,
                 target_date=today.isoformat(),
                 horoscope_type=HoroscopeType.DAILY,
+                deliver_at=deliver_at,
             )
-            count += 1
+            return True
         except Exception as e:
             # Individual user failure must not stop generation for other users
             logger.error(f"Failed to generate daily horoscope for user {telegram_uid}", exc_info=e)
+            return False
+
+    count = 0
+    telegram_uid_chunks = user_profile_repo.aiter_telegram_uids_by_notification_hour(
+        hour_utc=current_utc_hour,
+    )
+    with llm_priority(LLMPriority.BATCH):
+        async for telegram_uids in telegram_uid_chunks:
+            eligible_uids = []
+            for telegram_uid in telegram_uids:
+                has_subscription = await subscription_repo.ahas_active_subscription(telegram_uid=telegram_uid)
+
+                if not has_subscription:
+                    user = await user_repo.aget(telegram_uid)
+                    if not user:
+                        continue
+                    if not user.last_activity or user.last_activity < activity_cutoff:
+                        continue
+                eligible_uids.append(telegram_uid)
+
+            running = set()
+            for telegram_uid in eligible_uids:
+                while len(running) >= max(int(limiter.limit), 1):
+                    done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                    count += sum(task.result() for task in done)
+                running.add(asyncio.create_task(generate(telegram_uid)))
+            if running:
+                done, _ = await asyncio.wait(running)
+                count += sum(task.result() for task in done)
 
     logger.info(f"Generated daily horoscopes for {count} users on {today} (UTC hour={current_utc_hour})")
     return count
@@ -65,59 +102,72 @@ async def send_daily_horoscope_notifications(bot: Bot) -> int:
     Send daily horoscope notifications to subscribers who have generated but unsent horoscopes.
     Queries all unsent horoscopes for today regardless of current hour to avoid race conditions
     between generation and sending tasks.
-    """
-    from django.utils.translation import gettext_lazy as _
 
+    Regular delivery goes through deliver_due_horoscopes; this full scan is kept for
+    manual sweeps via run_task.
+    """
     from core.containers import container
-    from horoscope.tasks.messaging import send_message
-    from horoscope.utils import translate
 
     today = date.today()
-    user_profile_repo = container.horoscope.user_profile_repository()
     horoscope_repo = container.horoscope.horoscope_repository()
     subscription_repo = container.horoscope.subscription_repository()
 
-    telegram_uids = await horoscope_repo.aget_unsent_telegram_uids_for_date(
+    count = 0
+    telegram_uid_chunks = horoscope_repo.aiter_unsent_telegram_uids_for_date(
         target_date=today,
     )
+    async for telegram_uids in telegram_uid_chunks:
+        for telegram_uid in telegram_uids:
+            has_subscription = await subscription_repo.ahas_active_subscription(
+                telegram_uid=telegram_uid,
+            )
+            if not has_subscription:
+                continue
 
-    count = 0
-    for telegram_uid in telegram_uids:
-        has_subscription = await subscription_repo.ahas_active_subscription(
-            telegram_uid=telegram_uid,
-        )
-        if not has_subscription:
-            continue
-
-        horoscope = await horoscope_repo.aget_by_user_and_date(
-            telegram_uid=telegram_uid,
-            target_date=today,
-        )
-        if not horoscope:
-            continue
-
-        if horoscope.sent_at is not None:
-            continue
-
-        profile = await user_profile_repo.aget_by_telegram_uid(telegram_uid)
-        lang = profile.preferred_language if profile else 'en'
-
-        text = horoscope.full_text + translate(_(
-            "\n"
-            "\n"
-            "💬 You can ask questions about your horoscope — just type your message!"
-        ), lang)
-
-        success = await send_message(
-            bot=bot,
-            telegram_uid=telegram_uid,
-            text=text,
-        )
-        if success:
-            await horoscope_repo.amark_sent(horoscope_id=horoscope.id)
-            count += 1
-        else:
-            await horoscope_repo.amark_failed_to_send(horoscope_id=horoscope.id)
+            if await deliver_daily_horoscope(bot=bot, telegram_uid=telegram_uid, target_date=today):
+                count += 1
 
     logger.info(f"Sent daily horoscope to {count} subscribers on {today}")
     return count
+
+
+async def deliver_daily_horoscope(bot: Bot, telegram_uid: int, target_date: date) -> bool:
+    """Send a subscriber's full horoscope for `target_date` unless already sent. Returns True if sent."""
+    from django.utils.translation import gettext_lazy as _
+
+    from core.containers import container
+    from horoscope.tasks.messaging import send_message
+    from horoscope.utils import translate
+
+    user_profile_repo = container.horoscope.user_profile_repository()
+    horoscope_repo = container.horoscope.horoscope_repository()
+
+    horoscope = await horoscope_repo.aget_delivery_by_user_and_date(
+        telegram_uid=telegram_uid,
+        target_date=target_date,
+    )
+    if not horoscope:
+        return False
+
+    if horoscope.sent_at is not None:
+        return False
+
+    profile = await user_profile_repo.aget_by_telegram_uid(telegram_uid)
+    lang = profile.preferred_language if profile else 'en'
+
+    text = horoscope.full_text + translate(_(
+        "\n"
+        "\n"
+        "💬 You can ask questions about your horoscope — just type your message!"
+    ), lang)
+
+    success = await send_message(
+        bot=bot,
+        telegram_uid=telegram_uid,
+        text=text,
+    )
+    if success:
+        await horoscope_repo.amark_sent(horoscope_id=horoscope.id)
+    else:
+        await horoscope_repo.amark_failed_to_send(horoscope_id=horoscope.id)
+    return success
@@ -15,6 +15,42 @@ async def send_periodic_teaser_notifications(bot: Bot) -> int:
     Only sends to users who:
     - Do NOT have an active subscription
     - Have been active within HOROSCOPE_ACTIVITY_WINDOW_DAYS
+
+    Regular delivery goes through deliver_due_horoscopes; this full scan is kept for
+    manual sweeps via run_task.
+    """
+    from core.containers import container
+
+    today = date.today()
+    horoscope_repo = container.horoscope.horoscope_repository()
+    subscription_repo = container.horoscope.subscription_repository()
+
+    count = 0
+    found = 0
+    telegram_uid_chunks = horoscope_repo.aiter_unsent_telegram_uids_for_date(
+        target_date=today,
+    )
+    async for telegram_uids in telegram_uid_chunks:
+        found += len(telegram_uids)
+        for telegram_uid in telegram_uids:
+            has_subscription = await subscription_repo.ahas_active_subscription(
+                telegram_uid=telegram_uid,
+            )
+            if has_subscription:
+                continue
+
+            if await deliver_teaser(bot=bot, telegram_uid=telegram_uid, target_date=today):
+                count += 1
+
+    logger.info(f"Found {found} unsent horoscopes for today")
+    logger.info(f"Sent periodic teaser horoscope to {count} non-subscribers on {today}")
+    return count
+
+
+async def deliver_teaser(bot: Bot, telegram_uid: int, target_date: date) -> bool:
+    """
+    Send a non-subscriber the teaser of their horoscope for `target_date` if the
+    activity window and teaser phase allow it. Returns True if sent.
     """
     from datetime import timedelta
 
@@ -27,7 +63,6 @@ async def send_periodic_teaser_notifications(bot: Bot) -> int:
     from horoscope.tasks.messaging import send_message
     from horoscope.utils import translate
 
-    today = date.today()
     now = timezone.now()
     activity_cutoff = now - timedelta(days=settings.HOROSCOPE_ACTIVITY_WINDOW_DAYS)
 
@@ -36,85 +71,72 @@ async def send_periodic_teaser_notifications(bot: Bot) -> int:
     subscription_repo = container.horoscope.subscription_repository()
     user_repo = container.core.user_repository()
 
-    telegram_uids = await horoscope_repo.aget_unsent_telegram_uids_for_date(
-        target_date=today,
-    )
-
-    logger.info(f"Found {len(telegram_uids)} unsent horoscopes for today")
+    user = await user_repo.aget(telegram_uid)
+    if not user:
+        return False
 
-    count = 0
-    for telegram_uid in telegram_uids:
-        has_subscription = await subscription_repo.ahas_active_subscription(
-            telegram_uid=telegram_uid,
-        )
-        if has_subscription:
-            continue
+    if not user.last_activity or user.last_activity < activity_cutoff:
+        return False
 
-        user = await user_repo.aget(telegram_uid)
-        if not user:
-            continue
+    # Text is loaded only once we know the teaser will actually be sent
+    delivery_state = await horoscope_repo.aget_delivery_state_by_user_and_date(
+        telegram_uid=telegram_uid,
+        target_date=target_date,
+    )
+    if not delivery_state:
+        return False
 
-        if not user.last_activity or user.last_activity < activity_cutoff:
-            continue
+    if delivery_state.sent_at is not None:
+        return False
 
-        horoscope = await horoscope_repo.aget_by_user_and_date(
-            telegram_uid=telegram_uid,
-            target_date=today,
-        )
-        if not horoscope:
-            continue
+    profile = await user_profile_repo.aget_by_telegram_uid(telegram_uid)
+    if not profile:
+        return False
 
-        if horoscope.sent_at is not None:
-            continue
+    lang = profile.preferred_language or 'en'
 
-        profile = await user_profile_repo.aget_by_telegram_uid(telegram_uid)
-        if not profile:
-            continue
-
-        lang = profile.preferred_language or 'en'
+    latest_subscription = await subscription_repo.aget_latest_by_user(
+        telegram_uid=telegram_uid,
+    )
+    reference_date = (
+        latest_subscription.expires_at
+        if latest_subscription and latest_subscription.expires_at
+        else profile.created_at
+    )
+    days_since_reference = (now - reference_date).days
 
-        latest_subscription = await subscription_repo.aget_latest_by_user(
-            telegram_uid=telegram_uid,
-        )
-        reference_date = (
-            latest_subscription.expires_at
-            if latest_subscription and latest_subscription.expires_at
-            else profile.created_at
-        )
-        days_since_reference = (now - reference_date).days
-
-        if days_since_reference <= settings.HOROSCOPE_TEASER_DAILY_DAYS:
-            # Phase 1: first N days — send short teaser daily
-            text = horoscope.teaser_text
-        else:
-            # Phase 2: after N days — send extended teaser every M days
-            last_sent_at = await horoscope_repo.aget_last_sent_at(
-                telegram_uid=telegram_uid,
-            )
-            if last_sent_at is not None:
-                days_since_last_sent = (now - last_sent_at).days
-                if days_since_last_sent < settings.HOROSCOPE_PERIODIC_TEASER_INTERVAL_DAYS:
-                    continue
-            text = horoscope.extended_teaser_text
-
-        text += translate(_(
-            "\n"
-            "\n"
-            "\U0001f512 Subscribe to see your full daily horoscope!"
-        ), lang)
-        keyboard = subscribe_keyboard(language=lang)
-
-        success = await send_message(
-            bot=bot,
+    # Phase 1: first N days — send short teaser daily
+    # Phase 2: after N days — send extended teaser every M days
+    use_extended_teaser = days_since_reference > settings.HOROSCOPE_TEASER_DAILY_DAYS
+    if use_extended_teaser:
+        last_sent_at = await horoscope_repo.aget_last_sent_at(
             telegram_uid=telegram_uid,
-            text=text,
-            reply_markup=keyboard,
         )
-        if success:
-            await horoscope_repo.amark_sent(horoscope_id=horoscope.id)
-            count += 1
-        else:
-            await horoscope_repo.amark_failed_to_send(horoscope_id=horoscope.id)
-
-    logger.info(f"Sent periodic teaser horoscope to {count} non-subscribers on {today}")
-    return count
+        if last_sent_at is not None:
+            days_since_last_sent = (now - last_sent_at).days
+            if days_since_last_sent < settings.HOROSCOPE_PERIODIC_TEASER_INTERVAL_DAYS:
+                return False
+
+    horoscope = await horoscope_repo.aget_delivery(delivery_state.id)
+    if not horoscope:
+        return False
+    text = horoscope.extended_teaser_text if use_extended_teaser else horoscope.teaser_text
+
+    text += translate(_(
+        "\n"
+        "\n"
+        "\U0001f512 Subscribe to see your full daily horoscope!"
+    ), lang)
+    keyboard = subscribe_keyboard(language=lang)
+
+    success = await send_message(
+        bot=bot,
+        telegram_uid=telegram_uid,
+        text=text,
+        reply_markup=keyboard,
+    )
+    if success:
+        await horoscope_repo.amark_sent(horoscope_id=horoscope.id)
+    else:
+        await horoscope_repo.amark_failed_to_send(horoscope_id=horoscope.id)
+    return success
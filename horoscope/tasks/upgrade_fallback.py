@@ -0,0 +1,47 @@
+import logging
+
+from aiogram import Bot
+
+logger = logging.getLogger(__name__)
+
+
+async def upgrade_fallback_horoscopes(bot: Bot) -> int:
+    """
+    Regenerate with the LLM the fallback horoscopes still waiting in the delivery queue.
+
+    Due horoscopes leave the queue within a minute, so only those queued for
+    later (half-hour zones, future notification times) can still be improved;
+    unsent rows outside the queue were skipped and are never delivered. Up to
+    HOROSCOPE_FALLBACK_UPGRADE_BATCH_SIZE horoscopes are upgraded per run,
+    soonest delivery first. The run stops at the first LLM failure since the
+    provider is most likely still down; the rest are retried next time.
+    """
+    from django.conf import settings
+    from django.utils import timezone
+
+    from core.containers import container
+    from core.metrics import HOROSCOPE_FALLBACK_UPGRADES_TOTAL
+    from horoscope.services.llm_governor import LLMPriority, llm_priority
+
+    horoscope_repo = container.horoscope.horoscope_repository()
+    service = container.horoscope.horoscope_service()
+
+    horoscopes = await horoscope_repo.aget_queued_fallbacks(
+        after=timezone.now(),
+        limit=settings.HOROSCOPE_FALLBACK_UPGRADE_BATCH_SIZE,
+    )
+    upgraded = 0
+    with llm_priority(LLMPriority.BATCH):
+        for horoscope in horoscopes:
+            try:
+                if await service.aupgrade_fallback(horoscope):
+                    upgraded += 1
+                    HOROSCOPE_FALLBACK_UPGRADES_TOTAL.inc(outcome='ok')
+            except Exception as e:
+                HOROSCOPE_FALLBACK_UPGRADES_TOTAL.inc(outcome='error')
+                logger.warning(f"LLM still unavailable, stopping fallback upgrades ({type(e).__name__})")
+                break
+
+    if horoscopes:
+        logger.info(f"Upgraded {upgraded} of {len(horoscopes)} fallback horoscopes")
+    return upgraded
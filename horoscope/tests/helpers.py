@@ -0,0 +1,11 @@
+"""Helpers shared by the horoscope test modules."""
+
+from unittest.mock import MagicMock
+
+
+def mock_uid_chunks(*chunks: list[int]) -> MagicMock:
+    """Mock for repository aiter_* methods that yields the given UID chunks."""
+    async def _iterate():
+        for chunk in chunks:
+            yield chunk
+    return MagicMock(side_effect=lambda *args, **kwargs: _iterate())
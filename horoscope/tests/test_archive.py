@@ -0,0 +1,243 @@
+"""Tests for the cold archive: storage, archiving service and read path."""
+
+import asyncio
+from datetime import date, timedelta
+from io import StringIO
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.services import archive as archive_module
+from core.services.archive import ArchiveStorage
+from horoscope.enums import HoroscopeType
+from horoscope.models import Horoscope, HoroscopeFollowup, LLMUsage
+from horoscope.repositories import HoroscopeRepository
+from horoscope.services.archive import HOROSCOPES_DATASET, MESSAGE_HISTORY_DATASET, ColdArchiveService
+from telegram_bot.models import MessageHistory
+from telegram_bot.repositories import MessageHistoryRepository
+
+
+def _create_horoscope(telegram_uid: int, target_date: date, model: str = "gpt-4o-mini") -> Horoscope:
+    horoscope = Horoscope.objects.create(
+        user_telegram_uid=telegram_uid,
+        horoscope_type=HoroscopeType.DAILY,
+        date=target_date,
+        full_text="Full text",
+    )
+    LLMUsage.objects.create(horoscope=horoscope, model=model, input_tokens=100, output_tokens=200)
+    return horoscope
+
+
+def _create_message(telegram_uid: int, days_old: int) -> MessageHistory:
+    message = MessageHistory.objects.create(
+        from_user_telegram_uid=telegram_uid,
+        chat_telegram_uid=telegram_uid,
+        text="hello",
+        raw={"message_id": 1},
+    )
+    MessageHistory.objects.filter(pk=message.pk).update(created_at=timezone.now() - timedelta(days=days_old))
+    return message
+
+
+class TestArchiveStorage:
+
+    def test_roundtrip_by_month(self, tmp_path):
+        storage = ArchiveStorage(base_dir=tmp_path)
+        storage.write_segment('items', '2024-01', [{'id': 1, 'text': 'Привет'}, {'id': 2, 'text': 'b'}])
+        storage.write_segment('items', '2024-02', [{'id': 3, 'text': 'c'}])
+
+        assert storage.list_months('items') == ['2024-01', '2024-02']
+        assert [row['id'] for row in storage.iter_rows('items')] == [1, 2, 3]
+        assert [row['id'] for row in storage.iter_rows('items', month_from='2024-02')] == [3]
+        assert [row['id'] for row in storage.iter_rows('items', month_to='2024-01')] == [1, 2]
+        assert list(storage.iter_rows('items', predicate=lambda row: row['text'] == 'Привет')) == [
+            {'id': 1, 'text': 'Привет'},
+        ]
+
+    def test_gzip_fallback_without_zstandard(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(archive_module, 'zstandard', None)
+        storage = ArchiveStorage(base_dir=tmp_path)
+
+        path = storage.write_segment('items', '2024-01', [{'id': 5}])
+
+        assert path.name == 'part-000000000005-000000000005.jsonl.gz'
+        assert list(storage.iter_rows('items')) == [{'id': 5}]
+
+    def test_rewriting_same_ids_replaces_segment(self, tmp_path):
+        storage = ArchiveStorage(base_dir=tmp_path)
+        storage.write_segment('items', '2024-01', [{'id': 1, 'v': 'old'}])
+        storage.write_segment('items', '2024-01', [{'id': 1, 'v': 'new'}])
+
+        assert list(storage.iter_rows('items')) == [{'id': 1, 'v': 'new'}]
+
+    def test_missing_dataset_is_empty(self, tmp_path):
+        storage = ArchiveStorage(base_dir=tmp_path)
+        assert storage.list_months('nothing') == []
+        assert list(storage.iter_rows('nothing')) == []
+
+    def test_refuses_without_configured_archive_dir(self, settings):
+        from core.containers import container
+
+        settings.ARCHIVE_DIR = None
+        container.core.archive_storage.reset()
+        with pytest.raises(ImproperlyConfigured):
+            container.core.archive_storage()
+
+    def test_archive_chunks_writes_before_delete(self, tmp_path):
+        storage = ArchiveStorage(base_dir=tmp_path)
+        deleted = []
+
+        def delete_ids(ids):
+            # Every row of the chunk must already be readable from disk
+            assert {row['id'] for row in storage.iter_rows('items')} >= set(ids)
+            deleted.extend(ids)
+            return len(ids)
+
+        result = storage.archive_chunks(
+            dataset='items',
+            chunks=iter([[{'id': 1, 'm': '2024-01'}, {'id': 2, 'm': '2024-02'}], [{'id': 3, 'm': '2024-02'}]]),
+            month_of=lambda row: row['m'],
+            delete_ids=delete_ids,
+        )
+
+        assert deleted == [1, 2, 3]
+        assert result.archived_count == 3
+        assert result.segments == 3
+        assert result.bytes_written > 0
+
+
+@pytest.mark.django_db
+class TestColdArchiveService:
+
+    @pytest.fixture(autouse=True)
+    def _setup(self, tmp_path, settings):
+        settings.ARCHIVE_CHUNK_SIZE = 2
+        self.storage = ArchiveStorage(base_dir=tmp_path)
+        self.service = ColdArchiveService(
+            horoscope_repo=HoroscopeRepository(),
+            message_history_repo=MessageHistoryRepository(),
+            storage=self.storage,
+        )
+
+    def test_moves_old_horoscopes_with_usage_and_followups(self):
+        today = timezone.now().date()
+        old = _create_horoscope(111, today - timedelta(days=100))
+        HoroscopeFollowup.objects.create(
+            horoscope=old, question_text="Q?", answer_text="A.", model="gpt-4o-mini",
+            input_tokens=10, output_tokens=20,
+        )
+        for days in (101, 102):
+            _create_horoscope(222, today - timedelta(days=days))
+        recent = _create_horoscope(111, today - timedelta(days=1))
+
+        results = self.service.archive_old_records(horoscope_days=90, message_history_days=14)
+
+        horoscope_result = next(r for r in results if r.dataset == HOROSCOPES_DATASET)
+        assert horoscope_result.archived_count == 3
+        assert list(Horoscope.objects.values_list('id', flat=True)) == [recent.id]
+        assert LLMUsage.objects.count() == 1
+        assert HoroscopeFollowup.objects.count() == 0
+
+        archived = self.service.find_horoscopes(telegram_uid=111)
+        assert len(archived) == 1
+        assert archived[0]['id'] == old.id
+        assert archived[0]['full_text'] == "Full text"
+        assert archived[0]['llm_usage']['input_tokens'] == 100
+        assert archived[0]['followups'][0]['question_text'] == "Q?"
+
+    def test_moves_old_message_history(self):
+        old = _create_message(111, days_old=20)
+        _create_message(222, days_old=20)
+        _create_message(111, days_old=1)
+
+        results = self.service.archive_old_records(horoscope_days=90, message_history_days=14)
+
+        message_result = next(r for r in results if r.dataset == MESSAGE_HISTORY_DATASET)
+        assert message_result.archived_count == 2
+        assert MessageHistory.objects.count() == 1
+
+        archived = self.service.find_messages(telegram_uid=111)
+        assert [row['id'] for row in archived] == [old.id]
+        assert archived[0]['raw'] == {"message_id": 1}
+
+    @pytest.mark.django_db(transaction=True)
+    async def test_async_archive_lets_other_queries_run_between_chunks(self, settings):
+        settings.ARCHIVE_CHUNK_PAUSE_SECONDS = 0
+        today = timezone.now().date()
+        for days in range(100, 105):
+            await sync_to_async(_create_horoscope)(111, today - timedelta(days=days))
+        events = []
+        archive_rows = self.storage.archive_rows
+
+        def record_chunk(result, rows, **kwargs):
+            events.append('chunk')
+            archive_rows(result, rows, **kwargs)
+
+        self.storage.archive_rows = record_chunk
+        archive = asyncio.create_task(self.service.aarchive_old_records(horoscope_days=90, message_history_days=14))
+        while not archive.done():
+            await sync_to_async(events.append)('query')
+
+        results = await archive
+        assert results[0].archived_count == 5
+        assert events.count('chunk') == 3
+        chunk_positions = [i for i, event in enumerate(events) if event == 'chunk']
+        assert 'query' in events[chunk_positions[0]:chunk_positions[1]]
+
+    def test_usage_summary_over_archive(self):
+        today = timezone.now().date()
+        _create_horoscope(111, today - timedelta(days=100), model="model-a")
+        _create_horoscope(222, today - timedelta(days=100), model="model-a")
+        _create_horoscope(333, today - timedelta(days=100), model="model-b")
+
+        self.service.archive_old_records(horoscope_days=90, message_history_days=14)
+
+        assert self.service.get_usage_summary() == [
+            {'model': 'model-a', 'total_input_tokens': 200, 'total_output_tokens': 400, 'count': 2},
+            {'model': 'model-b', 'total_input_tokens': 100, 'total_output_tokens': 200, 'count': 1},
+        ]
+
+
+@pytest.mark.django_db
+class TestArchiveCommands:
+
+    @pytest.fixture(autouse=True)
+    def _setup(self, tmp_path):
+        from core.containers import container
+
+        storage = ArchiveStorage(base_dir=tmp_path)
+        with container.core.archive_storage.override(storage):
+            container.horoscope.archive_service.reset()
+            yield
+        container.horoscope.archive_service.reset()
+
+    def test_archive_then_cost_report_includes_archive(self):
+        today = timezone.now().date()
+        _create_horoscope(111, today - timedelta(days=100))
+        _create_horoscope(111, today)
+
+        out = StringIO()
+        call_command('archive_old_records', horoscope_days=90, stdout=out)
+        assert 'horoscopes: archived 1 rows' in out.getvalue()
+
+        out = StringIO()
+        call_command('calculate_llm_cost', stdout=out)
+        assert 'Horoscopes generated: 1' in out.getvalue()
+
+        out = StringIO()
+        call_command('calculate_llm_cost', include_archive=True, stdout=out)
+        assert 'Horoscopes generated: 2' in out.getvalue()
+
+    def test_lookup_prints_archived_rows(self):
+        today = timezone.now().date()
+        old = _create_horoscope(111, today - timedelta(days=100))
+        call_command('archive_old_records', horoscope_days=90, stdout=StringIO())
+
+        out, err = StringIO(), StringIO()
+        call_command('archive_lookup', '111', stdout=out, stderr=err)
+
+        assert f'"id": {old.id}' in out.getvalue()
+        assert '1 archived horoscopes rows found.' in err.getvalue()
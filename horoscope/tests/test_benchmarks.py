@@ -0,0 +1,163 @@
+"""
+Tests for benchmark helpers: population seeding, query plan inspection and
+the scheduled task benchmark.
+"""
+
+from datetime import date
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from core.models import User
+from horoscope.benchmarks.query_plans import find_seq_scans
+from horoscope.benchmarks.seed import seed_population
+from horoscope.benchmarks.tasks import BENCHMARKED_TASKS, compare_with_baseline
+from horoscope.models import Horoscope, Subscription, UserProfile
+from horoscope.utils import get_effective_notification_hour
+from telegram_bot.models import MessageHistory
+
+
+class TestFindSeqScans:
+    def test_index_scan_plan(self):
+        plan = {
+            'Node Type': 'Limit',
+            'Plans': [
+                {'Node Type': 'Index Only Scan', 'Relation Name': 'horoscope_horoscope'},
+            ],
+        }
+        assert find_seq_scans(plan) == []
+
+    def test_nested_seq_scan_on_large_table(self):
+        plan = {
+            'Node Type': 'Nested Loop',
+            'Plans': [
+                {'Node Type': 'Index Scan', 'Relation Name': 'users'},
+                {
+                    'Node Type': 'Sort',
+                    'Plans': [{'Node Type': 'Seq Scan', 'Relation Name': 'horoscope_subscription'}],
+                },
+            ],
+        }
+        assert find_seq_scans(plan) == ['horoscope_subscription']
+
+    def test_seq_scan_on_small_table_ignored(self):
+        plan = {'Node Type': 'Seq Scan', 'Relation Name': 'django_content_type'}
+        assert find_seq_scans(plan) == []
+
+
+@pytest.mark.django_db
+class TestSeedPopulation:
+    def test_seeds_all_tables(self):
+        result = seed_population(user_count=40, history_days=3, messages_per_user=2, target_date=date(2024, 6, 15))
+
+        assert result.users == 40
+        assert User.objects.count() == 40
+        assert UserProfile.objects.count() == 40
+        assert Horoscope.objects.count() == 120 == result.horoscopes
+        assert MessageHistory.objects.count() == 80 == result.messages
+        assert Subscription.objects.count() == result.subscriptions > 0
+
+    def test_only_target_date_left_unsent(self):
+        seed_population(user_count=10, history_days=3, messages_per_user=0, target_date=date(2024, 6, 15))
+
+        unsent = Horoscope.objects.filter(sent_at__isnull=True)
+        assert unsent.count() == 10
+        assert set(unsent.values_list('date', flat=True)) == {date(2024, 6, 15)}
+
+    def test_effective_notification_hour_populated(self):
+        seed_population(user_count=20, history_days=1, messages_per_user=0)
+
+        for profile in UserProfile.objects.all():
+            assert profile.effective_notification_hour == get_effective_notification_hour(
+                notification_hour_local=profile.notification_hour_local,
+                preferred_language=profile.preferred_language,
+            )
+
+
+@pytest.mark.django_db
+class TestCheckQueryPlansCommand:
+    def test_requires_postgresql(self):
+        with pytest.raises(CommandError, match='PostgreSQL'):
+            call_command('check_query_plans', users=10)
+
+
+@pytest.mark.django_db
+class TestBenchHydrationCommand:
+    def test_reports_all_paths_and_rolls_back(self):
+        out = StringIO()
+        call_command('bench_hydration', rows=20, repeat=1, stdout=out)
+
+        output = out.getvalue()
+        assert 'query + from_model' in output
+        assert 'from_row only' in output
+        assert output.count(' 20 ') == 6
+        assert Subscription.objects.count() == 0
+
+
+class TestCompareWithBaseline:
+    def test_pairs_runs_by_task_and_population(self):
+        baseline = {'runs': [
+            {'task': 'send_expiry_reminders', 'users': 100, 'seconds': 2.0, 'queries': 10, 'peak_rss_mb': 100},
+            {'task': 'send_expiry_reminders', 'users': 1000, 'seconds': 9.0, 'queries': 90, 'peak_rss_mb': 100},
+        ]}
+        current = {'runs': [
+            {'task': 'send_expiry_reminders', 'users': 100, 'seconds': 3.0, 'queries': 10, 'peak_rss_mb': 90},
+            {'task': 'send_expired_notifications', 'users': 100, 'seconds': 1.0, 'queries': 5, 'peak_rss_mb': 90},
+        ]}
+
+        changes = {
+            comparison.metric: comparison.change
+            for comparison in compare_with_baseline(current, baseline)
+        }
+
+        assert changes == {'seconds': 0.5, 'queries': 0.0, 'peak_rss_mb': -0.1}
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBenchTasksCommand:
+    def test_runs_every_task_and_writes_results(self, tmp_path):
+        output = tmp_path / 'results.json'
+        call_command('bench_tasks', users='60', output=str(output), stdout=StringIO())
+
+        results = json.loads(output.read_text())
+        runs = {run['task']: run for run in results['runs']}
+        assert set(runs) == set(BENCHMARKED_TASKS)
+        assert runs['generate_daily_for_all_users']['result'] > 0
+        assert runs['deliver_due_horoscopes']['messages'] > 0
+        assert all(run['queries'] > 0 for run in runs.values())
+        assert all(run['peak_rss_mb'] > 0 for run in runs.values())
+        assert User.objects.count() == 0
+
+    def test_runs_legacy_sweeps_only_on_request(self, tmp_path):
+        output = tmp_path / 'results.json'
+        call_command(
+            'bench_tasks',
+            users='40',
+            tasks='send_daily_horoscope_notifications',
+            output=str(output),
+            stdout=StringIO(),
+        )
+
+        runs = json.loads(output.read_text())['runs']
+        assert [run['task'] for run in runs] == ['send_daily_horoscope_notifications']
+        assert runs[0]['messages'] > 0
+
+    def test_fails_on_regression_against_baseline(self, tmp_path):
+        baseline = tmp_path / 'baseline.json'
+        baseline.write_text(json.dumps({'runs': [
+            {'task': 'send_expiry_reminders', 'users': 40, 'seconds': 1e-6, 'queries': 0, 'peak_rss_mb': 1},
+        ]}))
+
+        with pytest.raises(CommandError, match='regressed'):
+            call_command(
+                'bench_tasks',
+                users='40',
+                tasks='send_expiry_reminders',
+                output=str(tmp_path / 'results.json'),
+                baseline=str(baseline),
+                stdout=StringIO(),
+                stderr=StringIO(),
+            )
@@ -1,16 +1,23 @@
 """
 Tests for core module: models, entities, repositories.
 Covers Setting model, User model, BaseRepository, UserRepository,
-SettingEntity, UserEntity, BaseEntity.
+SchedulerLeaseRepository, SettingEntity, UserEntity, BaseEntity.
 """
 
+import asyncio
+from datetime import timedelta
+
 import pytest
+from django.utils import timezone
+from pydantic import BaseModel
 
 from core.base_entity import BaseEntity
 from core.entities import SettingEntity, UserEntity
 from core.enums import SettingType
 from core.exceptions import UserNotFoundException
-from core.models import Setting, User
+from core.models import SchedulerLease, Setting, User
+from core.repositories.base import aiter_chunks
+from core.repositories.scheduler_lease import SchedulerLeaseRepository
 from core.repositories.user import UserRepository
 
 
@@ -234,6 +241,56 @@ class TestBaseEntity:
         assert results[0].value == 1
         assert results[1].value == 2
 
+    def test_from_row_matches_validated_entity(self):
+        row = {
+            'telegram_uid': 123,
+            'username': 'alice',
+            'first_name': 'Alice',
+            'last_name': None,
+            'language_code': 'en',
+            'is_premium': False,
+            'last_activity': None,
+        }
+
+        entity = UserEntity.from_row(dict(row))
+
+        assert entity == UserEntity.model_validate(row)
+        assert entity.full_name == 'Alice'
+        assert entity.model_fields_set == set(row)
+        entity.username = 'bob'
+        assert entity.username == 'bob'
+
+    def test_base_model_slots_match_from_row_setters(self):
+        # from_row writes these slots itself; a pydantic upgrade that changes them must fail here
+        assert BaseModel.__slots__ == (
+            '__dict__', '__pydantic_fields_set__', '__pydantic_extra__', '__pydantic_private__',
+        )
+
+    def test_from_row_state_matches_model_construct(self):
+        row = {
+            'telegram_uid': 123,
+            'username': 'alice',
+            'first_name': 'Alice',
+            'last_name': None,
+            'language_code': 'en',
+            'is_premium': False,
+            'last_activity': None,
+        }
+
+        entity = UserEntity.from_row(dict(row))
+
+        assert entity.__getstate__() == UserEntity.model_construct(**row).__getstate__()
+
+    @pytest.mark.django_db
+    def test_from_queryset_selects_entity_fields(self):
+        User.objects.create(telegram_uid=1, first_name='A')
+        User.objects.create(telegram_uid=2, first_name='B', is_premium=True)
+
+        entities = UserEntity.from_queryset(User.objects.order_by('telegram_uid'))
+
+        assert entities == UserEntity.from_models(list(User.objects.order_by('telegram_uid')))
+        assert [e.is_premium for e in entities] == [False, True]
+
     def test_to_model_raises(self):
         entity = UserEntity(telegram_uid=123)
         with pytest.raises(NotImplementedError, match="to_model"):
@@ -382,3 +439,68 @@ class TestBaseRepositoryViaUser:
         assert len(result) == 1
 
 
+class TestAiterChunks:
+    async def test_yields_all_chunks_in_order(self):
+        chunks = iter([[1, 2], [3, 4], [5]])
+
+        result = [chunk async for chunk in aiter_chunks(chunks)]
+
+        assert result == [[1, 2], [3, 4], [5]]
+
+    async def test_empty_iterator(self):
+        result = [chunk async for chunk in aiter_chunks(iter([]))]
+        assert result == []
+
+    async def test_prefetches_next_chunk_while_current_is_processed(self):
+        fetched = []
+
+        def _chunks():
+            for chunk in ([1], [2], [3]):
+                fetched.append(chunk)
+                yield chunk
+
+        async for chunk in aiter_chunks(_chunks()):
+            if chunk == [1]:
+                await asyncio.sleep(0.05)
+                assert fetched == [[1], [2]]
+
+
+@pytest.mark.django_db
+class TestSchedulerLeaseRepository:
+    def setup_method(self):
+        self.repo = SchedulerLeaseRepository()
+
+    def test_acquire_free_lease(self):
+        assert self.repo.try_acquire("job", holder="a", ttl_seconds=60) is True
+        assert SchedulerLease.objects.get(name="job").holder == "a"
+
+    def test_live_lease_not_taken_by_other_holder(self):
+        self.repo.try_acquire("job", holder="a", ttl_seconds=60)
+
+        assert self.repo.try_acquire("job", holder="b", ttl_seconds=60) is False
+        assert SchedulerLease.objects.get(name="job").holder == "a"
+
+    def test_holder_extends_own_lease(self):
+        self.repo.try_acquire("job", holder="a", ttl_seconds=60)
+        first_expiry = SchedulerLease.objects.get(name="job").expires_at
+
+        assert self.repo.try_acquire("job", holder="a", ttl_seconds=600) is True
+        assert SchedulerLease.objects.get(name="job").expires_at > first_expiry
+
+    def test_expired_lease_taken_over(self):
+        SchedulerLease.objects.create(name="job", holder="a", expires_at=timezone.now() - timedelta(seconds=1))
+
+        assert self.repo.try_acquire("job", holder="b", ttl_seconds=60) is True
+        assert SchedulerLease.objects.get(name="job").holder == "b"
+
+    def test_release_frees_lease_for_others(self):
+        self.repo.try_acquire("job", holder="a", ttl_seconds=60)
+        self.repo.release("job", holder="b")
+        assert self.repo.try_acquire("job", holder="b", ttl_seconds=60) is False
+
+        self.repo.release("job", holder="a")
+        assert self.repo.try_acquire("job", holder="b", ttl_seconds=60) is True
+
+    def test_leases_are_per_job(self):
+        assert self.repo.try_acquire("job-1", holder="a", ttl_seconds=60) is True
+        assert self.repo.try_acquire("job-2", holder="b", ttl_seconds=60) is True
@@ -0,0 +1,168 @@
+"""
+Tests for the horoscope delivery queue:
+- generate_daily_for_all_users queues horoscopes at the start of the notification hour
+  starting after the generation lead
+- deliver_due_horoscopes sends due horoscopes and removes them from the queue
+"""
+
+from datetime import date, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from core.models import User
+from horoscope.enums import HoroscopeType, SubscriptionStatus
+from horoscope.models import Horoscope, Subscription, UserProfile
+from horoscope.tasks.deliver_due import deliver_due_horoscopes
+
+FULL_TEXT = "Header\nGreeting\n\nTeaser 1\nTeaser 2\nTeaser 3\nExtended teaser content\nFinal line"
+
+
+def _create_user(telegram_uid: int, subscribed: bool) -> None:
+    User.objects.create(telegram_uid=telegram_uid, last_activity=timezone.now())
+    UserProfile.objects.create(
+        user_telegram_uid=telegram_uid,
+        name="Test",
+        date_of_birth=date(1990, 5, 15),
+        place_of_birth="London",
+        place_of_living="Berlin",
+        preferred_language="en",
+    )
+    if subscribed:
+        Subscription.objects.create(
+            user_telegram_uid=telegram_uid,
+            status=SubscriptionStatus.ACTIVE,
+            expires_at=timezone.now() + timedelta(days=30),
+        )
+
+
+def _queue(telegram_uid: int, deliver_at, target_date: date | None = None) -> Horoscope:
+    return Horoscope.objects.create(
+        user_telegram_uid=telegram_uid,
+        horoscope_type=HoroscopeType.DAILY,
+        date=target_date or date.today(),
+        full_text=FULL_TEXT,
+        deliver_at=deliver_at,
+    )
+
+
+_acreate_user = sync_to_async(_create_user)
+_aqueue = sync_to_async(_queue)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestDeliverDueHoroscopes:
+    async def test_sends_full_text_to_subscriber_and_teaser_to_others(self):
+        await _acreate_user(111, subscribed=True)
+        await _acreate_user(222, subscribed=False)
+        subscriber = await _aqueue(111, timezone.now() - timedelta(minutes=1))
+        non_subscriber = await _aqueue(222, timezone.now() - timedelta(minutes=1))
+
+        with patch('horoscope.tasks.messaging.send_message', new_callable=AsyncMock, return_value=True) as mock_send:
+            result = await deliver_due_horoscopes(MagicMock())
+
+        assert result == 2
+        texts = {call.kwargs['telegram_uid']: call.kwargs['text'] for call in mock_send.await_args_list}
+        assert "Final line" in texts[111]
+        assert "Final line" not in texts[222]
+        for horoscope in (subscriber, non_subscriber):
+            await horoscope.arefresh_from_db()
+            assert horoscope.sent_at is not None
+            assert horoscope.deliver_at is None
+
+    async def test_ignores_rows_not_yet_due(self):
+        await _acreate_user(111, subscribed=True)
+        horoscope = await _aqueue(111, timezone.now() + timedelta(minutes=30))
+
+        with patch('horoscope.tasks.messaging.send_message', new_callable=AsyncMock) as mock_send:
+            result = await deliver_due_horoscopes(MagicMock())
+
+        assert result == 0
+        mock_send.assert_not_called()
+        await horoscope.arefresh_from_db()
+        assert horoscope.deliver_at is not None
+
+    async def test_skipped_rows_leave_queue(self):
+        # Non-subscriber without recent activity gets no teaser, and is not re-read next run
+        await _acreate_user(222, subscribed=False)
+        await User.objects.filter(telegram_uid=222).aupdate(last_activity=timezone.now() - timedelta(days=60))
+        horoscope = await _aqueue(222, timezone.now() - timedelta(minutes=1))
+
+        with patch('horoscope.tasks.messaging.send_message', new_callable=AsyncMock) as mock_send:
+            result = await deliver_due_horoscopes(MagicMock())
+
+        assert result == 0
+        mock_send.assert_not_called()
+        await horoscope.arefresh_from_db()
+        assert horoscope.deliver_at is None
+        assert horoscope.sent_at is None
+
+    async def test_rows_that_raised_stay_queued_for_next_run(self):
+        await _acreate_user(111, subscribed=True)
+        await _acreate_user(222, subscribed=True)
+        failing = await _aqueue(111, timezone.now() - timedelta(minutes=1))
+        delivered = await _aqueue(222, timezone.now() - timedelta(minutes=1))
+
+        async def send_message(telegram_uid, **kwargs):
+            if telegram_uid == 111:
+                raise ConnectionError("Bot API unreachable")
+            return True
+
+        with patch('horoscope.tasks.messaging.send_message', side_effect=send_message):
+            assert await deliver_due_horoscopes(MagicMock()) == 1
+
+        await failing.arefresh_from_db()
+        assert failing.deliver_at is not None
+        assert failing.sent_at is None
+        await delivered.arefresh_from_db()
+        assert delivered.deliver_at is None
+
+        with patch('horoscope.tasks.messaging.send_message', new_callable=AsyncMock, return_value=True):
+            assert await deliver_due_horoscopes(MagicMock()) == 1
+
+        await failing.arefresh_from_db()
+        assert failing.sent_at is not None
+        assert failing.deliver_at is None
+
+    async def test_drops_rows_from_previous_days(self):
+        await _acreate_user(111, subscribed=True)
+        horoscope = await _aqueue(111, timezone.now() - timedelta(days=1), target_date=date.today() - timedelta(days=1))
+
+        with patch('horoscope.tasks.messaging.send_message', new_callable=AsyncMock) as mock_send:
+            result = await deliver_due_horoscopes(MagicMock())
+
+        assert result == 0
+        mock_send.assert_not_called()
+        await horoscope.arefresh_from_db()
+        assert horoscope.deliver_at is None
+
+
+class TestGenerateDailyQueuesDelivery:
+    @pytest.mark.django_db
+    async def test_queues_for_hour_starting_after_lead(self):
+        from horoscope.tasks.send_daily_horoscope import generate_daily_for_all_users
+
+        async def _uids(*args, **kwargs):
+            yield [111]
+
+        mock_profile_repo = MagicMock()
+        mock_profile_repo.aiter_telegram_uids_by_notification_hour = MagicMock(side_effect=_uids)
+        mock_subscription_repo = MagicMock()
+        mock_subscription_repo.ahas_active_subscription = AsyncMock(return_value=True)
+        notification_hour = timezone.now().replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        scheduled_at = notification_hour - timedelta(seconds=settings.HOROSCOPE_GENERATION_LEAD_SECONDS)
+
+        with patch('core.containers.container') as mock_container, \
+             patch('horoscope.tasks.generate_horoscope.generate_horoscope', new_callable=AsyncMock) as mock_task:
+            mock_container.horoscope.user_profile_repository.return_value = mock_profile_repo
+            mock_container.horoscope.subscription_repository.return_value = mock_subscription_repo
+
+            await generate_daily_for_all_users(MagicMock(), scheduled_at=scheduled_at + timedelta(seconds=5))
+
+        assert mock_task.await_args.kwargs['deliver_at'] == notification_hour
+        mock_profile_repo.aiter_telegram_uids_by_notification_hour.assert_called_once_with(
+            hour_utc=notification_hour.hour,
+        )
@@ -39,7 +39,6 @@ class TestHoroscopeEntity:
             horoscope_type=HoroscopeType.DAILY,
             date=date(2024, 6, 15),
             full_text="Full horoscope text",
-            teaser_text="Teaser text",
         )
 
         entity = HoroscopeEntity.from_model(model)
@@ -49,9 +48,26 @@ class TestHoroscopeEntity:
         assert entity.horoscope_type == HoroscopeType.DAILY
         assert entity.date == date(2024, 6, 15)
         assert entity.full_text == "Full horoscope text"
-        assert entity.teaser_text == "Teaser text"
         assert entity.created_at is not None
 
+    def test_teasers_derived_from_full_text(self, settings):
+        settings.HOROSCOPE_TEASER_LINE_COUNT = 1
+        settings.HOROSCOPE_EXTENDED_TEASER_LINE_COUNT = 2
+        model = Horoscope.objects.create(
+            user_telegram_uid=12345,
+            horoscope_type=HoroscopeType.DAILY,
+            date=date(2024, 6, 15),
+            full_text="Header\nGreeting\n\nLine 1\nLine 2\nLine 3",
+        )
+
+        entity = HoroscopeEntity.from_model(model)
+
+        assert entity.teaser_text == "Line 1\n..."
+        assert entity.extended_teaser_text == "Line 1\nLine 2\n..."
+
+        settings.HOROSCOPE_TEASER_LINE_COUNT = 3
+        assert entity.teaser_text == "Line 1\nLine 2\nLine 3\n..."
+
 
 @pytest.mark.django_db
 class TestSubscriptionEntity:
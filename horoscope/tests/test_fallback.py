@@ -0,0 +1,248 @@
+"""
+Tests for offline fallback horoscopes:
+- the phrase corpus generator is deterministic per (sign, date, language)
+- generation falls back when the LLM fails or misses its latency budget
+- queued fallback horoscopes are upgraded once the LLM answers again, also
+  for whole-hour users generated ahead of their notification hour
+"""
+
+import contextvars
+import time
+from datetime import date, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from core.containers import container
+from horoscope.enums import HoroscopeType, SubscriptionStatus
+from horoscope.models import Horoscope, LLMUsage, Subscription, UserProfile
+from horoscope.services.fallback import FALLBACK_MODEL, call_with_deadline, generate_fallback_horoscope
+from horoscope.services.fallback_phrases import FALLBACK_PHRASES, SECTIONS
+from horoscope.services.horoscope import HoroscopeService
+from horoscope.services.llm import LLMResult
+from horoscope.tasks.upgrade_fallback import upgrade_fallback_horoscopes
+from horoscope.utils import ZODIAC_SIGNS
+
+LLM_TEXT = "LLM header\nLLM greeting\nLLM line"
+
+
+def _llm_result() -> LLMResult:
+    return LLMResult(full_text=LLM_TEXT, model="gpt-4o-mini", input_tokens=100, output_tokens=200)
+
+
+def _create_profile(telegram_uid: int, language: str = 'en') -> None:
+    UserProfile.objects.create(
+        user_telegram_uid=telegram_uid,
+        name="Alice",
+        date_of_birth=date(1990, 5, 15),
+        place_of_birth="London",
+        place_of_living="Berlin",
+        preferred_language=language,
+    )
+
+
+def _create_subscriber(telegram_uid: int, notification_hour_local: int) -> None:
+    UserProfile.objects.create(
+        user_telegram_uid=telegram_uid,
+        name="Alice",
+        date_of_birth=date(1990, 5, 15),
+        place_of_birth="London",
+        place_of_living="Berlin",
+        notification_hour_local=notification_hour_local,
+    )
+    Subscription.objects.create(
+        user_telegram_uid=telegram_uid,
+        status=SubscriptionStatus.ACTIVE,
+        expires_at=timezone.now() + timedelta(days=30),
+    )
+
+
+def _create_fallback(telegram_uid: int, target_date: date | None = None, **fields) -> Horoscope:
+    return Horoscope.objects.create(
+        user_telegram_uid=telegram_uid,
+        horoscope_type=HoroscopeType.DAILY,
+        date=target_date or date.today(),
+        full_text="Fallback text",
+        generated_by_fallback=True,
+        **fields,
+    )
+
+
+class TestGenerateFallbackHoroscope:
+    def test_same_sign_date_and_language_give_same_text(self):
+        first = generate_fallback_horoscope("Taurus", "Alice", date(2024, 6, 15), "en")
+        second = generate_fallback_horoscope("Taurus", "Alice", date(2024, 6, 15), "en")
+
+        assert first.full_text == second.full_text
+        assert first.model == FALLBACK_MODEL
+        assert first.input_tokens == first.output_tokens == 0
+
+    def test_text_varies_across_days(self):
+        texts = {
+            generate_fallback_horoscope("Leo", "Bob", date(2024, 6, 1) + timedelta(days=day), "en").full_text
+            for day in range(7)
+        }
+
+        assert len(texts) > 1
+
+    def test_header_and_greeting_localized(self):
+        text = generate_fallback_horoscope("Taurus", "Алиса", date(2024, 6, 15), "ru").full_text
+        header, greeting = text.split('\n')[:2]
+
+        assert header == "♉ Гороскоп: Телец · 15.06.2024"
+        assert "Алиса" in greeting
+
+    def test_unknown_language_uses_english(self):
+        text = generate_fallback_horoscope("Pisces", "Alice", date(2024, 6, 15), "xx").full_text
+
+        assert text.startswith("♓ Horoscope for Pisces")
+
+    def test_long_enough_for_extended_teaser(self):
+        text = generate_fallback_horoscope("Virgo", "Alice", date(2024, 6, 15), "en").full_text
+
+        assert len(text.split('\n')) > settings.HOROSCOPE_EXTENDED_TEASER_LINE_COUNT
+
+    @pytest.mark.parametrize('language', sorted(settings.HOROSCOPE_SUPPORTED_LANGUAGE_CODES))
+    def test_corpus_covers_supported_language(self, language):
+        phrases = FALLBACK_PHRASES[language]
+
+        assert set(phrases['signs']) == set(ZODIAC_SIGNS.values())
+        assert set(phrases['element']) == {'fire', 'earth', 'air', 'water'}
+        assert all('{name}' in greeting for greeting in phrases['greeting'])
+        assert all(len(phrases[section]) >= 2 for section in SECTIONS)
+
+
+class TestCallWithDeadline:
+    def test_returns_result_within_deadline(self):
+        assert call_with_deadline(lambda: 42, timeout_seconds=1) == 42
+
+    def test_raises_timeout_when_call_is_too_slow(self):
+        started = time.monotonic()
+        with pytest.raises(TimeoutError):
+            call_with_deadline(lambda: time.sleep(0.5), timeout_seconds=0.05)
+
+        assert time.monotonic() - started < 0.4
+
+    def test_call_sees_caller_context(self):
+        variable = contextvars.ContextVar('variable', default=None)
+        variable.set('caller')
+
+        assert call_with_deadline(variable.get, timeout_seconds=1) == 'caller'
+
+
+@pytest.mark.django_db
+class TestGenerateForUserFallback:
+    def _generate(self, generate_text):
+        _create_profile(12345)
+        service = HoroscopeService(
+            horoscope_repo=container.horoscope.horoscope_repository(),
+            user_profile_repo=container.horoscope.user_profile_repository(),
+            llm_usage_repo=container.horoscope.llm_usage_repository(),
+        )
+        service._generate_text = generate_text
+        return service.generate_for_user(telegram_uid=12345, target_date=date(2024, 6, 15))
+
+    def test_llm_failure_falls_back(self):
+        horoscope = self._generate(MagicMock(side_effect=ConnectionError("provider down")))
+
+        assert horoscope.generated_by_fallback is True
+        assert horoscope.full_text.startswith("♉ Horoscope for Taurus")
+        assert not LLMUsage.objects.exists()
+
+    def test_llm_slower_than_budget_falls_back(self):
+        def slow_generate_text(**kwargs):
+            time.sleep(0.5)
+            return _llm_result()
+
+        started = time.monotonic()
+        with override_settings(HOROSCOPE_LLM_LATENCY_BUDGET_SECONDS=0.05):
+            horoscope = self._generate(slow_generate_text)
+
+        assert time.monotonic() - started < 0.4
+        assert horoscope.generated_by_fallback is True
+
+    def test_llm_within_budget_is_used(self):
+        horoscope = self._generate(MagicMock(return_value=_llm_result()))
+
+        assert horoscope.generated_by_fallback is False
+        assert horoscope.full_text == LLM_TEXT
+        assert LLMUsage.objects.get(horoscope_id=horoscope.id).output_tokens == 200
+
+    def test_llm_failure_raised_when_fallback_disabled(self):
+        with override_settings(HOROSCOPE_FALLBACK_ENABLED=False):
+            with pytest.raises(ConnectionError):
+                self._generate(MagicMock(side_effect=ConnectionError("provider down")))
+
+        assert not Horoscope.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestUpgradeFallbackHoroscopes:
+    async def test_upgrades_queued_fallbacks(self):
+        later = timezone.now() + timedelta(hours=2)
+        await sync_to_async(_create_profile)(111)
+        pending = await sync_to_async(_create_fallback)(111, deliver_at=later)
+        await sync_to_async(_create_profile)(222)
+        sent = await sync_to_async(_create_fallback)(222, sent_at=timezone.now())
+        await sync_to_async(_create_profile)(333)
+        due = await sync_to_async(_create_fallback)(333, deliver_at=timezone.now() - timedelta(minutes=1))
+        await sync_to_async(_create_profile)(444)
+        unqueued = await sync_to_async(_create_fallback)(444)
+
+        with patch('horoscope.services.horoscope.HoroscopeService._generate_text', return_value=_llm_result()):
+            upgraded = await upgrade_fallback_horoscopes(MagicMock())
+
+        assert upgraded == 1
+        await pending.arefresh_from_db()
+        assert pending.full_text == LLM_TEXT
+        assert pending.generated_by_fallback is False
+        assert await LLMUsage.objects.filter(horoscope_id=pending.id).aexists()
+        for untouched in (sent, due, unqueued):
+            await untouched.arefresh_from_db()
+            assert untouched.full_text == "Fallback text"
+            assert untouched.generated_by_fallback is True
+
+    async def test_whole_hour_fallback_upgraded_before_delivery(self):
+        from horoscope.tasks.deliver_due import deliver_due_horoscopes
+        from horoscope.tasks.send_daily_horoscope import generate_daily_for_all_users
+
+        notification_hour = timezone.now().replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        await sync_to_async(_create_subscriber)(111, notification_hour_local=notification_hour.hour)
+        scheduled_at = notification_hour - timedelta(seconds=settings.HOROSCOPE_GENERATION_LEAD_SECONDS)
+
+        with patch('horoscope.services.horoscope.HoroscopeService._generate_text', side_effect=ConnectionError):
+            assert await generate_daily_for_all_users(MagicMock(), scheduled_at=scheduled_at) == 1
+        horoscope = await Horoscope.objects.aget(user_telegram_uid=111)
+        assert horoscope.generated_by_fallback is True
+        assert horoscope.deliver_at == notification_hour
+
+        with patch('horoscope.tasks.messaging.send_message', new_callable=AsyncMock) as send_message:
+            assert await deliver_due_horoscopes(MagicMock()) == 0
+            with patch('horoscope.services.horoscope.HoroscopeService._generate_text', return_value=_llm_result()):
+                assert await upgrade_fallback_horoscopes(MagicMock()) == 1
+
+            # The notification hour comes
+            await Horoscope.objects.filter(id=horoscope.id).aupdate(deliver_at=timezone.now())
+            with patch('horoscope.tasks.deliver_due.date') as deliver_date:
+                deliver_date.today.return_value = notification_hour.date()
+                assert await deliver_due_horoscopes(MagicMock()) == 1
+
+        assert LLM_TEXT in send_message.await_args.kwargs['text']
+
+    async def test_stops_at_first_llm_failure(self):
+        later = timezone.now() + timedelta(hours=2)
+        for telegram_uid in (111, 222):
+            await sync_to_async(_create_profile)(telegram_uid)
+            await sync_to_async(_create_fallback)(telegram_uid, deliver_at=later)
+
+        generate_text = MagicMock(side_effect=TimeoutError)
+        with patch('horoscope.services.horoscope.HoroscopeService._generate_text', generate_text):
+            upgraded = await upgrade_fallback_horoscopes(MagicMock())
+
+        assert upgraded == 0
+        assert generate_text.call_count == 1
+        assert await Horoscope.objects.filter(generated_by_fallback=True).acount() == 2
@@ -71,7 +71,7 @@ class TestHandleFollowupQuestion:
             mock_container.horoscope.subscription_repository.return_value = sub_repo
 
             horoscope_repo = AsyncMock()
-            horoscope_repo.aget_by_user_and_date = AsyncMock(return_value=horoscope)
+            horoscope_repo.aget_delivery_by_user_and_date = AsyncMock(return_value=horoscope)
             mock_container.horoscope.horoscope_repository.return_value = horoscope_repo
 
             profile_repo = AsyncMock()
@@ -129,7 +129,7 @@ class TestHandleFollowupQuestion:
             mock_container.horoscope.subscription_repository.return_value = sub_repo
 
             horoscope_repo = AsyncMock()
-            horoscope_repo.aget_by_user_and_date = AsyncMock(return_value=horoscope)
+            horoscope_repo.aget_delivery_by_user_and_date = AsyncMock(return_value=horoscope)
             mock_container.horoscope.horoscope_repository.return_value = horoscope_repo
 
             profile_repo = AsyncMock()
@@ -200,7 +200,7 @@ class TestHandleFollowupQuestion:
             mock_container.horoscope.subscription_repository.return_value = sub_repo
 
             horoscope_repo = AsyncMock()
-            horoscope_repo.aget_by_user_and_date = AsyncMock(return_value=None)
+            horoscope_repo.aget_delivery_by_user_and_date = AsyncMock(return_value=None)
             mock_container.horoscope.horoscope_repository.return_value = horoscope_repo
 
             await handle_followup_question(
@@ -231,7 +231,7 @@ class TestHandleFollowupQuestion:
             mock_container.horoscope.subscription_repository.return_value = sub_repo
 
             horoscope_repo = AsyncMock()
-            horoscope_repo.aget_by_user_and_date = AsyncMock(return_value=horoscope)
+            horoscope_repo.aget_delivery_by_user_and_date = AsyncMock(return_value=horoscope)
             mock_container.horoscope.horoscope_repository.return_value = horoscope_repo
 
             profile_repo = AsyncMock()
@@ -276,7 +276,7 @@ class TestHandleFollowupQuestion:
             mock_container.horoscope.subscription_repository.return_value = sub_repo
 
             horoscope_repo = AsyncMock()
-            horoscope_repo.aget_by_user_and_date = AsyncMock(return_value=horoscope)
+            horoscope_repo.aget_delivery_by_user_and_date = AsyncMock(return_value=horoscope)
             mock_container.horoscope.horoscope_repository.return_value = horoscope_repo
 
             profile_repo = AsyncMock()
@@ -324,7 +324,7 @@ class TestHandleFollowupQuestion:
             mock_container.horoscope.subscription_repository.return_value = sub_repo
 
             horoscope_repo = AsyncMock()
-            horoscope_repo.aget_by_user_and_date = AsyncMock(return_value=horoscope)
+            horoscope_repo.aget_delivery_by_user_and_date = AsyncMock(return_value=horoscope)
             mock_container.horoscope.horoscope_repository.return_value = horoscope_repo
 
             profile_repo = AsyncMock()
@@ -375,7 +375,7 @@ class TestHandleFollowupQuestion:
             mock_container.horoscope.subscription_repository.return_value = sub_repo
 
             horoscope_repo = AsyncMock()
-            horoscope_repo.aget_by_user_and_date = AsyncMock(return_value=horoscope)
+            horoscope_repo.aget_delivery_by_user_and_date = AsyncMock(return_value=horoscope)
             mock_container.horoscope.horoscope_repository.return_value = horoscope_repo
 
             profile_repo = AsyncMock()
@@ -56,7 +56,7 @@ def _setup_generate_mocks(
     mock_horoscope.extended_teaser_text = "Extended teaser text"
 
     mock_horoscope_repo = MagicMock()
-    mock_horoscope_repo.aget_by_user_and_date = AsyncMock(return_value=mock_horoscope)
+    mock_horoscope_repo.aget_delivery_by_user_and_date = AsyncMock(return_value=mock_horoscope)
     mock_horoscope_repo.amark_sent = AsyncMock()
     mock_horoscope_repo.amark_failed_to_send = AsyncMock()
 
@@ -273,7 +273,7 @@ class TestGenerateAndSendHoroscope:
         from horoscope.tasks.generate_horoscope import generate_and_send_horoscope
 
         mock_horoscope_repo = MagicMock()
-        mock_horoscope_repo.aget_by_user_and_date = AsyncMock(return_value=None)
+        mock_horoscope_repo.aget_delivery_by_user_and_date = AsyncMock(return_value=None)
 
         mock_user_profile_repo = MagicMock()
 
@@ -102,7 +102,6 @@ def _make_profile(
 def _make_horoscope(
     telegram_uid: int = 100000,
     full_text: str = "Your full horoscope text here.",
-    teaser_text: str = "Your teaser...",
 ) -> HoroscopeEntity:
     return HoroscopeEntity(
         id=1,
@@ -110,7 +109,6 @@ def _make_horoscope(
         horoscope_type=HoroscopeType.DAILY,
         date=date.today(),
         full_text=full_text,
-        teaser_text=teaser_text,
         created_at=datetime(2024, 1, 1),
     )
 
@@ -127,7 +125,7 @@ def _mock_profile_repo(profile=None):
 
 def _mock_horoscope_repo(horoscope=None):
     mock = MagicMock()
-    mock.aget_by_user_and_date = AsyncMock(return_value=horoscope)
+    mock.aget_delivery_by_user_and_date = AsyncMock(return_value=horoscope)
     mock.get_by_user_and_date = MagicMock(return_value=horoscope)
     return mock
 
@@ -633,8 +631,7 @@ class TestHoroscopeView:
         assert "just type your message" in responses[0].text
 
     async def test_non_subscriber_sees_teaser(self, client):
-        teaser = "Teaser preview..."
-        horoscope = _make_horoscope(teaser_text=teaser)
+        horoscope = _make_horoscope(full_text="Header\nGreeting\nTeaser preview\nL2\nL3\nHidden line")
 
         profile_repo = _mock_profile_repo(profile=_make_profile())
         horoscope_repo = _mock_horoscope_repo(horoscope=horoscope)
@@ -654,7 +651,8 @@ class TestHoroscopeView:
         responses = await user.send_command("horoscope")
 
         assert len(responses) == 1
-        assert teaser in responses[0].text
+        assert "Teaser preview" in responses[0].text
+        assert "Hidden line" not in responses[0].text
         assert "subscribe" in responses[0].text.lower() or "🔒" in responses[0].text
 
 
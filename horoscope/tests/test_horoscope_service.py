@@ -2,7 +2,7 @@ from datetime import date
 
 import pytest
 
-from horoscope.utils import get_zodiac_sign
+from horoscope.utils import build_teaser, get_zodiac_sign
 
 
 class TestGetZodiacSign:
@@ -44,3 +44,25 @@ class TestGetZodiacSign:
     def test_zodiac_sign_boundary_dec_22(self):
         assert get_zodiac_sign(date(2000, 12, 22)) == "Capricorn"
         assert get_zodiac_sign(date(2000, 12, 21)) == "Sagittarius"
+
+
+HOROSCOPE_TEXT = (
+    "♉ Taurus — June 15, 2024\n"
+    "Dear Alice,\n"
+    "\n"
+    "Line 1\n"
+    "Line 2\n"
+    "Line 3\n"
+    "Line 4"
+)
+
+
+class TestBuildTeaser:
+    def test_skips_header_and_greeting(self):
+        assert build_teaser(HOROSCOPE_TEXT, 2) == "Line 1\nLine 2\n..."
+
+    def test_line_count_larger_than_content(self):
+        assert build_teaser(HOROSCOPE_TEXT, 10) == "Line 1\nLine 2\nLine 3\nLine 4\n..."
+
+    def test_short_text(self):
+        assert build_teaser("Header only", 3) == "\n..."
@@ -0,0 +1,460 @@
+"""
+Tests for the shared LLM governor:
+- the circuit breaker opens after consecutive failures and probes half-open
+- the concurrency limit grows additively and halves on overload
+- waiting calls are served by priority
+- retryable errors are retried with backoff, others raised at once
+- a deadline doesn't count the wait for a slot, and cancels the call's
+  queue place and retries when it passes
+- batch generation fans out no wider than the current limit
+- LLM calls go through the governor, and an open circuit falls back offline
+"""
+
+import asyncio
+import threading
+import time
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from dependency_injector import providers
+
+from core.containers import container
+from horoscope.models import UserProfile
+from horoscope.services.fallback import call_with_deadline
+from horoscope.services.horoscope import HoroscopeService
+from horoscope.services.llm import LLMService
+from horoscope.services.llm_governor import (
+    AdaptiveConcurrencyLimit,
+    CircuitBreaker,
+    LLMCallCancelled,
+    LLMCircuitOpen,
+    LLMDeadline,
+    LLMGovernor,
+    LLMPriority,
+    LLMQueueTimeout,
+    is_retryable,
+    llm_deadline,
+    llm_priority,
+)
+from horoscope.tests.helpers import mock_uid_chunks
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        super().__init__(f"HTTP {status_code}")
+
+
+def _limiter(**kwargs) -> AdaptiveConcurrencyLimit:
+    options = dict(initial_limit=4, min_limit=1, max_limit=8, latency_target_seconds=10)
+    options.update(kwargs)
+    return AdaptiveConcurrencyLimit(**options)
+
+
+def _governor(sleeps: list, **kwargs) -> LLMGovernor:
+    options = dict(
+        limiter=_limiter(),
+        breaker=CircuitBreaker(failure_threshold=5, open_seconds=30),
+        max_retries=2,
+        backoff_seconds=1,
+        backoff_max_seconds=3,
+        sleep=sleeps.append,
+    )
+    options.update(kwargs)
+    return LLMGovernor(**options)
+
+
+class TestIsRetryable:
+    @pytest.mark.parametrize('error', [
+        TimeoutError(), ConnectionError(), ProviderError(429), ProviderError(503),
+    ])
+    def test_provider_failures_are_retryable(self, error):
+        assert is_retryable(error)
+
+    @pytest.mark.parametrize('error', [ProviderError(400), ProviderError(401), ValueError()])
+    def test_request_errors_are_not(self, error):
+        assert not is_retryable(error)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3, open_seconds=30, clock=FakeClock())
+        for _ in range(3):
+            breaker.before_call()
+            breaker.record_failure()
+
+        with pytest.raises(LLMCircuitOpen):
+            breaker.before_call()
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=2, open_seconds=30, clock=FakeClock())
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_lets_one_probe_through(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, open_seconds=30, clock=clock)
+        breaker.record_failure()
+        clock.now += 30
+
+        breaker.before_call()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(LLMCircuitOpen):
+            breaker.before_call()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.before_call()
+
+    def test_failed_probe_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=5, open_seconds=30, clock=clock)
+        for _ in range(5):
+            breaker.record_failure()
+        clock.now += 30
+        breaker.before_call()
+
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(LLMCircuitOpen):
+            breaker.before_call()
+
+
+class TestAdaptiveConcurrencyLimit:
+    def test_fast_answers_grow_limit_by_one_per_window(self):
+        limiter = _limiter(initial_limit=4)
+        for _ in range(4):
+            limiter.acquire(LLMPriority.INTERACTIVE)
+            limiter.release(latency_seconds=1)
+
+        assert 4.9 < limiter.limit < 5
+
+    def test_overload_halves_limit_once_per_window(self):
+        clock = FakeClock()
+        limiter = _limiter(initial_limit=8, clock=clock)
+        for _ in range(3):
+            limiter.acquire(LLMPriority.INTERACTIVE)
+        for _ in range(3):
+            limiter.release(latency_seconds=1, overloaded=True)
+
+        assert limiter.limit == 4
+
+        clock.now += 10
+        limiter.acquire(LLMPriority.INTERACTIVE)
+        limiter.release(latency_seconds=1, overloaded=True)
+        assert limiter.limit == 2
+
+    def test_slow_answers_shrink_limit(self):
+        limiter = _limiter(initial_limit=4)
+        limiter.acquire(LLMPriority.INTERACTIVE)
+        limiter.release(latency_seconds=11)
+
+        assert limiter.limit == 2
+
+    def test_limit_stays_within_bounds(self):
+        clock = FakeClock()
+        limiter = _limiter(initial_limit=1, max_limit=2, clock=clock)
+        for _ in range(10):
+            limiter.acquire(LLMPriority.INTERACTIVE)
+            limiter.release(latency_seconds=1)
+        assert limiter.limit == 2
+
+        for _ in range(5):
+            clock.now += 10
+            limiter.acquire(LLMPriority.INTERACTIVE)
+            limiter.release(latency_seconds=1, overloaded=True)
+        assert limiter.limit == 1
+
+    def test_queue_timeout_when_no_slot_frees(self):
+        limiter = _limiter(initial_limit=1, max_limit=1)
+        limiter.acquire(LLMPriority.INTERACTIVE)
+
+        with pytest.raises(LLMQueueTimeout):
+            limiter.acquire(LLMPriority.INTERACTIVE, timeout_seconds=0.05)
+        assert limiter.in_flight == 1
+
+    def test_interactive_callers_are_served_before_batch(self):
+        limiter = _limiter(initial_limit=1, max_limit=1)
+        limiter.acquire(LLMPriority.INTERACTIVE)
+        served = []
+
+        def wait(priority, name):
+            limiter.acquire(priority, timeout_seconds=5)
+            served.append(name)
+            limiter.release(latency_seconds=0)
+
+        batch = threading.Thread(target=wait, args=(LLMPriority.BATCH, 'batch'))
+        batch.start()
+        while not limiter._waiters:
+            time.sleep(0.001)
+        interactive = threading.Thread(target=wait, args=(LLMPriority.INTERACTIVE, 'interactive'))
+        interactive.start()
+        while len(limiter._waiters) < 2:
+            time.sleep(0.001)
+
+        limiter.release(latency_seconds=0)
+        batch.join(timeout=5)
+        interactive.join(timeout=5)
+
+        assert served == ['interactive', 'batch']
+
+
+    def test_cancelled_waiter_leaves_queue(self):
+        limiter = _limiter(initial_limit=1, max_limit=1)
+        limiter.acquire(LLMPriority.INTERACTIVE)
+        cancelled = threading.Event()
+        errors = []
+
+        def wait():
+            try:
+                limiter.acquire(LLMPriority.BATCH, timeout_seconds=5, cancelled=cancelled)
+            except LLMCallCancelled as e:
+                errors.append(e)
+
+        waiter = threading.Thread(target=wait)
+        waiter.start()
+        while not limiter._waiters:
+            time.sleep(0.001)
+        cancelled.set()
+        limiter.wake()
+        waiter.join(timeout=1)
+
+        assert len(errors) == 1
+        assert limiter._waiters == []
+        assert limiter.in_flight == 1
+
+
+class TestLLMDeadline:
+    def test_wait_for_slot_is_not_counted(self):
+        clock = FakeClock()
+        deadline = LLMDeadline(10, clock=clock)
+        with deadline.queued():
+            clock.now += 30
+            assert deadline.remaining() == 10
+        clock.now += 4
+
+        assert deadline.remaining() == 6
+
+    def test_governor_keeps_only_first_wait_off_the_deadline(self):
+        clock = FakeClock()
+        deadline = LLMDeadline(10, clock=clock)
+        governor = _governor([], max_retries=1)
+
+        def acquire(*args):
+            clock.now += 3
+
+        governor.limiter.acquire = acquire
+        governor.limiter.release = MagicMock()
+        with llm_deadline(deadline):
+            governor.call(MagicMock(side_effect=[ProviderError(503), 'answer']), kind='horoscope')
+
+        assert deadline.remaining() == 7
+
+    def test_cancel_stops_retries(self):
+        deadline = LLMDeadline(10)
+        governor = _governor([], backoff_seconds=5, backoff_max_seconds=5)
+
+        def fail():
+            deadline.cancel()
+            raise ProviderError(503)
+
+        func = MagicMock(side_effect=fail)
+        started = time.monotonic()
+        with llm_deadline(deadline), pytest.raises(LLMCallCancelled):
+            governor.call(func, kind='horoscope')
+
+        assert func.call_count == 1
+        assert time.monotonic() - started < 1
+
+    def test_queued_call_gets_full_budget_once_served(self):
+        governor = _governor([], limiter=_limiter(initial_limit=1, max_limit=1))
+        governor.limiter.acquire(LLMPriority.INTERACTIVE)
+        threading.Timer(0.2, governor.limiter.release, kwargs={'latency_seconds': 0}).start()
+
+        def slow_answer():
+            time.sleep(0.05)
+            return 'answer'
+
+        result = call_with_deadline(lambda: governor.call(slow_answer, kind='horoscope'), timeout_seconds=0.1)
+
+        assert result == 'answer'
+
+    def test_abandoned_call_is_not_retried(self):
+        governor = _governor([], backoff_seconds=0)
+
+        def slow_failure():
+            time.sleep(0.1)
+            raise ProviderError(503)
+
+        func = MagicMock(side_effect=slow_failure)
+        with pytest.raises(TimeoutError):
+            call_with_deadline(lambda: governor.call(func, kind='horoscope'), timeout_seconds=0.05)
+        time.sleep(0.3)
+
+        assert func.call_count == 1
+        assert governor.limiter.in_flight == 0
+
+    def test_batch_calls_use_their_own_workers(self):
+        with llm_priority(LLMPriority.BATCH):
+            batch_thread = call_with_deadline(lambda: threading.current_thread().name, timeout_seconds=1)
+        interactive_thread = call_with_deadline(lambda: threading.current_thread().name, timeout_seconds=1)
+
+        assert batch_thread.startswith('llm-deadline-batch')
+        assert interactive_thread.startswith('llm-deadline-interactive')
+
+
+class TestBatchFanOut:
+    @pytest.mark.django_db
+    async def test_daily_generation_runs_at_most_limit_at_once(self):
+        from horoscope.tasks.send_daily_horoscope import generate_daily_for_all_users
+
+        profile_repo = MagicMock()
+        profile_repo.aiter_telegram_uids_by_notification_hour = mock_uid_chunks(list(range(1, 11)))
+        subscription_repo = MagicMock()
+        subscription_repo.ahas_active_subscription = AsyncMock(return_value=True)
+        running = []
+        peak = 0
+
+        async def generate_horoscope(**kwargs):
+            nonlocal peak
+            running.append(kwargs['telegram_uid'])
+            peak = max(peak, len(running))
+            await asyncio.sleep(0.01)
+            running.remove(kwargs['telegram_uid'])
+
+        with (
+            patch('core.containers.container') as mock_container,
+            patch('horoscope.tasks.generate_horoscope.generate_horoscope', generate_horoscope),
+        ):
+            mock_container.horoscope.user_profile_repository.return_value = profile_repo
+            mock_container.horoscope.subscription_repository.return_value = subscription_repo
+            mock_container.horoscope.llm_governor.return_value.limiter.limit = 3.5
+
+            result = await generate_daily_for_all_users(MagicMock())
+
+        assert result == 10
+        assert peak == 3
+
+
+class TestLLMGovernor:
+    def test_retries_retryable_errors_with_backoff(self):
+        sleeps = []
+        func = MagicMock(side_effect=[ProviderError(429), ProviderError(503), 'answer'])
+
+        assert _governor(sleeps).call(func, kind='horoscope') == 'answer'
+        assert func.call_count == 3
+        assert len(sleeps) == 2
+        assert 0 <= sleeps[0] <= 1 and 0 <= sleeps[1] <= 2
+
+    def test_gives_up_after_max_retries(self):
+        sleeps = []
+        func = MagicMock(side_effect=ProviderError(503))
+
+        with pytest.raises(ProviderError):
+            _governor(sleeps).call(func, kind='horoscope')
+        assert func.call_count == 3
+
+    def test_request_errors_are_not_retried(self):
+        sleeps = []
+        governor = _governor(sleeps)
+        func = MagicMock(side_effect=ProviderError(400))
+
+        with pytest.raises(ProviderError):
+            governor.call(func, kind='followup')
+        assert func.call_count == 1
+        assert sleeps == []
+        assert governor.breaker.failures == 0
+
+    def test_backoff_is_capped(self):
+        governor = _governor([])
+
+        assert all(0 <= governor.backoff_delay(attempt=10) <= 3 for _ in range(20))
+
+    def test_open_circuit_fails_fast(self):
+        governor = _governor([], breaker=CircuitBreaker(failure_threshold=2, open_seconds=30), max_retries=1)
+        with pytest.raises(ProviderError):
+            governor.call(MagicMock(side_effect=ProviderError(503)), kind='horoscope')
+
+        func = MagicMock()
+        with pytest.raises(LLMCircuitOpen):
+            governor.call(func, kind='horoscope')
+        func.assert_not_called()
+
+    def test_slot_released_after_each_attempt(self):
+        governor = _governor([])
+        with pytest.raises(ProviderError):
+            governor.call(MagicMock(side_effect=ProviderError(500)), kind='horoscope')
+
+        assert governor.limiter.in_flight == 0
+
+    def test_priority_taken_from_context(self):
+        governor = _governor([])
+        governor.limiter.acquire = MagicMock()
+        governor.limiter.release = MagicMock()
+
+        with llm_priority(LLMPriority.BATCH):
+            governor.call(lambda: 'answer', kind='horoscope')
+        governor.call(lambda: 'answer', kind='followup')
+
+        priorities = [call.args[0] for call in governor.limiter.acquire.call_args_list]
+        assert priorities == [LLMPriority.BATCH, LLMPriority.INTERACTIVE]
+
+
+class TestLLMServiceUsesGovernor:
+    def _response(self):
+        response = MagicMock()
+        response.choices[0].message.content = 'answer'
+        response.usage.prompt_tokens = 10
+        response.usage.completion_tokens = 5
+        return response
+
+    def test_completion_retried_through_governor(self):
+        governor = _governor([])
+        completion = MagicMock(side_effect=[ProviderError(429), self._response()])
+        with (
+            container.horoscope.llm_governor.override(providers.Object(governor)),
+            patch('litellm.completion', completion),
+        ):
+            result = LLMService().generate_followup_answer(horoscope_text='text', question='q?')
+
+        assert result.answer_text == 'answer'
+        assert completion.call_count == 2
+
+    @pytest.mark.django_db
+    def test_open_circuit_falls_back_offline(self):
+        UserProfile.objects.create(
+            user_telegram_uid=12345,
+            name="Alice",
+            date_of_birth=date(1990, 5, 15),
+            place_of_birth="London",
+            place_of_living="Berlin",
+        )
+        breaker = CircuitBreaker(failure_threshold=1, open_seconds=30)
+        breaker.record_failure()
+        service = HoroscopeService(
+            horoscope_repo=container.horoscope.horoscope_repository(),
+            user_profile_repo=container.horoscope.user_profile_repository(),
+            llm_usage_repo=container.horoscope.llm_usage_repository(),
+        )
+        completion = MagicMock()
+        with (
+            container.horoscope.llm_governor.override(providers.Object(_governor([], breaker=breaker))),
+            patch('litellm.completion', completion),
+        ):
+            horoscope = service.generate_for_user(telegram_uid=12345, target_date=date(2024, 6, 15))
+
+        assert horoscope.generated_by_fallback is True
+        completion.assert_not_called()
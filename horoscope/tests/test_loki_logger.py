@@ -0,0 +1,115 @@
+"""Tests for the queued, batched Loki log handler."""
+
+import gzip
+import json
+import logging
+import queue
+from unittest.mock import MagicMock, patch
+from urllib.error import HTTPError
+
+from django.test import override_settings
+
+from core.loki_logger import LokiHandlerWrapper, LokiShipper, build_push_payload
+
+LOKI_SETTINGS = {
+    'LOKI_ENABLED': True,
+    'LOKI_URL': 'http://loki.test/loki/api/v1/push',
+    'LOKI_BEARER_TOKEN': 'token',
+    'LOKI_APPLICATION_NAME': 'horoscope',
+    'LOKI_BATCH_SIZE': 100,
+    'LOKI_FLUSH_INTERVAL': 0.05,
+    'LOKI_QUEUE_SIZE': 100,
+    'LOKI_FLUSH_TIMEOUT': 5,
+}
+
+
+def _record(message: str, level: int = logging.INFO, name: str = 'horoscope.tasks') -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, message, None, None)
+
+
+def _pushed_payloads(urlopen: MagicMock) -> list[dict]:
+    return [json.loads(gzip.decompress(call.args[0].data)) for call in urlopen.call_args_list]
+
+
+class TestBuildPushPayload:
+    def test_groups_values_by_label_set(self):
+        info = (('level', 'INFO'),)
+        error = (('level', 'ERROR'),)
+
+        payload = build_push_payload([(info, '1', 'a'), (error, '2', 'b'), (info, '3', 'c')])
+
+        assert payload == {'streams': [
+            {'stream': {'level': 'INFO'}, 'values': [['1', 'a'], ['3', 'c']]},
+            {'stream': {'level': 'ERROR'}, 'values': [['2', 'b']]},
+        ]}
+
+
+class TestLokiHandlerWrapper:
+    def test_disabled_handler_starts_no_thread(self):
+        with override_settings(**{**LOKI_SETTINGS, 'LOKI_ENABLED': False}):
+            handler = LokiHandlerWrapper()
+        handler.emit(_record("ignored"))
+
+        assert handler.queue.empty()
+        handler.close()
+
+    def test_emit_queues_and_close_flushes_one_gzip_batch(self):
+        with override_settings(**LOKI_SETTINGS), patch('core.loki_logger.urlopen') as urlopen:
+            handler = LokiHandlerWrapper()
+            handler.setFormatter(logging.Formatter('{message}', style='{'))
+            handler.emit(_record("first"))
+            handler.emit(_record("second"))
+            handler.emit(_record("failed", level=logging.ERROR))
+            handler.close()
+
+        request = urlopen.call_args.args[0]
+        assert request.headers['Content-encoding'] == 'gzip'
+        [payload] = _pushed_payloads(urlopen)
+        lines = {stream['stream']['level']: [v[1] for v in stream['values']] for stream in payload['streams']}
+        assert lines == {'INFO': ['first', 'second'], 'ERROR': ['failed']}
+
+    def test_drops_when_queue_full(self):
+        # Disabled, so no shipper thread drains the queue
+        with override_settings(**{**LOKI_SETTINGS, 'LOKI_ENABLED': False, 'LOKI_QUEUE_SIZE': 1}):
+            handler = LokiHandlerWrapper()
+        handler.enqueue(((), '1', 'kept'))
+        handler.enqueue(((), '2', 'dropped'))
+
+        assert handler.dropped == 1
+        assert handler.queue.get_nowait() == ((), '1', 'kept')
+
+
+class TestLokiShipper:
+    def _ship(self, urlopen_side_effect) -> tuple[LokiShipper, MagicMock]:
+        shipper = LokiShipper(
+            entries=queue.Queue(),
+            url='http://loki.test',
+            headers={},
+            batch_size=10,
+            flush_interval=0,
+            retry_backoff=0,
+        )
+        with patch('core.loki_logger.urlopen', side_effect=urlopen_side_effect) as urlopen:
+            shipper._ship([((), '1', 'line')])
+        return shipper, urlopen
+
+    def test_retries_server_errors(self):
+        unavailable = HTTPError('http://loki.test', 503, 'Unavailable', {}, None)
+        shipper, urlopen = self._ship([unavailable, ConnectionResetError(), MagicMock()])
+
+        assert urlopen.call_count == 3
+        assert shipper.sent == 1
+        assert shipper.failed == 0
+
+    def test_does_not_retry_client_errors(self):
+        bad_request = HTTPError('http://loki.test', 400, 'Bad Request', {}, None)
+        shipper, urlopen = self._ship([bad_request])
+
+        assert urlopen.call_count == 1
+        assert shipper.failed == 1
+
+    def test_gives_up_after_max_retries(self):
+        shipper, urlopen = self._ship(ConnectionRefusedError())
+
+        assert urlopen.call_count == 4
+        assert shipper.failed == 1
@@ -0,0 +1,83 @@
+"""Tests for the event loop watchdog."""
+
+import asyncio
+import logging
+import threading
+import time
+
+from core.loop_watchdog import LoopWatchdog, format_thread_stack
+from core.metrics import EVENT_LOOP_STALLS_TOTAL
+
+
+def blocking_call_in_handler():
+    time.sleep(0.3)
+
+
+class TestFormatThreadStack:
+    def test_stack_of_other_thread(self):
+        release = threading.Event()
+
+        def parked_worker():
+            release.wait()
+
+        thread = threading.Thread(target=parked_worker)
+        thread.start()
+        try:
+            stack = format_thread_stack(thread.ident)
+        finally:
+            release.set()
+            thread.join()
+
+        assert 'in parked_worker' in stack
+
+
+class TestLoopWatchdog:
+    async def test_blocking_call_stack_is_dumped(self, caplog):
+        watchdog = LoopWatchdog(stall_seconds=0.1, interval_seconds=0.02)
+        await watchdog.start()
+        try:
+            with caplog.at_level(logging.WARNING, logger='core.loop_watchdog'):
+                await asyncio.sleep(0.05)
+                blocking_call_in_handler()
+                await asyncio.sleep(0.05)
+        finally:
+            await watchdog.stop()
+
+        assert watchdog.dumps == 1
+        assert watchdog.stalls == 1
+        assert 'in blocking_call_in_handler' in caplog.text
+        assert 'Event loop was blocked for' in caplog.text
+
+    async def test_idle_loop_reports_nothing(self):
+        watchdog = LoopWatchdog(stall_seconds=0.5, interval_seconds=0.01)
+        await watchdog.start()
+        try:
+            await asyncio.sleep(0.1)
+        finally:
+            await watchdog.stop()
+
+        assert watchdog.stalls == 0
+        assert watchdog.dumps == 0
+
+    def test_one_dump_per_stall(self):
+        watchdog = LoopWatchdog(stall_seconds=0.1, interval_seconds=0.05)
+        watchdog._loop_thread_id = threading.get_ident()
+        watchdog._beat = 100.0
+
+        watchdog.check(100.1)
+        watchdog.check(100.2)
+        watchdog.check(100.3)
+        watchdog._beat = 101.0
+        watchdog.check(101.2)
+
+        assert watchdog.dumps == 2
+
+    def test_lag_above_threshold_counts_stall(self):
+        watchdog = LoopWatchdog(stall_seconds=0.1)
+        before = EVENT_LOOP_STALLS_TOTAL.value()
+
+        watchdog.record_lag(0.01)
+        watchdog.record_lag(0.25)
+
+        assert watchdog.stalls == 1
+        assert EVENT_LOOP_STALLS_TOTAL.value() == before + 1
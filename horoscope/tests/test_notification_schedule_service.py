@@ -0,0 +1,64 @@
+from datetime import date
+
+import pytest
+
+from core.models import Setting
+from core.repositories import SettingRepository
+from horoscope.models import UserProfile
+from horoscope.repositories import UserProfileRepository
+from horoscope.services.notification_schedule import (
+    NOTIFICATION_HOURS_SETTING_NAME,
+    NotificationScheduleService,
+)
+
+
+@pytest.mark.django_db
+class TestNotificationScheduleService:
+    def setup_method(self):
+        self.service = NotificationScheduleService(
+            user_profile_repo=UserProfileRepository(),
+            setting_repo=SettingRepository(),
+        )
+
+    def _create_profile(self, telegram_uid: int, language: str) -> None:
+        UserProfile.objects.create(
+            user_telegram_uid=telegram_uid,
+            name="A",
+            date_of_birth=date(1990, 1, 1),
+            place_of_birth="X",
+            place_of_living="Y",
+            preferred_language=language,
+        )
+
+    def test_first_sync_stores_config(self, settings):
+        settings.HOROSCOPE_GENERATION_HOURS_UTC = {'en': 6}
+        settings.HOROSCOPE_DEFAULT_GENERATION_HOUR_UTC = 6
+
+        self.service.refresh_effective_hours()
+
+        stored = Setting.objects.get(name=NOTIFICATION_HOURS_SETTING_NAME).get_value()
+        assert stored == {'hours': {'en': 6}, 'default_hour': 6}
+
+    def test_sync_recomputes_when_mapping_changes(self, settings):
+        settings.HOROSCOPE_GENERATION_HOURS_UTC = {'en': 6}
+        settings.HOROSCOPE_DEFAULT_GENERATION_HOUR_UTC = 6
+        self._create_profile(telegram_uid=111, language='en')
+        self.service.refresh_effective_hours()
+
+        settings.HOROSCOPE_GENERATION_HOURS_UTC = {'en': 9}
+        updated = self.service.refresh_effective_hours()
+
+        assert updated == 1
+        assert UserProfile.objects.get(pk=111).effective_notification_hour == 9
+
+    def test_sync_skips_when_mapping_unchanged(self, settings):
+        settings.HOROSCOPE_GENERATION_HOURS_UTC = {'en': 6}
+        settings.HOROSCOPE_DEFAULT_GENERATION_HOUR_UTC = 6
+        self._create_profile(telegram_uid=111, language='en')
+        self.service.refresh_effective_hours()
+
+        UserProfile.objects.filter(pk=111).update(effective_notification_hour=None)
+
+        assert self.service.refresh_effective_hours() == 0
+        assert self.service.refresh_effective_hours(force=True) == 1
+        assert UserProfile.objects.get(pk=111).effective_notification_hour == 6
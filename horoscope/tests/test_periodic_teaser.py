@@ -17,6 +17,7 @@ from django.utils import timezone
 from core.entities import UserEntity
 from horoscope.entities import HoroscopeEntity, SubscriptionEntity, UserProfileEntity
 from horoscope.enums import HoroscopeType, SubscriptionStatus
+from horoscope.tests.helpers import mock_uid_chunks
 
 
 def _make_profile(
@@ -35,15 +36,18 @@ def _make_profile(
     )
 
 
+# Short teaser covers the first HOROSCOPE_TEASER_LINE_COUNT (3) content lines,
+# the extended teaser reaches the fourth one
+HOROSCOPE_FULL_TEXT = "Header\nGreeting\n\nTeaser 1\nTeaser 2\nTeaser 3\nExtended teaser content\nFinal line"
+
+
 def _make_horoscope(telegram_uid: int = 12345) -> HoroscopeEntity:
     return HoroscopeEntity(
         id=1,
         user_telegram_uid=telegram_uid,
         horoscope_type=HoroscopeType.DAILY,
         date=date.today(),
-        full_text="Full text",
-        teaser_text="Teaser",
-        extended_teaser_text="Extended teaser content",
+        full_text=HOROSCOPE_FULL_TEXT,
         created_at=datetime(2024, 1, 1),
     )
 
@@ -69,7 +73,7 @@ class TestGenerateDailyFiltersByActivity:
         from horoscope.tasks.send_daily_horoscope import generate_daily_for_all_users
 
         mock_profile_repo = MagicMock()
-        mock_profile_repo.aget_telegram_uids_by_notification_hour = AsyncMock(return_value=[111])  # used by generate task
+        mock_profile_repo.aiter_telegram_uids_by_notification_hour = mock_uid_chunks([111])  # used by generate task
 
         mock_subscription_repo = MagicMock()
         mock_subscription_repo.ahas_active_subscription = AsyncMock(return_value=False)
@@ -99,7 +103,7 @@ class TestGenerateDailyFiltersByActivity:
         from horoscope.tasks.send_daily_horoscope import generate_daily_for_all_users
 
         mock_profile_repo = MagicMock()
-        mock_profile_repo.aget_telegram_uids_by_notification_hour = AsyncMock(return_value=[111])  # used by generate task
+        mock_profile_repo.aiter_telegram_uids_by_notification_hour = mock_uid_chunks([111])  # used by generate task
 
         mock_subscription_repo = MagicMock()
         mock_subscription_repo.ahas_active_subscription = AsyncMock(return_value=False)
@@ -129,7 +133,7 @@ class TestGenerateDailyFiltersByActivity:
         from horoscope.tasks.send_daily_horoscope import generate_daily_for_all_users
 
         mock_profile_repo = MagicMock()
-        mock_profile_repo.aget_telegram_uids_by_notification_hour = AsyncMock(return_value=[111])  # used by generate task
+        mock_profile_repo.aiter_telegram_uids_by_notification_hour = mock_uid_chunks([111])  # used by generate task
 
         mock_subscription_repo = MagicMock()
         mock_subscription_repo.ahas_active_subscription = AsyncMock(return_value=True)
@@ -151,7 +155,7 @@ class TestGenerateDailyFiltersByActivity:
         from horoscope.tasks.send_daily_horoscope import generate_daily_for_all_users
 
         mock_profile_repo = MagicMock()
-        mock_profile_repo.aget_telegram_uids_by_notification_hour = AsyncMock(return_value=[111])  # used by generate task
+        mock_profile_repo.aiter_telegram_uids_by_notification_hour = mock_uid_chunks([111])  # used by generate task
 
         mock_subscription_repo = MagicMock()
         mock_subscription_repo.ahas_active_subscription = AsyncMock(return_value=False)
@@ -177,6 +181,44 @@ class TestGenerateDailyFiltersByActivity:
         mock_task.assert_not_called()
 
 
+    @pytest.mark.django_db
+    async def test_uses_scheduled_hour_when_catching_up(self):
+        from horoscope.tasks.send_daily_horoscope import generate_daily_for_all_users
+
+        mock_profile_repo = MagicMock()
+        mock_profile_repo.aiter_telegram_uids_by_notification_hour = MagicMock(side_effect=mock_uid_chunks([]))
+        scheduled_at = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+        with patch('core.containers.container') as mock_container:
+            mock_container.horoscope.user_profile_repository.return_value = mock_profile_repo
+
+            await generate_daily_for_all_users(
+                MagicMock(),
+                scheduled_at=scheduled_at - timedelta(seconds=settings.HOROSCOPE_GENERATION_LEAD_SECONDS),
+            )
+
+        mock_profile_repo.aiter_telegram_uids_by_notification_hour.assert_called_once_with(hour_utc=0)
+
+    @pytest.mark.django_db
+    async def test_skips_scheduled_hour_from_previous_day(self):
+        from horoscope.tasks.send_daily_horoscope import generate_daily_for_all_users
+
+        mock_profile_repo = MagicMock()
+
+        with patch('core.containers.container') as mock_container, \
+             patch('horoscope.tasks.generate_horoscope.generate_horoscope', new_callable=AsyncMock) as mock_task:
+            mock_container.horoscope.user_profile_repository.return_value = mock_profile_repo
+
+            result = await generate_daily_for_all_users(
+                MagicMock(),
+                scheduled_at=timezone.now().replace(hour=0, minute=0) - timedelta(days=1),
+            )
+
+        assert result == 0
+        mock_task.assert_not_called()
+        mock_profile_repo.aiter_telegram_uids_by_notification_hour.assert_not_called()
+
+
 def _make_subscription(
     expires_at: datetime | None = None,
     status: str = SubscriptionStatus.EXPIRED,
@@ -215,8 +257,9 @@ def _setup_common_mocks(
     mock_profile_repo.aget_by_telegram_uid = AsyncMock(return_value=profile)
 
     mock_horoscope_repo = MagicMock()
-    mock_horoscope_repo.aget_unsent_telegram_uids_for_date = AsyncMock(return_value=[telegram_uid])
-    mock_horoscope_repo.aget_by_user_and_date = AsyncMock(return_value=horoscope)
+    mock_horoscope_repo.aiter_unsent_telegram_uids_for_date = mock_uid_chunks([telegram_uid])
+    mock_horoscope_repo.aget_delivery_state_by_user_and_date = AsyncMock(return_value=horoscope)
+    mock_horoscope_repo.aget_delivery = AsyncMock(return_value=horoscope)
     mock_horoscope_repo.aget_last_sent_at = AsyncMock(return_value=last_sent_at)
     mock_horoscope_repo.amark_sent = AsyncMock()
     mock_horoscope_repo.amark_failed_to_send = AsyncMock()
@@ -454,13 +497,14 @@ class TestSendPeriodicTeaserNotifications:
 
         assert result == 0
         mock_send.assert_not_called()
+        mocks['horoscope_repo'].aget_delivery.assert_not_called()
 
     @pytest.mark.django_db
     async def test_skips_subscriber(self):
         from horoscope.tasks.send_periodic_teaser import send_periodic_teaser_notifications
 
         mock_horoscope_repo = MagicMock()
-        mock_horoscope_repo.aget_unsent_telegram_uids_for_date = AsyncMock(return_value=[111])
+        mock_horoscope_repo.aiter_unsent_telegram_uids_for_date = mock_uid_chunks([111])
 
         mock_subscription_repo = MagicMock()
         mock_subscription_repo.ahas_active_subscription = AsyncMock(return_value=True)
@@ -482,7 +526,7 @@ class TestSendPeriodicTeaserNotifications:
         from horoscope.tasks.send_periodic_teaser import send_periodic_teaser_notifications
 
         mock_horoscope_repo = MagicMock()
-        mock_horoscope_repo.aget_unsent_telegram_uids_for_date = AsyncMock(return_value=[111])
+        mock_horoscope_repo.aiter_unsent_telegram_uids_for_date = mock_uid_chunks([111])
 
         mock_subscription_repo = MagicMock()
         mock_subscription_repo.ahas_active_subscription = AsyncMock(return_value=False)
@@ -517,9 +561,7 @@ class TestSendPeriodicTeaserNotifications:
             user_telegram_uid=111,
             horoscope_type=HoroscopeType.DAILY,
             date=date.today(),
-            full_text="Full text",
-            teaser_text="Teaser",
-            extended_teaser_text="Extended teaser content",
+            full_text=HOROSCOPE_FULL_TEXT,
             sent_at=timezone.now(),
             created_at=datetime(2024, 1, 1),
         )
@@ -542,6 +584,7 @@ class TestSendPeriodicTeaserNotifications:
 
         assert result == 0
         mock_send.assert_not_called()
+        mocks['horoscope_repo'].aget_delivery.assert_not_called()
 
     @pytest.mark.django_db
     async def test_marks_failed_to_send_on_failure(self):
@@ -577,8 +620,8 @@ class TestSendPeriodicTeaserNotifications:
         mock_profile_repo.aget_by_telegram_uid = AsyncMock(return_value=None)
 
         mock_horoscope_repo = MagicMock()
-        mock_horoscope_repo.aget_unsent_telegram_uids_for_date = AsyncMock(return_value=[111])
-        mock_horoscope_repo.aget_by_user_and_date = AsyncMock(return_value=horoscope)
+        mock_horoscope_repo.aiter_unsent_telegram_uids_for_date = mock_uid_chunks([111])
+        mock_horoscope_repo.aget_delivery_state_by_user_and_date = AsyncMock(return_value=horoscope)
 
         mock_subscription_repo = MagicMock()
         mock_subscription_repo.ahas_active_subscription = AsyncMock(return_value=False)
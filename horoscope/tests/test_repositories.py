@@ -3,12 +3,22 @@ Tests for horoscope repositories.
 Covers UserProfileRepository, HoroscopeRepository, LLMUsageRepository, SubscriptionRepository.
 """
 
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta, timezone as dt_timezone
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
-from horoscope.entities import HoroscopeEntity, LLMUsageEntity, SubscriptionEntity, UserProfileEntity
+from horoscope.entities import (
+    HoroscopeDeliveryEntity,
+    HoroscopeDeliveryStateEntity,
+    HoroscopeDueDeliveryEntity,
+    HoroscopeEntity,
+    LLMUsageEntity,
+    SubscriptionEntity,
+    UserProfileEntity,
+)
 from horoscope.enums import HoroscopeType, SubscriptionStatus
 from horoscope.models import Horoscope, LLMUsage, Subscription, UserProfile
 from horoscope.repositories.horoscope import HoroscopeRepository
@@ -113,14 +123,14 @@ class TestUserProfileRepository:
         assert uids == []
 
     def test_get_telegram_uids_by_notification_hour_explicit(self):
-        """Users with explicit notification_hour_utc matching the hour are returned."""
+        """Users with an explicit notification hour (UTC when no timezone is set) matching the hour are returned."""
         UserProfile.objects.create(
             user_telegram_uid=111,
             name="A",
             date_of_birth=date(1990, 1, 1),
             place_of_birth="X",
             place_of_living="Y",
-            notification_hour_utc=8,
+            notification_hour_local=8,
         )
         UserProfile.objects.create(
             user_telegram_uid=222,
@@ -128,18 +138,17 @@ class TestUserProfileRepository:
             date_of_birth=date(1991, 1, 1),
             place_of_birth="X",
             place_of_living="Y",
-            notification_hour_utc=10,
+            notification_hour_local=10,
         )
 
         result = self.repo.get_telegram_uids_by_notification_hour(hour_utc=8)
 
         assert result == [111]
 
-    def test_get_telegram_uids_by_notification_hour_language_default(self, monkeypatch):
+    def test_get_telegram_uids_by_notification_hour_language_default(self, settings):
         """Users without explicit hour use their language's default hour."""
-        from config import settings as cfg
-        monkeypatch.setattr(cfg, 'HOROSCOPE_GENERATION_HOURS_UTC', {'en': 6, 'ru': 5})
-        monkeypatch.setattr(cfg, 'HOROSCOPE_DEFAULT_GENERATION_HOUR_UTC', 6)
+        settings.HOROSCOPE_GENERATION_HOURS_UTC = {'en': 6, 'ru': 5}
+        settings.HOROSCOPE_DEFAULT_GENERATION_HOUR_UTC = 6
 
         UserProfile.objects.create(
             user_telegram_uid=111,
@@ -162,11 +171,10 @@ class TestUserProfileRepository:
 
         assert result == [111]
 
-    def test_get_telegram_uids_by_notification_hour_unconfigured_lang_uses_default(self, monkeypatch):
+    def test_get_telegram_uids_by_notification_hour_unconfigured_lang_uses_default(self, settings):
         """Users with a language not in HOROSCOPE_GENERATION_HOURS_UTC use the default hour."""
-        from config import settings as cfg
-        monkeypatch.setattr(cfg, 'HOROSCOPE_GENERATION_HOURS_UTC', {'en': 6, 'ru': 5})
-        monkeypatch.setattr(cfg, 'HOROSCOPE_DEFAULT_GENERATION_HOUR_UTC', 6)
+        settings.HOROSCOPE_GENERATION_HOURS_UTC = {'en': 6, 'ru': 5}
+        settings.HOROSCOPE_DEFAULT_GENERATION_HOUR_UTC = 6
 
         UserProfile.objects.create(
             user_telegram_uid=111,
@@ -182,11 +190,10 @@ class TestUserProfileRepository:
 
         assert 111 in result
 
-    def test_get_telegram_uids_by_notification_hour_mixed(self, monkeypatch):
+    def test_get_telegram_uids_by_notification_hour_mixed(self, settings):
         """Mix of explicit and language-default users."""
-        from config import settings as cfg
-        monkeypatch.setattr(cfg, 'HOROSCOPE_GENERATION_HOURS_UTC', {'en': 6, 'ru': 5})
-        monkeypatch.setattr(cfg, 'HOROSCOPE_DEFAULT_GENERATION_HOUR_UTC', 6)
+        settings.HOROSCOPE_GENERATION_HOURS_UTC = {'en': 6, 'ru': 5}
+        settings.HOROSCOPE_DEFAULT_GENERATION_HOUR_UTC = 6
 
         # Explicit hour=6
         UserProfile.objects.create(
@@ -195,7 +202,7 @@ class TestUserProfileRepository:
             date_of_birth=date(1990, 1, 1),
             place_of_birth="X",
             place_of_living="Y",
-            notification_hour_utc=6,
+            notification_hour_local=6,
             preferred_language='ru',
         )
         # Language default: en -> 6
@@ -226,11 +233,10 @@ class TestUserProfileRepository:
         result = self.repo.get_telegram_uids_by_notification_hour(hour_utc=6)
         assert result == []
 
-    def test_get_telegram_uids_by_notification_hour_no_match(self, monkeypatch):
+    def test_get_telegram_uids_by_notification_hour_no_match(self, settings):
         """No users match the given hour."""
-        from config import settings as cfg
-        monkeypatch.setattr(cfg, 'HOROSCOPE_GENERATION_HOURS_UTC', {'en': 6})
-        monkeypatch.setattr(cfg, 'HOROSCOPE_DEFAULT_GENERATION_HOUR_UTC', 6)
+        settings.HOROSCOPE_GENERATION_HOURS_UTC = {'en': 6}
+        settings.HOROSCOPE_DEFAULT_GENERATION_HOUR_UTC = 6
 
         UserProfile.objects.create(
             user_telegram_uid=111,
@@ -238,7 +244,7 @@ class TestUserProfileRepository:
             date_of_birth=date(1990, 1, 1),
             place_of_birth="X",
             place_of_living="Y",
-            notification_hour_utc=8,
+            notification_hour_local=8,
         )
         UserProfile.objects.create(
             user_telegram_uid=222,
@@ -253,6 +259,150 @@ class TestUserProfileRepository:
 
         assert result == []
 
+    def test_effective_notification_hour_maintained_on_update(self, settings):
+        settings.HOROSCOPE_GENERATION_HOURS_UTC = {'en': 6, 'ru': 5}
+        settings.HOROSCOPE_DEFAULT_GENERATION_HOUR_UTC = 7
+        self.repo.create_profile(
+            telegram_uid=111,
+            name="A",
+            date_of_birth="1990-01-01",
+            place_of_birth="X",
+            place_of_living="Y",
+            preferred_language='en',
+        )
+        assert UserProfile.objects.get(pk=111).effective_notification_hour == 6
+
+        self.repo.update_language(telegram_uid=111, language='ru')
+        assert UserProfile.objects.get(pk=111).effective_notification_hour == 5
+
+        self.repo.update_language(telegram_uid=111, language='de')
+        assert UserProfile.objects.get(pk=111).effective_notification_hour == 7
+
+        self.repo.update_notification_hour(telegram_uid=111, notification_hour_local=12)
+        assert UserProfile.objects.get(pk=111).effective_notification_hour == 12
+
+        self.repo.update_notification_hour(telegram_uid=111, notification_hour_local=None)
+        assert UserProfile.objects.get(pk=111).effective_notification_hour == 7
+
+    def test_recompute_effective_notification_hours_after_mapping_change(self, settings):
+        settings.HOROSCOPE_GENERATION_HOURS_UTC = {'en': 6, 'ru': 5}
+        settings.HOROSCOPE_DEFAULT_GENERATION_HOUR_UTC = 6
+        for uid, language, hour in (
+            (111, 'en', None),
+            (222, 'ru', None),
+            (333, 'de', None),
+            (444, 'en', 10),
+        ):
+            UserProfile.objects.create(
+                user_telegram_uid=uid,
+                name="A",
+                date_of_birth=date(1990, 1, 1),
+                place_of_birth="X",
+                place_of_living="Y",
+                preferred_language=language,
+                notification_hour_local=hour,
+            )
+
+        settings.HOROSCOPE_GENERATION_HOURS_UTC = {'en': 8, 'ru': 5}
+        settings.HOROSCOPE_DEFAULT_GENERATION_HOUR_UTC = 9
+
+        updated = self.repo.recompute_effective_notification_hours()
+
+        assert updated == 2
+        assert self.repo.get_telegram_uids_by_notification_hour(hour_utc=8) == [111]
+        assert self.repo.get_telegram_uids_by_notification_hour(hour_utc=5) == [222]
+        assert self.repo.get_telegram_uids_by_notification_hour(hour_utc=9) == [333]
+        assert self.repo.get_telegram_uids_by_notification_hour(hour_utc=10) == [444]
+        assert self.repo.recompute_effective_notification_hours() == 0
+
+    def test_explicit_hour_is_local_to_iana_timezone(self):
+        UserProfile.objects.create(
+            user_telegram_uid=111,
+            name="A",
+            date_of_birth=date(1990, 1, 1),
+            place_of_birth="X",
+            place_of_living="Y",
+            timezone='Asia/Kolkata',
+            notification_hour_local=8,
+        )
+
+        profile = UserProfile.objects.get(pk=111)
+
+        # 08:00 IST is 02:30 UTC
+        assert profile.utc_offset_minutes == 330
+        assert profile.effective_notification_minute == 150
+        assert self.repo.get_telegram_uids_by_notification_hour(hour_utc=2) == [111]
+
+    def test_rebuild_notification_buckets_follows_dst(self, settings):
+        settings.HOROSCOPE_GENERATION_HOURS_UTC = {'en': 12}
+        winter = datetime(2025, 1, 15, 12, tzinfo=dt_timezone.utc)
+        summer = datetime(2025, 7, 15, 12, tzinfo=dt_timezone.utc)
+        # 333 uses the language default, which is a UTC hour and never moves
+        for uid, tz_name, hour in ((111, 'Europe/Berlin', 8), (222, 'UTC+3', 8), (333, 'Europe/Berlin', None)):
+            UserProfile.objects.create(
+                user_telegram_uid=uid,
+                name="A",
+                date_of_birth=date(1990, 1, 1),
+                place_of_birth="X",
+                place_of_living="Y",
+                preferred_language='en',
+                timezone=tz_name,
+                notification_hour_local=hour,
+            )
+
+        self.repo.rebuild_notification_buckets(at=winter)
+        assert self.repo.get_telegram_uids_by_notification_hour(hour_utc=7) == [111]
+
+        updated = self.repo.rebuild_notification_buckets(at=summer)
+
+        assert updated == 1
+        assert self.repo.get_telegram_uids_by_notification_hour(hour_utc=6) == [111]
+        assert self.repo.get_telegram_uids_by_notification_hour(hour_utc=5) == [222]
+        assert self.repo.get_telegram_uids_by_notification_hour(hour_utc=12) == [333]
+        assert self.repo.rebuild_notification_buckets(at=summer) == 0
+
+    def test_iter_all_telegram_uids_chunks(self):
+        for uid in (111, 222, 333, 444, 555):
+            UserProfile.objects.create(
+                user_telegram_uid=uid,
+                name="A",
+                date_of_birth=date(1990, 1, 1),
+                place_of_birth="X",
+                place_of_living="Y",
+            )
+
+        chunks = list(self.repo.iter_all_telegram_uids(chunk_size=2))
+
+        assert chunks == [[111, 222], [333, 444], [555]]
+
+    def test_iter_all_telegram_uids_empty(self):
+        assert list(self.repo.iter_all_telegram_uids(chunk_size=2)) == []
+
+    def test_iter_telegram_uids_by_notification_hour_chunks(self, settings):
+        """Chunked variant returns the same users as the list variant."""
+        settings.HOROSCOPE_GENERATION_HOURS_UTC = {'en': 6, 'ru': 5}
+        settings.HOROSCOPE_DEFAULT_GENERATION_HOUR_UTC = 6
+
+        for uid, language, hour in (
+            (111, 'ru', 6),
+            (222, 'en', None),
+            (333, 'ru', None),
+            (444, 'de', None),
+        ):
+            UserProfile.objects.create(
+                user_telegram_uid=uid,
+                name="A",
+                date_of_birth=date(1990, 1, 1),
+                place_of_birth="X",
+                place_of_living="Y",
+                preferred_language=language,
+                notification_hour_local=hour,
+            )
+
+        chunks = list(self.repo.iter_telegram_uids_by_notification_hour(hour_utc=6, chunk_size=2))
+
+        assert chunks == [[111, 222], [444]]
+
 
 @pytest.mark.django_db
 class TestHoroscopeRepository:
@@ -265,7 +415,6 @@ class TestHoroscopeRepository:
             horoscope_type=HoroscopeType.DAILY,
             date=date(2024, 6, 15),
             full_text="Full text",
-            teaser_text="Teaser",
         )
 
         result = self.repo.get_by_user_and_date(
@@ -276,7 +425,6 @@ class TestHoroscopeRepository:
         assert result is not None
         assert isinstance(result, HoroscopeEntity)
         assert result.full_text == "Full text"
-        assert result.teaser_text == "Teaser"
 
     def test_get_by_user_and_date_not_found(self):
         result = self.repo.get_by_user_and_date(
@@ -291,7 +439,6 @@ class TestHoroscopeRepository:
             horoscope_type=HoroscopeType.DAILY,
             date=date(2024, 6, 15),
             full_text="Full text",
-            teaser_text="Teaser",
         )
 
         result = self.repo.get_by_user_and_date(
@@ -306,21 +453,62 @@ class TestHoroscopeRepository:
             horoscope_type=HoroscopeType.DAILY,
             target_date=date(2024, 6, 15),
             full_text="Generated horoscope",
-            teaser_text="Preview...",
         )
 
         assert isinstance(result, HoroscopeEntity)
         assert result.full_text == "Generated horoscope"
-        assert result.teaser_text == "Preview..."
         assert Horoscope.objects.filter(user_telegram_uid=12345).exists()
 
+    def test_get_delivery_state_by_user_and_date_skips_text(self):
+        horoscope = Horoscope.objects.create(
+            user_telegram_uid=12345,
+            horoscope_type=HoroscopeType.DAILY,
+            date=date(2024, 6, 15),
+            full_text="Full text",
+        )
+
+        with CaptureQueriesContext(connection) as ctx:
+            result = self.repo.get_delivery_state_by_user_and_date(
+                telegram_uid=12345,
+                target_date=date(2024, 6, 15),
+            )
+
+        assert isinstance(result, HoroscopeDeliveryStateEntity)
+        assert result.id == horoscope.id
+        assert result.sent_at is None
+        assert 'full_text' not in ctx.captured_queries[0]['sql']
+        assert self.repo.get_delivery_state_by_user_and_date(
+            telegram_uid=12345,
+            target_date=date(2024, 6, 16),
+        ) is None
+
+    def test_get_delivery_by_user_and_date(self):
+        horoscope = Horoscope.objects.create(
+            user_telegram_uid=12345,
+            horoscope_type=HoroscopeType.DAILY,
+            date=date(2024, 6, 15),
+            full_text="Header\nGreeting\nLine 1",
+        )
+
+        with CaptureQueriesContext(connection) as ctx:
+            result = self.repo.get_delivery_by_user_and_date(
+                telegram_uid=12345,
+                target_date=date(2024, 6, 15),
+            )
+
+        assert isinstance(result, HoroscopeDeliveryEntity)
+        assert result.id == horoscope.id
+        assert result.teaser_text == "Line 1\n..."
+        assert 'created_at' not in ctx.captured_queries[0]['sql']
+        assert self.repo.get_delivery(horoscope_id=horoscope.id) == result
+        assert self.repo.get_delivery(horoscope_id=horoscope.id + 1) is None
+
     def test_mark_sent(self):
         horoscope = Horoscope.objects.create(
             user_telegram_uid=12345,
             horoscope_type=HoroscopeType.DAILY,
             date=date(2024, 6, 15),
             full_text="Full text",
-            teaser_text="Teaser",
         )
         assert horoscope.sent_at is None
 
@@ -335,7 +523,6 @@ class TestHoroscopeRepository:
             horoscope_type=HoroscopeType.DAILY,
             date=date(2024, 6, 15),
             full_text="Full text",
-            teaser_text="Teaser",
         )
         assert horoscope.failed_to_send_at is None
 
@@ -344,6 +531,105 @@ class TestHoroscopeRepository:
         horoscope.refresh_from_db()
         assert horoscope.failed_to_send_at is not None
 
+    def test_iter_unsent_telegram_uids_for_date_chunks(self):
+        for uid in (111, 222, 333):
+            Horoscope.objects.create(
+                user_telegram_uid=uid,
+                horoscope_type=HoroscopeType.DAILY,
+                date=date(2024, 6, 15),
+                full_text="Full text",
+            )
+        Horoscope.objects.create(
+            user_telegram_uid=444,
+            horoscope_type=HoroscopeType.DAILY,
+            date=date(2024, 6, 15),
+            full_text="Full text",
+            sent_at=timezone.now(),
+        )
+
+        chunks = list(self.repo.iter_unsent_telegram_uids_for_date(
+            target_date=date(2024, 6, 15),
+            chunk_size=2,
+        ))
+
+        assert chunks == [[111, 222], [333]]
+
+    def test_iter_unsent_telegram_uids_not_shifted_by_marking_sent(self):
+        """Marking rows as sent while iterating must not skip remaining users."""
+        for uid in (111, 222, 333, 444, 555):
+            Horoscope.objects.create(
+                user_telegram_uid=uid,
+                horoscope_type=HoroscopeType.DAILY,
+                date=date(2024, 6, 15),
+                full_text="Full text",
+            )
+
+        seen = []
+        for chunk in self.repo.iter_unsent_telegram_uids_for_date(
+            target_date=date(2024, 6, 15),
+            chunk_size=2,
+        ):
+            seen.extend(chunk)
+            Horoscope.objects.filter(user_telegram_uid__in=chunk).update(sent_at=timezone.now())
+
+        assert seen == [111, 222, 333, 444, 555]
+
+    def _queue(self, uid: int, deliver_at) -> Horoscope:
+        return Horoscope.objects.create(
+            user_telegram_uid=uid,
+            horoscope_type=HoroscopeType.DAILY,
+            date=date(2024, 6, 15),
+            full_text="Full text",
+            deliver_at=deliver_at,
+        )
+
+    def test_iter_due_deliveries_returns_only_due_rows(self):
+        now = timezone.now()
+        due = [self._queue(uid, now - timedelta(minutes=5)) for uid in (111, 222, 333)]
+        self._queue(444, now + timedelta(minutes=5))
+        self._queue(555, None)
+
+        chunks = list(self.repo.iter_due_deliveries(due_at=now, chunk_size=2))
+
+        assert [[item.id for item in chunk] for chunk in chunks] == [[due[0].id, due[1].id], [due[2].id]]
+        assert isinstance(chunks[0][0], HoroscopeDueDeliveryEntity)
+        assert chunks[0][0].user_telegram_uid == 111
+        assert chunks[0][0].date == date(2024, 6, 15)
+
+    def test_create_horoscope_queues_delivery(self):
+        deliver_at = timezone.now()
+        entity = self.repo.create_horoscope(
+            telegram_uid=12345,
+            horoscope_type=HoroscopeType.DAILY,
+            target_date=date(2024, 6, 15),
+            full_text="Full text",
+            deliver_at=deliver_at,
+        )
+
+        assert Horoscope.objects.get(id=entity.id).deliver_at == deliver_at
+
+    def test_mark_sent_and_failed_leave_queue(self):
+        now = timezone.now()
+        sent = self._queue(111, now)
+        failed = self._queue(222, now)
+
+        self.repo.mark_sent(horoscope_id=sent.id)
+        self.repo.mark_failed_to_send(horoscope_id=failed.id)
+
+        assert list(self.repo.iter_due_deliveries(due_at=now)) == []
+
+    def test_dequeue_deliveries(self):
+        now = timezone.now()
+        skipped = self._queue(111, now)
+        kept = self._queue(222, now)
+
+        assert self.repo.dequeue_deliveries([skipped.id]) == 1
+
+        skipped.refresh_from_db()
+        assert skipped.deliver_at is None
+        assert skipped.sent_at is None
+        assert [item.id for chunk in self.repo.iter_due_deliveries(due_at=now) for item in chunk] == [kept.id]
+
 
 @pytest.mark.django_db
 class TestLLMUsageRepository:
@@ -363,7 +649,6 @@ class TestLLMUsageRepository:
             horoscope_type=HoroscopeType.DAILY,
             date=target_date or date(2024, 6, 15),
             full_text="Full text",
-            teaser_text="Teaser...",
         )
 
     def test_create_usage(self):
@@ -27,15 +27,9 @@ def _make_profile(telegram_uid: int = 12345) -> UserProfileEntity:
     )
 
 
-def _make_llm_result(
-    full_text: str = "Full text",
-    teaser_text: str = "Teaser",
-    extended_teaser_text: str = "Extended teaser",
-) -> LLMResult:
+def _make_llm_result(full_text: str = "Full text") -> LLMResult:
     return LLMResult(
         full_text=full_text,
-        teaser_text=teaser_text,
-        extended_teaser_text=extended_teaser_text,
         model="gpt-4o-mini",
         input_tokens=100,
         output_tokens=200,
@@ -49,7 +43,6 @@ def _make_horoscope(telegram_uid: int = 12345) -> HoroscopeEntity:
         horoscope_type=HoroscopeType.DAILY,
         date=date(2024, 6, 15),
         full_text="Full horoscope text",
-        teaser_text="Teaser...",
         created_at=datetime(2024, 1, 1),
     )
 
@@ -111,7 +104,7 @@ class TestHoroscopeServiceGenerateForUser:
             user_profile_repo=user_profile_repo,
         )
 
-        service._generate_text = MagicMock(return_value=("Full text", "Teaser", "Extended teaser", _make_llm_result()))
+        service._generate_text = MagicMock(return_value=_make_llm_result())
 
         result = service.generate_for_user(
             telegram_uid=12345,
@@ -121,6 +114,31 @@ class TestHoroscopeServiceGenerateForUser:
         assert result == new_horoscope
         horoscope_repo.create_horoscope.assert_called_once()
 
+    def test_delivery_shifted_to_half_hour_of_notification_minute(self):
+        profile = _make_profile().model_copy(update={'effective_notification_minute': 2 * 60 + 30})
+
+        horoscope_repo = MagicMock()
+        horoscope_repo.get_by_user_and_date.return_value = None
+        horoscope_repo.create_horoscope.return_value = _make_horoscope()
+
+        user_profile_repo = MagicMock()
+        user_profile_repo.get_by_telegram_uid.return_value = profile
+
+        service = self._make_service(
+            horoscope_repo=horoscope_repo,
+            user_profile_repo=user_profile_repo,
+        )
+        service._generate_text = MagicMock(return_value=_make_llm_result())
+
+        service.generate_for_user(
+            telegram_uid=12345,
+            target_date=date(2024, 6, 15),
+            deliver_at=datetime(2024, 6, 15, 2),
+        )
+
+        deliver_at = horoscope_repo.create_horoscope.call_args.kwargs['deliver_at']
+        assert deliver_at == datetime(2024, 6, 15, 2, 30)
+
     def test_generates_with_first_type(self):
         profile = _make_profile()
         new_horoscope = _make_horoscope()
@@ -137,7 +155,7 @@ class TestHoroscopeServiceGenerateForUser:
             user_profile_repo=user_profile_repo,
         )
 
-        service._generate_text = MagicMock(return_value=("Full text", "Teaser", "Extended teaser", _make_llm_result()))
+        service._generate_text = MagicMock(return_value=_make_llm_result())
 
         result = service.generate_for_user(
             telegram_uid=12345,
@@ -154,8 +172,6 @@ class TestHoroscopeServiceGenerateForUser:
         new_horoscope = _make_horoscope()
         llm_result = LLMResult(
             full_text="LLM full",
-            teaser_text="LLM teaser",
-            extended_teaser_text="LLM extended teaser",
             model="gpt-4o-mini",
             input_tokens=100,
             output_tokens=200,
@@ -176,7 +192,7 @@ class TestHoroscopeServiceGenerateForUser:
             llm_usage_repo=llm_usage_repo,
         )
 
-        service._generate_text = MagicMock(return_value=("LLM full", "LLM teaser", "LLM extended teaser", llm_result))
+        service._generate_text = MagicMock(return_value=llm_result)
 
         service.generate_for_user(
             telegram_uid=12345,
@@ -195,8 +211,6 @@ class TestHoroscopeServiceGenerateForUser:
         new_horoscope = _make_horoscope()
         llm_result = LLMResult(
             full_text="LLM full",
-            teaser_text="LLM teaser",
-            extended_teaser_text="LLM extended teaser",
             model="gpt-4o-mini",
             input_tokens=100,
             output_tokens=200,
@@ -217,7 +231,7 @@ class TestHoroscopeServiceGenerateForUser:
             llm_usage_repo=llm_usage_repo,
         )
 
-        service._generate_text = MagicMock(return_value=("LLM full", "LLM teaser", "LLM extended teaser", llm_result))
+        service._generate_text = MagicMock(return_value=llm_result)
 
         service.generate_for_user(
             telegram_uid=12345,
@@ -251,7 +265,7 @@ class TestHoroscopeServiceGenerateForUser:
             user_profile_repo=user_profile_repo,
         )
 
-        service._generate_text = MagicMock(return_value=("Full text", "Teaser", "Extended teaser", _make_llm_result()))
+        service._generate_text = MagicMock(return_value=_make_llm_result())
 
         service.generate_for_user(
             telegram_uid=12345,
@@ -279,8 +293,6 @@ class TestHoroscopeServiceGenerateText:
 
         llm_result = LLMResult(
             full_text="LLM full",
-            teaser_text="LLM teaser",
-            extended_teaser_text="LLM extended teaser",
             model="gpt-4o-mini",
             input_tokens=100,
             output_tokens=200,
@@ -291,15 +303,13 @@ class TestHoroscopeServiceGenerateText:
         mock_llm.generate_horoscope_text.return_value = llm_result
 
         with patch('horoscope.services.llm.LLMService', return_value=mock_llm):
-            full, teaser, extended_teaser, result = service._generate_text(
+            result = service._generate_text(
                 profile=profile,
                 target_date=date(2024, 6, 15),
                 language="en",
             )
 
-        assert full == "LLM full"
-        assert teaser == "LLM teaser"
-        assert result is not None
+        assert result.full_text == "LLM full"
         assert result.model == "gpt-4o-mini"
         assert result.input_tokens == 100
         assert result.output_tokens == 200
@@ -325,8 +335,6 @@ class TestHoroscopeServiceGenerateText:
 
         llm_result = LLMResult(
             full_text="Гороскоп",
-            teaser_text="Тизер",
-            extended_teaser_text="Расширенный тизер",
             model="gpt-4o-mini",
             input_tokens=100,
             output_tokens=200,
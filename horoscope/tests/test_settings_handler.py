@@ -1,19 +1,19 @@
 """
 Tests for horoscope/handlers/settings.py — /timezone and /notification_time commands.
-Also tests for utility functions in the settings handler.
+Also tests for the timezone utility functions they rely on.
 """
 
-from datetime import date, datetime
+from datetime import date, datetime, timezone as dt_timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from horoscope.entities import UserProfileEntity
-from horoscope.handlers.settings import (
-    _format_utc_offset,
-    _local_hour_to_utc,
-    _parse_timezone_offset,
-    _utc_hour_to_local,
+from horoscope.handlers.settings import _format_utc_offset
+from horoscope.utils import (
+    get_effective_notification_minute,
+    get_utc_offset_minutes,
+    resolve_timezone,
 )
 
 
@@ -21,7 +21,7 @@ def _make_profile(
     telegram_uid: int = 12345,
     preferred_language: str = "en",
     timezone: str = "",
-    notification_hour_utc: int | None = None,
+    notification_hour_local: int | None = None,
 ) -> UserProfileEntity:
     return UserProfileEntity(
         user_telegram_uid=telegram_uid,
@@ -31,7 +31,7 @@ def _make_profile(
         place_of_living="Berlin",
         preferred_language=preferred_language,
         timezone=timezone,
-        notification_hour_utc=notification_hour_utc,
+        notification_hour_local=notification_hour_local,
         created_at=datetime(2024, 1, 1),
         updated_at=datetime(2024, 1, 1),
     )
@@ -51,58 +51,60 @@ class TestFormatUtcOffset:
         assert _format_utc_offset(14) == "UTC+14"
 
 
-class TestParseTimezoneOffset:
-    def test_positive(self):
-        assert _parse_timezone_offset("UTC+3") == 3
+class TestGetUtcOffsetMinutes:
+    def test_legacy_positive(self):
+        assert get_utc_offset_minutes("UTC+3") == 180
 
-    def test_negative(self):
-        assert _parse_timezone_offset("UTC-5") == -5
+    def test_legacy_negative(self):
+        assert get_utc_offset_minutes("UTC-5") == -300
 
-    def test_zero(self):
-        assert _parse_timezone_offset("UTC+0") == 0
+    def test_legacy_half_hour(self):
+        assert get_utc_offset_minutes("UTC+5:30") == 330
+
+    def test_legacy_minutes_over_59_invalid(self):
+        assert resolve_timezone("UTC+5:75") is None
 
     def test_empty(self):
-        assert _parse_timezone_offset("") == 0
+        assert get_utc_offset_minutes("") == 0
 
     def test_invalid(self):
-        assert _parse_timezone_offset("invalid") == 0
+        assert get_utc_offset_minutes("invalid") == 0
+        assert resolve_timezone("Mars/Olympus_Mons") is None
 
-    def test_no_sign(self):
-        assert _parse_timezone_offset("UTC") == 0
+    def test_iana_follows_dst(self):
+        winter = datetime(2025, 1, 15, 12, tzinfo=dt_timezone.utc)
+        summer = datetime(2025, 7, 15, 12, tzinfo=dt_timezone.utc)
+        assert get_utc_offset_minutes("Europe/Berlin", at=winter) == 60
+        assert get_utc_offset_minutes("Europe/Berlin", at=summer) == 120
+        assert get_utc_offset_minutes("America/New_York", at=summer) == -240
 
 
-class TestLocalHourToUtc:
-    def test_positive_offset(self):
+class TestGetEffectiveNotificationMinute:
+    def test_local_hour_in_positive_offset(self):
         # 8:00 local in UTC+3 = 5:00 UTC
-        assert _local_hour_to_utc(local_hour=8, utc_offset=3) == 5
+        assert get_effective_notification_minute(8, "en", "UTC+3") == 5 * 60
 
-    def test_negative_offset(self):
+    def test_local_hour_in_negative_offset(self):
         # 8:00 local in UTC-5 = 13:00 UTC
-        assert _local_hour_to_utc(local_hour=8, utc_offset=-5) == 13
+        assert get_effective_notification_minute(8, "en", "UTC-5") == 13 * 60
 
     def test_wrap_around(self):
         # 2:00 local in UTC+5 = 21:00 UTC (previous day)
-        assert _local_hour_to_utc(local_hour=2, utc_offset=5) == 21
+        assert get_effective_notification_minute(2, "en", "UTC+5") == 21 * 60
 
-    def test_zero_offset(self):
-        assert _local_hour_to_utc(local_hour=8, utc_offset=0) == 8
+    def test_half_hour_zone(self):
+        # 8:00 in Asia/Kolkata (UTC+5:30) = 2:30 UTC
+        assert get_effective_notification_minute(8, "en", "Asia/Kolkata") == 2 * 60 + 30
 
+    def test_iana_zone_across_dst(self):
+        winter = datetime(2025, 1, 15, 12, tzinfo=dt_timezone.utc)
+        summer = datetime(2025, 7, 15, 12, tzinfo=dt_timezone.utc)
+        assert get_effective_notification_minute(8, "en", "Europe/Berlin", at=winter) == 7 * 60
+        assert get_effective_notification_minute(8, "en", "Europe/Berlin", at=summer) == 6 * 60
 
-class TestUtcHourToLocal:
-    def test_positive_offset(self):
-        # 5:00 UTC in UTC+3 = 8:00 local
-        assert _utc_hour_to_local(utc_hour=5, utc_offset=3) == 8
-
-    def test_negative_offset(self):
-        # 13:00 UTC in UTC-5 = 8:00 local
-        assert _utc_hour_to_local(utc_hour=13, utc_offset=-5) == 8
-
-    def test_wrap_around(self):
-        # 21:00 UTC in UTC+5 = 2:00 local (next day)
-        assert _utc_hour_to_local(utc_hour=21, utc_offset=5) == 2
-
-    def test_zero_offset(self):
-        assert _utc_hour_to_local(utc_hour=8, utc_offset=0) == 8
+    def test_language_default_ignores_timezone(self, settings):
+        settings.HOROSCOPE_GENERATION_HOURS_UTC = {'en': 6}
+        assert get_effective_notification_minute(None, "en", "Asia/Kolkata") == 6 * 60
 
 
 class TestTimezoneCommand:
@@ -171,6 +173,68 @@ class TestTimezoneCommand:
         assert call_kwargs['reply_markup'] is not None
 
 
+class TestTimezoneCommandWithName:
+    async def _run(self, args: str | None, updated_profile=None):
+        from horoscope.handlers.settings import timezone_command_handler
+
+        mock_profile_repo = MagicMock()
+        mock_profile_repo.aget_by_telegram_uid = AsyncMock(return_value=_make_profile())
+        mock_profile_repo.aupdate_timezone = AsyncMock(return_value=updated_profile)
+
+        mock_user = MagicMock()
+        mock_user.telegram_uid = 12345
+
+        mock_app_context = MagicMock()
+        mock_app_context.send_message = AsyncMock()
+
+        mock_state = MagicMock()
+        mock_state.clear = AsyncMock()
+
+        mock_command = MagicMock()
+        mock_command.args = args
+
+        with patch('horoscope.handlers.settings.container') as mock_container:
+            mock_container.horoscope.user_profile_repository.return_value = mock_profile_repo
+
+            await timezone_command_handler(
+                message=MagicMock(),
+                state=mock_state,
+                user=mock_user,
+                app_context=mock_app_context,
+                command=mock_command,
+            )
+        return mock_profile_repo, mock_app_context
+
+    @pytest.mark.django_db
+    async def test_saves_iana_zone(self):
+        mock_profile_repo, mock_app_context = await self._run(
+            " Europe/Berlin ",
+            updated_profile=_make_profile(timezone="Europe/Berlin"),
+        )
+
+        mock_profile_repo.aupdate_timezone.assert_called_once_with(
+            telegram_uid=12345,
+            timezone="Europe/Berlin",
+        )
+        assert "Europe/Berlin" in mock_app_context.send_message.call_args[1]['text']
+
+    @pytest.mark.django_db
+    async def test_rejects_unknown_zone(self):
+        mock_profile_repo, mock_app_context = await self._run("Europe/Atlantis")
+
+        mock_profile_repo.aupdate_timezone.assert_not_called()
+        text = mock_app_context.send_message.call_args[1]['text']
+        assert "Europe/Atlantis" in text
+        assert "unknown" in text.lower()
+
+    @pytest.mark.django_db
+    async def test_rejects_offset_minutes_over_59(self):
+        mock_profile_repo, mock_app_context = await self._run("UTC+5:75")
+
+        mock_profile_repo.aupdate_timezone.assert_not_called()
+        assert "UTC+5:75" in mock_app_context.send_message.call_args[1]['text']
+
+
 class TestChangeTimezone:
     @pytest.mark.django_db
     async def test_updates_timezone(self):
@@ -248,7 +312,7 @@ class TestNotificationTimeCommand:
     async def test_shows_notification_hour_keyboard(self):
         from horoscope.handlers.settings import notification_time_command_handler
 
-        profile = _make_profile(timezone="UTC+3", notification_hour_utc=5)
+        profile = _make_profile(timezone="UTC+3", notification_hour_local=8)
         mock_profile_repo = MagicMock()
         mock_profile_repo.aget_by_telegram_uid = AsyncMock(return_value=profile)
 
@@ -274,19 +338,17 @@ class TestNotificationTimeCommand:
 
         mock_app_context.send_message.assert_called_once()
         call_kwargs = mock_app_context.send_message.call_args[1]
-        assert "08:00" in call_kwargs['text']  # UTC+3 offset: 5 UTC = 8 local
+        assert "08:00" in call_kwargs['text']
         assert call_kwargs['reply_markup'] is not None
 
 
 class TestChangeNotificationHour:
     @pytest.mark.django_db
-    async def test_converts_local_to_utc_and_saves(self):
+    async def test_saves_local_hour(self):
         from horoscope.handlers.settings import change_notification_hour_callback
 
-        profile = _make_profile(timezone="UTC+3")
-        updated_profile = _make_profile(timezone="UTC+3", notification_hour_utc=5)
+        updated_profile = _make_profile(timezone="UTC+3", notification_hour_local=8)
         mock_profile_repo = MagicMock()
-        mock_profile_repo.aget_by_telegram_uid = AsyncMock(return_value=profile)
         mock_profile_repo.aupdate_notification_hour = AsyncMock(return_value=updated_profile)
 
         mock_user = MagicMock()
@@ -313,10 +375,10 @@ class TestChangeNotificationHour:
                 app_context=mock_app_context,
             )
 
-        # 8:00 local in UTC+3 = 5:00 UTC
+        # Stored as local time; the model resolves the UTC bucket
         mock_profile_repo.aupdate_notification_hour.assert_called_once_with(
             telegram_uid=12345,
-            notification_hour_utc=5,
+            notification_hour_local=8,
         )
         mock_app_context.send_message.assert_called_once()
         assert "08:00" in mock_app_context.send_message.call_args[1]['text']
@@ -353,7 +415,7 @@ class TestResetNotificationHour:
 
         mock_profile_repo.aupdate_notification_hour.assert_called_once_with(
             telegram_uid=12345,
-            notification_hour_utc=None,
+            notification_hour_local=None,
         )
         mock_app_context.send_message.assert_called_once()
         text = mock_app_context.send_message.call_args[1]['text']
@@ -13,6 +13,7 @@ from django.utils.translation import gettext_lazy as _
 
 from horoscope.entities import SubscriptionEntity, UserProfileEntity
 from horoscope.handlers.language import LANGUAGE_CHANGED, LANGUAGE_CURRENT, LANGUAGE_NO_PROFILE
+from horoscope.handlers.settings import TIMEZONE_INVALID, TIMEZONE_NAME_HINT
 from horoscope.handlers.subscription import (
     ERROR_PAYMENT_FAILED,
     SUBSCRIPTION_ALREADY_ACTIVE,
@@ -44,7 +45,9 @@ from horoscope.keyboards import KEYBOARD_SKIP_BIRTH_TIME, KEYBOARD_SUBSCRIBE
 from horoscope.enums import HoroscopeType
 from horoscope.tasks.generate_horoscope import TASK_FIRST_HOROSCOPE_READY
 from horoscope.tasks.subscription_reminders import TASK_EXPIRY_REMINDER, TASK_SUBSCRIPTION_EXPIRED
+from horoscope.tests.helpers import mock_uid_chunks
 from horoscope.utils import map_telegram_language, parse_date, translate
+from telegram_bot.middlewares.throttling import THROTTLED_MESSAGE
 
 _ALL_MESSAGE_CONSTANTS = [
     WIZARD_CHOOSE_LANGUAGE, WIZARD_WELCOME_BACK, WIZARD_WELCOME,
@@ -78,6 +81,7 @@ _ALL_MESSAGE_CONSTANTS = [
     TASK_SUBSCRIPTION_EXPIRED, LANGUAGE_CURRENT, LANGUAGE_CHANGED,
     LANGUAGE_NO_PROFILE,
     ERROR_PROFILE_CREATION_FAILED, ERROR_PAYMENT_FAILED,
+    TIMEZONE_NAME_HINT, TIMEZONE_INVALID, THROTTLED_MESSAGE,
 ]
 
 
@@ -224,6 +228,16 @@ class TestTranslationCompleteness:
                     f"Message '{msgid[:50]}...' has empty translation for '{lang}'"
                 )
 
+    def test_all_messages_translated_from_english(self):
+        for msg in _ALL_MESSAGE_CONSTANTS:
+            english = translate(msg, 'en')
+            for lang in settings.HOROSCOPE_SUPPORTED_LANGUAGE_CODES:
+                if lang == 'en':
+                    continue
+                assert translate(msg, lang) != english, (
+                    f"Message '{str(msg)[:50]}...' falls back to English for '{lang}'"
+                )
+
     def test_language_names_complete(self):
         for lang in settings.HOROSCOPE_SUPPORTED_LANGUAGE_CODES:
             assert lang in settings.HOROSCOPE_LANGUAGE_NAMES
@@ -268,6 +282,7 @@ class TestBackgroundTasks:
             telegram_uid=12345,
             target_date=date(2024, 6, 15),
             horoscope_type=HoroscopeType.DAILY,
+            deliver_at=None,
         )
         mock_send_first.assert_not_called()
 
@@ -332,7 +347,7 @@ class TestBackgroundTasks:
         from horoscope.tasks.send_daily_horoscope import generate_daily_for_all_users
 
         mock_profile_repo = MagicMock()
-        mock_profile_repo.aget_telegram_uids_by_notification_hour = AsyncMock(return_value=[111, 222, 333])
+        mock_profile_repo.aiter_telegram_uids_by_notification_hour = mock_uid_chunks([111, 222, 333])
 
         mock_subscription_repo = MagicMock()
         mock_subscription_repo.ahas_active_subscription = AsyncMock(return_value=True)
@@ -376,7 +391,6 @@ class TestBackgroundTasks:
             horoscope_type=HoroscopeType.DAILY,
             date=date.today(),
             full_text="Full text",
-            teaser_text="Teaser",
             created_at=datetime(2024, 1, 1),
         )
 
@@ -384,8 +398,8 @@ class TestBackgroundTasks:
         mock_profile_repo.aget_by_telegram_uid = AsyncMock(return_value=profile)
 
         mock_horoscope_repo = MagicMock()
-        mock_horoscope_repo.aget_unsent_telegram_uids_for_date = AsyncMock(return_value=[12345])
-        mock_horoscope_repo.aget_by_user_and_date = AsyncMock(return_value=horoscope)
+        mock_horoscope_repo.aiter_unsent_telegram_uids_for_date = mock_uid_chunks([12345])
+        mock_horoscope_repo.aget_delivery_by_user_and_date = AsyncMock(return_value=horoscope)
         mock_horoscope_repo.amark_sent = AsyncMock()
 
         mock_subscription_repo = MagicMock()
@@ -420,7 +434,7 @@ class TestBackgroundTasks:
         from horoscope.tasks.send_daily_horoscope import send_daily_horoscope_notifications
 
         mock_horoscope_repo = MagicMock()
-        mock_horoscope_repo.aget_unsent_telegram_uids_for_date = AsyncMock(return_value=[12345])
+        mock_horoscope_repo.aiter_unsent_telegram_uids_for_date = mock_uid_chunks([12345])
 
         mock_subscription_repo = MagicMock()
         mock_subscription_repo.ahas_active_subscription = AsyncMock(return_value=False)
@@ -441,7 +455,7 @@ class TestBackgroundTasks:
 
         assert result == 0
         mock_send.assert_not_called()
-        mock_horoscope_repo.aget_by_user_and_date.assert_not_called()
+        mock_horoscope_repo.aget_delivery_by_user_and_date.assert_not_called()
 
     @pytest.mark.django_db
     async def test_send_daily_horoscope_skips_already_sent(self):
@@ -455,14 +469,13 @@ class TestBackgroundTasks:
             horoscope_type=HoroscopeType.DAILY,
             date=date.today(),
             full_text="Full text",
-            teaser_text="Teaser",
             sent_at=timezone.now(),
             created_at=datetime(2024, 1, 1),
         )
 
         mock_horoscope_repo = MagicMock()
-        mock_horoscope_repo.aget_unsent_telegram_uids_for_date = AsyncMock(return_value=[12345])
-        mock_horoscope_repo.aget_by_user_and_date = AsyncMock(return_value=horoscope)
+        mock_horoscope_repo.aiter_unsent_telegram_uids_for_date = mock_uid_chunks([12345])
+        mock_horoscope_repo.aget_delivery_by_user_and_date = AsyncMock(return_value=horoscope)
 
         mock_subscription_repo = MagicMock()
         mock_subscription_repo.ahas_active_subscription = AsyncMock(return_value=True)
@@ -825,7 +838,6 @@ class TestLLMService:
             mock_settings.LLM_MODEL = "gpt-4"
             mock_settings.LLM_BASE_URL = None
             mock_settings.LLM_TIMEOUT = 30
-            mock_settings.HOROSCOPE_TEASER_LINE_COUNT = 3
 
             service = LLMService()
             result = service.generate_horoscope_text(
@@ -839,7 +851,6 @@ class TestLLMService:
             )
 
         assert "Horoscope for Taurus" in result.full_text
-        assert "..." in result.teaser_text
         assert result.model == "gpt-4"
         assert result.input_tokens == 150
         assert result.output_tokens == 250
@@ -858,7 +869,6 @@ class TestLLMService:
             mock_settings.LLM_MODEL = "gpt-4"
             mock_settings.LLM_BASE_URL = None
             mock_settings.LLM_TIMEOUT = 30
-            mock_settings.HOROSCOPE_TEASER_LINE_COUNT = 3
             mock_settings.HOROSCOPE_LANGUAGE_NAMES = settings.HOROSCOPE_LANGUAGE_NAMES
 
             service = LLMService()
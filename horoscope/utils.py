@@ -1,6 +1,8 @@
 import re
-from datetime import date, datetime, time
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone, tzinfo
+from functools import lru_cache
 from typing import Any, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from django.conf import settings
 from django.utils.translation import gettext
@@ -94,3 +96,98 @@ def map_telegram_language(language_code: str | None) -> str:
     if code in settings.HOROSCOPE_SUPPORTED_LANGUAGE_CODES:
         return code
     return 'en'
+
+
+_UTC_OFFSET_RE = re.compile(r'^UTC([+-])(\d{1,2})(?::([0-5]\d))?$')
+
+
+@lru_cache(maxsize=1024)
+def resolve_timezone(name: str) -> Optional[tzinfo]:
+    """
+    Resolve a stored timezone: an IANA name like "Europe/Kyiv", or a legacy
+    fixed offset like "UTC+3" / "UTC+5:30". Returns None for empty or unknown values.
+    """
+    if not name:
+        return None
+    match = _UTC_OFFSET_RE.match(name)
+    if match:
+        sign = 1 if match.group(1) == '+' else -1
+        minutes = int(match.group(2)) * 60 + int(match.group(3) or 0)
+        if minutes > 14 * 60:
+            return None
+        return dt_timezone(sign * timedelta(minutes=minutes))
+    if name in ('UTC', 'UTC+0', 'UTC-0'):
+        return dt_timezone.utc
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def get_utc_offset_minutes(timezone_name: str, at: Optional[datetime] = None) -> int:
+    """UTC offset of the zone at `at` (default: now), in minutes; 0 when the zone is unset or unknown."""
+    tz = resolve_timezone(timezone_name)
+    if tz is None:
+        return 0
+    at = at or datetime.now(dt_timezone.utc)
+    return int(at.astimezone(tz).utcoffset().total_seconds() // 60)
+
+
+def get_effective_notification_minute(
+    notification_hour_local: Optional[int],
+    preferred_language: str,
+    timezone_name: str = '',
+    at: Optional[datetime] = None,
+) -> int:
+    """
+    Resolve the UTC minute of the day (0-1439) a user gets notified at.
+
+    An explicit hour is local to the user's timezone (UTC when unset), so the
+    result follows DST and supports half-hour zones. Without one, the
+    per-language default UTC hour applies.
+    """
+    if notification_hour_local is not None:
+        offset = get_utc_offset_minutes(timezone_name, at)
+        return (notification_hour_local * 60 - offset) % (24 * 60)
+    hour = settings.HOROSCOPE_GENERATION_HOURS_UTC.get(
+        preferred_language,
+        settings.HOROSCOPE_DEFAULT_GENERATION_HOUR_UTC,
+    )
+    return hour * 60
+
+
+def get_effective_notification_hour(
+    notification_hour_local: Optional[int],
+    preferred_language: str,
+    timezone_name: str = '',
+    at: Optional[datetime] = None,
+) -> int:
+    """UTC hour bucket a user's notification falls into; see get_effective_notification_minute."""
+    return get_effective_notification_minute(
+        notification_hour_local=notification_hour_local,
+        preferred_language=preferred_language,
+        timezone_name=timezone_name,
+        at=at,
+    ) // 60
+
+
+@lru_cache(maxsize=512)
+def build_teaser(full_text: str, line_count: int) -> str:
+    """First `line_count` content lines of a horoscope followed by an ellipsis.
+
+    The header and greeting (first two non-empty lines) and the blank lines
+    right after them are not part of the content.
+    """
+    content_lines = []
+    skip_count = 0
+    for line in full_text.split("\n"):
+        if skip_count < 2:
+            if line.strip():
+                skip_count += 1
+            continue
+        if not content_lines and not line.strip():
+            continue
+        content_lines.append(line)
+        if len(content_lines) >= line_count:
+            break
+    return "\n".join(content_lines) + "\n..."
@@ -10,6 +10,7 @@ from asgiref.sync import sync_to_async
 from dependency_injector.wiring import Provide, inject
 
 from core.containers import ApplicationContainer
+from core.tracing import span
 from telegram_bot.helpers import fix_unserializable_values_in_raw
 from telegram_bot.repositories import MessageHistoryRepository
 
@@ -69,16 +70,17 @@ class AppContext:
         parse_mode: Optional[str] = ParseMode.HTML,
         disable_web_page_preview: bool = True,
     ) -> Message:
-        message = await self.bot.send_message(
-            chat_id=self.chat_id,
-            text=text,
-            parse_mode=parse_mode,
-            reply_markup=reply_markup,
-            disable_web_page_preview=disable_web_page_preview,
-            reply_to_message_id=reply_to_message_id,
-        )
+        with span('AppContext.send_message', conversation=conversation):
+            message = await self.bot.send_message(
+                chat_id=self.chat_id,
+                text=text,
+                parse_mode=parse_mode,
+                reply_markup=reply_markup,
+                disable_web_page_preview=disable_web_page_preview,
+                reply_to_message_id=reply_to_message_id,
+            )
 
-        await self._log_message_to_db(message)
+            await self._log_message_to_db(message)
         self._save_message_id(message.message_id, conversation)
 
         return message
@@ -0,0 +1,387 @@
+"""
+End-to-end bot throughput against a fake Telegram and a fake LLM.
+
+The real dispatcher (setup_dispatcher: every middleware and router) polls a
+FakeTelegramServer with getUpdates, while LLMService is pointed at a
+FakeLLMServer through LLM_BASE_URL. A synthetic population is seeded, then
+simulated users replay conversations drawn from a traffic mix: the onboarding
+wizard, /horoscope, follow-up questions and a Stars payment. Like a person
+waiting for the reply, a simulated user sends the next update of its
+conversation only once the previous one was handled.
+
+Latency is measured from pushing an update to the fake Telegram until the
+dispatcher finished handling it and is reported per route, with the overall
+throughput. The fake servers run on their own thread and event loop, like
+the external services they stand in for, so synchronous calls blocking the
+bot's loop (the LLM client) do not stall them too. Needs a database; seeded users and everything the traffic created
+for them are deleted afterwards.
+"""
+
+import asyncio
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware, Router
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import TelegramObject, Update
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.test.utils import override_settings
+
+from horoscope.benchmarks.fake_llm import FAKE_LLM_API_KEY, FAKE_LLM_MODEL, FakeLLMServer
+from horoscope.benchmarks.seed import SEED_UID_OFFSET, delete_population, seed_population
+from horoscope.callbacks import LanguageCallback, SkipBirthTimeCallback
+from telegram_bot.benchmarks.fake_telegram import FakeTelegramServer, create_fake_bot
+from telegram_bot.bot import create_dispatcher, setup_dispatcher
+
+ROUTES = ('wizard', 'horoscope', 'followup', 'payment')
+DEFAULT_MIX = {'wizard': 1, 'horoscope': 5, 'followup': 3, 'payment': 1}
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile, q in [0, 1]."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q * len(ordered)) - 1, 0)]
+
+
+@dataclass
+class RouteStats:
+    route: str
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    @property
+    def p50(self) -> float:
+        return percentile(self.latencies, 0.5)
+
+    @property
+    def p99(self) -> float:
+        return percentile(self.latencies, 0.99)
+
+
+@dataclass
+class BotLoadResult:
+    updates: int
+    seconds: float
+    routes: dict[str, RouteStats]
+    rate_limited: int
+    llm_requests: int
+    completed: bool
+
+    @property
+    def updates_per_second(self) -> float:
+        return self.updates / self.seconds if self.seconds else 0.0
+
+
+# Synthetic updates, without update_id (assigned by the fake Telegram)
+
+def _user(uid: int) -> dict:
+    return {'id': uid, 'is_bot': False, 'first_name': 'Bench', 'language_code': 'en'}
+
+
+def _message(uid: int, **fields: Any) -> dict:
+    return {
+        'message_id': random.randint(1, 2**31 - 1),
+        'date': int(time.time()),
+        'chat': {'id': uid, 'type': 'private'},
+        'from': _user(uid),
+        **fields,
+    }
+
+
+def message_update(uid: int, text: str) -> dict:
+    return {'message': _message(uid, text=text)}
+
+
+def callback_update(uid: int, data: str) -> dict:
+    return {
+        'callback_query': {
+            'id': str(random.randint(1, 2**31 - 1)),
+            'from': _user(uid),
+            'chat_instance': str(uid),
+            'data': data,
+            'message': _message(uid, text='…'),
+        },
+    }
+
+
+def pre_checkout_update(uid: int) -> dict:
+    return {
+        'pre_checkout_query': {
+            'id': str(random.randint(1, 2**31 - 1)),
+            'from': _user(uid),
+            'currency': 'XTR',
+            'total_amount': settings.HOROSCOPE_SUBSCRIPTION_PRICE_STARS,
+            'invoice_payload': f'subscription_{uid}',
+        },
+    }
+
+
+def successful_payment_update(uid: int) -> dict:
+    return {
+        'message': _message(uid, successful_payment={
+            'currency': 'XTR',
+            'total_amount': settings.HOROSCOPE_SUBSCRIPTION_PRICE_STARS,
+            'invoice_payload': f'subscription_{uid}',
+            'telegram_payment_charge_id': f'bench-{uid}-{random.randint(1, 2**31 - 1)}',
+            'provider_payment_charge_id': '',
+        }),
+    }
+
+
+def wizard_conversation(uid: int) -> list[dict]:
+    return [
+        message_update(uid, '/start'),
+        callback_update(uid, LanguageCallback(code='en').pack()),
+        message_update(uid, 'Bench User'),
+        message_update(uid, '15.03.1990'),
+        callback_update(uid, SkipBirthTimeCallback().pack()),
+        message_update(uid, 'London'),
+        message_update(uid, 'Paris'),
+    ]
+
+
+def horoscope_conversation(uid: int) -> list[dict]:
+    return [message_update(uid, '/horoscope')]
+
+
+def followup_conversation(uid: int) -> list[dict]:
+    return [message_update(uid, 'What does today hold for my career?')]
+
+
+def payment_conversation(uid: int) -> list[dict]:
+    return [message_update(uid, '/subscribe'), pre_checkout_update(uid), successful_payment_update(uid)]
+
+
+def build_traffic(
+    conversations: int,
+    mix: dict[str, int],
+    first_uid: int,
+    users: int,
+    wizard_first_uid: int,
+    rng: random.Random,
+) -> list[tuple[str, list[dict]]]:
+    """
+    Conversations drawn from `mix` (route -> weight). Follow-ups come from
+    seeded subscribers, payments from seeded non-subscribers (see
+    seed._subscription_for) and wizards from users not seeded yet.
+    """
+    subscribers = [first_uid + index for index in range(users) if index % 20 in (0, 1)]
+    others = [first_uid + index for index in range(users) if index % 20 not in (0, 1)]
+    routes = [route for route, weight in mix.items() if weight > 0]
+    weights = [mix[route] for route in routes]
+
+    traffic = []
+    wizard_uid = wizard_first_uid
+    for route in rng.choices(routes, weights=weights, k=conversations):
+        if route == 'wizard':
+            traffic.append((route, wizard_conversation(wizard_uid)))
+            wizard_uid += 1
+        elif route == 'horoscope':
+            traffic.append((route, horoscope_conversation(first_uid + rng.randrange(users))))
+        elif route == 'followup':
+            traffic.append((route, followup_conversation(rng.choice(subscribers or others))))
+        elif route == 'payment':
+            traffic.append((route, payment_conversation(rng.choice(others or subscribers))))
+        else:
+            raise ValueError(f"Unknown route {route!r}, expected one of {ROUTES}")
+    return traffic
+
+
+class ServerThread:
+    """Event loop in a background thread running the fake servers."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name='fake-servers', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    async def run(self, coroutine: Awaitable[Any]) -> Any:
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, self.loop))
+
+    async def call(self, func: Callable[..., Any], *args: Any) -> Any:
+        async def call_in_loop():
+            return func(*args)
+
+        return await self.run(call_in_loop())
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+class UpdateTimer(BaseMiddleware):
+    """Outermost update middleware resolving a future when an update is handled (True on error)."""
+
+    def __init__(self):
+        super().__init__()
+        self._waiting: dict[int, asyncio.Future] = {}
+        # Updates handled before anyone waited for them
+        self._finished: dict[int, bool] = {}
+
+    def expect(self, update_id: int) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        if update_id in self._finished:
+            future.set_result(self._finished.pop(update_id))
+        else:
+            self._waiting[update_id] = future
+        return future
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        failed = True
+        try:
+            result = await handler(event, data)
+            failed = False
+            return result
+        finally:
+            if isinstance(event, Update):
+                future = self._waiting.pop(event.update_id, None)
+                if future is None:
+                    self._finished[event.update_id] = failed
+                elif not future.done():
+                    future.set_result(failed)
+
+
+async def _replay(
+    servers: ServerThread,
+    fake_telegram: FakeTelegramServer,
+    timer: UpdateTimer,
+    traffic: list[tuple[str, list[dict]]],
+    routes: dict[str, RouteStats],
+    concurrency: int,
+    update_timeout: float,
+) -> bool:
+    queue: asyncio.Queue = asyncio.Queue()
+    for conversation in traffic:
+        queue.put_nowait(conversation)
+    completed = True
+
+    async def simulated_user() -> None:
+        nonlocal completed
+        while not queue.empty():
+            route, updates = queue.get_nowait()
+            stats = routes[route]
+            for update in updates:
+                pushed = time.perf_counter()
+                handled = timer.expect(await servers.call(fake_telegram.push_update, update))
+                try:
+                    failed = await asyncio.wait_for(handled, timeout=update_timeout)
+                except asyncio.TimeoutError:
+                    completed = False
+                    stats.errors += 1
+                    break
+                stats.latencies.append(time.perf_counter() - pushed)
+                stats.errors += failed
+
+    await asyncio.gather(*(simulated_user() for _ in range(concurrency)))
+    return completed
+
+
+def _detach_routers(router: Router) -> None:
+    """Handler routers are module-level and attach to one parent only; free them for the next run."""
+    for sub_router in router.sub_routers:
+        _detach_routers(sub_router)
+        sub_router._parent_router = None
+    router.sub_routers.clear()
+
+
+async def _drain_background_tasks(known: set[asyncio.Task], timeout: float) -> None:
+    """Wait for tasks spawned by handlers (first horoscope generation) so they don't hit a closed bot."""
+    pending = asyncio.all_tasks() - known - {asyncio.current_task()}
+    if pending:
+        await asyncio.wait(pending, timeout=timeout)
+
+
+async def run_bot_load(
+    users: int,
+    conversations: int,
+    concurrency: int,
+    mix: Optional[dict[str, int]] = None,
+    api_latency_seconds: float = 0.0,
+    rate_limit_every: int = 0,
+    llm_latency_seconds: float = 0.0,
+    llm_output_tokens: int = 200,
+    history_days: int = 7,
+    uid_offset: int = SEED_UID_OFFSET,
+    update_timeout: float = 60,
+    seed: int = 0,
+) -> BotLoadResult:
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    wizard_first_uid = uid_offset + users
+    await sync_to_async(seed_population)(
+        user_count=users,
+        history_days=history_days,
+        messages_per_user=0,
+        uid_offset=uid_offset,
+    )
+    traffic = build_traffic(
+        conversations=conversations,
+        mix=mix,
+        first_uid=uid_offset,
+        users=users,
+        wizard_first_uid=wizard_first_uid,
+        rng=rng,
+    )
+    wizards = sum(1 for route, _ in traffic if route == 'wizard')
+
+    fake_telegram = FakeTelegramServer(latency_seconds=api_latency_seconds, rate_limit_every=rate_limit_every)
+    fake_llm = FakeLLMServer(latency_seconds=llm_latency_seconds, output_tokens=llm_output_tokens)
+    servers = ServerThread()
+    servers.start()
+    api_url = await servers.run(fake_telegram.start())
+    llm_url = await servers.run(fake_llm.start())
+    bot = create_fake_bot(api_url)
+    routes = {route: RouteStats(route) for route in mix}
+    known_tasks = asyncio.all_tasks()
+    dispatcher = create_dispatcher(storage=MemoryStorage())
+    try:
+        with override_settings(LLM_BASE_URL=llm_url, LLM_API_KEY=FAKE_LLM_API_KEY, LLM_MODEL=FAKE_LLM_MODEL):
+            timer = UpdateTimer()
+            dispatcher.update.outer_middleware(timer)
+            setup_dispatcher(dispatcher=dispatcher, bot_instance=bot)
+
+            polling = asyncio.create_task(dispatcher.start_polling(
+                bot,
+                polling_timeout=1,
+                handle_signals=False,
+                close_bot_session=False,
+                tasks_concurrency_limit=settings.DISPATCH_MAX_PENDING_UPDATES,
+            ))
+            started = time.perf_counter()
+            completed = await _replay(servers, fake_telegram, timer, traffic, routes, concurrency, update_timeout)
+            seconds = time.perf_counter() - started
+
+            await dispatcher.stop_polling()
+            await polling
+            await _drain_background_tasks(known_tasks, timeout=update_timeout)
+    finally:
+        _detach_routers(dispatcher)
+        await bot.session.close()
+        await servers.run(fake_llm.stop())
+        await servers.run(fake_telegram.stop())
+        servers.stop()
+        await sync_to_async(delete_population)(uid_offset, wizard_first_uid + wizards)
+
+    return BotLoadResult(
+        updates=sum(len(stats.latencies) for stats in routes.values()),
+        seconds=seconds,
+        routes=routes,
+        rate_limited=sum(fake_telegram.rate_limited.values()),
+        llm_requests=fake_llm.requests,
+        completed=completed,
+    )
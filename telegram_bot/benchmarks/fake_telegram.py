@@ -0,0 +1,157 @@
+"""
+In-process stand-in for the Telegram Bot API, for benchmarks and load tests.
+
+Every method call is answered after a configurable latency with a minimal but
+valid result, so aiogram's Bot can be pointed at it unchanged. Texts sent with
+sendMessage are recorded per chat in arrival order. Updates pushed with
+push_update are served to getUpdates long polling, and every Nth outgoing
+call can be rejected with 429 Too Many Requests like a flood-limited bot.
+"""
+
+import asyncio
+import time
+from collections import Counter, defaultdict
+from typing import Any, Optional
+
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.enums import ParseMode
+from aiohttp import web
+
+FAKE_BOT_TOKEN = '123456789:AAFakeTelegramTokenForLocalBenchmarks'
+
+# Calls answered with a Message object; all other methods return True
+MESSAGE_METHODS = ('sendmessage', 'editmessagetext', 'sendinvoice')
+# Polling itself is never rate limited
+UNLIMITED_METHODS = ('getme', 'getupdates', 'deletewebhook', 'close')
+
+
+def create_fake_bot(api_url: str, token: str = FAKE_BOT_TOKEN) -> Bot:
+    """Bot whose API calls go to a FakeTelegramServer at `api_url`."""
+    return Bot(
+        token=token,
+        session=AiohttpSession(api=TelegramAPIServer.from_base(api_url)),
+        default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+    )
+
+
+class FakeTelegramServer:
+    def __init__(
+        self,
+        latency_seconds: float = 0.0,
+        rate_limit_every: int = 0,
+        retry_after_seconds: int = 1,
+    ):
+        self.latency_seconds = latency_seconds
+        self.rate_limit_every = rate_limit_every
+        self.retry_after_seconds = retry_after_seconds
+        self.calls: Counter[str] = Counter()
+        self.rate_limited: Counter[str] = Counter()
+        self.sent: dict[int, list[str]] = defaultdict(list)
+        self.sent_count = 0
+        self._message_id = 0
+        self._limited_calls = 0
+        self._updates: list[dict] = []
+        self._update_id = 0
+        self._updates_changed = asyncio.Event()
+        self._runner: Optional[web.AppRunner] = None
+        self._sent_changed = asyncio.Event()
+        self.url = ''
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_post('/bot{token}/{method}', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host=host, port=port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        self.url = f"http://{host}:{bound_port}"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def push_update(self, update: dict) -> int:
+        """Queue an update (without update_id) for getUpdates; returns its assigned update_id."""
+        self._update_id += 1
+        self._updates.append({'update_id': self._update_id, **update})
+        self._updates_changed.set()
+        return self._update_id
+
+    async def wait_for_sent(self, count: int, timeout: float) -> bool:
+        """Wait until at least `count` messages were sent. Returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        while self.sent_count < count:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._sent_changed.clear()
+            try:
+                await asyncio.wait_for(self._sent_changed.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info['method']
+        params = dict(await request.post())
+        self.calls[method] += 1
+        if method.lower() == 'getupdates':
+            return web.json_response({'ok': True, 'result': await self._get_updates(params)})
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        if self._should_rate_limit(method.lower()):
+            self.rate_limited[method] += 1
+            return web.json_response(
+                {
+                    'ok': False,
+                    'error_code': 429,
+                    'description': f'Too Many Requests: retry after {self.retry_after_seconds}',
+                    'parameters': {'retry_after': self.retry_after_seconds},
+                },
+                status=429,
+            )
+        return web.json_response({'ok': True, 'result': self._result(method.lower(), params)})
+
+    def _should_rate_limit(self, method: str) -> bool:
+        if not self.rate_limit_every or method in UNLIMITED_METHODS:
+            return False
+        self._limited_calls += 1
+        return self._limited_calls % self.rate_limit_every == 0
+
+    async def _get_updates(self, params: dict[str, Any]) -> list[dict]:
+        offset = int(params.get('offset') or 0)
+        limit = int(params.get('limit') or 100)
+        # Updates below the offset are confirmed by the client
+        self._updates = [update for update in self._updates if update['update_id'] >= offset]
+        if not self._updates:
+            self._updates_changed.clear()
+            try:
+                await asyncio.wait_for(self._updates_changed.wait(), timeout=float(params.get('timeout') or 0))
+            except asyncio.TimeoutError:
+                pass
+        return self._updates[:limit]
+
+    def _result(self, method: str, params: dict[str, Any]) -> Any:
+        if method == 'getme':
+            return {'id': int(FAKE_BOT_TOKEN.split(':')[0]), 'is_bot': True, 'first_name': 'Fake'}
+        if method in MESSAGE_METHODS:
+            chat_id = int(params['chat_id'])
+            text = str(params.get('text', ''))
+            if method == 'sendmessage':
+                self.sent[chat_id].append(text)
+                self.sent_count += 1
+                self._sent_changed.set()
+            self._message_id += 1
+            return {
+                'message_id': self._message_id,
+                'date': int(time.time()),
+                'chat': {'id': chat_id, 'type': 'private'},
+                'text': text,
+            }
+        return True
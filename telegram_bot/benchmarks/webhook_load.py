@@ -0,0 +1,235 @@
+"""
+Webhook ingestion throughput against a fake Telegram, by number of workers.
+
+For every worker count the benchmark starts a FakeTelegramServer, a webhook
+endpoint publishing to Redis streams and N worker processes running an echo
+dispatcher (one sendMessage per update, plus optional CPU work standing in for
+handler code). Synthetic updates for many chats are POSTed to the webhook and
+the time until every reply reached the fake Telegram is measured. Replies are
+also checked to arrive in order per chat.
+
+Needs a reachable Redis; streams are namespaced per run and deleted afterwards.
+"""
+
+import asyncio
+import multiprocessing
+import time
+import uuid
+from dataclasses import dataclass
+
+import aiohttp
+from aiogram import Dispatcher, Router
+from aiogram.types import Message
+from aiohttp import web
+from redis.asyncio import Redis
+
+from telegram_bot.benchmarks.fake_telegram import FakeTelegramServer, create_fake_bot
+from telegram_bot.webhook import (
+    SECRET_TOKEN_HEADER,
+    UpdateStreamPublisher,
+    UpdateStreamRequestHandler,
+    UpdateStreamWorker,
+    ensure_consumer_groups,
+    stream_name,
+)
+
+WEBHOOK_SECRET = 'bench-secret'
+WEBHOOK_PATH = '/webhook'
+
+
+@dataclass
+class WebhookBenchResult:
+    workers: int
+    updates: int
+    seconds: float
+    completed: bool
+    ordered: bool
+
+    @property
+    def updates_per_second(self) -> float:
+        return self.updates / self.seconds if self.seconds else 0.0
+
+
+def build_echo_dispatcher(handler_cpu_seconds: float = 0.0) -> Dispatcher:
+    router = Router()
+
+    @router.message()
+    async def echo(message: Message) -> None:
+        if handler_cpu_seconds:
+            deadline = time.perf_counter() + handler_cpu_seconds
+            while time.perf_counter() < deadline:
+                pass
+        await message.answer(message.text)
+
+    dispatcher = Dispatcher()
+    dispatcher.include_router(router)
+    return dispatcher
+
+
+def make_update(update_id: int, chat_id: int, sequence: int) -> dict:
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Bench'},
+            'text': str(sequence),
+        },
+    }
+
+
+def _run_worker_process(
+    redis_url: str,
+    api_url: str,
+    bot_slug: str,
+    partitions: int,
+    worker_index: int,
+    worker_count: int,
+    handler_cpu_seconds: float,
+    ready,
+) -> None:
+    async def main():
+        redis = Redis.from_url(redis_url, decode_responses=True)
+        bot = create_fake_bot(api_url)
+        worker = UpdateStreamWorker(
+            redis=redis,
+            dispatcher=build_echo_dispatcher(handler_cpu_seconds),
+            bot=bot,
+            bot_slug=bot_slug,
+            partitions=partitions,
+            worker_index=worker_index,
+            worker_count=worker_count,
+            block_ms=100,
+        )
+        ready.set()
+        try:
+            await worker.run()
+        finally:
+            await bot.session.close()
+            await redis.aclose()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+async def _post_updates(url: str, updates: list[dict], concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    async with aiohttp.ClientSession(headers={SECRET_TOKEN_HEADER: WEBHOOK_SECRET}) as session:
+        async def post(update: dict) -> None:
+            async with semaphore:
+                async with session.post(url, json=update) as response:
+                    response.raise_for_status()
+
+        # Updates of one chat are posted in order, like Telegram delivers them
+        by_chat: dict[int, list[dict]] = {}
+        for update in updates:
+            by_chat.setdefault(update['message']['chat']['id'], []).append(update)
+
+        async def post_chat(chat_updates: list[dict]) -> None:
+            for update in chat_updates:
+                await post(update)
+
+        await asyncio.gather(*(post_chat(chat_updates) for chat_updates in by_chat.values()))
+
+
+async def run_once(
+    redis_url: str,
+    workers: int,
+    updates: int,
+    chats: int,
+    partitions: int,
+    api_latency_seconds: float,
+    handler_cpu_seconds: float,
+    concurrency: int = 64,
+    timeout: float = 300,
+) -> WebhookBenchResult:
+    bot_slug = f"bench-{uuid.uuid4().hex[:8]}"
+    streams = [stream_name(bot_slug, partition) for partition in range(partitions)]
+    redis = Redis.from_url(redis_url, decode_responses=True)
+    fake_telegram = FakeTelegramServer(latency_seconds=api_latency_seconds)
+    api_url = await fake_telegram.start()
+
+    app = web.Application()
+    UpdateStreamRequestHandler(
+        publisher=UpdateStreamPublisher(redis=redis, bot_slug=bot_slug, partitions=partitions),
+        secret_token=WEBHOOK_SECRET,
+    ).register(app, path=WEBHOOK_PATH)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host='127.0.0.1', port=0).start()
+    webhook_url = f"http://127.0.0.1:{runner.addresses[0][1]}{WEBHOOK_PATH}"
+
+    context = multiprocessing.get_context('spawn')
+    processes = []
+    try:
+        await ensure_consumer_groups(redis, streams)
+        for worker_index in range(workers):
+            ready = context.Event()
+            process = context.Process(
+                target=_run_worker_process,
+                args=(
+                    redis_url, api_url, bot_slug, partitions, worker_index, workers,
+                    handler_cpu_seconds, ready,
+                ),
+                daemon=True,
+            )
+            process.start()
+            processes.append((process, ready))
+        for _, ready in processes:
+            await asyncio.to_thread(ready.wait, 60)
+
+        batch = [
+            make_update(update_id=index + 1, chat_id=1000 + index % chats, sequence=index // chats)
+            for index in range(updates)
+        ]
+        started = time.perf_counter()
+        await _post_updates(webhook_url, batch, concurrency)
+        completed = await fake_telegram.wait_for_sent(updates, timeout=timeout)
+        seconds = time.perf_counter() - started
+
+        ordered = all(
+            [int(text) for text in texts] == sorted(int(text) for text in texts)
+            for texts in fake_telegram.sent.values()
+        )
+        return WebhookBenchResult(
+            workers=workers,
+            updates=updates,
+            seconds=seconds,
+            completed=completed,
+            ordered=ordered,
+        )
+    finally:
+        for process, _ in processes:
+            process.terminate()
+        for process, _ in processes:
+            process.join(timeout=10)
+        await runner.cleanup()
+        await fake_telegram.stop()
+        await redis.delete(*streams)
+        await redis.aclose()
+
+
+async def run_webhook_benchmark(
+    redis_url: str,
+    worker_counts: list[int],
+    updates: int,
+    chats: int,
+    partitions: int,
+    api_latency_seconds: float,
+    handler_cpu_seconds: float,
+) -> list[WebhookBenchResult]:
+    results = []
+    for workers in worker_counts:
+        results.append(await run_once(
+            redis_url=redis_url,
+            workers=workers,
+            updates=updates,
+            chats=chats,
+            partitions=partitions,
+            api_latency_seconds=api_latency_seconds,
+            handler_cpu_seconds=handler_cpu_seconds,
+        ))
+    return results
@@ -1,6 +1,6 @@
 from typing import Union
 
-from aiogram import Bot, Dispatcher
+from aiogram import BaseMiddleware, Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 from aiogram.fsm.storage.base import BaseStorage
@@ -9,8 +9,29 @@ from aiogram.fsm.storage.redis import RedisStorage
 from redis.asyncio import Redis
 
 from config import settings
+from core.profiling import SlowWorkDetector
 from telegram_bot.middlewares.bot import BotMiddleware
+from telegram_bot.middlewares.dispatch import ChatDispatchMiddleware
 from telegram_bot.middlewares.i18n import UserLanguageMiddleware
+from telegram_bot.middlewares.metrics import (
+    HandlerMetricsMiddleware,
+    QueryCountMiddleware,
+    TelegramRequestMetricsMiddleware,
+)
+from telegram_bot.middlewares.slow_updates import SlowUpdateMiddleware
+from telegram_bot.middlewares.throttling import (
+    MemoryTokenBucketStore,
+    RedisTokenBucketStore,
+    ThrottlingMiddleware,
+    TokenBucketStore,
+    build_throttle_limits,
+)
+from telegram_bot.middlewares.tracing import (
+    HandlerSpanMiddleware,
+    TelegramRequestTracingMiddleware,
+    TracedMiddleware,
+    TracingMiddleware,
+)
 from telegram_bot.middlewares.user import AppContextMiddleware, LoggingMiddleware, UserMiddleware
 
 
@@ -35,30 +56,105 @@ def create_storage() -> Union[RedisStorage, MemoryStorage]:
         return MemoryStorage()
 
 
+def create_update_stream_redis() -> Redis:
+    """Redis client for the webhook update streams (see telegram_bot.webhook)."""
+    return Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_BOT_DB,
+        password=settings.REDIS_PASSWORD or None,
+        decode_responses=True,
+    )
+
+
+def create_throttle_store() -> TokenBucketStore:
+    if settings.REDIS_HOST and settings.REDIS_PORT:
+        redis = Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_BOT_DB,
+            password=settings.REDIS_PASSWORD or None,
+            decode_responses=True,
+        )
+        return RedisTokenBucketStore(redis)
+    else:
+        return MemoryTokenBucketStore()
+
+
 def create_dispatcher(storage: BaseStorage) -> Dispatcher:
     return Dispatcher(storage=storage)
 
 
+def _traced(middleware: BaseMiddleware) -> BaseMiddleware:
+    return TracedMiddleware(middleware) if settings.TRACING_ENABLED else middleware
+
+
 def setup_middlewares(dispatcher: Dispatcher, bot_instance: Bot) -> None:
+    if settings.TRACING_ENABLED:
+        # Each update is a trace; started before dispatch so queueing is included
+        dispatcher.update.outer_middleware(TracingMiddleware())
+
+    # First update middleware: orders updates per chat and bounds concurrency
+    chat_dispatch_middleware = ChatDispatchMiddleware(
+        max_concurrent=settings.DISPATCH_MAX_CONCURRENT_UPDATES,
+        max_chat_queue=settings.DISPATCH_MAX_CHAT_QUEUE,
+        shed_pending_threshold=settings.DISPATCH_SHED_PENDING_THRESHOLD,
+    )
+    dispatcher.update.outer_middleware(_traced(chat_dispatch_middleware))
+    dispatcher['chat_dispatch'] = chat_dispatch_middleware
+
+    # SQL statements per update, labelled with the handler that matched
+    dispatcher.update.outer_middleware(QueryCountMiddleware())
+
+    if settings.SLOW_UPDATE_SECONDS:
+        slow_detector = SlowWorkDetector.from_settings()
+        slow_detector.install()
+        dispatcher.update.outer_middleware(SlowUpdateMiddleware(slow_detector))
+        dispatcher['slow_detector'] = slow_detector
+
     bot_middleware = BotMiddleware(settings.CURRENT_BOT_SLUG)
-    dispatcher.message.middleware(bot_middleware)
-    dispatcher.callback_query.middleware(bot_middleware)
+    dispatcher.message.middleware(_traced(bot_middleware))
+    dispatcher.callback_query.middleware(_traced(bot_middleware))
+
+    if settings.THROTTLE_ENABLED:
+        # Before UserMiddleware so throttled events never touch the database
+        throttling_middleware = ThrottlingMiddleware(
+            store=create_throttle_store(),
+            limits=build_throttle_limits(settings.THROTTLE_LIMITS),
+            key_prefix=f"throttle:{settings.CURRENT_BOT_SLUG}",
+        )
+        dispatcher.message.middleware(_traced(throttling_middleware))
+        dispatcher.callback_query.middleware(_traced(throttling_middleware))
+        dispatcher['throttling'] = throttling_middleware
 
     user_middleware = UserMiddleware()
-    dispatcher.message.middleware(user_middleware)
-    dispatcher.callback_query.middleware(user_middleware)
+    dispatcher.message.middleware(_traced(user_middleware))
+    dispatcher.callback_query.middleware(_traced(user_middleware))
 
     app_context_middleware = AppContextMiddleware()
-    dispatcher.message.middleware(app_context_middleware)
-    dispatcher.callback_query.middleware(app_context_middleware)
+    dispatcher.message.middleware(_traced(app_context_middleware))
+    dispatcher.callback_query.middleware(_traced(app_context_middleware))
 
     logging_middleware = LoggingMiddleware(bot_id=bot_instance.id)
-    dispatcher.message.middleware(logging_middleware)
-    dispatcher.callback_query.middleware(logging_middleware)
+    dispatcher.message.middleware(_traced(logging_middleware))
+    dispatcher.callback_query.middleware(_traced(logging_middleware))
 
     i18n_middleware = UserLanguageMiddleware()
-    dispatcher.message.middleware(i18n_middleware)
-    dispatcher.callback_query.middleware(i18n_middleware)
+    dispatcher.message.middleware(_traced(i18n_middleware))
+    dispatcher.callback_query.middleware(_traced(i18n_middleware))
+
+    # Last, so only the handler itself is timed
+    handler_metrics_middleware = HandlerMetricsMiddleware()
+    dispatcher.message.middleware(handler_metrics_middleware)
+    dispatcher.callback_query.middleware(handler_metrics_middleware)
+
+    bot_instance.session.middleware(TelegramRequestMetricsMiddleware())
+
+    if settings.TRACING_ENABLED:
+        handler_span_middleware = HandlerSpanMiddleware()
+        dispatcher.message.middleware(handler_span_middleware)
+        dispatcher.callback_query.middleware(handler_span_middleware)
+        bot_instance.session.middleware(TelegramRequestTracingMiddleware())
 
 
 def setup_handlers(dispatcher: Dispatcher) -> None:
@@ -14,3 +14,9 @@ class MessageHistoryEntity(BaseEntity):
     raw: Optional[Dict[str, Any]] = None
     context: Optional[Dict[str, Any]] = None
     created_at: datetime
+
+
+class MessageHistoryPurgeChunkEntity(BaseEntity):
+    deleted_count: int
+    last_id: Optional[int] = None
+    deleted_bytes: Optional[int] = None
@@ -0,0 +1,97 @@
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from telegram_bot.benchmarks.bot_load import DEFAULT_MIX, ROUTES, run_bot_load
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    mix = {}
+    for part in value.split(','):
+        if not part.strip():
+            continue
+        route, _, weight = part.partition('=')
+        route = route.strip()
+        if route not in ROUTES or not weight.strip().isdigit():
+            raise CommandError(f'Invalid mix entry "{part}", expected <route>=<weight> with route in {", ".join(ROUTES)}')
+        mix[route] = int(weight)
+    if not any(mix.values()):
+        raise CommandError('Traffic mix needs at least one route with a positive weight')
+    return mix
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay synthetic wizard, /horoscope, follow-up and payment traffic through the real dispatcher '
+        'against a fake Telegram and a fake LLM, and report throughput and latency per route'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Synthetic users to seed (default: 1000)')
+        parser.add_argument(
+            '--conversations',
+            type=int,
+            default=2000,
+            help='Conversations to replay (default: 2000)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=50,
+            help='Simulated users talking to the bot at the same time (default: 50)',
+        )
+        parser.add_argument(
+            '--mix',
+            type=str,
+            default=','.join(f'{route}={weight}' for route, weight in DEFAULT_MIX.items()),
+            help='Relative weight of each conversation type '
+                 f'(default: {",".join(f"{route}={weight}" for route, weight in DEFAULT_MIX.items())})',
+        )
+        parser.add_argument(
+            '--api-latency-ms',
+            type=float,
+            default=20,
+            help='Latency of every fake Bot API call (default: 20)',
+        )
+        parser.add_argument(
+            '--rate-limit-every',
+            type=int,
+            default=0,
+            help='Answer every Nth Bot API call with 429 Too Many Requests (default: 0, never)',
+        )
+        parser.add_argument(
+            '--llm-latency-ms',
+            type=float,
+            default=800,
+            help='Latency of every fake LLM completion (default: 800)',
+        )
+        parser.add_argument(
+            '--llm-output-tokens',
+            type=int,
+            default=300,
+            help='Tokens in every fake LLM completion (default: 300)',
+        )
+
+    def handle(self, *args, **options):
+        result = asyncio.run(run_bot_load(
+            users=options['users'],
+            conversations=options['conversations'],
+            concurrency=options['concurrency'],
+            mix=parse_mix(options['mix']),
+            api_latency_seconds=options['api_latency_ms'] / 1000,
+            rate_limit_every=options['rate_limit_every'],
+            llm_latency_seconds=options['llm_latency_ms'] / 1000,
+            llm_output_tokens=options['llm_output_tokens'],
+        ))
+
+        self.stdout.write(f'{"route":<10} {"updates":>8} {"errors":>7} {"p50 ms":>9} {"p99 ms":>9}')
+        for stats in result.routes.values():
+            self.stdout.write(
+                f'{stats.route:<10} {len(stats.latencies):>8,} {stats.errors:>7,} '
+                f'{stats.p50 * 1000:>9.1f} {stats.p99 * 1000:>9.1f}'
+            )
+        status = '' if result.completed else '  (some updates timed out)'
+        self.stdout.write(
+            f'\n{result.updates:,} updates in {result.seconds:.2f}s: {result.updates_per_second:.1f} updates/s, '
+            f'{result.rate_limited:,} Bot API calls rate limited, {result.llm_requests:,} LLM requests{status}'
+        )
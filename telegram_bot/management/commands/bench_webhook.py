@@ -0,0 +1,68 @@
+import asyncio
+
+from django.core.management.base import BaseCommand
+
+from config import settings
+from telegram_bot.benchmarks.webhook_load import run_webhook_benchmark
+
+
+class Command(BaseCommand):
+    help = 'Measure webhook update throughput against a fake Telegram for different numbers of stream workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=str,
+            default='1,2,4',
+            help='Comma-separated worker counts to compare (default: 1,2,4)',
+        )
+        parser.add_argument('--updates', type=int, default=5000, help='Updates per run (default: 5000)')
+        parser.add_argument('--chats', type=int, default=500, help='Distinct chats (default: 500)')
+        parser.add_argument(
+            '--partitions',
+            type=int,
+            default=settings.WEBHOOK_STREAM_PARTITIONS,
+            help=f'Stream partitions (default: {settings.WEBHOOK_STREAM_PARTITIONS})',
+        )
+        parser.add_argument(
+            '--api-latency-ms',
+            type=float,
+            default=20,
+            help='Latency of every fake Bot API call (default: 20)',
+        )
+        parser.add_argument(
+            '--handler-cpu-ms',
+            type=float,
+            default=2,
+            help='CPU time burnt per update, standing in for handler work (default: 2)',
+        )
+        parser.add_argument(
+            '--redis-url',
+            type=str,
+            default=None,
+            help='Redis to run the streams on (default: REDIS_HOST/REDIS_PORT/REDIS_BOT_DB)',
+        )
+
+    def handle(self, *args, **options):
+        redis_url = options['redis_url'] or (
+            f"redis://:{settings.REDIS_PASSWORD}@{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_BOT_DB}"
+        )
+        worker_counts = [int(count) for count in options['workers'].split(',') if count.strip()]
+
+        results = asyncio.run(run_webhook_benchmark(
+            redis_url=redis_url,
+            worker_counts=worker_counts,
+            updates=options['updates'],
+            chats=options['chats'],
+            partitions=options['partitions'],
+            api_latency_seconds=options['api_latency_ms'] / 1000,
+            handler_cpu_seconds=options['handler_cpu_ms'] / 1000,
+        ))
+
+        self.stdout.write(f'{"workers":>7} {"updates":>8} {"seconds":>8} {"updates/s":>10} {"ordered":>8}')
+        for result in results:
+            status = '' if result.completed else '  (timed out)'
+            self.stdout.write(
+                f'{result.workers:>7} {result.updates:>8,} {result.seconds:>8.2f} '
+                f'{result.updates_per_second:>10.1f} {str(result.ordered):>8}{status}'
+            )
@@ -1,12 +1,20 @@
 import asyncio
 import logging
 import sys
+from typing import Optional
 
 from django.core.management.base import BaseCommand
 
 from config import settings
 from core.enums import BotSlug
-from telegram_bot.bot import create_bot, create_storage, create_dispatcher, setup_dispatcher
+from core.metrics import install_db_query_metrics
+from telegram_bot.bot import (
+    create_bot,
+    create_dispatcher,
+    create_storage,
+    create_update_stream_redis,
+    setup_dispatcher,
+)
 
 
 class Command(BaseCommand):
@@ -27,6 +35,32 @@ class Command(BaseCommand):
             help=f'Bot slug to run (default: {settings.MAIN_BOT_SLUG}). '
                  f'Available: {", ".join(slug.value for slug in BotSlug)}',
         )
+        parser.add_argument(
+            '--mode',
+            type=str,
+            default=None,
+            choices=['polling', 'webhook', 'worker'],
+            help=f'How updates are received (default: {settings.BOT_UPDATES_MODE}). '
+                 f'"worker" handles updates queued by a webhook process with WEBHOOK_WORKERS > 0',
+        )
+        parser.add_argument(
+            '--worker-index',
+            type=int,
+            default=0,
+            help='Index of this worker (0 to WEBHOOK_WORKERS - 1), only used with --mode worker',
+        )
+        parser.add_argument(
+            '--loop-watchdog',
+            action='store_true',
+            help='Export event loop lag and log the stack of calls blocking the loop',
+        )
+        parser.add_argument(
+            '--loop-stall-ms',
+            type=int,
+            default=None,
+            help=f'Blocking time reported as a stall by --loop-watchdog '
+                 f'(default: {settings.LOOP_STALL_SECONDS * 1000:.0f})',
+        )
 
     def handle(self, *args, **options):
         bot_slug = options.get('bot')
@@ -47,14 +81,36 @@ class Command(BaseCommand):
         settings.CURRENT_BOT_SLUG = BotSlug(bot_config['slug'])
         settings.CURRENT_BOT_TOKEN = bot_config['token']
 
-        logging.info(f'Starting bot "{bot_slug}"')
+        mode = options.get('mode') or settings.BOT_UPDATES_MODE
+        worker_index = options['worker_index']
+        if mode == 'webhook' and not (settings.WEBHOOK_BASE_URL and settings.WEBHOOK_SECRET_TOKEN):
+            self.stderr.write(self.style.ERROR('Webhook mode requires WEBHOOK_BASE_URL and WEBHOOK_SECRET_TOKEN'))
+            sys.exit(1)
+        if mode == 'worker' and not 0 <= worker_index < settings.WEBHOOK_WORKERS:
+            self.stderr.write(
+                self.style.ERROR(f'--worker-index must be between 0 and WEBHOOK_WORKERS - 1 ({settings.WEBHOOK_WORKERS - 1})')
+            )
+            sys.exit(1)
+        if settings.ARCHIVE_ENABLED and not settings.ARCHIVE_DIR:
+            # Archived rows are deleted from the database; never write them to the container filesystem
+            self.stderr.write(
+                self.style.ERROR('ARCHIVE_ENABLED requires ARCHIVE_DIR on persistent storage shared by all replicas')
+            )
+            sys.exit(1)
+
+        loop_stall_seconds = None
+        if options['loop_watchdog']:
+            stall_ms = options['loop_stall_ms']
+            loop_stall_seconds = stall_ms / 1000 if stall_ms else settings.LOOP_STALL_SECONDS
+
+        logging.info(f'Starting bot "{bot_slug}" ({mode})')
 
         try:
-            asyncio.run(self.run_bot())
+            asyncio.run(self.run_bot(mode=mode, worker_index=worker_index, loop_stall_seconds=loop_stall_seconds))
         except KeyboardInterrupt:
             logging.info("Bot stopped by user (Ctrl+C)")
 
-    async def run_bot(self):
+    async def run_bot(self, mode: str = 'polling', worker_index: int = 0, loop_stall_seconds: Optional[float] = None):
         logger = logging.getLogger(__name__)
 
         bot = create_bot(settings.CURRENT_BOT_TOKEN)
@@ -63,73 +119,251 @@ class Command(BaseCommand):
 
         self._bot = bot
         self._scheduler = None
+        metrics_server = None
+        loop_watchdog = None
 
         try:
             setup_dispatcher(dispatcher=dispatcher, bot_instance=bot)
 
+            # Per-statement hook feeding metrics, traces and slow-work profiles
+            install_db_query_metrics()
+
+            if settings.TRACING_ENABLED:
+                from core.tracing import Tracer, configure_tracing
+
+                configure_tracing(Tracer.from_settings())
+
+            if loop_stall_seconds:
+                from core.loop_watchdog import LoopWatchdog
+
+                loop_watchdog = LoopWatchdog(stall_seconds=loop_stall_seconds)
+                await loop_watchdog.start()
+
+            if settings.METRICS_PORT:
+                metrics_server = await self.start_metrics(dispatcher=dispatcher, mode=mode, worker_index=worker_index)
+
+            if mode == 'worker':
+                # Workers only handle updates; the webhook process runs the scheduler
+                await self.run_worker(dispatcher=dispatcher, bot=bot, worker_index=worker_index)
+                return
+
             dispatcher.startup.register(self.on_startup)
             dispatcher.shutdown.register(self.on_shutdown)
 
+            if mode == 'webhook':
+                await self.run_webhook(dispatcher=dispatcher, bot=bot)
+                return
+
             logger.info(f"Bot '{settings.CURRENT_BOT_SLUG}' polling started.")
             await dispatcher.start_polling(
                 bot,
                 allowed_updates=dispatcher.resolve_used_update_types(),
+                tasks_concurrency_limit=settings.DISPATCH_MAX_PENDING_UPDATES,
             )
         finally:
+            if loop_watchdog:
+                await loop_watchdog.stop()
+            if metrics_server:
+                await metrics_server.stop()
             await bot.session.close()
             logger.info("Bot session closed")
 
+    async def start_metrics(self, dispatcher, mode: str, worker_index: int):
+        from core.metrics import REGISTRY
+        from telegram_bot.metrics import MetricsServer, dispatch_metrics
+
+        REGISTRY.register_collector('dispatch', lambda: dispatch_metrics(dispatcher))
+        port = settings.METRICS_PORT + (1 + worker_index if mode == 'worker' else 0)
+        metrics_server = MetricsServer(host=settings.METRICS_HOST, port=port)
+        await metrics_server.start()
+        return metrics_server
+
+    async def run_webhook(self, dispatcher, bot):
+        logger = logging.getLogger(__name__)
+
+        from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+        from aiohttp import web
+
+        from telegram_bot.webhook import UpdateStreamPublisher, UpdateStreamRequestHandler
+
+        path = f"{settings.WEBHOOK_PATH.rstrip('/')}/{settings.CURRENT_BOT_SLUG}"
+        app = web.Application()
+        if settings.WEBHOOK_WORKERS:
+            publisher = UpdateStreamPublisher(
+                redis=create_update_stream_redis(),
+                bot_slug=settings.CURRENT_BOT_SLUG,
+                partitions=settings.WEBHOOK_STREAM_PARTITIONS,
+                maxlen=settings.WEBHOOK_STREAM_MAXLEN,
+            )
+            UpdateStreamRequestHandler(
+                publisher=publisher,
+                secret_token=settings.WEBHOOK_SECRET_TOKEN,
+            ).register(app, path=path)
+        else:
+            SimpleRequestHandler(
+                dispatcher=dispatcher,
+                bot=bot,
+                secret_token=settings.WEBHOOK_SECRET_TOKEN,
+            ).register(app, path=path)
+
+        async def set_webhook():
+            await bot.set_webhook(
+                url=settings.WEBHOOK_BASE_URL.rstrip('/') + path,
+                secret_token=settings.WEBHOOK_SECRET_TOKEN,
+                allowed_updates=dispatcher.resolve_used_update_types(),
+            )
+
+        dispatcher.startup.register(set_webhook)
+        setup_application(app, dispatcher, bot=bot)
+
+        runner = web.AppRunner(app)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, host=settings.WEBHOOK_HOST, port=settings.WEBHOOK_PORT).start()
+            logger.info(
+                f"Bot '{settings.CURRENT_BOT_SLUG}' webhook listening on "
+                f"{settings.WEBHOOK_HOST}:{settings.WEBHOOK_PORT}{path} "
+                f"(workers={settings.WEBHOOK_WORKERS or 'in-process'})"
+            )
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+
+    async def run_worker(self, dispatcher, bot, worker_index: int):
+        logger = logging.getLogger(__name__)
+
+        from telegram_bot.webhook import UpdateStreamWorker
+
+        redis = create_update_stream_redis()
+        worker = UpdateStreamWorker(
+            redis=redis,
+            dispatcher=dispatcher,
+            bot=bot,
+            bot_slug=settings.CURRENT_BOT_SLUG,
+            partitions=settings.WEBHOOK_STREAM_PARTITIONS,
+            worker_index=worker_index,
+            worker_count=settings.WEBHOOK_WORKERS,
+        )
+        logger.info(
+            f"Bot '{settings.CURRENT_BOT_SLUG}' update worker {worker_index + 1}/{settings.WEBHOOK_WORKERS} started."
+        )
+        try:
+            await worker.run()
+        finally:
+            await redis.aclose()
+
     async def on_startup(self):
         logger = logging.getLogger(__name__)
 
+        from core.containers import container
+        from core.profiling import SlowWorkDetector
         from telegram_bot.scheduler import BackgroundScheduler
         from horoscope.tasks import (
+            archive_old_records,
+            deliver_due_horoscopes,
             generate_daily_for_all_users,
-            send_daily_horoscope_notifications,
-            send_periodic_teaser_notifications,
+            rebuild_notification_buckets,
             send_expiry_reminders,
             send_expired_notifications,
+            upgrade_fallback_horoscopes,
         )
+        from telegram_bot.tasks import purge_old_message_history
+
+        # Per-language hour mapping may have changed since last start
+        notification_schedule_service = container.horoscope.notification_schedule_service()
+        await notification_schedule_service.arefresh_effective_hours()
 
-        self._scheduler = BackgroundScheduler(bot=self._bot)
+        self._scheduler = BackgroundScheduler(
+            bot=self._bot,
+            state_repo=container.core.setting_repository(),
+            lease_repo=container.core.scheduler_lease_repository(),
+            lease_ttl_seconds=settings.SCHEDULER_LEASE_TTL_SECONDS,
+            instance_id=settings.SCHEDULER_INSTANCE_ID,
+            slow_detector=SlowWorkDetector.from_settings() if settings.SLOW_TASK_SECONDS else None,
+        )
 
         daily_interval = settings.SCHEDULER_DAILY_INTERVAL_SECONDS
         hourly_interval = settings.SCHEDULER_HOURLY_INTERVAL_SECONDS
+        jitter = settings.SCHEDULER_JITTER_SECONDS
 
-        # Horoscope generation and notification tasks run hourly
-        # to support per-user notification hours
+        # Horoscope generation runs hourly to support per-user notification
+        # hours, HOROSCOPE_GENERATION_LEAD_SECONDS before the hour it serves so
+        # fallbacks can be upgraded before delivery. It replays hours missed
+        # during downtime so those users still get theirs.
+        generation_offset = hourly_interval - settings.HOROSCOPE_GENERATION_LEAD_SECONDS
         self._scheduler.schedule(
             func=generate_daily_for_all_users,
             interval_seconds=hourly_interval,
             name="generate-daily-horoscopes",
+            offset_seconds=generation_offset,
+            jitter_seconds=jitter,
+            catch_up=True,
+            max_catch_up=settings.SCHEDULER_MAX_CATCH_UP_RUNS,
         )
+        # Explicit notification hours are local; shortly before every generation
+        # run the UTC buckets are moved for zones whose offset changes (DST)
         self._scheduler.schedule(
-            func=send_daily_horoscope_notifications,
-            interval_seconds=10 * 60,
-            name="send-daily-horoscope-notifications",
+            func=rebuild_notification_buckets,
+            interval_seconds=hourly_interval,
+            name="rebuild-notification-buckets",
+            offset_seconds=generation_offset - 5 * 60,
+            jitter_seconds=jitter,
         )
+        # Generation queues each horoscope with its due time; the queue is
+        # drained every minute for both subscribers and teasers
         self._scheduler.schedule(
-            func=send_periodic_teaser_notifications,
-            interval_seconds=15 * 60,
-            name="send-periodic-teaser-notifications",
+            func=deliver_due_horoscopes,
+            interval_seconds=settings.SCHEDULER_DELIVERY_INTERVAL_SECONDS,
+            name="deliver-due-horoscopes",
         )
+        # Horoscopes composed offline during an LLM outage are rewritten by
+        # the LLM once it answers again, if they were not delivered yet
+        if settings.HOROSCOPE_FALLBACK_ENABLED and settings.HOROSCOPE_FALLBACK_UPGRADE_ENABLED:
+            self._scheduler.schedule(
+                func=upgrade_fallback_horoscopes,
+                interval_seconds=settings.HOROSCOPE_FALLBACK_UPGRADE_INTERVAL_SECONDS,
+                name="upgrade-fallback-horoscopes",
+                jitter_seconds=jitter,
+            )
         # Subscription tasks remain on daily interval
         self._scheduler.schedule(
             func=send_expiry_reminders,
             interval_seconds=daily_interval,
             name="send-expiry-reminders",
+            jitter_seconds=jitter,
         )
         self._scheduler.schedule(
             func=send_expired_notifications,
             interval_seconds=daily_interval,
             name="send-expired-notifications",
+            jitter_seconds=jitter,
         )
+        # Cold data maintenance in the quiet early-morning hours rather than at
+        # midnight UTC. The archive moves old message history out of the hot
+        # table, so it replaces the retention purge; without it history is purged.
+        if settings.ARCHIVE_ENABLED:
+            self._scheduler.schedule(
+                func=archive_old_records,
+                interval_seconds=daily_interval,
+                name="archive-old-records",
+                offset_seconds=3 * 60 * 60,
+                jitter_seconds=jitter,
+            )
+        else:
+            self._scheduler.schedule(
+                func=purge_old_message_history,
+                interval_seconds=daily_interval,
+                name="purge-old-message-history",
+                offset_seconds=3 * 60 * 60,
+                jitter_seconds=jitter,
+            )
 
         logger.info("=" * 60)
         logger.info("Bot startup complete")
         logger.info(
             f"Background scheduler started: "
-            f"horoscope tasks={hourly_interval}s, subscription tasks={daily_interval}s"
+            f"horoscope tasks={hourly_interval}s, subscription tasks={daily_interval}s, "
+            f"instance={self._scheduler.instance_id}"
         )
         logger.info("=" * 60)
 
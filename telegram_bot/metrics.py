@@ -0,0 +1,92 @@
+"""
+`/metrics` endpoint of a bot process.
+
+Serves core.metrics.REGISTRY in the Prometheus text format on a separate local
+port, adds scrape-time collectors for the update dispatcher and keeps probing
+how long sync_to_async calls wait for the ORM thread.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Iterable, Optional
+
+from aiogram import Dispatcher
+from aiohttp import web
+from asgiref.sync import sync_to_async
+
+from core.metrics import REGISTRY, SYNC_TO_ASYNC_WAIT_SECONDS, CollectedMetric, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def dispatch_metrics(dispatcher: Dispatcher) -> Iterable[CollectedMetric]:
+    """Update throughput and backlog from the dispatch, slow update and throttling middlewares."""
+    chat_dispatch = dispatcher.get('chat_dispatch')
+    if chat_dispatch is not None:
+        stats = chat_dispatch.stats
+        yield 'bot_updates_processed_total', 'counter', 'Updates handled.', [({}, stats.processed)]
+        yield 'bot_updates_shed_total', 'counter', 'Non-critical updates dropped under load.', [({}, stats.shed)]
+        yield 'bot_updates_in_flight', 'gauge', 'Updates being handled right now.', [({}, stats.in_flight)]
+        yield 'bot_updates_pending', 'gauge', 'Updates waiting or being handled.', [({}, stats.pending)]
+        yield 'bot_chat_queue_depth_max', 'gauge', 'Updates queued for the busiest chat.', [
+            ({}, chat_dispatch.busiest_chat_depth),
+        ]
+    slow_detector = dispatcher.get('slow_detector')
+    if slow_detector is not None:
+        yield 'bot_slow_updates_total', 'counter', 'Updates slower than SLOW_UPDATE_SECONDS.', [
+            ({}, slow_detector.reported),
+        ]
+    throttling = dispatcher.get('throttling')
+    if throttling is not None:
+        yield 'bot_updates_throttled_total', 'counter', 'Updates rejected by per-user throttling.', [
+            ({}, throttling.throttled),
+        ]
+
+
+async def probe_sync_to_async_wait(interval_seconds: float) -> None:
+    """Time an empty sync_to_async call every interval; it queues behind all pending ORM work."""
+    noop = sync_to_async(lambda: None)
+    while True:
+        started = time.perf_counter()
+        await noop()
+        SYNC_TO_ASYNC_WAIT_SECONDS.observe(time.perf_counter() - started)
+        await asyncio.sleep(interval_seconds)
+
+
+class MetricsServer:
+    def __init__(self, host: str, port: int, registry: MetricsRegistry = REGISTRY, probe_interval_seconds: float = 1.0):
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self.probe_interval_seconds = probe_interval_seconds
+        self._runner: Optional[web.AppRunner] = None
+        self._probe: Optional[asyncio.Task] = None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        return web.Response(body=self.registry.render().encode('utf-8'), headers={'Content-Type': CONTENT_TYPE})
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/metrics', self.handle)
+        return app
+
+    async def start(self) -> None:
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host=self.host, port=self.port)
+        await site.start()
+        self._probe = asyncio.create_task(probe_sync_to_async_wait(self.probe_interval_seconds))
+        logger.info(f"Metrics available on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        if self._probe is not None:
+            self._probe.cancel()
+            try:
+                await self._probe
+            except asyncio.CancelledError:
+                pass
+        if self._runner is not None:
+            await self._runner.cleanup()
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, TelegramObject, Update
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DispatchStats:
+    in_flight: int = 0
+    pending: int = 0
+    max_pending: int = 0
+    max_chat_depth: int = 0
+    processed: int = 0
+    shed: int = 0
+
+
+def update_chat_id(update: Update) -> Optional[int]:
+    """Chat an update belongs to (sender if it has no chat); None for updates tied to neither."""
+    event = update.event
+    chat = getattr(event, 'chat', None)
+    if chat is None and isinstance(event, CallbackQuery) and event.message:
+        chat = event.message.chat
+    if chat is not None:
+        return chat.id
+    from_user = getattr(event, 'from_user', None)
+    return from_user.id if from_user else None
+
+
+def is_critical_update(update: Update) -> bool:
+    """Updates never shed under load: payments and commands."""
+    if update.pre_checkout_query or update.shipping_query:
+        return True
+    message = update.message
+    if message is None:
+        return False
+    return bool(message.successful_payment) or (message.text or '').startswith('/')
+
+
+class ChatDispatchMiddleware(BaseMiddleware):
+    """
+    Outer update middleware bounding how updates are processed.
+
+    Updates of one chat run one at a time in arrival order (asyncio.Lock wakes
+    waiters FIFO), so handlers and FSM state of a chat never race. Across chats
+    at most `max_concurrent` updates run at once. Under overload, non-critical
+    updates are dropped instead of queued: when the chat already has
+    `max_chat_queue` updates waiting, or `shed_pending_threshold` updates wait
+    in total.
+
+    Must be the first update middleware so that the chat lock is taken before
+    anything else awaits.
+    """
+
+    def __init__(self, max_concurrent: int, max_chat_queue: int, shed_pending_threshold: int):
+        super().__init__()
+        self.max_chat_queue = max_chat_queue
+        self.shed_pending_threshold = shed_pending_threshold
+        self.stats = DispatchStats()
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._chat_locks: dict[int, asyncio.Lock] = {}
+        self._chat_depths: dict[int, int] = {}
+        self._shedding = False
+
+    def chat_depth(self, chat_id: int) -> int:
+        """Updates of a chat currently waiting or running."""
+        return self._chat_depths.get(chat_id, 0)
+
+    @property
+    def busiest_chat_depth(self) -> int:
+        return max(self._chat_depths.values(), default=0)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        chat_id = update_chat_id(event) if isinstance(event, Update) else None
+
+        if self._should_shed(event, chat_id):
+            self.stats.shed += 1
+            if not self._shedding:
+                self._shedding = True
+                logger.warning(
+                    f"Shedding non-critical updates (pending={self.stats.pending}, "
+                    f"chat {chat_id} depth={self.chat_depth(chat_id) if chat_id is not None else 0})"
+                )
+            return None
+        if self._shedding and self.stats.pending < self.shed_pending_threshold // 2:
+            self._shedding = False
+            logger.info(f"Stopped shedding updates after dropping {self.stats.shed} in total")
+
+        self.stats.pending += 1
+        self.stats.max_pending = max(self.stats.max_pending, self.stats.pending)
+        try:
+            if chat_id is None:
+                return await self._run(handler, event, data)
+            depth = self._chat_depths.get(chat_id, 0) + 1
+            self._chat_depths[chat_id] = depth
+            self.stats.max_chat_depth = max(self.stats.max_chat_depth, depth)
+            lock = self._chat_locks.setdefault(chat_id, asyncio.Lock())
+            try:
+                async with lock:
+                    return await self._run(handler, event, data)
+            finally:
+                self._chat_depths[chat_id] -= 1
+                if not self._chat_depths[chat_id]:
+                    del self._chat_depths[chat_id]
+                    del self._chat_locks[chat_id]
+        finally:
+            self.stats.pending -= 1
+
+    def _should_shed(self, event: TelegramObject, chat_id: Optional[int]) -> bool:
+        if not isinstance(event, Update) or is_critical_update(event):
+            return False
+        if self.stats.pending >= self.shed_pending_threshold:
+            return True
+        return chat_id is not None and self.chat_depth(chat_id) >= self.max_chat_queue
+
+    async def _run(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        async with self._semaphore:
+            self.stats.in_flight += 1
+            try:
+                return await handler(event, data)
+            finally:
+                self.stats.in_flight -= 1
+                self.stats.processed += 1
@@ -0,0 +1,101 @@
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import Response, TelegramType
+from aiogram.types import TelegramObject
+
+from core.metrics import (
+    HANDLER_SECONDS,
+    TELEGRAM_ERRORS_TOTAL,
+    TELEGRAM_REQUEST_SECONDS,
+    UPDATE_QUERIES,
+    UPDATE_QUERY_SECONDS,
+)
+from core.profiling import record_io
+from core.query_budget import count_queries, current_query_count
+
+
+def handler_labels(data: Dict[str, Any]) -> tuple[str, str]:
+    """Router (handler module, e.g. 'wizard') and function name of the matched handler."""
+    handler = data.get('handler')
+    callback = getattr(handler, 'callback', None)
+    if callback is None:
+        return 'unknown', 'unknown'
+    module = getattr(callback, '__module__', '') or ''
+    return module.rsplit('.', 1)[-1] or 'unknown', getattr(callback, '__name__', 'unknown')
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Innermost message/callback middleware timing the matched handler."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        router, name = handler_labels(data)
+        query_count = current_query_count()
+        if query_count is not None:
+            query_count.route = f"{router}.{name}"
+        outcome = 'ok'
+        started = time.perf_counter()
+        try:
+            result = await handler(event, data)
+            if result is UNHANDLED:
+                outcome = 'unhandled'
+            return result
+        except Exception:
+            outcome = 'error'
+            raise
+        finally:
+            HANDLER_SECONDS.observe(time.perf_counter() - started, router=router, handler=name, outcome=outcome)
+
+
+class QueryCountMiddleware(BaseMiddleware):
+    """
+    Update middleware counting SQL statements of a whole update, user upsert
+    and message logging included, reported under the handler that matched.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        with count_queries() as query_count:
+            try:
+                return await handler(event, data)
+            finally:
+                route = query_count.route or 'unhandled'
+                UPDATE_QUERIES.observe(query_count.queries, route=route)
+                UPDATE_QUERY_SECONDS.observe(query_count.seconds, route=route)
+
+
+class TelegramRequestMetricsMiddleware(BaseRequestMiddleware):
+    """Bot session middleware timing Bot API calls and counting failures by exception class."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        api_method = getattr(method, '__api_method__', type(method).__name__)
+        outcome = 'ok'
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as e:
+            outcome = 'error'
+            TELEGRAM_ERRORS_TOTAL.inc(method=api_method, error=type(e).__name__)
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            TELEGRAM_REQUEST_SECONDS.observe(duration, method=api_method, outcome=outcome)
+            record_io('telegram', duration)
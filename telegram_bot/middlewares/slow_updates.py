@@ -0,0 +1,35 @@
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from core.profiling import SlowWorkDetector
+from telegram_bot.middlewares.dispatch import update_chat_id
+from telegram_bot.middlewares.throttling import throttle_route
+
+
+class SlowUpdateMiddleware(BaseMiddleware):
+    """
+    Update middleware logging updates slower than SLOW_UPDATE_SECONDS with
+    their DB / LLM / Bot API / Python time breakdown.
+
+    Registered after ChatDispatchMiddleware, so time spent queued behind the
+    chat lock or the concurrency limit does not count.
+    """
+
+    def __init__(self, detector: SlowWorkDetector):
+        super().__init__()
+        self.detector = detector
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if not isinstance(event, Update):
+            return await handler(event, data)
+        route = throttle_route(event.event)
+        name = f"{event.event_type}:{route}" if route else event.event_type
+        with self.detector.watch('update', name, update_id=event.update_id, chat_id=update_chat_id(event)):
+            return await handler(event, data)
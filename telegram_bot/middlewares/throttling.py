@@ -0,0 +1,201 @@
+import logging
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional, Protocol
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, Message, TelegramObject
+from django.utils.translation import gettext_lazy as _
+from redis.asyncio import Redis
+
+from horoscope.utils import map_telegram_language, translate
+
+logger = logging.getLogger(__name__)
+
+THROTTLED_MESSAGE = _("⏳ You're going a bit fast. Please wait a moment and try again.")
+
+DEFAULT_ROUTE = 'default'
+
+
+@dataclass(frozen=True)
+class ThrottleLimit:
+    capacity: int
+    refill_per_minute: float
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.refill_per_minute / 60
+
+    @property
+    def full_refill_seconds(self) -> int:
+        return int(self.capacity / self.refill_per_second) + 1
+
+
+class TokenBucketStore(Protocol):
+    async def consume(self, key: str, limit: ThrottleLimit) -> bool:
+        """Take one token from the bucket; False when it is empty."""
+
+    async def should_notify(self, key: str, ttl_seconds: int) -> bool:
+        """True the first time a key is throttled within `ttl_seconds`."""
+
+
+class MemoryTokenBucketStore:
+    """Per-process token buckets, used when Redis is not configured."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._notified: dict[str, float] = {}
+        self._max_keys = max_keys
+
+    async def consume(self, key: str, limit: ThrottleLimit) -> bool:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (limit.capacity, now))
+        tokens = min(limit.capacity, tokens + (now - updated) * limit.refill_per_second)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        if len(self._buckets) >= self._max_keys and key not in self._buckets:
+            self._prune(now)
+        self._buckets[key] = (tokens, now)
+        return allowed
+
+    async def should_notify(self, key: str, ttl_seconds: int) -> bool:
+        now = time.monotonic()
+        if self._notified.get(key, 0) > now:
+            return False
+        if len(self._notified) >= self._max_keys:
+            self._notified = {k: expires for k, expires in self._notified.items() if expires > now}
+        self._notified[key] = now + ttl_seconds
+        return True
+
+    def _prune(self, now: float) -> None:
+        # Buckets idle for a minute are close to full; forgetting them only refills them early
+        self._buckets = {k: v for k, v in self._buckets.items() if now - v[1] < 60}
+
+
+# Refill and take a token atomically, on the Redis clock so all replicas agree
+_CONSUME_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], ttl)
+return allowed
+"""
+
+
+class RedisTokenBucketStore:
+    """Token buckets shared by all bot processes."""
+
+    def __init__(self, redis: Redis):
+        self._redis = redis
+        self._consume = redis.register_script(_CONSUME_SCRIPT)
+
+    async def consume(self, key: str, limit: ThrottleLimit) -> bool:
+        allowed = await self._consume(
+            keys=[key],
+            args=[limit.capacity, limit.refill_per_second, limit.full_refill_seconds],
+        )
+        return bool(allowed)
+
+    async def should_notify(self, key: str, ttl_seconds: int) -> bool:
+        return bool(await self._redis.set(f"{key}:notified", 1, nx=True, ex=ttl_seconds))
+
+
+@lru_cache(maxsize=None)
+def throttled_reply(language: str) -> str:
+    return translate(THROTTLED_MESSAGE, language)
+
+
+def throttle_route(event: TelegramObject) -> Optional[str]:
+    """Limit an event is counted against: the command name, 'text', 'callback'; None if never throttled."""
+    if isinstance(event, CallbackQuery):
+        return 'callback'
+    if not isinstance(event, Message) or event.successful_payment:
+        return None
+    text = event.text or ''
+    if text.startswith('/'):
+        return text[1:].split(maxsplit=1)[0].split('@', 1)[0].lower() or DEFAULT_ROUTE
+    return 'text'
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Per-user, per-route token buckets in front of the user and handler middlewares.
+
+    Throttled events are answered with a short localized notice (once per bucket
+    refill period) and go no further, so bursts do not reach the database or the LLM.
+    """
+
+    def __init__(
+        self,
+        store: TokenBucketStore,
+        limits: dict[str, ThrottleLimit],
+        key_prefix: str = 'throttle',
+    ):
+        super().__init__()
+        self._store = store
+        self._limits = limits
+        self._key_prefix = key_prefix
+        self.throttled = 0
+
+    def limit_for(self, route: str) -> Optional[ThrottleLimit]:
+        return self._limits.get(route) or self._limits.get(DEFAULT_ROUTE)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        route = throttle_route(event)
+        user = getattr(event, 'from_user', None)
+        limit = self.limit_for(route) if route else None
+        if limit is None or user is None:
+            return await handler(event, data)
+
+        key = f"{self._key_prefix}:{user.id}:{route}"
+        try:
+            allowed = await self._store.consume(key, limit)
+        except Exception as e:
+            # Throttling must never take the bot down with it
+            logger.error(f"Throttle check failed for {key}", exc_info=e)
+            return await handler(event, data)
+        if allowed:
+            return await handler(event, data)
+
+        self.throttled += 1
+        logger.info(f"Throttled user {user.id} on {route}")
+        if await self._store.should_notify(key, limit.full_refill_seconds):
+            await self._reply(event, throttled_reply(map_telegram_language(user.language_code)))
+        elif isinstance(event, CallbackQuery):
+            # Callback queries must still be answered or the button keeps spinning
+            await event.answer()
+        return None
+
+    @staticmethod
+    async def _reply(event: TelegramObject, text: str) -> None:
+        try:
+            if isinstance(event, (CallbackQuery, Message)):
+                await event.answer(text)
+        except Exception as e:
+            logger.warning(f"Failed to send throttle notice: {e}")
+
+
+def build_throttle_limits(config: dict[str, tuple[int, float]]) -> dict[str, ThrottleLimit]:
+    return {
+        route: ThrottleLimit(capacity=capacity, refill_per_minute=refill_per_minute)
+        for route, (capacity, refill_per_minute) in config.items()
+    }
@@ -0,0 +1,78 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import Response, TelegramType
+from aiogram.types import TelegramObject, Update
+
+from core.tracing import span, start_trace
+from telegram_bot.middlewares.dispatch import update_chat_id
+from telegram_bot.middlewares.metrics import handler_labels
+
+
+class TracingMiddleware(BaseMiddleware):
+    """
+    Outermost update middleware: every update is the root span of a trace.
+
+    Registered before ChatDispatchMiddleware, so time spent waiting for the
+    chat lock and the concurrency limit is part of the trace.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        attributes: Dict[str, Any] = {}
+        if isinstance(event, Update):
+            attributes = {'update_id': event.update_id, 'type': event.event_type, 'chat_id': update_chat_id(event)}
+        with start_trace('update', 'update', **attributes):
+            return await handler(event, data)
+
+
+class TracedMiddleware(BaseMiddleware):
+    """Runs another middleware inside a span named after its class."""
+
+    def __init__(self, middleware: BaseMiddleware, name: Optional[str] = None):
+        super().__init__()
+        self.middleware = middleware
+        self.name = name or type(middleware).__name__
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        with span(self.name, 'middleware'):
+            return await self.middleware(handler, event, data)
+
+
+class HandlerSpanMiddleware(BaseMiddleware):
+    """Innermost message/callback middleware: a span around the matched handler."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        router, name = handler_labels(data)
+        with span(f"{router}.{name}", 'handler'):
+            return await handler(event, data)
+
+
+class TelegramRequestTracingMiddleware(BaseRequestMiddleware):
+    """Bot session middleware: a span per Bot API call."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        api_method = getattr(method, '__api_method__', type(method).__name__)
+        with span(f"telegram.{api_method}", 'telegram'):
+            return await make_request(bot, method)
@@ -1,12 +1,12 @@
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from asgiref.sync import sync_to_async
-from django.db import close_old_connections
+from django.db import close_old_connections, connection
 from django.utils import timezone
 
 from core.repositories.base import BaseRepository
-from telegram_bot.entities import MessageHistoryEntity
+from telegram_bot.entities import MessageHistoryEntity, MessageHistoryPurgeChunkEntity
 from telegram_bot.exceptions import MessageHistoryNotFoundException
 from telegram_bot.models import MessageHistory
 
@@ -72,7 +72,7 @@ class MessageHistoryRepository(BaseRepository[MessageHistory, MessageHistoryEnti
         ).order_by('-created_at')
         if limit:
             queryset = queryset[:limit]
-        return MessageHistoryEntity.from_models(list(queryset))
+        return MessageHistoryEntity.from_queryset(queryset)
 
     @sync_to_async
     def aget_by_user(
@@ -104,13 +104,88 @@ class MessageHistoryRepository(BaseRepository[MessageHistory, MessageHistoryEnti
         close_old_connections()
         return self.count_by_user(telegram_uid=telegram_uid, since=since)
 
-    def delete_old_messages(self, days: int = 30) -> int:
+    def delete_old_messages_chunk(
+        self,
+        older_than: datetime,
+        chunk_size: int,
+        after_id: Optional[int] = None,
+    ) -> MessageHistoryPurgeChunkEntity:
+        """
+        Delete up to `chunk_size` messages created before `older_than`, in id order after `after_id`.
+
+        Keeps each DELETE bounded (short locks, small WAL bursts). On PostgreSQL the
+        on-disk size of the deleted rows is reported as `deleted_bytes`.
+        """
+        queryset = MessageHistory.objects.filter(created_at__lt=older_than)
+        if after_id is not None:
+            queryset = queryset.filter(id__gt=after_id)
+        ids = list(queryset.order_by('id').values_list('id', flat=True)[:chunk_size])
+        if not ids:
+            return MessageHistoryPurgeChunkEntity(deleted_count=0, last_id=after_id)
+
+        deleted_bytes = None
+        if connection.vendor == 'postgresql':
+            table = connection.ops.quote_name(MessageHistory._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'SELECT COALESCE(SUM(pg_column_size(t.*)), 0) FROM {table} t WHERE t.id = ANY(%s)',
+                    [ids],
+                )
+                deleted_bytes = int(cursor.fetchone()[0])
+
+        deleted_count, _ = MessageHistory.objects.filter(id__in=ids).delete()
+        return MessageHistoryPurgeChunkEntity(
+            deleted_count=deleted_count,
+            last_id=ids[-1],
+            deleted_bytes=deleted_bytes,
+        )
+
+    @sync_to_async
+    def adelete_old_messages_chunk(
+        self,
+        older_than: datetime,
+        chunk_size: int,
+        after_id: Optional[int] = None,
+    ) -> MessageHistoryPurgeChunkEntity:
+        close_old_connections()
+        return self.delete_old_messages_chunk(
+            older_than=older_than,
+            chunk_size=chunk_size,
+            after_id=after_id,
+        )
+
+    def delete_old_messages(self, days: int = 30, chunk_size: int = 5000) -> int:
         from datetime import timedelta
         threshold = timezone.now() - timedelta(days=days)
-        count, _ = MessageHistory.objects.filter(created_at__lt=threshold).delete()
-        return count
+        count = 0
+        last_id = None
+        while True:
+            chunk = self.delete_old_messages_chunk(
+                older_than=threshold,
+                chunk_size=chunk_size,
+                after_id=last_id,
+            )
+            if not chunk.deleted_count:
+                return count
+            count += chunk.deleted_count
+            last_id = chunk.last_id
 
     @sync_to_async
-    def adelete_old_messages(self, days: int = 30) -> int:
+    def adelete_old_messages(self, days: int = 30, chunk_size: int = 5000) -> int:
         close_old_connections()
-        return self.delete_old_messages(days=days)
+        return self.delete_old_messages(days=days, chunk_size=chunk_size)
+
+    def iter_archive_rows(self, older_than: datetime, chunk_size: int) -> Iterator[list[dict]]:
+        """Yield messages created before `older_than` as plain dicts, in id-ordered chunks."""
+        queryset = MessageHistory.objects.filter(created_at__lt=older_than).order_by('id')
+        last_id = 0
+        while True:
+            rows = list(queryset.filter(id__gt=last_id).values()[:chunk_size])
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1]['id']
+
+    def delete_by_ids(self, ids: list[int]) -> int:
+        deleted_count, _ = MessageHistory.objects.filter(id__in=ids).delete()
+        return deleted_count
@@ -1,23 +1,137 @@
 """
 Asyncio-based scheduler for periodic background tasks.
 Replaces Celery Beat for running daily tasks within the bot's event loop.
+
+Runs are aligned to wall-clock buckets (multiples of the interval since the Unix
+epoch, shifted by an optional offset), so start times do not drift by the task's
+runtime and restarts do not reset timers. The last completed bucket of every job
+is persisted in the Setting table; on startup a job either runs the buckets it
+missed (catch_up=True) or a single run for the current bucket. A failed run does
+not count as completed, so catch-up jobs retry it at the next boundary.
+
+With a lease repository, every bot replica schedules every job but a bucket only
+runs on the replica holding that job's lease. The lease is renewed while the job
+runs and released afterwards, and the persisted state is re-read after acquiring
+it, so a bucket finished by another replica is not run twice. Different jobs can
+be led by different replicas; if one replica dies, its leases expire and the
+next boundary is picked up elsewhere.
 """
 
 import asyncio
 import logging
-from typing import Any, Callable, Coroutine
+import os
+import random
+import socket
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, ContextManager, Coroutine, Optional
 
 from aiogram import Bot
+from django.utils import timezone
+
+from core.metrics import (
+    SCHEDULER_JOB_LAG_SECONDS,
+    SCHEDULER_JOB_QUERIES,
+    SCHEDULER_JOB_QUERY_SECONDS,
+    SCHEDULER_JOB_SECONDS,
+)
+from core.query_budget import count_queries
+from core.tracing import start_trace
+
+if TYPE_CHECKING:
+    from core.profiling import SlowWorkDetector
+    from core.repositories import SchedulerLeaseRepository, SettingRepository
 
 logger = logging.getLogger(__name__)
 
+LAST_RUN_SETTING_PREFIX = 'scheduler_last_run:'
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def bucket_start(moment: datetime, interval_seconds: int, offset_seconds: int = 0) -> datetime:
+    """Start of the wall-clock bucket containing `moment`."""
+    elapsed = (moment - EPOCH).total_seconds() - offset_seconds
+    return EPOCH + timedelta(seconds=(elapsed // interval_seconds) * interval_seconds + offset_seconds)
+
+
+def due_buckets(
+    last_bucket: Optional[datetime],
+    now: datetime,
+    interval_seconds: int,
+    offset_seconds: int = 0,
+    catch_up: bool = False,
+    max_catch_up: int = 24,
+) -> list[datetime]:
+    """
+    Buckets that should run now, oldest first.
+
+    Without catch-up, any number of missed buckets collapses into one run for the
+    current bucket. With catch-up, every missed bucket runs, limited to the latest
+    `max_catch_up` of them. Missed buckets follow the current offset, so a job whose
+    offset changed moves to the new boundaries rather than the persisted ones.
+    """
+    current = bucket_start(now, interval_seconds, offset_seconds)
+    if last_bucket is not None and last_bucket >= current:
+        return []
+    if last_bucket is None or not catch_up:
+        return [current]
+
+    missed = []
+    bucket = current
+    while bucket > last_bucket and len(missed) < max_catch_up:
+        missed.append(bucket)
+        bucket -= timedelta(seconds=interval_seconds)
+    return missed[::-1]
+
+
+@dataclass
+class ScheduledJob:
+    name: str
+    func: Callable[..., Coroutine[Any, Any, Any]]
+    interval_seconds: int
+    offset_seconds: int = 0
+    jitter_seconds: float = 0
+    catch_up: bool = False
+    max_catch_up: int = 24
+
+
+@dataclass
+class JobStats:
+    runs: int = 0
+    failures: int = 0
+    last_bucket: Optional[datetime] = None
+    last_lag_seconds: Optional[float] = None
+    last_duration_seconds: Optional[float] = None
+    skipped_not_leader: int = 0
+
 
 class BackgroundScheduler:
-    """Simple asyncio-based scheduler for periodic tasks."""
+    """Wall-clock aligned asyncio scheduler for periodic tasks."""
 
-    def __init__(self, bot: Bot):
+    def __init__(
+        self,
+        bot: Bot,
+        state_repo: Optional["SettingRepository"] = None,
+        lease_repo: Optional["SchedulerLeaseRepository"] = None,
+        lease_ttl_seconds: float = 120,
+        instance_id: Optional[str] = None,
+        slow_detector: Optional["SlowWorkDetector"] = None,
+        now: Callable[[], datetime] = timezone.now,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
         self._bot = bot
+        self._state_repo = state_repo
+        self._lease_repo = lease_repo
+        self._lease_ttl_seconds = lease_ttl_seconds
+        self.instance_id = instance_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._slow_detector = slow_detector
+        self._now = now
+        self._sleep = sleep
         self._tasks: list[asyncio.Task] = []
+        self.stats: dict[str, JobStats] = {}
 
     @property
     def bot(self) -> Bot:
@@ -25,40 +139,223 @@ class BackgroundScheduler:
 
     def schedule(
         self,
-        func: Callable[[Bot], Coroutine[Any, Any, Any]],
+        func: Callable[..., Coroutine[Any, Any, Any]],
         interval_seconds: int,
         name: str,
+        offset_seconds: int = 0,
+        jitter_seconds: float = 0,
+        catch_up: bool = False,
+        max_catch_up: int = 24,
     ) -> None:
-        """Schedule an async function to run periodically."""
-        task = asyncio.create_task(
-            self._run_periodic(
-                func=func,
-                interval_seconds=interval_seconds,
-                name=name,
-            ),
-            name=f"scheduler:{name}",
+        """
+        Schedule an async function to run once per wall-clock bucket.
+
+        Jobs with catch_up=True are called as `func(bot, scheduled_at=bucket)` so
+        they can process a missed bucket rather than the current time.
+        """
+        job = ScheduledJob(
+            name=name,
+            func=func,
+            interval_seconds=interval_seconds,
+            offset_seconds=offset_seconds,
+            jitter_seconds=jitter_seconds,
+            catch_up=catch_up,
+            max_catch_up=max_catch_up,
         )
+        self.stats[name] = JobStats()
+        task = asyncio.create_task(self._run_periodic(job), name=f"scheduler:{name}")
         self._tasks.append(task)
 
-    async def _run_periodic(
+    async def _run_periodic(self, job: ScheduledJob) -> None:
+        """Run a job for every due bucket, then sleep until the next boundary."""
+        try:
+            last_bucket = await self._load_last_bucket(job)
+            while True:
+                now = self._now()
+                buckets = self._due_buckets(job, last_bucket, now)
+                if not buckets:
+                    await self._sleep_until_next_bucket(job, now)
+                    continue
+
+                if self._lease_repo is None:
+                    last_bucket, completed = await self._run_buckets(job, buckets, last_bucket)
+                    if not completed:
+                        await self._sleep_until_next_bucket(job, self._now())
+                    continue
+
+                if not await self._acquire_lease(job):
+                    self.stats[job.name].skipped_not_leader += 1
+                    logger.debug(f"Scheduled task {job.name} is led by another replica")
+                    await self._sleep_until_next_bucket(job, now)
+                    continue
+                renewer = asyncio.create_task(self._renew_lease(job))
+                completed = True
+                try:
+                    # Another replica may have run these buckets before we got the lease
+                    stored_bucket = await self._load_last_bucket(job)
+                    if stored_bucket is not None and (last_bucket is None or stored_bucket > last_bucket):
+                        last_bucket = stored_bucket
+                    buckets = self._due_buckets(job, last_bucket, self._now())
+                    if buckets:
+                        last_bucket, completed = await self._run_buckets(job, buckets, last_bucket)
+                finally:
+                    renewer.cancel()
+                    await self._release_lease(job)
+                if not completed:
+                    await self._sleep_until_next_bucket(job, self._now())
+        except asyncio.CancelledError:
+            logger.info(f"Scheduled task cancelled: {job.name}")
+
+    def _due_buckets(self, job: ScheduledJob, last_bucket: Optional[datetime], now: datetime) -> list[datetime]:
+        return due_buckets(
+            last_bucket=last_bucket,
+            now=now,
+            interval_seconds=job.interval_seconds,
+            offset_seconds=job.offset_seconds,
+            catch_up=job.catch_up,
+            max_catch_up=job.max_catch_up,
+        )
+
+    async def _sleep_until_next_bucket(self, job: ScheduledJob, now: datetime) -> None:
+        next_bucket = bucket_start(now, job.interval_seconds, job.offset_seconds) + timedelta(
+            seconds=job.interval_seconds,
+        )
+        delay = (next_bucket - now).total_seconds()
+        if job.jitter_seconds:
+            delay += random.uniform(0, job.jitter_seconds)
+        await self._sleep(max(delay, 0))
+
+    async def _run_buckets(
         self,
-        func: Callable[[Bot], Coroutine[Any, Any, Any]],
-        interval_seconds: int,
-        name: str,
-    ) -> None:
-        """Run a function periodically with error handling."""
+        job: ScheduledJob,
+        buckets: list[datetime],
+        last_bucket: Optional[datetime],
+    ) -> tuple[Optional[datetime], bool]:
+        """
+        Run due buckets in order. Returns the last completed bucket and whether all of them completed.
+
+        A failed bucket is not saved and stops the run: the job retries it at
+        the next boundary (with catch-up, together with the buckets after it).
+        """
+        if len(buckets) > 1:
+            logger.warning(f"Scheduled task {job.name} catching up {len(buckets)} missed runs")
+        # Buckets run one after another: an overrunning job delays its
+        # next bucket instead of overlapping with it
+        for bucket in buckets:
+            if not await self._execute(job, bucket):
+                return last_bucket, False
+            await self._save_last_bucket(job, bucket)
+            last_bucket = bucket
+        return last_bucket, True
+
+    async def _execute(self, job: ScheduledJob, bucket: datetime) -> bool:
+        stats = self.stats[job.name]
+        lag = (self._now() - bucket).total_seconds()
+        started = time.monotonic()
+        outcome = 'ok'
+        logger.info(f"Running scheduled task: {job.name} (bucket={bucket.isoformat()}, lag={lag:.1f}s)")
+        try:
+            with (
+                start_trace(f"task {job.name}", 'task', bucket=bucket.isoformat(), lag_seconds=round(lag, 3)),
+                self._watch_slow(job, bucket),
+                count_queries() as query_count,
+            ):
+                if job.catch_up:
+                    await job.func(self._bot, scheduled_at=bucket)
+                else:
+                    await job.func(self._bot)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Periodic task failure must not crash the scheduler loop
+            stats.failures += 1
+            outcome = 'error'
+            logger.error(f"Scheduled task failed: {job.name}", exc_info=e)
+        duration = time.monotonic() - started
+        SCHEDULER_JOB_LAG_SECONDS.observe(max(lag, 0), job=job.name)
+        SCHEDULER_JOB_SECONDS.observe(duration, job=job.name, outcome=outcome)
+        SCHEDULER_JOB_QUERIES.observe(query_count.queries, job=job.name)
+        SCHEDULER_JOB_QUERY_SECONDS.observe(query_count.seconds, job=job.name)
+
+        stats.runs += 1
+        stats.last_bucket = bucket
+        stats.last_lag_seconds = lag
+        stats.last_duration_seconds = duration
+        logger.info(f"Scheduled task completed: {job.name} (lag={lag:.1f}s, duration={duration:.1f}s)")
+        if duration > job.interval_seconds:
+            logger.warning(
+                f"Scheduled task {job.name} took {duration:.1f}s, longer than its {job.interval_seconds}s interval"
+            )
+        return outcome == 'ok'
+
+    def _watch_slow(self, job: ScheduledJob, bucket: datetime) -> ContextManager:
+        if self._slow_detector is None:
+            return nullcontext()
+        return self._slow_detector.watch('task', job.name, bucket=bucket.isoformat())
+
+    async def _load_last_bucket(self, job: ScheduledJob) -> Optional[datetime]:
+        if self._state_repo is None:
+            return None
+        try:
+            state = await self._state_repo.aget_value(LAST_RUN_SETTING_PREFIX + job.name)
+        except Exception as e:
+            # Missing state only costs an extra run, it must not keep the job from starting
+            logger.error(f"Failed to load scheduler state for {job.name}", exc_info=e)
+            return None
+        if not state or not state.get('bucket'):
+            return None
+        return datetime.fromisoformat(state['bucket'])
+
+    async def _save_last_bucket(self, job: ScheduledJob, bucket: datetime) -> None:
+        if self._state_repo is None:
+            return
+        stats = self.stats[job.name]
+        try:
+            await self._state_repo.aset_value(
+                name=LAST_RUN_SETTING_PREFIX + job.name,
+                value={
+                    'bucket': bucket.isoformat(),
+                    'lag_seconds': stats.last_lag_seconds,
+                    'duration_seconds': stats.last_duration_seconds,
+                },
+            )
+        except Exception as e:
+            logger.error(f"Failed to save scheduler state for {job.name}", exc_info=e)
+
+    async def _acquire_lease(self, job: ScheduledJob) -> bool:
+        try:
+            return await self._lease_repo.atry_acquire(
+                name=job.name,
+                holder=self.instance_id,
+                ttl_seconds=self._lease_ttl_seconds,
+            )
+        except Exception as e:
+            # Without a lease we cannot tell whether another replica is running the job
+            logger.error(f"Failed to acquire scheduler lease for {job.name}", exc_info=e)
+            return False
+
+    async def _renew_lease(self, job: ScheduledJob) -> None:
+        """Keep the lease alive while a long job runs; cancelled when the job finishes."""
         while True:
+            await asyncio.sleep(self._lease_ttl_seconds / 3)
             try:
-                logger.info(f"Running scheduled task: {name}")
-                await func(self._bot)
-                logger.info(f"Scheduled task completed: {name}")
-            except asyncio.CancelledError:
-                logger.info(f"Scheduled task cancelled: {name}")
-                break
+                renewed = await self._lease_repo.atry_acquire(
+                    name=job.name,
+                    holder=self.instance_id,
+                    ttl_seconds=self._lease_ttl_seconds,
+                )
             except Exception as e:
-                # Periodic task failure must not crash the scheduler loop
-                logger.error(f"Scheduled task failed: {name}", exc_info=e)
-            await asyncio.sleep(interval_seconds)
+                logger.error(f"Failed to renew scheduler lease for {job.name}", exc_info=e)
+                continue
+            if not renewed:
+                logger.warning(f"Scheduler lease for {job.name} was taken over while the job was running")
+
+    async def _release_lease(self, job: ScheduledJob) -> None:
+        try:
+            await self._lease_repo.arelease(name=job.name, holder=self.instance_id)
+        except Exception as e:
+            # The lease expires on its own after the TTL
+            logger.error(f"Failed to release scheduler lease for {job.name}", exc_info=e)
 
     async def shutdown(self) -> None:
         """Cancel all scheduled tasks and wait for them to finish."""
@@ -0,0 +1,5 @@
+from telegram_bot.tasks.message_history_retention import purge_old_message_history
+
+__all__ = [
+    'purge_old_message_history',
+]
@@ -0,0 +1,50 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+from aiogram import Bot
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_old_message_history(bot: Bot) -> int:
+    """
+    Delete message history older than MESSAGE_HISTORY_RETENTION_DAYS.
+
+    Rows are deleted in keyset-ordered chunks of MESSAGE_HISTORY_RETENTION_CHUNK_SIZE
+    with a pause between chunks, so the purge never holds long locks or floods WAL
+    while the bot keeps inserting new history rows.
+    """
+    from django.conf import settings
+    from django.utils import timezone
+
+    from core.containers import container
+
+    message_history_repo = container.core.message_history_repository()
+    older_than = timezone.now() - timedelta(days=settings.MESSAGE_HISTORY_RETENTION_DAYS)
+
+    started = time.monotonic()
+    deleted_count = 0
+    deleted_bytes = 0
+    chunks = 0
+    last_id = None
+    while True:
+        chunk = await message_history_repo.adelete_old_messages_chunk(
+            older_than=older_than,
+            chunk_size=settings.MESSAGE_HISTORY_RETENTION_CHUNK_SIZE,
+            after_id=last_id,
+        )
+        if not chunk.deleted_count:
+            break
+        chunks += 1
+        deleted_count += chunk.deleted_count
+        deleted_bytes += chunk.deleted_bytes or 0
+        last_id = chunk.last_id
+        await asyncio.sleep(settings.MESSAGE_HISTORY_RETENTION_CHUNK_PAUSE_SECONDS)
+
+    logger.info(
+        f"Purged {deleted_count} message history rows ({deleted_bytes} bytes) older than {older_than:%Y-%m-%d} "
+        f"in {chunks} chunks, {time.monotonic() - started:.1f}s"
+    )
+    return deleted_count
@@ -0,0 +1,124 @@
+"""Tests for the synthetic load harness: fake Bot API, fake LLM and the traffic driver."""
+
+import asyncio
+import random
+from unittest.mock import patch
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from django.test.utils import override_settings
+
+from core.models import User
+from horoscope.benchmarks.fake_llm import FAKE_LLM_API_KEY, FAKE_LLM_MODEL, FakeLLMServer
+from telegram_bot.benchmarks.bot_load import (
+    ServerThread,
+    build_traffic,
+    message_update,
+    percentile,
+    run_bot_load,
+)
+from telegram_bot.benchmarks.fake_telegram import FakeTelegramServer, create_fake_bot
+from telegram_bot.middlewares.throttling import MemoryTokenBucketStore
+
+
+class TestFakeTelegram:
+    async def test_get_updates_serves_pushed_updates_until_confirmed(self):
+        server = FakeTelegramServer()
+        bot = create_fake_bot(await server.start())
+        try:
+            first = server.push_update(message_update(1, 'hello'))
+            server.push_update(message_update(1, 'again'))
+
+            updates = await bot.get_updates(timeout=0)
+            assert [update.message.text for update in updates] == ['hello', 'again']
+
+            confirmed = await bot.get_updates(offset=first + 1, timeout=0)
+            assert [update.message.text for update in confirmed] == ['again']
+        finally:
+            await bot.session.close()
+            await server.stop()
+
+    async def test_every_nth_call_rate_limited(self):
+        server = FakeTelegramServer(rate_limit_every=2, retry_after_seconds=3)
+        bot = create_fake_bot(await server.start())
+        try:
+            await bot.send_message(chat_id=1, text='first')
+            with pytest.raises(TelegramRetryAfter) as error:
+                await bot.send_message(chat_id=1, text='second')
+            await bot.send_message(chat_id=1, text='third')
+        finally:
+            await bot.session.close()
+            await server.stop()
+
+        assert error.value.retry_after == 3
+        assert server.rate_limited['sendMessage'] == 1
+        assert server.sent[1] == ['first', 'third']
+
+
+class TestFakeLLM:
+    def test_llm_service_talks_to_fake_endpoint(self):
+        from horoscope.services.llm import LLMService
+
+        servers = ServerThread()
+        servers.start()
+        server = FakeLLMServer(output_tokens=7)
+        url = asyncio.run_coroutine_threadsafe(server.start(), servers.loop).result()
+        try:
+            with override_settings(LLM_BASE_URL=url, LLM_API_KEY=FAKE_LLM_API_KEY, LLM_MODEL=FAKE_LLM_MODEL):
+                result = LLMService().generate_followup_answer(horoscope_text='text', question='Love?')
+        finally:
+            asyncio.run_coroutine_threadsafe(server.stop(), servers.loop).result()
+            servers.stop()
+
+        assert server.requests == 1
+        assert result.output_tokens == 7
+        assert result.input_tokens > 0
+
+
+class TestTraffic:
+    def test_percentile_nearest_rank(self):
+        values = [float(value) for value in range(1, 101)]
+        assert percentile(values, 0.5) == 50
+        assert percentile(values, 0.99) == 99
+        assert percentile([], 0.5) == 0
+
+    def test_conversations_use_matching_users(self):
+        traffic = build_traffic(
+            conversations=200,
+            mix={'wizard': 1, 'followup': 1, 'payment': 1},
+            first_uid=1000,
+            users=100,
+            wizard_first_uid=1100,
+            rng=random.Random(1),
+        )
+
+        for route, updates in traffic:
+            uid = updates[0]['message']['from']['id']
+            if route == 'wizard':
+                assert uid >= 1100
+                assert len(updates) == 7
+            elif route == 'followup':
+                assert (uid - 1000) % 20 in (0, 1)
+            else:
+                assert (uid - 1000) % 20 not in (0, 1)
+                assert 'successful_payment' in updates[-1]['message']
+
+
+@pytest.mark.django_db(transaction=True)
+class TestRunBotLoad:
+    async def test_replays_every_route_through_dispatcher(self):
+        with patch('telegram_bot.bot.create_throttle_store', return_value=MemoryTokenBucketStore()):
+            result = await run_bot_load(
+                users=40,
+                conversations=8,
+                concurrency=4,
+                mix={'wizard': 1, 'horoscope': 1, 'followup': 1, 'payment': 1},
+                update_timeout=20,
+                seed=3,
+            )
+
+        assert result.completed
+        assert result.updates == sum(len(stats.latencies) for stats in result.routes.values())
+        assert all(stats.errors == 0 for stats in result.routes.values())
+        assert result.llm_requests > 0
+        assert await User.objects.acount() == 0
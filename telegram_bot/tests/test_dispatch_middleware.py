@@ -0,0 +1,145 @@
+"""Tests for per-chat ordered, bounded update dispatch with load shedding."""
+
+import asyncio
+from datetime import datetime
+
+from aiogram.types import Update
+
+from telegram_bot.middlewares.dispatch import ChatDispatchMiddleware, is_critical_update, update_chat_id
+
+
+def _message_update(update_id: int, chat_id: int, text: str = "hello") -> Update:
+    return Update.model_validate({
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': datetime(2024, 1, 1),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Test'},
+            'text': text,
+        },
+    })
+
+
+def _callback_update(update_id: int, chat_id: int) -> Update:
+    return Update.model_validate({
+        'update_id': update_id,
+        'callback_query': {
+            'id': str(update_id),
+            'chat_instance': 'x',
+            'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Test'},
+            'data': 'lang:en',
+        },
+    })
+
+
+class Gate:
+    """Handler that blocks until released and records the order updates ran in."""
+
+    def __init__(self):
+        self.started: list[int] = []
+        self.running = 0
+        self.max_running = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self, event, data):
+        self.started.append(event.update_id)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await self.release.wait()
+        self.running -= 1
+        return event.update_id
+
+
+def _middleware(max_concurrent: int = 10, max_chat_queue: int = 10, shed_pending_threshold: int = 100):
+    return ChatDispatchMiddleware(
+        max_concurrent=max_concurrent,
+        max_chat_queue=max_chat_queue,
+        shed_pending_threshold=shed_pending_threshold,
+    )
+
+
+class TestUpdateClassification:
+    def test_chat_id_from_message_and_callback(self):
+        assert update_chat_id(_message_update(1, chat_id=42)) == 42
+        assert update_chat_id(_callback_update(2, chat_id=7)) == 7
+
+    def test_commands_are_critical_text_is_not(self):
+        assert is_critical_update(_message_update(1, 42, text="/start"))
+        assert not is_critical_update(_message_update(2, 42, text="what about love?"))
+        assert not is_critical_update(_callback_update(3, 42))
+
+
+class TestChatDispatchMiddleware:
+    async def test_same_chat_runs_serially_in_order(self):
+        middleware = _middleware()
+        gate = Gate()
+        tasks = [
+            asyncio.create_task(middleware(gate, _message_update(update_id, chat_id=1), {}))
+            for update_id in (1, 2, 3)
+        ]
+        await asyncio.sleep(0)
+
+        assert gate.started == [1]
+        assert middleware.chat_depth(1) == 3
+
+        gate.release.set()
+        assert await asyncio.gather(*tasks) == [1, 2, 3]
+        assert gate.started == [1, 2, 3]
+        assert gate.max_running == 1
+        assert middleware.chat_depth(1) == 0
+
+    async def test_different_chats_run_concurrently_up_to_limit(self):
+        middleware = _middleware(max_concurrent=2)
+        gate = Gate()
+        tasks = [
+            asyncio.create_task(middleware(gate, _message_update(update_id, chat_id=update_id), {}))
+            for update_id in (1, 2, 3)
+        ]
+        await asyncio.sleep(0)
+
+        assert gate.running == 2
+        assert middleware.stats.pending == 3
+        assert middleware.stats.in_flight == 2
+
+        gate.release.set()
+        await asyncio.gather(*tasks)
+        assert gate.max_running == 2
+        assert middleware.stats.processed == 3
+        assert middleware.stats.pending == 0
+
+    async def test_sheds_non_critical_updates_over_chat_queue(self):
+        middleware = _middleware(max_chat_queue=2)
+        gate = Gate()
+        tasks = [
+            asyncio.create_task(middleware(gate, _message_update(update_id, chat_id=1), {}))
+            for update_id in (1, 2)
+        ]
+        await asyncio.sleep(0)
+
+        shed = await middleware(gate, _message_update(3, chat_id=1), {})
+        command = asyncio.create_task(middleware(gate, _message_update(4, chat_id=1, text="/start"), {}))
+        other_chat = asyncio.create_task(middleware(gate, _message_update(5, chat_id=2), {}))
+        await asyncio.sleep(0)
+
+        assert shed is None
+        assert middleware.stats.shed == 1
+        gate.release.set()
+        await asyncio.gather(*tasks, command, other_chat)
+        assert sorted(gate.started) == [1, 2, 4, 5]
+
+    async def test_sheds_when_total_pending_over_threshold(self):
+        middleware = _middleware(shed_pending_threshold=2)
+        gate = Gate()
+        tasks = [
+            asyncio.create_task(middleware(gate, _message_update(update_id, chat_id=update_id), {}))
+            for update_id in (1, 2)
+        ]
+        await asyncio.sleep(0)
+
+        assert await middleware(gate, _callback_update(3, chat_id=3), {}) is None
+
+        gate.release.set()
+        await asyncio.gather(*tasks)
+        assert middleware.stats.shed == 1
+        assert middleware.stats.max_pending == 2
@@ -187,3 +187,86 @@ class TestMessageHistoryEntity:
         entities = MessageHistoryEntity.from_models(list(models))
         assert len(entities) == 3
         assert all(isinstance(e, MessageHistoryEntity) for e in entities)
+
+
+def _create_old_messages(count: int, days_old: int = 60) -> list[int]:
+    ids = []
+    for i in range(count):
+        msg = MessageHistory.objects.create(
+            from_user_telegram_uid=111,
+            chat_telegram_uid=111,
+            text=f"old {i}",
+        )
+        ids.append(msg.pk)
+    MessageHistory.objects.filter(pk__in=ids).update(
+        created_at=timezone.now() - timedelta(days=days_old),
+    )
+    return ids
+
+
+@pytest.mark.django_db
+class TestMessageHistoryRetention:
+
+    def setup_method(self):
+        self.repo = MessageHistoryRepository()
+
+    def test_delete_old_messages_chunk_is_bounded(self):
+        ids = _create_old_messages(5)
+        self.repo.log_message(from_user_telegram_uid=111, chat_telegram_uid=111, text="recent")
+
+        threshold = timezone.now() - timedelta(days=30)
+        chunk = self.repo.delete_old_messages_chunk(older_than=threshold, chunk_size=2)
+
+        assert chunk.deleted_count == 2
+        assert chunk.last_id == ids[1]
+        assert MessageHistory.objects.count() == 4
+
+        chunk = self.repo.delete_old_messages_chunk(older_than=threshold, chunk_size=2, after_id=chunk.last_id)
+        assert chunk.deleted_count == 2
+        assert chunk.last_id == ids[3]
+
+    def test_delete_old_messages_chunk_empty(self):
+        self.repo.log_message(from_user_telegram_uid=111, chat_telegram_uid=111, text="recent")
+
+        chunk = self.repo.delete_old_messages_chunk(
+            older_than=timezone.now() - timedelta(days=30),
+            chunk_size=10,
+            after_id=7,
+        )
+
+        assert chunk.deleted_count == 0
+        assert chunk.last_id == 7
+        assert MessageHistory.objects.count() == 1
+
+    def test_delete_old_messages_in_chunks(self):
+        _create_old_messages(7)
+        self.repo.log_message(from_user_telegram_uid=111, chat_telegram_uid=111, text="recent")
+
+        assert self.repo.delete_old_messages(days=30, chunk_size=3) == 7
+        assert MessageHistory.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPurgeOldMessageHistoryTask:
+
+    @pytest.mark.asyncio
+    async def test_purges_all_chunks_and_keeps_recent(self, settings):
+        from asgiref.sync import sync_to_async
+
+        from telegram_bot.tasks import purge_old_message_history
+
+        settings.MESSAGE_HISTORY_RETENTION_DAYS = 30
+        settings.MESSAGE_HISTORY_RETENTION_CHUNK_SIZE = 2
+        settings.MESSAGE_HISTORY_RETENTION_CHUNK_PAUSE_SECONDS = 0
+
+        await sync_to_async(_create_old_messages)(5)
+        await MessageHistoryRepository().alog_message(
+            from_user_telegram_uid=111,
+            chat_telegram_uid=111,
+            text="recent",
+        )
+
+        deleted = await purge_old_message_history(bot=None)
+
+        assert deleted == 5
+        assert await MessageHistory.objects.acount() == 1
@@ -0,0 +1,167 @@
+"""Tests for the metrics registry, instrumentation middlewares and the /metrics endpoint."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiogram import Dispatcher
+from aiogram.exceptions import TelegramForbiddenError
+from aiogram.methods import SendMessage
+from aiohttp.test_utils import TestClient, TestServer
+from django.db import connection
+
+from core.metrics import (
+    DB_QUERIES_TOTAL,
+    HANDLER_SECONDS,
+    TELEGRAM_ERRORS_TOTAL,
+    TELEGRAM_REQUEST_SECONDS,
+    MetricsRegistry,
+    install_db_query_metrics,
+    sql_operation,
+)
+from telegram_bot.metrics import CONTENT_TYPE, MetricsServer, dispatch_metrics
+from telegram_bot.middlewares.dispatch import ChatDispatchMiddleware
+from telegram_bot.middlewares.metrics import (
+    HandlerMetricsMiddleware,
+    TelegramRequestMetricsMiddleware,
+    handler_labels,
+)
+
+
+class TestMetricsRegistry:
+    def test_renders_counter_and_gauge(self):
+        registry = MetricsRegistry()
+        counter = registry.counter('jobs_total', 'Jobs.', ['kind'])
+        gauge = registry.gauge('queue_size', 'Queue size.')
+        counter.inc(kind='a')
+        counter.inc(2, kind='a')
+        gauge.set(1.5)
+
+        text = registry.render()
+
+        assert '# TYPE jobs_total counter' in text
+        assert 'jobs_total{kind="a"} 3' in text
+        assert 'queue_size 1.5' in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram('latency_seconds', 'Latency.', buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value)
+
+        lines = registry.render().splitlines()
+
+        assert 'latency_seconds_bucket{le="0.1"} 2' in lines
+        assert 'latency_seconds_bucket{le="1"} 3' in lines
+        assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+        assert 'latency_seconds_count 4' in lines
+        assert 'latency_seconds_sum 3.65' in lines
+
+    def test_label_values_are_escaped(self):
+        registry = MetricsRegistry()
+        registry.counter('errors_total', 'Errors.', ['error']).inc(error='say "hi"\n')
+
+        assert 'errors_total{error="say \\"hi\\"\\n"} 1' in registry.render()
+
+    def test_wrong_labels_rejected(self):
+        counter = MetricsRegistry().counter('c_total', 'C.', ['kind'])
+        with pytest.raises(ValueError):
+            counter.inc(other='x')
+
+    def test_collectors_rendered_on_scrape(self):
+        registry = MetricsRegistry()
+        registry.register_collector('x', lambda: [('things', 'gauge', 'Things.', [({'a': 'b'}, 7)])])
+
+        assert 'things{a="b"} 7' in registry.render()
+
+
+class TestSqlOperation:
+    def test_first_keyword(self):
+        assert sql_operation('  select 1') == 'SELECT'
+        assert sql_operation('') == 'OTHER'
+
+
+@pytest.mark.django_db
+class TestDbQueryMetrics:
+    def test_counts_queries(self):
+        install_db_query_metrics()
+        before = DB_QUERIES_TOTAL.value(operation='SELECT')
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+        assert DB_QUERIES_TOTAL.value(operation='SELECT') == before + 1
+
+
+def _handler_data(callback) -> dict:
+    return {'handler': SimpleNamespace(callback=callback)}
+
+
+async def wizard_step(event, data):
+    return None
+
+
+class TestHandlerMetricsMiddleware:
+    def test_labels_from_handler_module_and_name(self):
+        assert handler_labels(_handler_data(wizard_step)) == ('test_metrics', 'wizard_step')
+        assert handler_labels({}) == ('unknown', 'unknown')
+
+    async def test_times_handler_with_outcome(self):
+        middleware = HandlerMetricsMiddleware()
+        ok_before = HANDLER_SECONDS.count(router='test_metrics', handler='wizard_step', outcome='ok')
+        error_before = HANDLER_SECONDS.count(router='test_metrics', handler='wizard_step', outcome='error')
+
+        await middleware(AsyncMock(return_value='done'), MagicMock(), _handler_data(wizard_step))
+        with pytest.raises(RuntimeError):
+            await middleware(AsyncMock(side_effect=RuntimeError), MagicMock(), _handler_data(wizard_step))
+
+        assert HANDLER_SECONDS.count(router='test_metrics', handler='wizard_step', outcome='ok') == ok_before + 1
+        assert HANDLER_SECONDS.count(router='test_metrics', handler='wizard_step', outcome='error') == error_before + 1
+
+
+class TestTelegramRequestMetricsMiddleware:
+    async def test_records_latency_and_error_class(self):
+        middleware = TelegramRequestMetricsMiddleware()
+        method = SendMessage(chat_id=1, text='hi')
+        errors_before = TELEGRAM_ERRORS_TOTAL.value(method='sendMessage', error='TelegramForbiddenError')
+        ok_before = TELEGRAM_REQUEST_SECONDS.count(method='sendMessage', outcome='ok')
+
+        await middleware(AsyncMock(return_value='sent'), MagicMock(), method)
+        with pytest.raises(TelegramForbiddenError):
+            await middleware(
+                AsyncMock(side_effect=TelegramForbiddenError(method=method, message='blocked')),
+                MagicMock(),
+                method,
+            )
+
+        assert TELEGRAM_REQUEST_SECONDS.count(method='sendMessage', outcome='ok') == ok_before + 1
+        assert TELEGRAM_ERRORS_TOTAL.value(method='sendMessage', error='TelegramForbiddenError') == errors_before + 1
+
+
+class TestMetricsEndpoint:
+    def test_dispatch_collector_reads_middleware_stats(self):
+        dispatcher = Dispatcher()
+        chat_dispatch = ChatDispatchMiddleware(max_concurrent=1, max_chat_queue=1, shed_pending_threshold=1)
+        chat_dispatch.stats.processed = 5
+        dispatcher['chat_dispatch'] = chat_dispatch
+
+        metrics = {name: samples for name, _, _, samples in dispatch_metrics(dispatcher)}
+
+        assert metrics['bot_updates_processed_total'] == [({}, 5)]
+        assert 'bot_updates_throttled_total' not in metrics
+
+    async def test_serves_registry(self):
+        registry = MetricsRegistry()
+        registry.counter('served_total', 'Served.').inc()
+        server = MetricsServer(host='127.0.0.1', port=0, registry=registry)
+        client = TestClient(TestServer(server.build_app()))
+        await client.start_server()
+        try:
+            response = await client.get('/metrics')
+            body = await response.text()
+        finally:
+            await client.close()
+
+        assert response.headers['Content-Type'] == CONTENT_TYPE
+        assert 'served_total 1' in body
+
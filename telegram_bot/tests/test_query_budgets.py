@@ -0,0 +1,174 @@
+"""
+Query counting and per-route query budgets.
+
+The budgets below are the SQL statements one update of each route may run,
+middlewares included. A change making a route run more statements fails
+here with the statements listed; if the extra queries are intended, raise
+the budget in the same change.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import Update
+from asgiref.sync import sync_to_async
+from django.test.utils import override_settings
+
+from core.metrics import UPDATE_QUERIES, install_db_query_metrics
+from core.models import User
+from core.query_budget import QueryBudgetExceeded, count_queries, current_query_count, query_budget
+from horoscope.benchmarks.fake_llm import FAKE_LLM_API_KEY, FAKE_LLM_MODEL, FakeLLMServer
+from horoscope.benchmarks.seed import SEED_UID_OFFSET, delete_population, seed_population
+from telegram_bot.benchmarks.bot_load import (
+    ServerThread,
+    _detach_routers,
+    followup_conversation,
+    horoscope_conversation,
+    payment_conversation,
+    wizard_conversation,
+)
+from telegram_bot.benchmarks.fake_telegram import FakeTelegramServer, create_fake_bot
+from telegram_bot.bot import create_dispatcher, setup_dispatcher
+from telegram_bot.middlewares.metrics import HandlerMetricsMiddleware, QueryCountMiddleware
+from telegram_bot.middlewares.throttling import MemoryTokenBucketStore
+
+SEEDED_USERS = 20
+# Seeded users 0 and 1 of every 20 are subscribers, 3 has never subscribed (see seed._subscription_for)
+SUBSCRIBER_UID = SEED_UID_OFFSET
+NON_SUBSCRIBER_UID = SEED_UID_OFFSET + 3
+NEW_UID = SEED_UID_OFFSET + SEEDED_USERS
+
+# Route -> (conversation, budget for each of its updates)
+QUERY_BUDGETS = {
+    'horoscope': (horoscope_conversation(NON_SUBSCRIBER_UID), [8]),
+    'followup': (followup_conversation(SUBSCRIBER_UID), [10]),
+    # /subscribe, pre-checkout (answered without the database), successful payment
+    'payment': (payment_conversation(NON_SUBSCRIBER_UID), [8, 0, 8]),
+    # /start, language, name, birth date, skipped birth time, birth place, home place;
+    # the first horoscope is generated in a background task, outside the update
+    'wizard': (wizard_conversation(NEW_UID), [8, 5, 5, 5, 5, 5, 6]),
+}
+
+
+class TestCountQueries:
+    @pytest.mark.django_db
+    def test_counts_statements_and_time(self):
+        install_db_query_metrics()
+
+        with count_queries() as count:
+            list(User.objects.all())
+            User.objects.filter(telegram_uid=1).exists()
+
+        assert count.queries == 2
+        assert count.seconds > 0
+        assert count.statements[0].startswith('SELECT')
+
+    @pytest.mark.django_db
+    def test_nested_counters_all_see_statement(self):
+        install_db_query_metrics()
+
+        with count_queries() as outer:
+            list(User.objects.all())
+            with count_queries() as inner:
+                assert current_query_count() is inner
+                list(User.objects.all())
+            assert current_query_count() is outer
+
+        assert outer.queries == 2
+        assert inner.queries == 1
+        assert current_query_count() is None
+
+    @pytest.mark.django_db(transaction=True)
+    async def test_counts_statements_in_sync_to_async_threads(self):
+        install_db_query_metrics()
+
+        with count_queries() as count:
+            await sync_to_async(lambda: list(User.objects.all()))()
+
+        assert count.queries == 1
+
+    @pytest.mark.django_db
+    def test_budget_exceeded_lists_statements(self):
+        install_db_query_metrics()
+
+        with pytest.raises(QueryBudgetExceeded) as error:
+            with query_budget(1, name='listing'):
+                list(User.objects.all())
+                User.objects.filter(telegram_uid=1).exists()
+
+        assert error.value.count.queries == 2
+        message = str(error.value)
+        assert message.startswith('listing ran 2 queries, budget is 1')
+        assert '  2. SELECT' in message
+
+
+class TestQueryCountMiddleware:
+    async def test_update_observed_under_matched_handler(self):
+        async def horoscope_command(event, data):
+            return 'handled'
+
+        async def through_handler_middleware(event, data):
+            data['handler'] = SimpleNamespace(callback=horoscope_command)
+            return await HandlerMetricsMiddleware()(horoscope_command, event, data)
+
+        before = UPDATE_QUERIES.count(route='test_query_budgets.horoscope_command')
+        result = await QueryCountMiddleware()(through_handler_middleware, Update(update_id=1), {})
+
+        assert result == 'handled'
+        assert UPDATE_QUERIES.count(route='test_query_budgets.horoscope_command') == before + 1
+
+    async def test_unhandled_update_observed_as_unhandled(self):
+        async def handler(event, data):
+            return None
+
+        before = UPDATE_QUERIES.count(route='unhandled')
+        await QueryCountMiddleware()(handler, Update(update_id=1), {})
+
+        assert UPDATE_QUERIES.count(route='unhandled') == before + 1
+
+
+@pytest.fixture
+async def dispatched_bot():
+    install_db_query_metrics()
+    await sync_to_async(seed_population)(user_count=SEEDED_USERS, history_days=2, messages_per_user=0)
+
+    fake_telegram = FakeTelegramServer()
+    fake_llm = FakeLLMServer()
+    servers = ServerThread()
+    servers.start()
+    bot = create_fake_bot(await servers.run(fake_telegram.start()))
+    llm_url = await servers.run(fake_llm.start())
+    dispatcher = create_dispatcher(storage=MemoryStorage())
+    try:
+        with (
+            override_settings(LLM_BASE_URL=llm_url, LLM_API_KEY=FAKE_LLM_API_KEY, LLM_MODEL=FAKE_LLM_MODEL),
+            patch('telegram_bot.bot.create_throttle_store', return_value=MemoryTokenBucketStore()),
+        ):
+            setup_dispatcher(dispatcher=dispatcher, bot_instance=bot)
+            yield dispatcher, bot
+    finally:
+        # Let generations the handlers started in the background finish before the fake LLM goes away
+        background = asyncio.all_tasks() - {asyncio.current_task()}
+        if background:
+            await asyncio.wait(background, timeout=10)
+        _detach_routers(dispatcher)
+        await bot.session.close()
+        await servers.run(fake_llm.stop())
+        await servers.run(fake_telegram.stop())
+        servers.stop()
+        await sync_to_async(delete_population)(SEED_UID_OFFSET, NEW_UID)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestRouteQueryBudgets:
+    @pytest.mark.parametrize('route', sorted(QUERY_BUDGETS))
+    async def test_route_within_budget(self, dispatched_bot, route):
+        dispatcher, bot = dispatched_bot
+        conversation, budgets = QUERY_BUDGETS[route]
+
+        for index, (update, budget) in enumerate(zip(conversation, budgets)):
+            with query_budget(budget, name=f'{route} update {index + 1}'):
+                await dispatcher.feed_raw_update(bot, {'update_id': index + 1, **update})
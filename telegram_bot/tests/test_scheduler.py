@@ -0,0 +1,263 @@
+"""Tests for the wall-clock aligned background scheduler."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from django.utils import timezone as django_timezone
+
+from telegram_bot.scheduler import LAST_RUN_SETTING_PREFIX, BackgroundScheduler, bucket_start, due_buckets
+
+HOUR = 60 * 60
+
+
+def _utc(hour: int, minute: int = 0, day: int = 15) -> datetime:
+    return datetime(2024, 6, day, hour, minute, tzinfo=timezone.utc)
+
+
+class FakeClock:
+    """Clock whose sleep advances time; the sleep after `max_sleeps` stops the loop."""
+
+    def __init__(self, start: datetime, max_sleeps: int = 0):
+        self.current = start
+        self.max_sleeps = max_sleeps
+        self.sleeps: list[float] = []
+
+    def now(self) -> datetime:
+        return self.current
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        if len(self.sleeps) > self.max_sleeps:
+            raise asyncio.CancelledError
+        self.current += timedelta(seconds=seconds)
+
+
+def _state_repo(state: dict | None = None) -> MagicMock:
+    repo = MagicMock()
+    repo.aget_value = AsyncMock(return_value=state)
+    repo.aset_value = AsyncMock()
+    return repo
+
+
+async def _run(scheduler: BackgroundScheduler, **schedule_kwargs) -> None:
+    scheduler.schedule(**schedule_kwargs)
+    await asyncio.gather(*scheduler._tasks)
+
+
+class TestBucketStart:
+    def test_aligns_to_interval(self):
+        assert bucket_start(_utc(10, 37), HOUR) == _utc(10)
+        assert bucket_start(_utc(10, 37), 15 * 60) == _utc(10, 30)
+
+    def test_offset_shifts_boundary(self):
+        assert bucket_start(_utc(2, 30), 24 * HOUR, offset_seconds=3 * HOUR) == _utc(3, day=14)
+        assert bucket_start(_utc(3, 30), 24 * HOUR, offset_seconds=3 * HOUR) == _utc(3)
+
+
+class TestDueBuckets:
+    def test_first_run_is_current_bucket(self):
+        assert due_buckets(None, _utc(10, 5), HOUR) == [_utc(10)]
+
+    def test_nothing_due_within_completed_bucket(self):
+        assert due_buckets(_utc(10), _utc(10, 59), HOUR) == []
+
+    def test_missed_buckets_coalesce_without_catch_up(self):
+        assert due_buckets(_utc(6), _utc(10, 5), HOUR) == [_utc(10)]
+
+    def test_missed_buckets_replayed_with_catch_up(self):
+        assert due_buckets(_utc(6), _utc(10, 5), HOUR, catch_up=True) == [
+            _utc(7), _utc(8), _utc(9), _utc(10),
+        ]
+
+    def test_catch_up_keeps_latest_buckets(self):
+        assert due_buckets(_utc(0), _utc(10, 5), HOUR, catch_up=True, max_catch_up=2) == [_utc(9), _utc(10)]
+
+    def test_catch_up_follows_changed_offset(self):
+        assert due_buckets(_utc(9), _utc(10, 40), HOUR, offset_seconds=30 * 60, catch_up=True) == [
+            _utc(9, 30), _utc(10, 30),
+        ]
+
+
+class TestBackgroundScheduler:
+    async def test_sleeps_until_next_boundary(self):
+        clock = FakeClock(_utc(10, 20))
+        func = AsyncMock()
+        scheduler = BackgroundScheduler(bot=MagicMock(), now=clock.now, sleep=clock.sleep)
+
+        await _run(scheduler, func=func, interval_seconds=HOUR, name="job")
+
+        func.assert_awaited_once_with(scheduler.bot)
+        assert clock.sleeps == [40 * 60]
+
+    async def test_runs_again_at_boundary(self):
+        clock = FakeClock(_utc(10, 20), max_sleeps=1)
+        func = AsyncMock()
+        scheduler = BackgroundScheduler(bot=MagicMock(), now=clock.now, sleep=clock.sleep)
+
+        await _run(scheduler, func=func, interval_seconds=HOUR, name="job")
+
+        assert func.await_count == 2
+        assert scheduler.stats["job"].last_bucket == _utc(11)
+        assert scheduler.stats["job"].last_lag_seconds == 0
+
+    async def test_jitter_added_to_sleep(self, monkeypatch):
+        monkeypatch.setattr('telegram_bot.scheduler.random.uniform', lambda low, high: high)
+        clock = FakeClock(_utc(10, 20))
+        scheduler = BackgroundScheduler(bot=MagicMock(), now=clock.now, sleep=clock.sleep)
+
+        await _run(scheduler, func=AsyncMock(), interval_seconds=HOUR, name="job", jitter_seconds=7)
+
+        assert clock.sleeps == [40 * 60 + 7]
+
+    async def test_persisted_state_prevents_rerun_after_restart(self):
+        clock = FakeClock(_utc(10, 20))
+        func = AsyncMock()
+        repo = _state_repo({'bucket': _utc(10).isoformat()})
+        scheduler = BackgroundScheduler(bot=MagicMock(), state_repo=repo, now=clock.now, sleep=clock.sleep)
+
+        await _run(scheduler, func=func, interval_seconds=HOUR, name="job")
+
+        func.assert_not_called()
+        repo.aget_value.assert_awaited_once_with(LAST_RUN_SETTING_PREFIX + "job")
+
+    async def test_catch_up_replays_missed_buckets_in_order(self):
+        clock = FakeClock(_utc(10, 20))
+        func = AsyncMock()
+        repo = _state_repo({'bucket': _utc(7).isoformat()})
+        scheduler = BackgroundScheduler(bot=MagicMock(), state_repo=repo, now=clock.now, sleep=clock.sleep)
+
+        await _run(scheduler, func=func, interval_seconds=HOUR, name="job", catch_up=True)
+
+        assert [call.kwargs['scheduled_at'] for call in func.await_args_list] == [_utc(8), _utc(9), _utc(10)]
+        saved = [call.kwargs['value']['bucket'] for call in repo.aset_value.await_args_list]
+        assert saved == [_utc(8).isoformat(), _utc(9).isoformat(), _utc(10).isoformat()]
+
+    async def test_overrun_coalesces_instead_of_overlapping(self):
+        clock = FakeClock(_utc(10, 50))
+
+        async def slow_job(bot):
+            # First run holds the job past two boundaries
+            if func.await_count == 1:
+                clock.current += timedelta(hours=2)
+
+        func = AsyncMock(side_effect=slow_job)
+        scheduler = BackgroundScheduler(bot=MagicMock(), now=clock.now, sleep=clock.sleep)
+
+        await _run(scheduler, func=func, interval_seconds=HOUR, name="job")
+
+        assert func.await_count == 2
+        assert scheduler.stats["job"].last_bucket == _utc(12)
+        assert scheduler.stats["job"].last_lag_seconds == 50 * 60
+
+    async def test_failure_recorded_and_bucket_not_persisted(self):
+        clock = FakeClock(_utc(10, 20))
+        repo = _state_repo()
+        scheduler = BackgroundScheduler(bot=MagicMock(), state_repo=repo, now=clock.now, sleep=clock.sleep)
+
+        await _run(scheduler, func=AsyncMock(side_effect=RuntimeError("boom")), interval_seconds=HOUR, name="job")
+
+        assert scheduler.stats["job"].failures == 1
+        repo.aset_value.assert_not_awaited()
+        assert clock.sleeps == [40 * 60]
+
+    async def test_failed_bucket_retried_by_catch_up(self):
+        clock = FakeClock(_utc(10, 20), max_sleeps=1)
+        func = AsyncMock(side_effect=[RuntimeError("boom"), None, None])
+        repo = _state_repo({'bucket': _utc(9).isoformat()})
+        scheduler = BackgroundScheduler(bot=MagicMock(), state_repo=repo, now=clock.now, sleep=clock.sleep)
+
+        await _run(scheduler, func=func, interval_seconds=HOUR, name="job", catch_up=True)
+
+        assert [call.kwargs['scheduled_at'] for call in func.await_args_list] == [_utc(10), _utc(10), _utc(11)]
+        saved = [call.kwargs['value']['bucket'] for call in repo.aset_value.await_args_list]
+        assert saved == [_utc(10).isoformat(), _utc(11).isoformat()]
+
+    async def test_failed_bucket_stops_catch_up(self):
+        clock = FakeClock(_utc(10, 20))
+        func = AsyncMock(side_effect=[None, RuntimeError("boom")])
+        repo = _state_repo({'bucket': _utc(7).isoformat()})
+        scheduler = BackgroundScheduler(bot=MagicMock(), state_repo=repo, now=clock.now, sleep=clock.sleep)
+
+        await _run(scheduler, func=func, interval_seconds=HOUR, name="job", catch_up=True)
+
+        assert func.await_count == 2
+        saved = [call.kwargs['value']['bucket'] for call in repo.aset_value.await_args_list]
+        assert saved == [_utc(8).isoformat()]
+
+    async def test_state_load_error_treated_as_first_run(self):
+        clock = FakeClock(_utc(10, 20))
+        func = AsyncMock()
+        repo = _state_repo()
+        repo.aget_value.side_effect = RuntimeError("db down")
+        scheduler = BackgroundScheduler(bot=MagicMock(), state_repo=repo, now=clock.now, sleep=clock.sleep)
+
+        await _run(scheduler, func=func, interval_seconds=HOUR, name="job")
+
+        func.assert_awaited_once()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSchedulerStateRepository:
+    async def test_round_trips_through_setting_table(self):
+        from core.containers import container
+
+        repo = container.core.setting_repository()
+        clock = FakeClock(_utc(10, 20))
+        first = BackgroundScheduler(bot=MagicMock(), state_repo=repo, now=clock.now, sleep=clock.sleep)
+        await _run(first, func=AsyncMock(), interval_seconds=HOUR, name="job")
+
+        clock = FakeClock(_utc(10, 40))
+        func = AsyncMock()
+        second = BackgroundScheduler(bot=MagicMock(), state_repo=repo, now=clock.now, sleep=clock.sleep)
+        await _run(second, func=func, interval_seconds=HOUR, name="job")
+
+        func.assert_not_called()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSchedulerLeadership:
+    def _scheduler(self, clock: FakeClock, instance_id: str) -> BackgroundScheduler:
+        from core.containers import container
+
+        return BackgroundScheduler(
+            bot=MagicMock(),
+            state_repo=container.core.setting_repository(),
+            lease_repo=container.core.scheduler_lease_repository(),
+            instance_id=instance_id,
+            now=clock.now,
+            sleep=clock.sleep,
+        )
+
+    async def test_bucket_runs_once_across_replicas(self):
+        func = AsyncMock()
+
+        first = self._scheduler(FakeClock(_utc(10, 20)), "replica-1")
+        await _run(first, func=func, interval_seconds=HOUR, name="job")
+        second = self._scheduler(FakeClock(_utc(10, 21)), "replica-2")
+        await _run(second, func=func, interval_seconds=HOUR, name="job")
+
+        func.assert_awaited_once()
+
+    async def test_follower_skips_while_lease_is_held(self):
+        from core.containers import container
+
+        await container.core.scheduler_lease_repository().atry_acquire("job", holder="replica-1", ttl_seconds=600)
+        func = AsyncMock()
+        follower = self._scheduler(FakeClock(_utc(10, 20)), "replica-2")
+
+        await _run(follower, func=func, interval_seconds=HOUR, name="job")
+
+        func.assert_not_called()
+        assert follower.stats["job"].skipped_not_leader == 1
+
+    async def test_lease_released_after_run(self):
+        from core.models import SchedulerLease
+
+        leader = self._scheduler(FakeClock(_utc(10, 20)), "replica-1")
+        await _run(leader, func=AsyncMock(), interval_seconds=HOUR, name="job")
+
+        lease = await SchedulerLease.objects.aget(name="job")
+        assert lease.holder == "replica-1"
+        assert lease.expires_at <= django_timezone.now()
@@ -0,0 +1,153 @@
+"""Tests for slow update / slow job detection and its time breakdown."""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+from aiogram.types import Update
+from asgiref.sync import sync_to_async
+
+from core.profiling import SlowWorkDetector, format_coroutine_stack, record_io
+from telegram_bot.middlewares.slow_updates import SlowUpdateMiddleware
+from telegram_bot.scheduler import BackgroundScheduler, JobStats, ScheduledJob
+
+
+def _breakdown(caplog) -> dict:
+    [record] = [record for record in caplog.records if record.getMessage().startswith('Slow ')]
+    message = record.getMessage()
+    return json.loads(message[message.index('{'):])
+
+
+def _update(text: str = '/horoscope') -> Update:
+    return Update.model_validate({
+        'update_id': 5,
+        'message': {
+            'message_id': 1,
+            'date': datetime(2024, 1, 1),
+            'chat': {'id': 42, 'type': 'private'},
+            'from': {'id': 42, 'is_bot': False, 'first_name': 'Test'},
+            'text': text,
+        },
+    })
+
+
+class TestSlowWorkDetector:
+    def test_fast_unit_not_reported(self, caplog):
+        detector = SlowWorkDetector(thresholds={'update': 10})
+
+        with detector.watch('update', 'message'):
+            record_io('db', 0.01, 'SELECT 1')
+
+        assert detector.reported == 0
+        assert 'Slow ' not in caplog.text
+
+    def test_disabled_kind_is_not_watched(self):
+        detector = SlowWorkDetector(thresholds={'update': 0})
+
+        with detector.watch('update', 'message') as profile:
+            assert profile is None
+
+    def test_slow_unit_logs_breakdown(self, caplog):
+        detector = SlowWorkDetector(thresholds={'update': 1e-9})
+
+        with detector.watch('update', 'message:horoscope', update_id=5):
+            record_io('db', 0.2, 'SELECT * FROM horoscope_userprofile')
+            record_io('db', 0.1, 'UPDATE horoscope_horoscope SET sent_at = now()')
+            record_io('llm', 3.0)
+            record_io('telegram', 0.4)
+
+        breakdown = _breakdown(caplog)
+        assert breakdown['name'] == 'message:horoscope'
+        assert breakdown['update_id'] == 5
+        assert breakdown['db_seconds'] == 0.3
+        assert breakdown['db_calls'] == 2
+        assert breakdown['llm_seconds'] == 3.0
+        assert breakdown['telegram_calls'] == 1
+        assert [statement['sql'] for statement in breakdown['statements']] == [
+            'SELECT * FROM horoscope_userprofile',
+            'UPDATE horoscope_horoscope SET sent_at = now()',
+        ]
+
+    async def test_calls_in_sync_threads_are_attributed(self):
+        detector = SlowWorkDetector(thresholds={'update': 10})
+
+        with detector.watch('update', 'message') as profile:
+            await sync_to_async(record_io)('db', 0.05, 'SELECT 1')
+
+        assert profile.calls['db'] == 1
+
+    def test_slow_query_logged(self, caplog):
+        detector = SlowWorkDetector(thresholds={}, slow_query_seconds=0.5)
+        detector.install()
+        try:
+            record_io('db', 0.1, 'SELECT fast')
+            record_io('db', 0.7, 'SELECT slow')
+        finally:
+            SlowWorkDetector(thresholds={}).install()
+
+        assert 'SELECT slow' in caplog.text
+        assert 'SELECT fast' not in caplog.text
+
+    async def test_samples_task_stack_after_threshold(self, caplog):
+        detector = SlowWorkDetector(thresholds={'update': 0.01}, profile_interval_seconds=0.01)
+
+        async def waiting_on_llm():
+            await asyncio.sleep(0.1)
+
+        with detector.watch('update', 'message'):
+            await waiting_on_llm()
+
+        breakdown = _breakdown(caplog)
+        assert breakdown['stacks']
+        assert 'waiting_on_llm' in breakdown['stacks'][0]['stack']
+
+
+class TestFormatCoroutineStack:
+    async def test_follows_awaits_to_innermost_frame(self):
+        release = asyncio.Event()
+
+        async def inner():
+            await release.wait()
+
+        async def outer():
+            await inner()
+
+        task = asyncio.create_task(outer())
+        await asyncio.sleep(0)
+        stack = format_coroutine_stack(task.get_coro())
+        release.set()
+        await task
+
+        assert stack.index('in outer') < stack.index('in inner')
+
+
+class TestSlowUpdateMiddleware:
+    async def test_names_update_by_route(self, caplog):
+        middleware = SlowUpdateMiddleware(SlowWorkDetector(thresholds={'update': 1e-9}))
+
+        async def handler(event, data):
+            return 'done'
+
+        assert await middleware(handler, _update(), {}) == 'done'
+        breakdown = _breakdown(caplog)
+        assert breakdown['name'] == 'message:horoscope'
+        assert breakdown['chat_id'] == 42
+
+
+class TestSlowScheduledJob:
+    async def test_slow_job_reported(self, caplog):
+        detector = SlowWorkDetector(thresholds={'task': 1e-9})
+        scheduler = BackgroundScheduler(bot=MagicMock(), slow_detector=detector)
+        scheduler.stats['job'] = JobStats()
+
+        async def job(bot):
+            record_io('telegram', 0.2)
+
+        await scheduler._execute(
+            ScheduledJob(name='job', func=job, interval_seconds=60),
+            datetime(2024, 6, 15, tzinfo=timezone.utc),
+        )
+
+        assert detector.reported == 1
+        assert _breakdown(caplog)['telegram_calls'] == 1
@@ -0,0 +1,155 @@
+"""Tests for per-user, per-route token bucket throttling."""
+
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from aiogram.types import CallbackQuery, Message
+
+from telegram_bot.middlewares.throttling import (
+    THROTTLED_MESSAGE,
+    MemoryTokenBucketStore,
+    RedisTokenBucketStore,
+    ThrottleLimit,
+    ThrottlingMiddleware,
+    throttle_route,
+)
+
+
+def _message(text: str = "hello", user_id: int = 42, **extra) -> Message:
+    return Message.model_validate({
+        'message_id': 1,
+        'date': datetime(2024, 1, 1),
+        'chat': {'id': user_id, 'type': 'private'},
+        'from': {'id': user_id, 'is_bot': False, 'first_name': 'Test', 'language_code': 'en'},
+        'text': text,
+        **extra,
+    })
+
+
+def _callback(user_id: int = 42) -> CallbackQuery:
+    return CallbackQuery.model_validate({
+        'id': '1',
+        'chat_instance': 'x',
+        'from': {'id': user_id, 'is_bot': False, 'first_name': 'Test'},
+        'data': 'lang:en',
+    })
+
+
+class TestThrottleRoute:
+    def test_command_name_without_bot_mention(self):
+        assert throttle_route(_message("/Horoscope@my_bot today")) == 'horoscope'
+
+    def test_free_text_and_callbacks(self):
+        assert throttle_route(_message("what about love?")) == 'text'
+        assert throttle_route(_callback()) == 'callback'
+
+    def test_successful_payment_is_never_throttled(self):
+        payment = _message(successful_payment={
+            'currency': 'XTR',
+            'total_amount': 100,
+            'invoice_payload': 'sub',
+            'telegram_payment_charge_id': 'c',
+            'provider_payment_charge_id': 'p',
+        })
+        assert throttle_route(payment) is None
+
+
+class TestMemoryTokenBucketStore:
+    async def test_allows_burst_then_blocks(self):
+        store = MemoryTokenBucketStore()
+        limit = ThrottleLimit(capacity=3, refill_per_minute=1)
+
+        results = [await store.consume('k', limit) for _ in range(4)]
+
+        assert results == [True, True, True, False]
+
+    async def test_refills_over_time(self):
+        store = MemoryTokenBucketStore()
+        limit = ThrottleLimit(capacity=1, refill_per_minute=60)
+        with patch('telegram_bot.middlewares.throttling.time.monotonic', side_effect=[100.0, 100.5, 101.6]):
+            assert await store.consume('k', limit)
+            assert not await store.consume('k', limit)
+            assert await store.consume('k', limit)
+
+    async def test_buckets_are_per_key(self):
+        store = MemoryTokenBucketStore()
+        limit = ThrottleLimit(capacity=1, refill_per_minute=1)
+
+        assert await store.consume('a', limit)
+        assert await store.consume('b', limit)
+
+    async def test_notifies_once_per_window(self):
+        store = MemoryTokenBucketStore()
+
+        assert await store.should_notify('k', ttl_seconds=60)
+        assert not await store.should_notify('k', ttl_seconds=60)
+
+
+class TestRedisTokenBucketStore:
+    async def test_runs_script_with_limit(self):
+        redis = MagicMock()
+        script = AsyncMock(return_value=0)
+        redis.register_script.return_value = script
+        store = RedisTokenBucketStore(redis)
+
+        allowed = await store.consume('throttle:1:text', ThrottleLimit(capacity=5, refill_per_minute=30))
+
+        assert allowed is False
+        assert script.await_args.kwargs == {'keys': ['throttle:1:text'], 'args': [5, 0.5, 11]}
+
+    async def test_notify_uses_set_nx(self):
+        redis = MagicMock()
+        redis.set = AsyncMock(side_effect=[True, None])
+        store = RedisTokenBucketStore(redis)
+
+        assert await store.should_notify('k', ttl_seconds=30)
+        assert not await store.should_notify('k', ttl_seconds=30)
+        redis.set.assert_awaited_with('k:notified', 1, nx=True, ex=30)
+
+
+class TestThrottlingMiddleware:
+    def _middleware(self, **limits) -> ThrottlingMiddleware:
+        limits = limits or {'default': ThrottleLimit(capacity=1, refill_per_minute=1)}
+        return ThrottlingMiddleware(store=MemoryTokenBucketStore(), limits=limits)
+
+    async def test_blocks_handler_and_replies_once(self):
+        middleware = self._middleware()
+        handler = AsyncMock(return_value='handled')
+
+        with patch.object(Message, 'answer', new_callable=AsyncMock) as answer:
+            results = [await middleware(handler, _message("/horoscope"), {}) for _ in range(3)]
+
+        assert results == ['handled', None, None]
+        assert handler.await_count == 1
+        assert middleware.throttled == 2
+        answer.assert_awaited_once_with(str(THROTTLED_MESSAGE))
+
+    async def test_routes_have_separate_buckets(self):
+        middleware = self._middleware()
+        handler = AsyncMock()
+
+        await middleware(handler, _message("/horoscope"), {})
+        await middleware(handler, _message("/settings"), {})
+
+        assert handler.await_count == 2
+
+    async def test_throttled_callback_is_still_answered(self):
+        middleware = self._middleware(callback=ThrottleLimit(capacity=1, refill_per_minute=1))
+        handler = AsyncMock()
+
+        with patch.object(CallbackQuery, 'answer', new_callable=AsyncMock) as answer:
+            for _ in range(3):
+                await middleware(handler, _callback(), {})
+
+        assert handler.await_count == 1
+        assert answer.await_count == 2
+        assert answer.await_args_list[0].args == (str(THROTTLED_MESSAGE),)
+        assert answer.await_args_list[1].args == ()
+
+    async def test_store_failure_lets_event_through(self):
+        store = MagicMock()
+        store.consume = AsyncMock(side_effect=ConnectionError("redis down"))
+        middleware = ThrottlingMiddleware(store=store, limits={'default': ThrottleLimit(1, 1)})
+        handler = AsyncMock(return_value='handled')
+
+        assert await middleware(handler, _message(), {}) == 'handled'
@@ -0,0 +1,207 @@
+"""Tests for in-process tracing: span trees, export decisions and instrumentation points."""
+
+import json
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from aiogram.types import Update
+
+from core.metrics import install_db_query_metrics
+from core.repositories.user import UserRepository
+from core.tracing import (
+    MAX_CHILDREN_PER_SPAN,
+    ConsoleSpanExporter,
+    FileSpanExporter,
+    Tracer,
+    configure_tracing,
+    span,
+    start_trace,
+)
+from telegram_bot.middlewares.tracing import HandlerSpanMiddleware, TracedMiddleware, TracingMiddleware
+
+
+class RecordingExporter:
+    def __init__(self):
+        self.traces = []
+
+    def export(self, trace):
+        self.traces.append(trace)
+
+
+@pytest.fixture
+def exporter():
+    exporter = RecordingExporter()
+    configure_tracing(Tracer(exporter=exporter, sample_rate=1.0))
+    yield exporter
+    configure_tracing(None)
+
+
+class TestSpans:
+    def test_spans_nest_under_trace(self, exporter):
+        with start_trace('update', 'update', update_id=1):
+            with span('outer', 'middleware'):
+                with span('inner', 'db'):
+                    pass
+
+        [trace] = exporter.traces
+        assert trace.root.attributes == {'update_id': 1}
+        [outer] = trace.root.children
+        assert outer.name == 'outer'
+        assert [child.name for child in outer.children] == ['inner']
+        assert outer.duration >= outer.children[0].duration
+
+    def test_span_outside_trace_is_noop(self, exporter):
+        with span('orphan') as orphan:
+            assert orphan is None
+        assert exporter.traces == []
+
+    def test_disabled_tracing_records_nothing(self):
+        with start_trace('update', 'update') as root:
+            assert root is None
+
+    def test_error_recorded_on_span(self, exporter):
+        with pytest.raises(ValueError):
+            with start_trace('update', 'update'):
+                with span('failing'):
+                    raise ValueError
+
+        root = exporter.traces[0].root
+        assert root.error == 'ValueError'
+        assert root.children[0].error == 'ValueError'
+
+    def test_children_beyond_cap_are_counted(self, exporter):
+        with start_trace('task bulk', 'task'):
+            for _ in range(MAX_CHILDREN_PER_SPAN + 3):
+                with span('telegram.sendMessage', 'telegram'):
+                    pass
+
+        root = exporter.traces[0].root
+        assert len(root.children) == MAX_CHILDREN_PER_SPAN
+        assert root.dropped_children == 3
+
+
+class TestExportDecision:
+    def test_unsampled_fast_trace_not_exported(self):
+        exporter = RecordingExporter()
+        configure_tracing(Tracer(exporter=exporter, sample_rate=0.0, slow_seconds=10))
+        try:
+            with start_trace('update', 'update'):
+                pass
+        finally:
+            configure_tracing(None)
+        assert exporter.traces == []
+
+    def test_slow_trace_exported_without_sampling(self):
+        exporter = RecordingExporter()
+        configure_tracing(Tracer(exporter=exporter, sample_rate=0.0, slow_seconds=0))
+        try:
+            with start_trace('update', 'update'):
+                pass
+        finally:
+            configure_tracing(None)
+        assert len(exporter.traces) == 1
+
+    def test_file_exporter_writes_json_lines(self, tmp_path):
+        path = tmp_path / 'traces.jsonl'
+        configure_tracing(Tracer(exporter=FileSpanExporter(str(path)), sample_rate=1.0))
+        try:
+            with start_trace('update', 'update'):
+                with span('handler', 'handler'):
+                    pass
+        finally:
+            configure_tracing(None)
+
+        [line] = path.read_text().splitlines()
+        data = json.loads(line)
+        assert data['name'] == 'update'
+        assert data['children'][0]['kind'] == 'handler'
+
+    def test_console_exporter_logs_tree(self, caplog):
+        configure_tracing(Tracer(exporter=ConsoleSpanExporter(), sample_rate=1.0))
+        try:
+            with caplog.at_level('INFO', logger='core.tracing'):
+                with start_trace('update', 'update'):
+                    with span('UserMiddleware', 'middleware'):
+                        pass
+        finally:
+            configure_tracing(None)
+
+        assert '  UserMiddleware [middleware]' in caplog.text
+
+
+@pytest.mark.django_db(transaction=True)
+class TestRepositorySpans:
+    async def test_async_repository_call_is_db_span_with_sql_count(self, exporter):
+        install_db_query_metrics()
+
+        with start_trace('update', 'update'):
+            await UserRepository().aget_or_create(telegram_uid=123, defaults={'username': 'u'})
+
+        [repository_span] = exporter.traces[0].root.children
+        assert repository_span.name == 'UserRepository.aget_or_create'
+        assert repository_span.kind == 'db'
+        assert repository_span.sql_count >= 1
+
+
+def _update() -> Update:
+    return Update.model_validate({
+        'update_id': 9,
+        'message': {
+            'message_id': 1,
+            'date': datetime(2024, 1, 1),
+            'chat': {'id': 42, 'type': 'private'},
+            'from': {'id': 42, 'is_bot': False, 'first_name': 'Test'},
+            'text': '/horoscope',
+        },
+    })
+
+
+async def show_horoscope(event, data):
+    return None
+
+
+class TestTracingMiddlewares:
+    async def test_update_traced_through_middlewares_and_handler(self, exporter):
+        inner = MagicMock()
+
+        async def user_middleware(handler, event, data):
+            inner()
+            return await handler(event, data)
+
+        traced = TracedMiddleware(user_middleware, name='UserMiddleware')
+        handler_span = HandlerSpanMiddleware()
+        handler = AsyncMock(return_value='done')
+        data = {'handler': MagicMock(callback=show_horoscope)}
+
+        async def chain(event, data):
+            return await traced(lambda e, d: handler_span(handler, e, d), event, data)
+
+        result = await TracingMiddleware()(chain, _update(), data)
+
+        assert result == 'done'
+        root = exporter.traces[0].root
+        assert root.attributes == {'update_id': 9, 'type': 'message', 'chat_id': 42}
+        [middleware_span] = root.children
+        assert middleware_span.name == 'UserMiddleware'
+        assert middleware_span.children[0].name == 'test_tracing.show_horoscope'
+        assert middleware_span.children[0].kind == 'handler'
+
+
+class TestLLMSpan:
+    def test_llm_call_span_has_token_counts(self, exporter):
+        from horoscope.services.llm import LLMService
+
+        response = MagicMock()
+        response.choices[0].message.content = 'answer'
+        response.model = 'test-model'
+        response.usage.prompt_tokens = 10
+        response.usage.completion_tokens = 5
+
+        with patch('litellm.completion', return_value=response):
+            with start_trace('update', 'update'):
+                LLMService().generate_followup_answer(horoscope_text='text', question='q?')
+
+        [llm_span] = exporter.traces[0].root.children
+        assert llm_span.kind == 'llm'
+        assert llm_span.attributes['input_tokens'] == 10
@@ -0,0 +1,189 @@
+"""Tests for webhook ingestion: chat partitioning, the stream endpoint and the stream worker."""
+
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from telegram_bot.benchmarks.fake_telegram import FakeTelegramServer, create_fake_bot
+from telegram_bot.benchmarks.webhook_load import build_echo_dispatcher, make_update
+from telegram_bot.webhook import (
+    CONSUMER_GROUP,
+    SECRET_TOKEN_HEADER,
+    UpdateStreamPublisher,
+    UpdateStreamRequestHandler,
+    UpdateStreamWorker,
+    chat_key,
+    owned_partitions,
+    partition_for,
+    stream_name,
+)
+
+
+class TestChatKey:
+    def test_message_uses_chat(self):
+        assert chat_key({'update_id': 1, 'message': {'chat': {'id': -100}, 'from': {'id': 7}}}) == -100
+
+    def test_callback_query_uses_message_chat(self):
+        update = {'update_id': 1, 'callback_query': {'from': {'id': 7}, 'message': {'chat': {'id': 42}}}}
+        assert chat_key(update) == 42
+
+    def test_callback_query_without_message_uses_sender(self):
+        assert chat_key({'update_id': 1, 'callback_query': {'from': {'id': 7}}}) == 7
+
+    def test_pre_checkout_query_uses_sender(self):
+        assert chat_key({'update_id': 1, 'pre_checkout_query': {'id': 'x', 'from': {'id': 9}}}) == 9
+
+    def test_falls_back_to_update_id(self):
+        assert chat_key({'update_id': 5, 'poll': {'id': 'p'}}) == 5
+
+
+class TestPartitioning:
+    def test_negative_chat_ids_map_into_range(self):
+        assert 0 <= partition_for(-1001234567, 16) < 16
+
+    def test_every_partition_has_exactly_one_owner(self):
+        owners = [owned_partitions(index, 3, 16) for index in range(3)]
+        flat = [partition for owned in owners for partition in owned]
+        assert sorted(flat) == list(range(16))
+
+    def test_worker_count_above_partitions_rejected(self):
+        with pytest.raises(ValueError, match='partitions'):
+            UpdateStreamWorker(
+                redis=MagicMock(),
+                dispatcher=MagicMock(),
+                bot=MagicMock(),
+                bot_slug='horoscope',
+                partitions=2,
+                worker_index=0,
+                worker_count=3,
+            )
+
+
+class TestUpdateStreamPublisher:
+    async def test_appends_to_partition_of_chat(self):
+        redis = MagicMock()
+        redis.xadd = AsyncMock(return_value='1-0')
+        publisher = UpdateStreamPublisher(redis=redis, bot_slug='horoscope', partitions=4, maxlen=10)
+
+        await publisher.publish(make_update(update_id=1, chat_id=6, sequence=0))
+
+        stream, fields = redis.xadd.await_args.args
+        assert stream == stream_name('horoscope', 2)
+        assert '"update_id": 1' in fields['update']
+        assert redis.xadd.await_args.kwargs == {'maxlen': 10, 'approximate': True}
+
+
+class TestUpdateStreamRequestHandler:
+    async def _client(self, publisher) -> TestClient:
+        app = web.Application()
+        UpdateStreamRequestHandler(publisher=publisher, secret_token='s3cret').register(app, path='/hook')
+        client = TestClient(TestServer(app))
+        await client.start_server()
+        return client
+
+    async def test_rejects_wrong_secret(self):
+        publisher = MagicMock()
+        publisher.publish = AsyncMock()
+        client = await self._client(publisher)
+        try:
+            response = await client.post('/hook', json={'update_id': 1}, headers={SECRET_TOKEN_HEADER: 'nope'})
+            missing = await client.post('/hook', json={'update_id': 1})
+        finally:
+            await client.close()
+
+        assert response.status == 401
+        assert missing.status == 401
+        publisher.publish.assert_not_called()
+
+    async def test_publishes_update_with_valid_secret(self):
+        publisher = MagicMock()
+        publisher.publish = AsyncMock()
+        client = await self._client(publisher)
+        try:
+            response = await client.post('/hook', json={'update_id': 1}, headers={SECRET_TOKEN_HEADER: 's3cret'})
+        finally:
+            await client.close()
+
+        assert response.status == 200
+        publisher.publish.assert_awaited_once_with({'update_id': 1})
+
+
+def _entry(entry_id: str, update: dict) -> tuple[str, dict]:
+    return entry_id, {'update': json.dumps(update)}
+
+
+class TestUpdateStreamWorker:
+    def _worker(self, redis, dispatcher) -> UpdateStreamWorker:
+        return UpdateStreamWorker(
+            redis=redis,
+            dispatcher=dispatcher,
+            bot=MagicMock(),
+            bot_slug='horoscope',
+            partitions=2,
+            worker_index=0,
+            worker_count=1,
+        )
+
+    async def test_handles_entries_in_order_and_acks(self):
+        handled = []
+        dispatcher = MagicMock()
+        dispatcher.feed_raw_update = AsyncMock(side_effect=lambda bot, update: handled.append(update['update_id']))
+        redis = MagicMock()
+        redis.xreadgroup = AsyncMock(return_value=[
+            (stream_name('horoscope', 0), [_entry('1-0', {'update_id': 1}), _entry('2-0', {'update_id': 2})]),
+            (stream_name('horoscope', 1), [_entry('1-1', {'update_id': 3})]),
+        ])
+        redis.xack = AsyncMock()
+
+        count = await self._worker(redis, dispatcher).read_once()
+
+        assert count == 3
+        assert handled.index(1) < handled.index(2)
+        redis.xack.assert_any_await(stream_name('horoscope', 0), CONSUMER_GROUP, '1-0', '2-0')
+        redis.xack.assert_any_await(stream_name('horoscope', 1), CONSUMER_GROUP, '1-1')
+
+    async def test_failed_update_is_acked(self):
+        dispatcher = MagicMock()
+        dispatcher.feed_raw_update = AsyncMock(side_effect=RuntimeError("boom"))
+        redis = MagicMock()
+        redis.xreadgroup = AsyncMock(return_value=[
+            (stream_name('horoscope', 0), [_entry('1-0', {'update_id': 1})]),
+        ])
+        redis.xack = AsyncMock()
+        worker = self._worker(redis, dispatcher)
+
+        await worker.read_once()
+
+        assert worker.failed == 1
+        redis.xack.assert_awaited_once_with(stream_name('horoscope', 0), CONSUMER_GROUP, '1-0')
+
+    async def test_pending_read_does_not_block(self):
+        redis = MagicMock()
+        redis.xreadgroup = AsyncMock(return_value=[])
+        worker = self._worker(redis, MagicMock())
+
+        assert await worker.read_once(pending=True) == 0
+        streams = redis.xreadgroup.await_args.args[2]
+        assert set(streams.values()) == {'0'}
+        assert redis.xreadgroup.await_args.kwargs['block'] is None
+
+
+class TestFakeTelegram:
+    async def test_echo_dispatcher_replies_through_fake_api(self):
+        server = FakeTelegramServer()
+        api_url = await server.start()
+        bot = create_fake_bot(api_url)
+        try:
+            dispatcher = build_echo_dispatcher()
+            for sequence in range(3):
+                await dispatcher.feed_raw_update(bot, make_update(update_id=sequence + 1, chat_id=77, sequence=sequence))
+            assert await server.wait_for_sent(3, timeout=5)
+        finally:
+            await bot.session.close()
+            await server.stop()
+
+        assert server.sent[77] == ['0', '1', '2']
+        assert server.calls['sendMessage'] == 3
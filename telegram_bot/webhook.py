@@ -0,0 +1,209 @@
+"""
+Webhook ingestion for Telegram updates.
+
+In webhook mode Telegram POSTs updates to an aiohttp endpoint that checks the
+X-Telegram-Bot-Api-Secret-Token header. Updates are either handled in the
+receiving process, or appended to Redis streams and handled by separate worker
+processes (start_bot --mode worker).
+
+Streams are partitioned by chat: every update of a chat goes to the same
+partition, and every partition is read by exactly one worker, which handles its
+entries one at a time. Per-chat order is therefore kept while different chats
+are spread over all workers. Workers read through a consumer group and ack after
+handling, so entries read but not handled before a crash are picked up again
+when the worker restarts.
+"""
+
+import asyncio
+import json
+import logging
+import secrets
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from aiohttp import web
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+logger = logging.getLogger(__name__)
+
+SECRET_TOKEN_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+STREAM_PREFIX = 'telegram_updates'
+CONSUMER_GROUP = 'workers'
+
+# Update types whose object carries the chat; the rest are keyed by the sender
+_CHAT_UPDATE_TYPES = (
+    'message',
+    'edited_message',
+    'channel_post',
+    'edited_channel_post',
+    'business_message',
+    'edited_business_message',
+    'message_reaction',
+    'message_reaction_count',
+    'chat_member',
+    'my_chat_member',
+    'chat_join_request',
+    'chat_boost',
+    'removed_chat_boost',
+)
+
+
+def chat_key(update: dict[str, Any]) -> int:
+    """Chat id an update belongs to (sender id if there is no chat, update id as a last resort)."""
+    for update_type in _CHAT_UPDATE_TYPES:
+        payload = update.get(update_type)
+        if payload and payload.get('chat'):
+            return payload['chat']['id']
+    callback_query = update.get('callback_query')
+    if callback_query:
+        message = callback_query.get('message')
+        if message and message.get('chat'):
+            return message['chat']['id']
+        return callback_query['from']['id']
+    for payload in update.values():
+        if isinstance(payload, dict) and payload.get('from'):
+            return payload['from']['id']
+    return update['update_id']
+
+
+def partition_for(key: int, partitions: int) -> int:
+    return key % partitions
+
+
+def stream_name(bot_slug: str, partition: int) -> str:
+    return f"{STREAM_PREFIX}:{bot_slug}:{partition}"
+
+
+def owned_partitions(worker_index: int, worker_count: int, partitions: int) -> list[int]:
+    """Partitions read by one worker; every partition belongs to exactly one worker."""
+    return [partition for partition in range(partitions) if partition % worker_count == worker_index]
+
+
+async def ensure_consumer_groups(redis: Redis, streams: list[str]) -> None:
+    """Create the worker consumer group on every stream (and the stream itself) if missing."""
+    for stream in streams:
+        try:
+            await redis.xgroup_create(stream, CONSUMER_GROUP, id='0', mkstream=True)
+        except ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+
+class UpdateStreamPublisher:
+    """Appends raw updates to the partition stream of their chat."""
+
+    def __init__(self, redis: Redis, bot_slug: str, partitions: int, maxlen: int = 100_000):
+        self._redis = redis
+        self._bot_slug = bot_slug
+        self._partitions = partitions
+        self._maxlen = maxlen
+
+    async def publish(self, update: dict[str, Any]) -> str:
+        partition = partition_for(chat_key(update), self._partitions)
+        return await self._redis.xadd(
+            stream_name(self._bot_slug, partition),
+            {'update': json.dumps(update)},
+            maxlen=self._maxlen,
+            approximate=True,
+        )
+
+
+class UpdateStreamRequestHandler:
+    """aiohttp webhook endpoint that hands updates to UpdateStreamPublisher instead of handling them."""
+
+    def __init__(self, publisher: UpdateStreamPublisher, secret_token: str):
+        self._publisher = publisher
+        self._secret_token = secret_token
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if not secrets.compare_digest(request.headers.get(SECRET_TOKEN_HEADER, ''), self._secret_token):
+            return web.Response(body='Unauthorized', status=401)
+        try:
+            update = await request.json()
+        except ValueError:
+            return web.Response(body='Bad Request', status=400)
+        # Telegram retries anything but a 2xx, so a failed publish is reported back
+        await self._publisher.publish(update)
+        return web.json_response({})
+
+    def register(self, app: web.Application, path: str) -> None:
+        app.router.add_post(path, self.handle)
+
+
+class UpdateStreamWorker:
+    """Reads the partition streams owned by one worker and feeds their updates to the dispatcher."""
+
+    def __init__(
+        self,
+        redis: Redis,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        bot_slug: str,
+        partitions: int,
+        worker_index: int,
+        worker_count: int,
+        batch_size: int = 100,
+        block_ms: int = 1000,
+    ):
+        if worker_count > partitions:
+            raise ValueError(f"worker_count ({worker_count}) must not exceed partitions ({partitions})")
+        self._redis = redis
+        self._dispatcher = dispatcher
+        self._bot = bot
+        self._batch_size = batch_size
+        self._block_ms = block_ms
+        self.consumer_name = f"worker-{worker_index}"
+        self.streams = [
+            stream_name(bot_slug, partition)
+            for partition in owned_partitions(worker_index, worker_count, partitions)
+        ]
+        self.handled = 0
+        self.failed = 0
+
+    async def run(self) -> None:
+        await ensure_consumer_groups(self._redis, self.streams)
+        logger.info(f"Update worker {self.consumer_name} reading {len(self.streams)} streams")
+        # Entries read before a restart but never acked come first, in their original order
+        while await self.read_once(pending=True):
+            pass
+        while True:
+            await self.read_once()
+
+    async def read_once(self, pending: bool = False) -> int:
+        """Read and handle one batch from every owned stream. Returns the number of entries handled."""
+        response = await self._redis.xreadgroup(
+            CONSUMER_GROUP,
+            self.consumer_name,
+            {stream: '0' if pending else '>' for stream in self.streams},
+            count=self._batch_size,
+            block=None if pending else self._block_ms,
+        )
+        if not response:
+            return 0
+        # Streams are independent partitions; entries within one are handled in order
+        counts = await asyncio.gather(*(
+            self._handle_entries(stream, entries) for stream, entries in response
+        ))
+        return sum(counts)
+
+    async def _handle_entries(self, stream: str, entries: list[tuple[str, dict]]) -> int:
+        handled_ids = []
+        for entry_id, fields in entries:
+            if fields:
+                await self._handle_update(fields)
+            handled_ids.append(entry_id)
+        if handled_ids:
+            await self._redis.xack(stream, CONSUMER_GROUP, *handled_ids)
+        return len(handled_ids)
+
+    async def _handle_update(self, fields: dict) -> None:
+        update = json.loads(fields['update'])
+        try:
+            await self._dispatcher.feed_raw_update(self._bot, update)
+            self.handled += 1
+        except Exception as e:
+            # A failing update is acked anyway so it cannot block its chat's partition
+            self.failed += 1
+            logger.error(f"Failed to handle update {update.get('update_id')}", exc_info=e)
+